@@ -0,0 +1,29 @@
+"""add_redirect_hit_count
+
+Revision ID: a7b8c9d0e1f2
+Revises: z6a7b8c9d0e1
+Create Date: 2026-10-18
+
+Adds `content_redirects.hit_count`, incremented in batches from the
+per-worker redirect table.
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a7b8c9d0e1f2"
+down_revision: str = "z6a7b8c9d0e1"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("content_redirects", sa.Column("hit_count", sa.Integer, nullable=False, server_default="0"))
+
+
+def downgrade() -> None:
+    op.drop_column("content_redirects", "hit_count")
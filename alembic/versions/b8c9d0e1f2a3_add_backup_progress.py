@@ -0,0 +1,41 @@
+"""add_backup_progress
+
+Revision ID: b8c9d0e1f2a3
+Revises: a7b8c9d0e1f2
+Create Date: 2026-10-19
+
+Adds `backups.progress_percent` and `backups.progress_stage`, updated by
+the backup engine as a run advances.  `backups` is created by the
+application's metadata rather than an earlier revision, so the columns are
+only added where the table already exists.
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b8c9d0e1f2a3"
+down_revision: str = "a7b8c9d0e1f2"
+branch_labels = None
+depends_on = None
+
+
+def _has_backups_table() -> bool:
+    return sa.inspect(op.get_bind()).has_table("backups")
+
+
+def upgrade() -> None:
+    if not _has_backups_table():
+        return
+    op.add_column("backups", sa.Column("progress_percent", sa.Integer, nullable=False, server_default="0"))
+    op.add_column("backups", sa.Column("progress_stage", sa.String(50), nullable=True))
+
+
+def downgrade() -> None:
+    if not _has_backups_table():
+        return
+    op.drop_column("backups", "progress_stage")
+    op.drop_column("backups", "progress_percent")
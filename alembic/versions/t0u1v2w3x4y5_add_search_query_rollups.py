@@ -0,0 +1,50 @@
+"""add_search_query_rollups
+
+Revision ID: t0u1v2w3x4y5
+Revises: s9t0u1v2w3x4
+Create Date: 2026-10-18
+
+Creates the `search_query_rollups` table (per-day aggregates keyed by
+(day, normalized_query)) read by the search analytics endpoint, and
+backfills it from the existing `search_queries` rows.
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "t0u1v2w3x4y5"
+down_revision: str = "s9t0u1v2w3x4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "search_query_rollups",
+        sa.Column("day", sa.Date, primary_key=True),
+        sa.Column("normalized_query", sa.String(500), primary_key=True),
+        sa.Column("search_count", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("zero_result_count", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("total_results", sa.BigInteger, nullable=False, server_default="0"),
+        sa.Column("total_execution_time_ms", sa.Float, nullable=False, server_default="0"),
+    )
+    op.create_index("ix_search_query_rollups_day", "search_query_rollups", ["day"])
+
+    op.execute(
+        "INSERT INTO search_query_rollups "
+        "(day, normalized_query, search_count, zero_result_count, total_results, total_execution_time_ms) "
+        "SELECT DATE(created_at), COALESCE(normalized_query, LOWER(TRIM(query))), COUNT(*), "
+        "SUM(CASE WHEN results_count = 0 THEN 1 ELSE 0 END), SUM(results_count), "
+        "COALESCE(SUM(execution_time_ms), 0) "
+        "FROM search_queries "
+        "GROUP BY DATE(created_at), COALESCE(normalized_query, LOWER(TRIM(query)))"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_search_query_rollups_day", table_name="search_query_rollups")
+    op.drop_table("search_query_rollups")
@@ -0,0 +1,48 @@
+"""add_comment_materialized_path
+
+Revision ID: u1v2w3x4y5z6
+Revises: t0u1v2w3x4y5
+Create Date: 2026-10-18
+
+Adds `thread_id` (id of the thread's top-level comment) and `path`
+(zero-padded ancestor ids, e.g. "0000000007/0000000042/") to `comments`,
+backfills both with a recursive CTE, and indexes (thread_id, path) so a
+page of threads with all descendants is one ordered index scan.
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "u1v2w3x4y5z6"
+down_revision: str = "t0u1v2w3x4y5"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("comments", sa.Column("thread_id", sa.Integer, nullable=True))
+    op.add_column("comments", sa.Column("path", sa.Text, nullable=False, server_default=""))
+
+    op.execute(
+        "WITH RECURSIVE tree AS ("
+        "  SELECT id, id AS thread_id, LPAD(id::text, 10, '0') || '/' AS path "
+        "  FROM comments WHERE parent_id IS NULL "
+        "  UNION ALL "
+        "  SELECT c.id, t.thread_id, t.path || LPAD(c.id::text, 10, '0') || '/' "
+        "  FROM comments c JOIN tree t ON c.parent_id = t.id"
+        ") "
+        "UPDATE comments SET thread_id = tree.thread_id, path = tree.path "
+        "FROM tree WHERE comments.id = tree.id"
+    )
+
+    op.create_index("ix_comments_thread_path", "comments", ["thread_id", "path"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_comments_thread_path", table_name="comments")
+    op.drop_column("comments", "path")
+    op.drop_column("comments", "thread_id")
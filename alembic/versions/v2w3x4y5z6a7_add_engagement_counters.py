@@ -0,0 +1,57 @@
+"""add_engagement_counters
+
+Revision ID: v2w3x4y5z6a7
+Revises: u1v2w3x4y5z6
+Create Date: 2026-10-18
+
+Adds denormalized counter columns — `content.view_count`,
+`content.comment_count`, `comments.like_count`, `comments.dislike_count` —
+and backfills them from content_views / comments / comment_reactions.
+Afterwards they are maintained by app.utils.counters.
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "v2w3x4y5z6a7"
+down_revision: str = "u1v2w3x4y5z6"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("content", sa.Column("view_count", sa.Integer, nullable=False, server_default="0"))
+    op.add_column("content", sa.Column("comment_count", sa.Integer, nullable=False, server_default="0"))
+    op.add_column("comments", sa.Column("like_count", sa.Integer, nullable=False, server_default="0"))
+    op.add_column("comments", sa.Column("dislike_count", sa.Integer, nullable=False, server_default="0"))
+
+    op.execute(
+        "UPDATE content SET view_count = v.n FROM "
+        "(SELECT content_id, COUNT(*) AS n FROM content_views GROUP BY content_id) v "
+        "WHERE content.id = v.content_id"
+    )
+    op.execute(
+        "UPDATE content SET comment_count = c.n FROM "
+        "(SELECT content_id, COUNT(*) AS n FROM comments "
+        " WHERE status = 'APPROVED' AND is_deleted = false GROUP BY content_id) c "
+        "WHERE content.id = c.content_id"
+    )
+    op.execute(
+        "UPDATE comments SET like_count = r.likes, dislike_count = r.dislikes FROM "
+        "(SELECT comment_id, "
+        " COUNT(*) FILTER (WHERE UPPER(reaction_type::text) = 'LIKE') AS likes, "
+        " COUNT(*) FILTER (WHERE UPPER(reaction_type::text) = 'DISLIKE') AS dislikes "
+        " FROM comment_reactions GROUP BY comment_id) r "
+        "WHERE comments.id = r.comment_id"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("comments", "dislike_count")
+    op.drop_column("comments", "like_count")
+    op.drop_column("content", "comment_count")
+    op.drop_column("content", "view_count")
@@ -0,0 +1,165 @@
+"""compact_content_versions
+
+Revision ID: w3x4y5z6a7b8
+Revises: v2w3x4y5z6a7
+Create Date: 2026-10-18
+
+Switches `content_versions` from full snapshots to keyframes plus deltas:
+adds `version_number`, `base_version_id`, `body_delta` and `body_length`,
+makes `body` nullable, numbers existing versions (unique per content item),
+then compacts existing history one content item at a time — every version
+that is not a keyframe is rewritten as a compressed line diff against its
+keyframe and its `body` is cleared.
+
+The delta codec is inlined (a frozen copy of app/utils/text_delta.py as of
+this revision) so the migration does not depend on application code or
+settings; the keyframe interval is the default of
+`CONTENT_VERSION_KEYFRAME_INTERVAL`.
+
+Postgres does not return the freed space to the OS on its own; run
+`VACUUM (FULL, ANALYZE) content_versions` (or pg_repack) afterwards.
+"""
+
+from __future__ import annotations
+
+import difflib
+import json
+import zlib
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "w3x4y5z6a7b8"
+down_revision: str = "v2w3x4y5z6a7"
+branch_labels = None
+depends_on = None
+
+KEYFRAME_INTERVAL = 25
+MAX_DELTA_RATIO = 0.5
+
+
+def encode_delta(base: str, target: str) -> bytes:
+    base_lines = base.splitlines(keepends=True)
+    target_lines = target.splitlines(keepends=True)
+
+    ops: list[int | str] = []
+    matcher = difflib.SequenceMatcher(None, base_lines, target_lines)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append(i2 - i1)
+            continue
+        if i2 > i1:
+            ops.append(i1 - i2)
+        if j2 > j1:
+            ops.append("".join(target_lines[j1:j2]))
+
+    return zlib.compress(json.dumps(ops, separators=(",", ":")).encode())
+
+
+def apply_delta(base: str, delta: bytes) -> str:
+    base_lines = base.splitlines(keepends=True)
+    out: list[str] = []
+    pos = 0
+    for op_ in json.loads(zlib.decompress(delta)):
+        if isinstance(op_, str):
+            out.append(op_)
+        elif op_ > 0:
+            out.extend(base_lines[pos : pos + op_])
+            pos += op_
+        else:
+            pos -= op_
+    return "".join(out)
+
+
+def worth_chaining(delta: bytes, target: str) -> bool:
+    return len(delta) <= len(zlib.compress(target.encode())) * MAX_DELTA_RATIO
+
+
+def upgrade() -> None:
+    op.add_column("content_versions", sa.Column("version_number", sa.Integer, nullable=True))
+    op.add_column(
+        "content_versions",
+        sa.Column(
+            "base_version_id",
+            sa.Integer,
+            sa.ForeignKey("content_versions.id", ondelete="CASCADE"),
+            nullable=True,
+        ),
+    )
+    op.add_column("content_versions", sa.Column("body_delta", sa.LargeBinary, nullable=True))
+    op.add_column("content_versions", sa.Column("body_length", sa.Integer, nullable=True))
+    op.alter_column("content_versions", "body", existing_type=sa.Text, nullable=True)
+
+    op.execute(
+        "UPDATE content_versions SET body_length = LENGTH(body), version_number = n.rn FROM "
+        "(SELECT id, ROW_NUMBER() OVER (PARTITION BY content_id ORDER BY created_at, id) AS rn "
+        " FROM content_versions) n "
+        "WHERE content_versions.id = n.id"
+    )
+    op.create_unique_constraint(
+        "uq_content_versions_content_number", "content_versions", ["content_id", "version_number"]
+    )
+    op.create_index("ix_content_versions_base_version_id", "content_versions", ["base_version_id"])
+
+    _compact(op.get_bind(), KEYFRAME_INTERVAL)
+
+
+def _compact(bind, interval: int) -> None:
+    content_ids = bind.execute(
+        sa.text("SELECT content_id FROM content_versions GROUP BY content_id HAVING COUNT(*) > 1")
+    ).scalars()
+
+    for content_id in list(content_ids):
+        rows = bind.execute(
+            sa.text(
+                "SELECT id, version_number, body FROM content_versions "
+                "WHERE content_id = :content_id ORDER BY version_number"
+            ),
+            {"content_id": content_id},
+        ).all()
+
+        keyframe = None
+        updates = []
+        for row in rows:
+            body = row.body or ""
+            if keyframe is not None and row.version_number - keyframe.version_number < interval:
+                delta = encode_delta(keyframe.body or "", body)
+                if worth_chaining(delta, body):
+                    updates.append({"id": row.id, "base": keyframe.id, "delta": delta})
+                    continue
+            keyframe = row
+
+        if updates:
+            bind.execute(
+                sa.text(
+                    "UPDATE content_versions SET base_version_id = :base, body_delta = :delta, body = NULL "
+                    "WHERE id = :id"
+                ),
+                updates,
+            )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.text(
+            "SELECT v.id, k.body AS base_body, v.body_delta FROM content_versions v "
+            "JOIN content_versions k ON k.id = v.base_version_id"
+        )
+    ).all()
+    if rows:
+        bind.execute(
+            sa.text("UPDATE content_versions SET body = :body WHERE id = :id"),
+            [{"id": row.id, "body": apply_delta(row.base_body or "", row.body_delta)} for row in rows],
+        )
+    op.execute("UPDATE content_versions SET body = '' WHERE body IS NULL")
+
+    op.drop_index("ix_content_versions_base_version_id", table_name="content_versions")
+    op.drop_constraint("uq_content_versions_content_number", "content_versions", type_="unique")
+    op.alter_column("content_versions", "body", existing_type=sa.Text, nullable=False)
+    op.drop_column("content_versions", "body_length")
+    op.drop_column("content_versions", "body_delta")
+    op.drop_column("content_versions", "base_version_id")
+    op.drop_column("content_versions", "version_number")
@@ -0,0 +1,57 @@
+"""add_media_blobs
+
+Revision ID: x4y5z6a7b8c9
+Revises: w3x4y5z6a7b8
+Create Date: 2026-10-18
+
+Adds content-addressed media storage: the `media_blobs` table (one row per
+distinct uploaded file, with its variants and a reference count) and
+`media.content_hash` pointing at it.  Existing media keep `content_hash`
+NULL until the background dedupe job (app/utils/media_dedupe.py) folds
+them into blobs.
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "x4y5z6a7b8c9"
+down_revision: str = "w3x4y5z6a7b8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "media_blobs",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("content_hash", sa.String(64), nullable=False),
+        sa.Column("file_path", sa.String, nullable=False),
+        sa.Column("file_size", sa.BigInteger, nullable=False),
+        sa.Column("width", sa.Integer, nullable=True),
+        sa.Column("height", sa.Integer, nullable=True),
+        sa.Column("thumbnail_path", sa.String, nullable=True),
+        sa.Column("sizes", sa.JSON, nullable=False),
+        sa.Column("ref_count", sa.Integer, nullable=False, server_default="1"),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index("ix_media_blobs_id", "media_blobs", ["id"])
+    op.create_index("ix_media_blobs_content_hash", "media_blobs", ["content_hash"], unique=True)
+
+    op.add_column("media", sa.Column("content_hash", sa.String(64), nullable=True))
+    op.create_foreign_key(
+        "fk_media_content_hash_media_blobs", "media", "media_blobs", ["content_hash"], ["content_hash"]
+    )
+    op.create_index("ix_media_content_hash", "media", ["content_hash"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_media_content_hash", table_name="media")
+    op.drop_constraint("fk_media_content_hash_media_blobs", "media", type_="foreignkey")
+    op.drop_column("media", "content_hash")
+    op.drop_index("ix_media_blobs_content_hash", table_name="media_blobs")
+    op.drop_index("ix_media_blobs_id", table_name="media_blobs")
+    op.drop_table("media_blobs")
@@ -0,0 +1,46 @@
+"""add_resumable_uploads
+
+Revision ID: y5z6a7b8c9d0
+Revises: x4y5z6a7b8c9
+Create Date: 2026-10-18
+
+Adds `resumable_uploads`, the server-side state of chunked uploads
+(declared file, received offset, resulting media id).
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "y5z6a7b8c9d0"
+down_revision: str = "x4y5z6a7b8c9"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "resumable_uploads",
+        sa.Column("id", sa.String(32), primary_key=True),
+        sa.Column("user_id", sa.Integer, sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("filename", sa.String, nullable=False),
+        sa.Column("mime_type", sa.String, nullable=False),
+        sa.Column("file_type", sa.String, nullable=False),
+        sa.Column("total_size", sa.BigInteger, nullable=False),
+        sa.Column("received", sa.BigInteger, nullable=False, server_default="0"),
+        sa.Column("checksum", sa.String(64), nullable=True),
+        sa.Column("media_id", sa.Integer, sa.ForeignKey("media.id", ondelete="SET NULL"), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_resumable_uploads_user_id", "resumable_uploads", ["user_id"])
+    op.create_index("ix_resumable_uploads_expires_at", "resumable_uploads", ["expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_resumable_uploads_expires_at", table_name="resumable_uploads")
+    op.drop_index("ix_resumable_uploads_user_id", table_name="resumable_uploads")
+    op.drop_table("resumable_uploads")
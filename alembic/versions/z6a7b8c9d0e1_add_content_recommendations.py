@@ -0,0 +1,39 @@
+"""add_content_recommendations
+
+Revision ID: z6a7b8c9d0e1
+Revises: y5z6a7b8c9d0
+Create Date: 2026-10-18
+
+Adds `content_recommendations`, the precomputed top-k similar items per
+published content item.  Rows are filled by the recommendation rebuild
+job and refreshed per item on publish.
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "z6a7b8c9d0e1"
+down_revision: str = "y5z6a7b8c9d0"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "content_recommendations",
+        sa.Column("content_id", sa.Integer, sa.ForeignKey("content.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("related_content_id", sa.Integer, sa.ForeignKey("content.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("score", sa.Float, nullable=False),
+    )
+    op.create_index("ix_content_recommendations_content_score", "content_recommendations", ["content_id", "score"])
+    op.create_index("ix_content_recommendations_related", "content_recommendations", ["related_content_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_content_recommendations_related", table_name="content_recommendations")
+    op.drop_index("ix_content_recommendations_content_score", table_name="content_recommendations")
+    op.drop_table("content_recommendations")
@@ -35,6 +35,11 @@ class Settings(BaseSettings):
     smtp_user: str | None = None
     smtp_password: str | None = None
     smtp_from: str = "noreply@cms-project.com"
+    smtp_starttls: bool = True  # turn off only for a local SMTP sink or a trusted relay
+    smtp_timeout_seconds: int = 30
+    smtp_max_connections: int = 4  # persistent SMTP connections (and sender threads) for batched notification mail
+    notification_batch_size: int = 500  # digest users / queued emails sent and committed per batch
+    notification_max_attempts: int = 5  # failed sends before a queued email is no longer retried
     app_url: str = "http://localhost:8000"
 
     # Media settings
@@ -42,6 +47,21 @@ class Settings(BaseSettings):
     media_jpeg_quality: int = 85
     media_png_compression: int = 6
     media_enable_exif_strip: bool = True
+    media_signed_url_ttl_seconds: int = 300  # signed links live between 1x and 2x this
+    media_accel_redirect_prefix: str | None = None  # e.g. "/protected-media/" to let nginx send files
+    media_dedupe_interval_minutes: int = 360  # how often legacy uploads are folded into shared blobs
+    media_dedupe_batch_size: int = 100  # media records hashed per dedupe transaction
+    media_processing_workers: int = 4  # image post-processing jobs run concurrently on threads
+    media_resumable_max_file_size: int = 524288000  # 500MB cap for chunked uploads
+    media_resumable_chunk_size: int = 8388608  # 8MB chunk size suggested to clients
+    media_resumable_expiry_hours: int = 24  # idle resumable uploads are discarded after this
+
+    # Redirects
+    redirect_hit_flush_interval_seconds: int = 60  # how often in-memory redirect hit counts are written
+
+    # Related-content recommendations
+    recommendations_top_k: int = 10  # precomputed neighbors stored per published item
+    recommendations_rebuild_interval_minutes: int = 1440  # full rebuild cadence; publishes update incrementally
 
     # Search settings
     search_min_query_length: int = 2
@@ -53,14 +73,40 @@ class Settings(BaseSettings):
     search_suggestions_limit: int = 10
     search_analytics_enabled: bool = True
     search_language: str = "english"
+    search_analytics_flush_interval_seconds: int = 5  # how often buffered search events are written
+    search_analytics_batch_size: int = 1000  # rows per batched INSERT; a full batch triggers an early flush
+    search_analytics_max_buffer: int = 10000  # oldest events are dropped beyond this (analytics are best-effort)
 
     # Comment settings
     comment_report_auto_flag_threshold: int = 3
 
+    # Engagement counters (app/utils/counters.py)
+    counter_flush_interval_seconds: int = 10  # how often buffered counter deltas are applied
+    counter_reconcile_interval_minutes: int = 60  # how often counters are recomputed from source rows
+
+    # Content versions
+    content_version_keyframe_interval: int = 25  # versions stored as diffs before the next full keyframe
+
+    # GraphQL (app/graphql/extensions.py)
+    graphql_max_query_cost: int = 5000  # objects an operation may resolve; list fields count ``limit`` times
+    graphql_document_cache_size: int = 500  # parsed and validated documents kept per worker
+    graphql_persisted_query_max_items: int = 1000  # persisted query hashes remembered per worker
+
     # Performance settings
     slow_query_threshold_ms: int = 100
+    query_n_plus_one_threshold: int = 10  # one statement repeated more often than this in a request is logged as N+1
+    server_timing_enabled: bool = False  # add Server-Timing (db time, query count, app time) to every response
+
+    # Sampling profiler (app/utils/profiler.py)
+    profiler_max_seconds: int = 60  # longest on-demand profiling session
+    profiler_sample_rate: int = 0  # always-on mode: sample the worker during 1 in N requests; 0 disables
+    profiler_sample_interval_ms: int = 10  # always-on sampling interval
+    profiler_window_seconds: int = 60  # always-on hot functions are kept per window ...
+    profiler_windows: int = 60  # ... in a ring buffer of this many windows
+    profiler_hot_functions: int = 50  # functions kept per window
     gzip_minimum_size: int = 500
     etag_enabled: bool = True
+    fast_json_responses: bool = False  # encode every JSON response with orjson (app.utils.serializers)
 
     # Monitoring settings
     sentry_dsn: str | None = None
@@ -81,9 +127,17 @@ class Settings(BaseSettings):
     audit_log_retention_days: int = 365  # activity logs older than this are pruned daily
     privacy_policy_version: str = "1.0"  # increment when policy changes to prompt re-consent
 
+    # Backups (app/services/backup_service.py)
+    backup_pg_dump_jobs: int = 4  # parallel pg_dump workers (directory format); 1 dumps serially
+    backup_pg_dump_timeout_seconds: int = 3600
+    backup_compress_level: int = 6  # gzip level of backup archives
+
     # Multi-tenancy settings
     enable_multitenancy: bool = False  # feature flag — off by default, no impact on existing behaviour
     app_domain: str = "localhost"  # base domain for subdomain-based tenant extraction
+    tenant_cache_ttl_seconds: int = 300  # how long a worker trusts a resolved tenant without an invalidation
+    tenant_negative_cache_ttl_seconds: int = 30  # how long an unknown slug/host is remembered as unknown
+    tenant_cache_max_entries: int = 10000  # bound on cached slugs/hosts per worker (unknown hosts included)
 
     # Internationalization (i18n) settings
     default_language: str = "en"  # BCP 47 locale code used when client sends no preference
@@ -99,6 +153,7 @@ class Settings(BaseSettings):
         "it",
         "nl",
     ]
+    translation_cache_max_items: int = 10000  # content items whose resolved listing translations each worker keeps
 
     # Real-time settings (WebSocket / SSE)
     sse_keepalive_interval: int = 25  # seconds between SSE keepalive comments sent to idle clients
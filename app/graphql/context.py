@@ -1,4 +1,4 @@
-"""GraphQL context — carries the current user and DB session into resolvers."""
+"""GraphQL context — carries the current user, DB session and DataLoaders into resolvers."""
 
 from __future__ import annotations
 
@@ -6,6 +6,8 @@ from typing import TYPE_CHECKING
 
 from strawberry.fastapi import BaseContext
 
+from app.graphql.loaders import GraphQLLoaders
+
 if TYPE_CHECKING:
     from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -19,3 +21,5 @@ class GraphQLContext(BaseContext):
         super().__init__()
         self.user = user
         self.db = db
+        # Fresh per request: loader caches never outlive the request
+        self.loaders = GraphQLLoaders(db)
@@ -0,0 +1,182 @@
+"""
+GraphQL schema extensions: persisted queries and a query-cost limit.
+
+Persisted queries follow the Automatic Persisted Queries protocol: a client
+sends ``extensions.persistedQuery.sha256Hash`` without the query text; an
+unknown hash answers ``PersistedQueryNotFound`` and the client retries once
+with the full text, which is then remembered.  The registry is per worker,
+so a retry against another worker just registers the query there too.
+Parsed and validated documents are cached by ParserCache and
+ValidationCache (see app.graphql.schema), keyed by the query text.
+
+The cost of an operation is the number of objects it can resolve: every
+object field counts once per parent object, and list fields multiply their
+children by their ``limit`` argument (DEFAULT_LIST_SIZE when there is none).
+Operations above the maximum are rejected before any resolver runs.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any
+
+from graphql import (
+    FieldNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    GraphQLError,
+    GraphQLList,
+    GraphQLObjectType,
+    InlineFragmentNode,
+    OperationDefinitionNode,
+    VariableNode,
+    get_named_type,
+    get_nullable_type,
+    value_from_ast,
+)
+from strawberry.extensions import SchemaExtension
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from graphql import DocumentNode, GraphQLField, GraphQLSchema, SelectionSetNode
+
+DEFAULT_LIST_SIZE = 10  # assumed length of list fields without a limit argument
+
+
+class PersistedQueryRegistry:
+    """Bounded sha256 -> query text map (LRU)"""
+
+    def __init__(self, max_items: int):
+        self.max_items = max_items
+        self._queries: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, sha256: str) -> str | None:
+        with self._lock:
+            query = self._queries.get(sha256)
+            if query is not None:
+                self._queries.move_to_end(sha256)
+            return query
+
+    def register(self, sha256: str, query: str) -> None:
+        with self._lock:
+            self._queries[sha256] = query
+            self._queries.move_to_end(sha256)
+            while len(self._queries) > self.max_items:
+                self._queries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._queries.clear()
+
+
+class PersistedQueries(SchemaExtension):
+    """Resolve ``persistedQuery`` hashes to query text before parsing."""
+
+    def __init__(self, registry: PersistedQueryRegistry):
+        self.registry = registry
+
+    def on_operation(self) -> Iterator[None]:
+        execution_context = self.execution_context
+        persisted = (execution_context.operation_extensions or {}).get("persistedQuery")
+        if isinstance(persisted, dict) and persisted.get("sha256Hash"):
+            sha256 = str(persisted["sha256Hash"])
+            if execution_context.query:
+                if hashlib.sha256(execution_context.query.encode()).hexdigest() != sha256:
+                    raise GraphQLError("provided sha does not match query", extensions={"code": "INVALID_SHA256"})
+                self.registry.register(sha256, execution_context.query)
+            else:
+                query = self.registry.get(sha256)
+                if query is None:
+                    raise GraphQLError("PersistedQueryNotFound", extensions={"code": "PERSISTED_QUERY_NOT_FOUND"})
+                execution_context.query = query
+        yield
+
+
+def _list_size(node: FieldNode, field: GraphQLField, variables: dict[str, Any]) -> int:
+    for argument in node.arguments:
+        if argument.name.value == "limit":
+            if isinstance(argument.value, VariableNode):
+                value = variables.get(argument.value.name.value)
+            else:
+                value = value_from_ast(argument.value, field.args["limit"].type, variables)
+            if isinstance(value, int):
+                return max(value, 0)
+    limit = field.args.get("limit")
+    if limit is not None and isinstance(limit.default_value, int):
+        return limit.default_value
+    return DEFAULT_LIST_SIZE
+
+
+def selection_cost(
+    selection_set: SelectionSetNode,
+    parent_type: GraphQLObjectType,
+    fragments: dict[str, FragmentDefinitionNode],
+    variables: dict[str, Any],
+    multiplier: int = 1,
+) -> int:
+    """Objects a selection set can resolve when its parent is resolved multiplier times."""
+    cost = 0
+    for selection in selection_set.selections:
+        if isinstance(selection, FragmentSpreadNode):
+            fragment = fragments.get(selection.name.value)
+            if fragment is not None:
+                cost += selection_cost(fragment.selection_set, parent_type, fragments, variables, multiplier)
+            continue
+        if isinstance(selection, InlineFragmentNode):
+            cost += selection_cost(selection.selection_set, parent_type, fragments, variables, multiplier)
+            continue
+        name = selection.name.value
+        if name.startswith("__") or selection.selection_set is None:
+            continue
+        field = parent_type.fields.get(name)
+        field_type = get_named_type(field.type) if field else None
+        if not isinstance(field_type, GraphQLObjectType):
+            continue
+        count = _list_size(selection, field, variables) if isinstance(get_nullable_type(field.type), GraphQLList) else 1
+        objects = multiplier * count
+        cost += objects + selection_cost(selection.selection_set, field_type, fragments, variables, objects)
+    return cost
+
+
+def operation_cost(
+    schema: GraphQLSchema,
+    document: DocumentNode,
+    operation_name: str | None,
+    variables: dict[str, Any] | None,
+) -> int:
+    """Cost of the operation that will run from a validated document."""
+    operations = [d for d in document.definitions if isinstance(d, OperationDefinitionNode)]
+    fragments = {d.name.value: d for d in document.definitions if isinstance(d, FragmentDefinitionNode)}
+    for operation in operations:
+        if operation_name is None or (operation.name and operation.name.value == operation_name):
+            root_type = schema.get_root_type(operation.operation)
+            if root_type is None:
+                return 0
+            return selection_cost(operation.selection_set, root_type, fragments, variables or {})
+    return 0
+
+
+class QueryCostLimiter(SchemaExtension):
+    """Reject operations whose cost exceeds max_cost."""
+
+    def __init__(self, max_cost: int):
+        self.max_cost = max_cost
+
+    def on_execute(self) -> Iterator[None]:
+        execution_context = self.execution_context
+        cost = operation_cost(
+            execution_context.schema._schema,
+            execution_context.graphql_document,
+            execution_context.operation_name,
+            execution_context.variables,
+        )
+        if cost > self.max_cost:
+            raise GraphQLError(
+                f"Query cost {cost} exceeds the maximum of {self.max_cost}",
+                extensions={"code": "QUERY_TOO_COSTLY", "cost": cost, "maxCost": self.max_cost},
+            )
+        yield
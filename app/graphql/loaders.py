@@ -0,0 +1,90 @@
+"""
+Per-request DataLoaders for the GraphQL API.
+
+Nested fields (a content item's author, category, tags and comment count, a
+comment's author) resolve through these loaders instead of being eager-loaded
+by every query.  A loader collects the keys requested while one level of the
+result is resolved, fetches them in one query and caches them for the rest of
+the request, so fields a query does not select are never fetched and an
+author shared by twenty items is loaded once.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+from sqlalchemy import func, select
+from strawberry.dataloader import DataLoader
+
+from app.graphql.types import CategoryType, TagType, UserType
+from app.models.category import Category
+from app.models.comment import Comment, CommentStatus
+from app.models.content_tags import content_tags
+from app.models.tag import Tag
+from app.models.user import Role, User
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.sql import Select
+
+
+class GraphQLLoaders:
+    """DataLoaders bound to one request's DB session"""
+
+    def __init__(self, db: AsyncSession) -> None:
+        self._db = db
+        # Loaders dispatch side by side, but one AsyncSession runs one statement at a time
+        self._lock = asyncio.Lock()
+        self.users: DataLoader[int, UserType | None] = DataLoader(self._load_users)
+        self.categories: DataLoader[int, CategoryType | None] = DataLoader(self._load_categories)
+        self.tags: DataLoader[int, list[TagType]] = DataLoader(self._load_tags)
+        self.comment_counts: DataLoader[int, int] = DataLoader(self._load_comment_counts)
+
+    async def _rows(self, stmt: Select) -> list:
+        async with self._lock:
+            return (await self._db.execute(stmt)).all()
+
+    async def _load_users(self, ids: list[int]) -> list[UserType | None]:
+        rows = await self._rows(
+            select(User.id, User.username, Role.name).outerjoin(Role, Role.id == User.role_id).where(User.id.in_(ids))
+        )
+        users = {
+            user_id: UserType(id=user_id, username=username, role_name=role_name or "user")
+            for user_id, username, role_name in rows
+        }
+        return [users.get(user_id) for user_id in ids]
+
+    async def _load_categories(self, ids: list[int]) -> list[CategoryType | None]:
+        rows = await self._rows(
+            select(Category.id, Category.name, Category.slug, Category.parent_id).where(Category.id.in_(ids))
+        )
+        categories = {
+            row.id: CategoryType(id=row.id, name=row.name, slug=row.slug, parent_id=row.parent_id) for row in rows
+        }
+        return [categories.get(category_id) for category_id in ids]
+
+    async def _load_tags(self, content_ids: list[int]) -> list[list[TagType]]:
+        rows = await self._rows(
+            select(content_tags.c.content_id, Tag.id, Tag.name)
+            .join(Tag, Tag.id == content_tags.c.tag_id)
+            .where(content_tags.c.content_id.in_(content_ids))
+            .order_by(Tag.name)
+        )
+        tags: dict[int, list[TagType]] = {}
+        for content_id, tag_id, name in rows:
+            tags.setdefault(content_id, []).append(TagType(id=tag_id, name=name))
+        return [tags.get(content_id, []) for content_id in content_ids]
+
+    async def _load_comment_counts(self, content_ids: list[int]) -> list[int]:
+        rows = await self._rows(
+            select(Comment.content_id, func.count())
+            .where(
+                Comment.content_id.in_(content_ids),
+                Comment.status == CommentStatus.APPROVED,
+                Comment.is_deleted.is_(False),
+            )
+            .group_by(Comment.content_id)
+        )
+        counts = dict(rows)
+        return [counts.get(content_id, 0) for content_id in content_ids]
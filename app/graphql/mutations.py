@@ -3,7 +3,7 @@
 import strawberry
 from fastapi import HTTPException
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import raiseload
 from strawberry.types import Info
 
 from app.graphql.context import GraphQLContext
@@ -51,16 +51,8 @@ class Mutation:
             await db.rollback()
             raise ValueError(f"Failed to create content: {e}") from e
 
-        # Reload with relationships
-        result = await db.execute(
-            select(Content)
-            .where(Content.id == new_content.id)
-            .options(
-                selectinload(Content.author).selectinload(User.role),
-                selectinload(Content.category),
-                selectinload(Content.tags),
-            )
-        )
+        # Reload; relationships resolve through the DataLoaders
+        result = await db.execute(select(Content).where(Content.id == new_content.id).options(raiseload("*")))
         item = result.scalars().first()
         return content_to_type(item)
 
@@ -74,9 +66,7 @@ class Mutation:
         user = _require_auth(info)
         db = info.context.db
 
-        result = await db.execute(
-            select(Content).where(Content.id == id).options(selectinload(Content.author).selectinload(User.role))
-        )
+        result = await db.execute(select(Content).where(Content.id == id).options(raiseload("*")))
         existing = result.scalars().first()
         if not existing:
             return None
@@ -96,14 +86,6 @@ class Mutation:
         except (HTTPException, Exception) as e:
             raise ValueError(str(e)) from e
 
-        result = await db.execute(
-            select(Content)
-            .where(Content.id == id)
-            .options(
-                selectinload(Content.author).selectinload(User.role),
-                selectinload(Content.category),
-                selectinload(Content.tags),
-            )
-        )
+        result = await db.execute(select(Content).where(Content.id == id).options(raiseload("*")))
         item = result.scalars().first()
         return content_to_type(item) if item else None
@@ -2,7 +2,7 @@
 
 import strawberry
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import raiseload
 from strawberry.types import Info
 
 from app.graphql.context import GraphQLContext
@@ -19,7 +19,6 @@ from app.graphql.types import (
 from app.models.category import Category
 from app.models.comment import Comment, CommentStatus
 from app.models.content import Content
-from app.models.user import User
 from app.services.content_service import get_all_content
 
 
@@ -41,15 +40,7 @@ class Query:
         id: int,
     ) -> ContentType | None:
         db = info.context.db
-        result = await db.execute(
-            select(Content)
-            .where(Content.id == id)
-            .options(
-                selectinload(Content.author).selectinload(User.role),
-                selectinload(Content.category),
-                selectinload(Content.tags),
-            )
-        )
+        result = await db.execute(select(Content).where(Content.id == id).options(raiseload("*")))
         item = result.scalars().first()
         if not item:
             return None
@@ -73,6 +64,7 @@ class Query:
             status=status,
             category_id=category_id,
             author_id=author_id,
+            load_relationships=False,
         )
         return [content_to_type(c) for c in items]
 
@@ -102,7 +94,7 @@ class Query:
                 Comment.status == CommentStatus.APPROVED,
                 Comment.is_deleted.is_(False),
             )
-            .options(selectinload(Comment.user).selectinload(User.role))
+            .options(raiseload("*"))
             .order_by(Comment.created_at.asc())
             .offset(offset)
             .limit(limit)
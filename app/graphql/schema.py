@@ -1,8 +1,23 @@
 """GraphQL schema — assembles Query and Mutation into a single schema."""
 
 import strawberry
+from strawberry.extensions import ParserCache, ValidationCache
 
+from app.config import settings
+from app.graphql.extensions import PersistedQueries, PersistedQueryRegistry, QueryCostLimiter
 from app.graphql.mutations import Mutation
 from app.graphql.queries import Query
 
-schema = strawberry.Schema(query=Query, mutation=Mutation)
+# Per-worker registry of persisted (hash-only) queries
+persisted_queries = PersistedQueryRegistry(settings.graphql_persisted_query_max_items)
+
+schema = strawberry.Schema(
+    query=Query,
+    mutation=Mutation,
+    extensions=[
+        PersistedQueries(persisted_queries),
+        ParserCache(maxsize=settings.graphql_document_cache_size),
+        ValidationCache(maxsize=settings.graphql_document_cache_size),
+        QueryCostLimiter(settings.graphql_max_query_cost),
+    ],
+)
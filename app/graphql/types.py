@@ -1,8 +1,13 @@
-"""Strawberry GraphQL types mapped from CMS SQLAlchemy models."""
+"""Strawberry GraphQL types mapped from CMS SQLAlchemy models.
+
+Relationship fields resolve through the request's DataLoaders
+(app.graphql.loaders), so they are only fetched when a query selects them.
+"""
 
 from datetime import datetime
 
 import strawberry
+from strawberry.types import Info
 
 
 @strawberry.type
@@ -44,9 +49,26 @@ class ContentType:
     body: str | None
     created_at: datetime
     updated_at: datetime
-    author: UserType
-    category: CategoryType | None
-    tags: list[TagType]
+    author_id: strawberry.Private[int]
+    category_id: strawberry.Private[int | None]
+
+    @strawberry.field
+    async def author(self, info: Info) -> UserType:
+        return await info.context.loaders.users.load(self.author_id)
+
+    @strawberry.field
+    async def category(self, info: Info) -> CategoryType | None:
+        if self.category_id is None:
+            return None
+        return await info.context.loaders.categories.load(self.category_id)
+
+    @strawberry.field
+    async def tags(self, info: Info) -> list[TagType]:
+        return await info.context.loaders.tags.load(self.id)
+
+    @strawberry.field(description="Number of approved comments.")
+    async def comment_count(self, info: Info) -> int:
+        return await info.context.loaders.comment_counts.load(self.id)
 
 
 @strawberry.type
@@ -58,7 +80,11 @@ class CommentType:
     status: str
     created_at: datetime
     content_id: int
-    author: UserType
+    user_id: strawberry.Private[int]
+
+    @strawberry.field
+    async def author(self, info: Info) -> UserType:
+        return await info.context.loaders.users.load(self.user_id)
 
 
 # ============================================================================
@@ -122,9 +148,8 @@ def content_to_type(content) -> ContentType:
         body=content.body,
         created_at=content.created_at,
         updated_at=content.updated_at,
-        author=user_to_type(content.author),
-        category=category_to_type(content.category) if content.category else None,
-        tags=[tag_to_type(t) for t in (content.tags or [])],
+        author_id=content.author_id,
+        category_id=content.category_id,
     )
 
 
@@ -135,5 +160,5 @@ def comment_to_type(comment) -> CommentType:
         status=comment.status.value if hasattr(comment.status, "value") else str(comment.status),
         created_at=comment.created_at,
         content_id=comment.content_id,
-        author=user_to_type(comment.user),
+        user_id=comment.user_id,
     )
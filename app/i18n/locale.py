@@ -5,6 +5,7 @@ Pure functions for BCP 47 locale handling:
 - RTL (right-to-left) language detection
 - Accept-Language header parsing with quality-value (q=) support
 - Language metadata lookup
+- Locale fallback chains
 """
 
 from __future__ import annotations
@@ -103,6 +104,23 @@ def parse_accept_language(header: str, supported: list[str]) -> str | None:
     return None
 
 
+def locale_chain(locale: str, fallback_locale: str) -> list[str]:
+    """Return the locales to try for a request, most preferred first.
+
+    The exact locale, then its base language, then the fallback, without
+    duplicates: ``locale_chain("fr-CA", "en")`` is ``["fr-CA", "fr", "en"]``.
+
+    Args:
+        locale:          Requested BCP 47 locale, e.g. "fr-CA".
+        fallback_locale: Locale used when neither the exact nor the base locale exists.
+
+    Returns:
+        Ordered list of distinct locale codes.
+    """
+    chain = [locale, locale.split("-")[0], fallback_locale]
+    return list(dict.fromkeys(chain))
+
+
 def get_language_info(locale: str) -> dict[str, str | bool]:
     """Return a metadata dict describing the given locale.
 
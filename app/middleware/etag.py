@@ -35,8 +35,8 @@ class ETagMiddleware(BaseHTTPMiddleware):
         if response.status_code != 200 or "application/json" not in content_type:
             return response
 
-        # Skip file downloads
-        if "content-disposition" in response.headers:
+        # Skip file downloads and routes that set their own ETag (e.g. the response cache)
+        if "content-disposition" in response.headers or "etag" in response.headers:
             return response
 
         # Read the response body to compute ETag
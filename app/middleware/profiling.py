@@ -0,0 +1,34 @@
+"""
+Sampled Profiling Middleware
+
+Always-on, low-rate CPU profiling: 1 in ``sample_rate`` requests switches
+on the worker's request sampler (app.utils.profiler) until it finishes.
+"""
+
+import itertools
+
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp
+
+from app.utils.profiler import RequestSampler, request_sampler
+
+
+class SampledProfilingMiddleware(BaseHTTPMiddleware):
+    """Sample the worker while every sample_rate-th request is in flight."""
+
+    def __init__(self, app: ASGIApp, sample_rate: int, sampler: RequestSampler = request_sampler):
+        super().__init__(app)
+        self.sample_rate = max(sample_rate, 1)
+        self.sampler = sampler
+        self._requests = itertools.count()
+
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        if next(self._requests) % self.sample_rate:
+            return await call_next(request)
+        self.sampler.begin()
+        try:
+            return await call_next(request)
+        finally:
+            self.sampler.end()
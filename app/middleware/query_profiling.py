@@ -0,0 +1,74 @@
+"""
+Query Profiling Middleware
+
+Attributes SQL statements to the request that ran them (see
+app.utils.query_monitor): counts them, logs N+1 patterns, feeds the
+per-endpoint report and optionally reports database time in a
+``Server-Timing`` header.
+"""
+
+import logging
+import time
+
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp
+
+from app.utils.metrics import PrometheusMiddleware
+from app.utils.query_monitor import endpoint_query_stats, track_queries
+
+logger = logging.getLogger(__name__)
+
+EXCLUDED_PATHS = frozenset({"/metrics", "/metrics/queries", "/health", "/ready"})
+
+
+def endpoint_name(request: Request) -> str:
+    """``METHOD /route/{template}`` of a handled request (IDs normalized when no route matched)."""
+    route = request.scope.get("route")
+    path = getattr(route, "path", None) or PrometheusMiddleware._normalize_path(request.url.path)
+    return f"{request.method} {path}"
+
+
+class QueryProfilingMiddleware(BaseHTTPMiddleware):
+    """
+    Per-request SQL profiling.
+
+    - Queries repeating one fingerprint more than ``n_plus_one_threshold``
+      times are logged as a likely N+1
+    - Every request is aggregated into ``endpoint_query_stats``
+    - ``server_timing`` adds ``Server-Timing: db;dur=...;desc="N queries", app;dur=...``
+    """
+
+    def __init__(self, app: ASGIApp, n_plus_one_threshold: int = 10, server_timing: bool = False):
+        super().__init__(app)
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.server_timing = server_timing
+
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        if request.url.path in EXCLUDED_PATHS:
+            return await call_next(request)
+
+        start = time.perf_counter()
+        with track_queries() as stats:
+            response = await call_next(request)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        endpoint = endpoint_name(request)
+        n_plus_one = stats.repeated(self.n_plus_one_threshold)
+        if n_plus_one:
+            statement, count = n_plus_one[0]
+            logger.warning(
+                "Possible N+1 on %s: %d of %d queries share one statement: %s",
+                endpoint,
+                count,
+                stats.count,
+                statement[:200],
+            )
+        endpoint_query_stats.record(endpoint, stats, n_plus_one)
+
+        if self.server_timing:
+            timing = f'db;dur={stats.total_ms:.1f};desc="{stats.count} queries", app;dur={elapsed_ms:.1f}'
+            existing = response.headers.get("server-timing")
+            response.headers["Server-Timing"] = f"{existing}, {timing}" if existing else timing
+        return response
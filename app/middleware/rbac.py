@@ -38,6 +38,7 @@ class RBACMiddleware(BaseHTTPMiddleware):
             "/health/detailed",
             "/metrics",
             "/metrics/summary",
+            "/metrics/queries",  # dev mode only (404 otherwise)
             # Security & privacy — public informational endpoints
             "/api/v1/policy-version",
             "/api/v1/security/headers",
@@ -61,11 +62,12 @@ class RBACMiddleware(BaseHTTPMiddleware):
         ):
             return await call_next(request)
 
-        # Allow public API paths (social sharing, analytics config, i18n metadata)
+        # Allow public API paths (social sharing, analytics config, i18n metadata, signed media links)
         if (
             request.url.path.startswith("/api/v1/social/")
             or request.url.path == "/api/v1/analytics/config"
             or request.url.path.startswith("/api/v1/i18n/")
+            or request.url.path.startswith("/api/v1/media/signed/")
         ):
             return await call_next(request)
 
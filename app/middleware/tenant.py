@@ -4,9 +4,13 @@ Tenant Resolution Middleware — Phase 6.1 Multi-Tenancy
 Resolves the current tenant from:
   1. X-Tenant-Slug request header  (API clients)
   2. Subdomain of the request host (browser clients, e.g. acme.localhost)
+  3. Custom domain of the request host (e.g. cms.acme.com)
 
-Sets request.state.tenant_id and request.state.tenant_slug for downstream
-handlers.  When ENABLE_MULTITENANCY is False this middleware is a no-op and
+Lookups go through the per-worker tenant registry (app.utils.tenant_registry),
+so a request only touches the database when its slug or host is not cached.
+
+Sets request.state.tenant_id, request.state.tenant_slug and
+request.state.tenant_plan for downstream handlers.  When ENABLE_MULTITENANCY is False this middleware is a no-op and
 all existing behaviour is unchanged.
 
 Starlette middleware is LIFO — this middleware is registered AFTER
@@ -21,6 +25,7 @@ from typing import TYPE_CHECKING
 from starlette.middleware.base import BaseHTTPMiddleware
 
 from app.config import settings
+from app.utils.tenant_registry import tenant_registry
 
 if TYPE_CHECKING:
     from collections.abc import Callable
@@ -54,12 +59,14 @@ class TenantMiddleware(BaseHTTPMiddleware):
     Attributes set on request.state:
         tenant_id   (int | None)  — DB primary key of the active tenant
         tenant_slug (str | None)  — slug string of the active tenant
+        tenant_plan (str | None)  — plan of the active tenant
     """
 
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
         # Always initialise state so downstream code can safely read without AttributeError
         request.state.tenant_id = None
         request.state.tenant_slug = None
+        request.state.tenant_plan = None
 
         if not settings.enable_multitenancy:
             return await call_next(request)
@@ -67,22 +74,23 @@ class TenantMiddleware(BaseHTTPMiddleware):
         # 1. X-Tenant-Slug header takes priority (explicit API clients)
         slug: str | None = request.headers.get("X-Tenant-Slug")
 
-        # 2. Fall back to subdomain extraction
-        if not slug:
-            host = request.headers.get("host", "")
-            slug = _extract_slug_from_host(host, settings.app_domain)
-
+        tenant = None
         if slug:
-            # Deferred import avoids circular dependency at module load time
-            from app.database import AsyncSessionLocal
-            from app.services.tenant_service import get_tenant_by_slug
-
-            async with AsyncSessionLocal() as db:
-                tenant = await get_tenant_by_slug(slug, db)
-
-            if tenant and tenant.status == "active":
-                request.state.tenant_id = tenant.id
-                request.state.tenant_slug = tenant.slug
-                logger.debug("TenantMiddleware: resolved tenant_id=%d slug=%s", tenant.id, tenant.slug)
+            tenant = await tenant_registry.by_slug(slug)
+        else:
+            # 2. Fall back to subdomain extraction
+            host = request.headers.get("host", "").split(":")[0].lower()
+            slug = _extract_slug_from_host(host, settings.app_domain)
+            if slug:
+                tenant = await tenant_registry.by_slug(slug)
+            # 3. Any other host may be a tenant's custom domain
+            elif host and host != settings.app_domain:
+                tenant = await tenant_registry.by_domain(host)
+
+        if tenant and tenant.status == "active":
+            request.state.tenant_id = tenant.id
+            request.state.tenant_slug = tenant.slug
+            request.state.tenant_plan = tenant.plan
+            logger.debug("TenantMiddleware: resolved tenant_id=%d slug=%s", tenant.id, tenant.slug)
 
         return await call_next(request)
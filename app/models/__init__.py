@@ -15,6 +15,7 @@ from .consent_record import ConsentRecord
 from .content import Content
 from .content_permission import ContentPermission
 from .content_relations import (
+    ContentRecommendation,
     ContentRedirect,
     ContentRelation,
     ContentSeries,
@@ -42,6 +43,7 @@ from .import_job import (
     ImportType,
 )
 from .media import Media
+from .media_blob import MediaBlob
 from .media_folder import MediaFolder
 from .notification import Notification
 from .notification_preference import (
@@ -54,7 +56,8 @@ from .notification_preference import (
     NotificationTemplate,
 )
 from .password_reset import PasswordResetToken
-from .search_query import SearchQuery
+from .resumable_upload import ResumableUpload
+from .search_query import SearchQuery, SearchQueryRollup
 from .tag import Tag
 from .team import InvitationStatus, Team, TeamInvitation, TeamMember, TeamRole
 from .tenant import Tenant, TenantStatus
@@ -88,6 +91,7 @@ __all__ = [
     "Content",
     "content_tags",
     "ContentTranslation",
+    "ContentRecommendation",
     "ContentRedirect",
     "ContentRelation",
     "ContentSeries",
@@ -108,6 +112,7 @@ __all__ = [
     "InvitationStatus",
     "LoginAttempt",
     "Media",
+    "MediaBlob",
     "MediaFolder",
     "Notification",
     "NotificationCategory",
@@ -117,12 +122,14 @@ __all__ = [
     "NotificationQueue",
     "NotificationTemplate",
     "PasswordResetToken",
+    "ResumableUpload",
     "ReactionType",
     "RelationType",
     "ReportReason",
     "ReportStatus",
     "Role",
     "SearchQuery",
+    "SearchQueryRollup",
     "Tag",
     "Team",
     "TeamInvitation",
@@ -59,6 +59,10 @@ class Backup(Base):
     include_media = Column(Boolean, default=True)
     include_config = Column(Boolean, default=False)
 
+    # Progress of a running backup (committed as each stage advances)
+    progress_percent = Column(Integer, default=0, server_default="0", nullable=False)
+    progress_stage = Column(String(50), nullable=True)  # database, media, config, finalizing
+
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     started_at = Column(DateTime(timezone=True), nullable=True)
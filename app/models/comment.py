@@ -3,6 +3,10 @@ Comment Model
 
 Supports threaded comments with nested replies, moderation status,
 and user attribution.
+
+Each comment stores a materialized path of zero-padded ancestor ids
+("0000000007/0000000042/") and the id of its thread root, so a whole
+thread can be fetched in one indexed query ordered by path.
 """
 
 import enum
@@ -29,6 +33,7 @@ class Comment(Base):
 
     Supports:
     - Nested replies via parent_id (self-referential)
+    - Materialized path (thread_id, path) for single-query thread loading
     - Moderation workflow
     - Soft delete capability
     - User attribution
@@ -47,6 +52,10 @@ class Comment(Base):
     # Parent comment for nested replies (null = top-level comment)
     parent_id = Column(Integer, ForeignKey("comments.id", ondelete="CASCADE"), nullable=True, index=True)
 
+    # Thread root id and materialized path (set right after insert, see CommentService)
+    thread_id = Column(Integer, nullable=True)
+    path = Column(Text, nullable=False, default="", server_default="")
+
     # Comment body
     body = Column(Text, nullable=False)
 
@@ -64,6 +73,10 @@ class Comment(Base):
     is_edited = Column(Boolean, default=False, nullable=False)
     edited_at = Column(DateTime, nullable=True)
 
+    # Denormalized reaction counters, maintained by app.utils.counters
+    like_count = Column(Integer, default=0, server_default="0", nullable=False)
+    dislike_count = Column(Integer, default=0, server_default="0", nullable=False)
+
     # Relationships
     content = relationship("Content", back_populates="comments")
     user = relationship("User", back_populates="comments")
@@ -89,7 +102,16 @@ class Comment(Base):
         Index("ix_comments_content_status", "content_id", "status"),
         Index("ix_comments_user_created", "user_id", "created_at"),
         Index("ix_comments_parent_created", "parent_id", "created_at"),
+        Index("ix_comments_thread_path", "thread_id", "path"),
     )
 
     def __repr__(self) -> str:
         return f"<Comment(id={self.id}, content_id={self.content_id}, user_id={self.user_id})>"
+
+
+COMMENT_PATH_WIDTH = 10  # digits per path segment; fits any 32-bit id
+
+
+def comment_path_segment(comment_id: int) -> str:
+    """Path segment for one comment id, e.g. 42 -> "0000000042/"."""
+    return f"{comment_id:0{COMMENT_PATH_WIDTH}d}/"
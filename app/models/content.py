@@ -28,6 +28,10 @@ class Content(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     author_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+
+    # Denormalized engagement counters, maintained by app.utils.counters
+    view_count = Column(Integer, default=0, server_default="0", nullable=False)
+    comment_count = Column(Integer, default=0, server_default="0", nullable=False)  # approved, not deleted
     versions = relationship("ContentVersion", back_populates="content", cascade="all, delete-orphan")
     category_id = Column(Integer, ForeignKey("categories.id"), nullable=True)
     category = relationship("Category")
@@ -46,8 +50,10 @@ class Content(Base):
     activity_logs = relationship("ActivityLog", back_populates="content", cascade="all, delete-orphan")
     tags = relationship("Tag", secondary=content_tags, back_populates="contents")
 
-    # Comment relationship
-    comments = relationship("Comment", back_populates="content", cascade="all, delete-orphan", lazy="selectin")
+    # Comment relationship (never loaded implicitly; use CommentService to fetch threads)
+    comments = relationship(
+        "Comment", back_populates="content", cascade="all, delete-orphan", passive_deletes=True, lazy="noload"
+    )
 
     # View tracking
     views = relationship("ContentView", back_populates="content", cascade="all, delete-orphan", lazy="noload")
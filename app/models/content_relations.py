@@ -2,7 +2,8 @@
 Content Relations Models
 
 Provides content relationships (related_to, depends_on, translated_from),
-content series/collections with ordering, and URL redirects.
+content series/collections with ordering, URL redirects, and precomputed
+related-content recommendations.
 """
 
 import enum
@@ -13,6 +14,7 @@ from sqlalchemy import (
     Column,
     DateTime,
     Enum,
+    Float,
     ForeignKey,
     Index,
     Integer,
@@ -129,6 +131,7 @@ class ContentRedirect(Base):
     old_slug = Column(String(255), unique=True, nullable=False, index=True)
     content_id = Column(Integer, ForeignKey("content.id", ondelete="CASCADE"), nullable=False, index=True)
     status_code = Column(Integer, default=301, nullable=False)
+    hit_count = Column(Integer, default=0, server_default="0", nullable=False)  # batched by app.utils.redirects
     created_by_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
@@ -137,3 +140,27 @@ class ContentRedirect(Base):
 
     def __repr__(self) -> str:
         return f"<ContentRedirect(id={self.id}, old_slug={self.old_slug}, content_id={self.content_id})>"
+
+
+class ContentRecommendation(Base):
+    """Precomputed nearest neighbor of a content item (maintained by app.utils.recommendations)."""
+
+    __tablename__ = "content_recommendations"
+
+    content_id = Column(Integer, ForeignKey("content.id", ondelete="CASCADE"), primary_key=True)
+    related_content_id = Column(Integer, ForeignKey("content.id", ondelete="CASCADE"), primary_key=True)
+    score = Column(Float, nullable=False)  # cosine similarity of the items' term vectors
+
+    related_content = relationship("Content", foreign_keys=[related_content_id])
+
+    __table_args__ = (
+        # Serves "top k for content X" straight from the index
+        Index("ix_content_recommendations_content_score", "content_id", "score"),
+        Index("ix_content_recommendations_related", "related_content_id"),
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<ContentRecommendation(content={self.content_id}, "
+            f"related={self.related_content_id}, score={self.score:.3f})>"
+        )
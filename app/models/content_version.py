@@ -1,18 +1,33 @@
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, LargeBinary, String, Text, UniqueConstraint
+from sqlalchemy.orm import deferred, relationship
 
 from app.database import Base
 
 
 class ContentVersion(Base):
+    """
+    A saved revision of a content item.
+
+    Bodies are stored as periodic full keyframes (``body`` set,
+    ``base_version_id`` NULL) with compressed line diffs against the nearest
+    keyframe in between (``body_delta`` set, ``body`` NULL).  Both are
+    deferred, so listing versions never reads body data; use
+    content_version_service to reconstruct a body.
+    """
+
     __tablename__ = "content_versions"
+    __table_args__ = (UniqueConstraint("content_id", "version_number", name="uq_content_versions_content_number"),)
 
     id = Column(Integer, primary_key=True, index=True)
     content_id = Column(Integer, ForeignKey("content.id", ondelete="CASCADE"))
+    version_number = Column(Integer, nullable=True)
     title = Column(String, nullable=False)
-    body = Column(Text, nullable=False)
+    body = deferred(Column(Text, nullable=True))
+    base_version_id = Column(Integer, ForeignKey("content_versions.id", ondelete="CASCADE"), nullable=True, index=True)
+    body_delta = deferred(Column(LargeBinary, nullable=True))
+    body_length = Column(Integer, nullable=True)
     meta_title = Column(Text)
     meta_description = Column(Text)
     meta_keywords = Column(Text)
@@ -23,5 +38,10 @@ class ContentVersion(Base):
     update_at = Column(DateTime, default=datetime.utcnow)
 
     content = relationship("Content", back_populates="versions")
+    base_version = relationship("ContentVersion", remote_side=[id])
     editor_id = Column(Integer, ForeignKey("users.id"))
     editor = relationship("User", foreign_keys=[editor_id])
+
+    @property
+    def is_keyframe(self) -> bool:
+        return self.base_version_id is None
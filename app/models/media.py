@@ -31,6 +31,9 @@ class Media(Base):
     thumbnail_path = Column(String, nullable=True)
     sizes = Column(JSON, default=dict, nullable=False)  # {"small": "path", "medium": "path", "large": "path"}
 
+    # Shared storage; NULL for files not yet deduplicated (see app/utils/media_dedupe.py)
+    content_hash = Column(String(64), ForeignKey("media_blobs.content_hash"), nullable=True)
+
     # Descriptive metadata
     alt_text = Column(String, nullable=True)
     title = Column(String, nullable=True)
@@ -56,6 +59,7 @@ class Media(Base):
         Index("ix_media_uploaded_by", "uploaded_by"),
         Index("ix_media_uploaded_at", "uploaded_at"),
         Index("ix_media_folder_id", "folder_id"),
+        Index("ix_media_content_hash", "content_hash"),
     )
 
     def __repr__(self):
@@ -0,0 +1,32 @@
+"""
+Media Blob Model
+
+Content-addressed storage for uploaded files.  Every distinct upload (by
+SHA-256 of its bytes) is stored, optimized and resized once; media records
+with the same content share the blob's files and ref_count tracks how many
+records point at it.
+"""
+
+from sqlalchemy import JSON, BigInteger, Column, DateTime, Integer, String, func
+
+from app.database import Base
+
+
+class MediaBlob(Base):
+    """Stored file plus its thumbnail and size variants, shared by identical uploads"""
+
+    __tablename__ = "media_blobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    content_hash = Column(String(64), nullable=False, unique=True, index=True)  # hex SHA-256 of the uploaded bytes
+    file_path = Column(String, nullable=False)
+    file_size = Column(BigInteger, nullable=False)
+    width = Column(Integer, nullable=True)
+    height = Column(Integer, nullable=True)
+    thumbnail_path = Column(String, nullable=True)
+    sizes = Column(JSON, default=dict, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=1)  # media rows sharing these files
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<MediaBlob(hash={self.content_hash[:12]}, refs={self.ref_count})>"
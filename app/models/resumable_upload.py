@@ -0,0 +1,38 @@
+"""
+Resumable Upload Model
+
+Server-side state of a chunked upload: the declared file, how many bytes
+have been received so far (the offset the next chunk must start at) and,
+once finalized, the media record it produced.  The bytes themselves are
+assembled in a part file under the upload directory.
+"""
+
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+class ResumableUpload(Base):
+    """A chunked upload in progress (or completed, kept so finalize can be retried)"""
+
+    __tablename__ = "resumable_uploads"
+
+    id = Column(String(32), primary_key=True)  # uuid4 hex, used in URLs
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    filename = Column(String, nullable=False)
+    mime_type = Column(String, nullable=False)
+    file_type = Column(String, nullable=False)
+    total_size = Column(BigInteger, nullable=False)
+    received = Column(BigInteger, nullable=False, default=0)
+    checksum = Column(String(64), nullable=True)  # client-declared hex SHA-256, verified on finalize
+    media_id = Column(Integer, ForeignKey("media.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+    @property
+    def completed(self) -> bool:
+        return self.media_id is not None
+
+    def __repr__(self) -> str:
+        return f"<ResumableUpload(id={self.id}, received={self.received}/{self.total_size})>"
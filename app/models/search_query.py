@@ -2,11 +2,15 @@
 SearchQuery Model
 
 Tracks search queries for analytics and optimization.
+
+SearchQueryRollup holds per-day aggregates keyed by (day, normalized_query).
+It is maintained by the buffered writer in app/utils/search_analytics.py and
+is the only table read by the analytics endpoint.
 """
 
 from datetime import datetime, timezone
 
-from sqlalchemy import JSON, Column, DateTime, Float, ForeignKey, Index, Integer, String
+from sqlalchemy import JSON, BigInteger, Column, Date, DateTime, Float, ForeignKey, Index, Integer, String
 
 from app.database import Base
 
@@ -24,3 +28,16 @@ class SearchQuery(Base):
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
 
     __table_args__ = (Index("ix_search_queries_created_at", "created_at"),)
+
+
+class SearchQueryRollup(Base):
+    __tablename__ = "search_query_rollups"
+
+    day = Column(Date, primary_key=True)
+    normalized_query = Column(String(500), primary_key=True)
+    search_count = Column(Integer, nullable=False, default=0)
+    zero_result_count = Column(Integer, nullable=False, default=0)
+    total_results = Column(BigInteger, nullable=False, default=0)
+    total_execution_time_ms = Column(Float, nullable=False, default=0.0)
+
+    __table_args__ = (Index("ix_search_query_rollups_day", "day"),)
@@ -32,7 +32,11 @@ class Tenant(Base):
     # Use metadata_ as Python attr to avoid shadowing SQLAlchemy Base.metadata
     metadata_ = Column("metadata", JSON, nullable=True, default=dict)
     created_at = Column(DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
-    created_by_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    created_by_id = Column(
+        Integer,
+        ForeignKey("users.id", ondelete="SET NULL", use_alter=True, name="fk_tenants_created_by_id"),
+        nullable=True,
+    )
 
     # Relationship back to the creating user (no back_populates — avoids circular import)
     created_by = relationship("User", foreign_keys=[created_by_id], lazy="select")
@@ -35,7 +35,7 @@ class User(Base):
     role = relationship("Role", lazy="selectin")
 
     # Multi-tenancy: nullable FK — NULL means "no tenant" (backward-compatible default)
-    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="SET NULL"), nullable=True, index=True)
+    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="SET NULL"), nullable=True)
     tenant = relationship("Tenant", foreign_keys=[tenant_id], lazy="select")
 
     # Update the relationship to remove `delete-orphan`
@@ -11,16 +11,25 @@ Provides FastAPI Depends()-compatible callables for permission checking:
       Full check: global role permissions + object-level ContentPermission
       overrides.  Reads content_id from the request's path parameters
       (key: "content_id") so no tight coupling to specific route signatures.
+
+  get_permission_service()
+      One PermissionService per request (FastAPI caches dependency results
+      per request), so every check in a request shares its decision memo.
 """
 
 from fastapi import Depends, HTTPException, Request, status
 
 from app.auth import get_current_user
 from app.database import get_db
-from app.permissions_config.permissions import get_role_permissions
+from app.permissions_config.permissions import role_has_permission
 from app.services.permission_service import PermissionService
 
 
+def get_permission_service(db=Depends(get_db)) -> PermissionService:
+    """Dependency: the request's PermissionService."""
+    return PermissionService(db)
+
+
 def permission_required(permission: str):
     """
     Dependency factory: require *permission* based on global role only.
@@ -30,8 +39,7 @@ def permission_required(permission: str):
 
     async def checker(current_user=Depends(get_current_user)):
         role = current_user.role.name if current_user.role else "user"
-        allowed = get_role_permissions(role)
-        if "*" in allowed or permission in allowed:
+        if role_has_permission(role, permission):
             return True
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -52,12 +60,11 @@ def object_permission_required(permission: str):
     async def checker(
         request: Request,
         current_user=Depends(get_current_user),
-        db=Depends(get_db),
+        service: PermissionService = Depends(get_permission_service),
     ):
         content_id_raw = request.path_params.get("content_id")
         content_id: int | None = int(content_id_raw) if content_id_raw is not None else None
 
-        service = PermissionService(db)
         allowed = await service.check_permission(current_user, permission, content_id)
         if not allowed:
             raise HTTPException(
@@ -8,6 +8,8 @@ Provides:
 - PERMISSION_TEMPLATES: predefined permission bundles for quick role assignment
 - get_role_permissions(): resolves effective permissions with full inheritance
 - ROLE_PERMISSIONS: backward-compat alias for ROLE_OWN_PERMISSIONS
+- ROLE_PERMISSION_MASKS / role_has_permission(): the inheritance-resolved
+  role matrix compiled to one bitmask per role at import, for O(1) checks
 """
 
 # ── Canonical permission catalogue ────────────────────────────────────────────
@@ -153,3 +155,45 @@ def get_role_permissions(role: str) -> list[str]:
         queue.extend(ROLE_INHERITANCE.get(parent, []))
 
     return sorted(effective)
+
+
+# ── Compiled permission matrix ────────────────────────────────────────────────
+
+# One bit per catalogue permission
+PERMISSION_BITS: dict[str, int] = {perm: 1 << bit for bit, perm in enumerate(ALL_PERMISSIONS)}
+
+# Every bit set: wildcard roles pass any check, including tokens outside the catalogue
+WILDCARD_MASK = -1
+
+
+def compile_role_masks() -> dict[str, int]:
+    """
+    Resolve every role's inherited permissions once and encode them as bitmasks.
+
+    Wildcard roles map to ``WILDCARD_MASK``.  Call again after changing
+    ROLE_OWN_PERMISSIONS or ROLE_INHERITANCE at runtime.
+    """
+    masks: dict[str, int] = {}
+    for role in ROLE_OWN_PERMISSIONS:
+        perms = get_role_permissions(role)
+        if "*" in perms:
+            masks[role] = WILDCARD_MASK
+        else:
+            masks[role] = sum(PERMISSION_BITS[perm] for perm in perms if perm in PERMISSION_BITS)
+    return masks
+
+
+ROLE_PERMISSION_MASKS: dict[str, int] = compile_role_masks()
+
+
+def role_has_permission(role: str, permission: str) -> bool:
+    """
+    Return True if *role* (with inheritance) grants *permission*.
+
+    Same result as ``permission in get_role_permissions(role)`` (or a
+    wildcard), from the compiled matrix.  Unknown roles raise ``ValueError``.
+    """
+    mask = ROLE_PERMISSION_MASKS.get(role)
+    if mask is None:
+        raise ValueError(f"Invalid role: {role!r}")
+    return mask == WILDCARD_MASK or bool(mask & PERMISSION_BITS.get(permission, 0))
@@ -48,6 +48,8 @@ class BackupResponse(BaseModel):
     include_database: bool
     include_media: bool
     include_config: bool
+    progress_percent: int
+    progress_stage: str | None
     created_at: str
     started_at: str | None
     completed_at: str | None
@@ -135,6 +137,8 @@ def _backup_to_response(backup) -> BackupResponse:
         include_database=backup.include_database,
         include_media=backup.include_media,
         include_config=backup.include_config,
+        progress_percent=backup.progress_percent,
+        progress_stage=backup.progress_stage,
         created_at=backup.created_at.isoformat() if backup.created_at else None,
         started_at=backup.started_at.isoformat() if backup.started_at else None,
         completed_at=backup.completed_at.isoformat() if backup.completed_at else None,
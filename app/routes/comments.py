@@ -67,6 +67,8 @@ class CommentResponse(BaseModel):
     updated_at: datetime
     edited_at: datetime | None
     author: CommentAuthor | None = None
+    like_count: int = 0
+    dislike_count: int = 0
     replies: list["CommentResponse"] = []
 
 
@@ -169,7 +171,7 @@ async def get_content_comments(
     """
     Get all approved comments for a content item.
 
-    Returns top-level comments with nested replies.
+    Returns top-level comments with their full reply trees and reaction counts.
     """
     service = CommentService(db)
 
@@ -183,9 +185,10 @@ async def get_content_comments(
     )
 
     total = await service.get_comment_count(content_id, include_pending=False)
+    reactions = await service.get_content_reaction_counts(content_id)
 
     return CommentListResponse(
-        comments=[_comment_to_response(c) for c in comments],
+        comments=[_comment_to_response(c, reactions) for c in comments],
         total=total,
         page=page,
         limit=limit,
@@ -735,15 +738,17 @@ async def reject_comment(
 # ============== Helper Functions ==============
 
 
-def _comment_to_response(comment) -> CommentResponse:
-    """Convert Comment model to response schema."""
+def _comment_to_response(comment, reactions: dict[int, dict] | None = None) -> CommentResponse:
+    """Convert Comment model to response schema, with optional per-comment reaction counts."""
     author = None
     if comment.user:
         author = CommentAuthor(id=comment.user.id, username=comment.user.username)
 
     replies = []
     if hasattr(comment, "replies") and comment.replies:
-        replies = [_comment_to_response(r) for r in comment.replies if not r.is_deleted]
+        replies = [_comment_to_response(r, reactions) for r in comment.replies if not r.is_deleted]
+
+    counts = (reactions or {}).get(comment.id, {})
 
     return CommentResponse(
         id=comment.id,
@@ -758,5 +763,7 @@ def _comment_to_response(comment) -> CommentResponse:
         updated_at=comment.updated_at,
         edited_at=comment.edited_at,
         author=author,
+        like_count=counts.get("like_count", 0),
+        dislike_count=counts.get("dislike_count", 0),
         replies=replies,
     )
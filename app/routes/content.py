@@ -13,11 +13,10 @@ from app.auth import get_current_user, get_current_user_with_role
 from app.database import get_db, get_read_db
 from app.models.activity_log import ActivityLog
 from app.models.content import Content, ContentStatus
-from app.models.content_version import ContentVersion
 from app.models.user import User
 from app.scheduler import schedule_content
 from app.schemas.content import ContentCreate, ContentResponse, ContentUpdate
-from app.schemas.content_version import ContentVersionOut
+from app.schemas.content_version import ContentVersionDetail, ContentVersionOut
 from app.services import content_service, content_version_service
 from app.services.social_service import SocialPostingService
 from app.services.webhook_service import WebhookEventDispatcher
@@ -25,6 +24,10 @@ from app.services.websocket_manager import broadcast_content_event
 from app.utils.activity_log import log_activity
 from app.utils.cache import CacheManager, cache_manager
 from app.utils.field_selector import FieldSelector
+from app.utils.recommendations import schedule_recommendation_refresh
+from app.utils.redirects import invalidate_redirects
+from app.utils.response_cache import cached_json_response
+from app.utils.serializers import CONTENT_SERIALIZER
 from app.utils.slugify import slugify
 
 logging.basicConfig(
@@ -132,6 +135,11 @@ async def update_content(
     if not existing_content:
         raise HTTPException(status_code=404, detail="Content not found.")
 
+    # Save current version before applying updates
+    await content_version_service.create_version_from_content(existing_content, db, current_user, commit=False)
+
+    previous_slug = existing_content.slug
+
     # Validate slug
     if content.slug:
         slug = content.slug
@@ -142,16 +150,6 @@ async def update_content(
     elif content.title:
         existing_content.slug = slugify(content.title)
 
-    # Save current version before applying updates
-    version = ContentVersion(
-        content_id=existing_content.id,
-        title=existing_content.title,
-        body=existing_content.body,
-        slug=existing_content.slug,
-        editor_id=current_user.id,
-    )
-    db.add(version)
-
     # Update fields
     existing_content.title = content.title or existing_content.title
     existing_content.body = content.body or existing_content.body
@@ -179,6 +177,9 @@ async def update_content(
 
         # Invalidate content cache
         await cache_manager.invalidate_content(content_id)
+        if existing_content.slug != previous_slug:
+            # Redirects to this item now land on the new slug
+            await invalidate_redirects()
 
         # Broadcast WebSocket event
         try:
@@ -307,6 +308,10 @@ async def approve_content(
         with contextlib.suppress(Exception):
             asyncio.create_task(SocialPostingService().post_on_publish(content, str(request.base_url).rstrip("/")))
 
+        # Fold the newly published item into related-content recommendations
+        with contextlib.suppress(Exception):
+            schedule_recommendation_refresh(content.id)
+
     except Exception as e:
         await db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to approve content: {str(e)}") from e
@@ -323,6 +328,11 @@ async def get_content_versions(content_id: int, db: AsyncSession = Depends(get_r
     return await content_version_service.get_versions(content_id, db)
 
 
+@router.get("/{content_id}/versions/{version_id}", response_model=ContentVersionDetail)
+async def get_content_version(content_id: int, version_id: int, db: AsyncSession = Depends(get_read_db)):
+    return await content_version_service.get_version(content_id, version_id, db)
+
+
 @router.post("/{content_id}/rollback/{version_id}", response_model=ContentResponse)
 async def rollback_content_version(
     content_id: int,
@@ -330,11 +340,14 @@ async def rollback_content_version(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    return await content_version_service.rollback_to_version(content_id, version_id, db, current_user)
+    content = await content_version_service.rollback_to_version(content_id, version_id, db, current_user)
+    await cache_manager.invalidate_content(content_id)
+    return content
 
 
 @router.get("/", response_model=list[ContentResponse])
 async def get_all_content_route(
+    request: Request,
     skip: int = 0,
     limit: int = 10,
     status: str | None = None,
@@ -343,28 +356,28 @@ async def get_all_content_route(
     fields: FieldSelector = Depends(),
     db: AsyncSession = Depends(get_read_db),
 ):
-    # Try cache first
-    cache_key = f"{CacheManager.PREFIX_CONTENT}list:{skip}:{limit}:{status}:{category_id}:{author_id}"
-    cached = await cache_manager.get(cache_key)
-    if cached is not None:
-        if fields.has_selection:
-            return fields.apply(cached)
-        return cached
-
-    result = await content_service.get_all_content(
-        db, skip=skip, limit=limit, status=status, category_id=category_id, author_id=author_id
-    )
-
-    # Cache the serialized result
-    try:
-        serializable = [ContentResponse.model_validate(c).model_dump(mode="json") for c in result]
-        await cache_manager.set(cache_key, serializable, CacheManager.TTL_SHORT)
-    except Exception as e:
-        logger.debug(f"Failed to cache content list: {e}")
+    async def render() -> bytes:
+        result = await content_service.get_all_content(
+            db,
+            skip=skip,
+            limit=limit,
+            status=status,
+            category_id=category_id,
+            author_id=author_id,
+            columns=fields.columns(Content),
+        )
+        return CONTENT_SERIALIZER.dumps(result, fields.requested_fields)
 
-    if fields.has_selection:
-        return fields.apply(result)
-    return result
+    # Hits are served as the cached encoded body; misses encode with the precompiled serializer
+    params = {
+        "skip": skip,
+        "limit": limit,
+        "status": status,
+        "category_id": category_id,
+        "author_id": author_id,
+        "fields": fields.requested_fields,
+    }
+    return await cached_json_response(request, "content:list", params, render)
 
 
 # Search Endpoints
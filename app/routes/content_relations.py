@@ -52,6 +52,12 @@ class RelationResponse(BaseModel):
     target_content: ContentBrief | None = None
 
 
+class RelatedContentResponse(BaseModel):
+    content: ContentBrief
+    score: float | None = None  # similarity of a computed recommendation; None when curated
+    curated: bool
+
+
 class SeriesCreate(BaseModel):
     title: str = Field(..., min_length=1, max_length=200)
     slug: str = Field(..., min_length=1, max_length=200)
@@ -109,6 +115,7 @@ class RedirectResponse(BaseModel):
     old_slug: str
     content_id: int
     status_code: int
+    hit_count: int = 0
     created_at: datetime
     content: ContentBrief | None = None
 
@@ -172,6 +179,7 @@ def _redirect_resp(r) -> RedirectResponse:
         old_slug=r.old_slug,
         content_id=r.content_id,
         status_code=r.status_code,
+        hit_count=r.hit_count or 0,
         created_at=r.created_at,
         content=_content_brief(getattr(r, "content", None)),
     )
@@ -192,6 +200,18 @@ async def get_content_relations(
     return [_relation_resp(r) for r in relations]
 
 
+@router.get("/content/{content_id}/related", response_model=list[RelatedContentResponse])
+async def get_related_content(
+    content_id: int,
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_db),
+):
+    """Get published related content: curated relations first, then precomputed recommendations."""
+    service = ContentRelationsService(db)
+    rows = await service.get_related_content(content_id, limit)
+    return [RelatedContentResponse(content=_content_brief(r), score=r.score, curated=r.curated) for r in rows]
+
+
 @router.post(
     "/content/{content_id}/relations",
     response_model=RelationResponse,
@@ -421,7 +441,7 @@ async def resolve_redirect(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No redirect found for this slug")
     return {
         "old_slug": redirect.old_slug,
-        "new_slug": redirect.content.slug if redirect.content else None,
+        "new_slug": redirect.new_slug,
         "content_id": redirect.content_id,
         "status_code": redirect.status_code,
     }
@@ -6,14 +6,14 @@ API endpoints for file upload and media management.
 
 import asyncio
 import contextlib
-from pathlib import Path
+import time
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile, status
-from fastapi.responses import FileResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth import get_current_user, require_role
+from app.config import settings
 from app.database import get_db
 from app.middleware.rate_limit import limiter
 from app.models.user import User
@@ -25,10 +25,15 @@ from app.schemas.media import (
     MediaResponse,
     MediaUpdateRequest,
     MediaUploadResponse,
+    ResumableUploadCreate,
+    ResumableUploadResponse,
+    SignedMediaURLResponse,
 )
-from app.services.upload_service import IMAGE_SIZES, UPLOAD_DIR, upload_service
+from app.services.resumable_upload_service import resumable_upload_service
+from app.services.upload_service import IMAGE_SIZES, upload_service
 from app.services.webhook_service import WebhookEventDispatcher
-from app.utils.security import validate_file_path
+from app.utils.media_delivery import VARIANTS, get_media_descriptor, serve_variant, sign_media_url, verify_signature
+from app.utils.serializers import MEDIA_SERIALIZER, FastJSONResponse
 
 router = APIRouter(tags=["Media"])
 
@@ -56,8 +61,11 @@ async def upload_file(
     with contextlib.suppress(Exception):
         asyncio.create_task(WebhookEventDispatcher(db).media_uploaded(media.id, media.filename, current_user.id))
 
-    base_url = "/api/v1/media"
+    return _upload_response(media)
+
 
+def _upload_response(media) -> MediaUploadResponse:
+    base_url = "/api/v1/media"
     return MediaUploadResponse(
         id=media.id,
         filename=media.filename,
@@ -88,48 +96,111 @@ async def bulk_upload_files(
     """
     Upload multiple files at once (max 10).
 
+    Images are optimized and resized concurrently on a bounded worker pool;
+    duplicate content is stored once.
+
     Rate limit: 5 bulk uploads per hour
     """
     if len(files) > 10:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Maximum 10 files per bulk upload")
 
-    base_url = "/api/v1/media"
-    success_items = []
-    failed_items = []
-
-    for file in files:
-        try:
-            media = await upload_service.upload_file(file, current_user, db)
-            success_items.append(
-                MediaUploadResponse(
-                    id=media.id,
-                    filename=media.filename,
-                    original_filename=media.original_filename,
-                    file_type=media.file_type,
-                    file_size=media.file_size,
-                    mime_type=media.mime_type,
-                    url=f"{base_url}/files/{media.id}",
-                    thumbnail_url=f"{base_url}/thumbnails/{media.id}" if media.thumbnail_path else None,
-                    width=media.width,
-                    height=media.height,
-                    alt_text=media.alt_text,
-                    title=media.title,
-                    tags=media.tags or [],
-                    sizes={name: f"{base_url}/sizes/{media.id}/{name}" for name in (media.sizes or {})},
-                    uploaded_at=media.uploaded_at,
-                )
-            )
-        except HTTPException as e:
-            failed_items.append({"filename": file.filename or "unknown", "error": e.detail})
+    media_items, failed_items = await upload_service.bulk_upload(files, current_user, db)
 
     return {
-        "success_count": len(success_items),
+        "success_count": len(media_items),
         "failed_count": len(failed_items),
-        "success_items": [item.model_dump() for item in success_items],
+        "success_items": [_upload_response(media).model_dump() for media in media_items],
         "failed_items": failed_items,
     }
 
 
+# ============== Resumable uploads ==============
+
+
+def _resumable_state(upload) -> ResumableUploadResponse:
+    return ResumableUploadResponse(
+        id=upload.id,
+        filename=upload.filename,
+        total_size=upload.total_size,
+        offset=upload.received,
+        chunk_size=settings.media_resumable_chunk_size,
+        completed=upload.completed,
+        media_id=upload.media_id,
+        expires_at=upload.expires_at,
+    )
+
+
+@router.post("/uploads", response_model=ResumableUploadResponse, status_code=status.HTTP_201_CREATED)
+@limiter.limit("60/hour")
+async def create_resumable_upload(
+    request: Request,
+    upload_data: ResumableUploadCreate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Start a resumable upload.
+
+    Send the file in chunks with `PUT /uploads/{id}?offset=N` (raw bytes as
+    the body), then `POST /uploads/{id}/complete`.  After a dropped
+    connection, `GET /uploads/{id}` returns the offset to resume from.
+    """
+    upload = await resumable_upload_service.create(
+        upload_data.filename,
+        upload_data.content_type,
+        upload_data.total_size,
+        upload_data.checksum,
+        current_user,
+        db,
+    )
+    return _resumable_state(upload)
+
+
+@router.get("/uploads/{upload_id}", response_model=ResumableUploadResponse)
+async def get_resumable_upload(
+    upload_id: str,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Get the state of a resumable upload (the offset to resume from)."""
+    return _resumable_state(await resumable_upload_service.get(upload_id, current_user, db))
+
+
+@router.put("/uploads/{upload_id}", response_model=ResumableUploadResponse)
+async def put_upload_chunk(
+    request: Request,
+    upload_id: str,
+    offset: int = Query(..., ge=0, description="Byte offset of this chunk; must equal the current offset"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Write one chunk (the raw request body) at offset."""
+    upload = await resumable_upload_service.write_chunk(upload_id, offset, request.stream(), current_user, db)
+    return _resumable_state(upload)
+
+
+@router.post("/uploads/{upload_id}/complete", response_model=MediaUploadResponse)
+async def complete_resumable_upload(
+    upload_id: str,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Finalize a fully received upload into a media item (safe to retry)."""
+    media = await resumable_upload_service.complete(upload_id, current_user, db)
+    return _upload_response(media)
+
+
+@router.delete("/uploads/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def abort_resumable_upload(
+    upload_id: str,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Abort a resumable upload and discard the received bytes."""
+    await resumable_upload_service.abort(upload_id, current_user, db)
+    return None
+
+
 @router.get("/search", response_model=MediaListResponse)
 async def search_media(
     query: Annotated[str | None, Query(description="Search in filename, alt_text, title")] = None,
@@ -199,11 +270,13 @@ async def list_media(
 
     media_list = await upload_service.get_user_media(current_user.id, db, limit, offset)
 
-    return MediaListResponse(
-        media=media_list,
-        total=len(media_list),
-        limit=limit,
-        offset=offset,
+    return FastJSONResponse(
+        {
+            "media": MEDIA_SERIALIZER.to_dicts(media_list),
+            "total": len(media_list),
+            "limit": limit,
+            "offset": offset,
+        }
     )
 
 
@@ -242,66 +315,37 @@ async def update_media(
 
 @router.get("/files/{media_id}")
 async def download_file(
+    request: Request,
     media_id: int,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Download/view the actual file."""
-    media = await upload_service.get_media_by_id(media_id, db)
-
-    from app.constants.roles import RoleEnum
-
-    if media.uploaded_by != current_user.id and current_user.role.name not in [
-        RoleEnum.ADMIN.value,
-        RoleEnum.SUPERADMIN.value,
-    ]:
+    media = await get_media_descriptor(media_id, db)
+    if not media.can_access(current_user):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to access this file")
 
-    safe_file_path = validate_file_path(media.file_path, UPLOAD_DIR)
-
-    if not safe_file_path.exists():
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found on disk")
-
-    return FileResponse(
-        path=str(safe_file_path),
-        media_type=media.mime_type,
-        filename=media.original_filename,
-    )
+    return serve_variant(request, media, "original")
 
 
 @router.get("/thumbnails/{media_id}")
 async def get_thumbnail(
+    request: Request,
     media_id: int,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Get thumbnail for an image."""
-    media = await upload_service.get_media_by_id(media_id, db)
-
-    from app.constants.roles import RoleEnum
-
-    if media.uploaded_by != current_user.id and current_user.role.name not in [
-        RoleEnum.ADMIN.value,
-        RoleEnum.SUPERADMIN.value,
-    ]:
+    media = await get_media_descriptor(media_id, db)
+    if not media.can_access(current_user):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to access this file")
 
-    if not media.thumbnail_path:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No thumbnail available for this media")
-
-    safe_thumbnail_path = validate_file_path(media.thumbnail_path, UPLOAD_DIR.parent)
-
-    if not safe_thumbnail_path.exists():
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Thumbnail not found on disk")
-
-    return FileResponse(
-        path=str(safe_thumbnail_path),
-        media_type=media.mime_type,
-    )
+    return serve_variant(request, media, "thumbnail")
 
 
 @router.get("/sizes/{media_id}/{size}")
 async def get_image_size(
+    request: Request,
     media_id: int,
     size: str,
     current_user: User = Depends(get_current_user),
@@ -314,27 +358,56 @@ async def get_image_size(
             detail=f"Invalid size. Must be one of: {', '.join(IMAGE_SIZES.keys())}",
         )
 
-    media = await upload_service.get_media_by_id(media_id, db)
+    media = await get_media_descriptor(media_id, db)
+    if not media.can_access(current_user):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to access this file")
 
-    from app.constants.roles import RoleEnum
+    return serve_variant(request, media, size)
 
-    if media.uploaded_by != current_user.id and current_user.role.name not in [
-        RoleEnum.ADMIN.value,
-        RoleEnum.SUPERADMIN.value,
-    ]:
+
+@router.get("/{media_id}/signed-url", response_model=SignedMediaURLResponse)
+async def get_signed_url(
+    media_id: int,
+    variant: str = Query("original", description=f"One of: {', '.join(VARIANTS)}"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Issue a short-lived signed link to a media variant.
+
+    The link can be embedded in pages or handed to clients that hold no
+    session; it is served without authentication or database access.
+    """
+    if variant not in VARIANTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid variant. Must be one of: {', '.join(VARIANTS)}"
+        )
+
+    media = await get_media_descriptor(media_id, db)
+    if not media.can_access(current_user):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to access this file")
+    media.path_for(variant)  # 404 for variants this item does not have
 
-    if not media.sizes or size not in media.sizes:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Size variant '{size}' not available")
+    url, expires_at = sign_media_url(media_id, variant)
+    return SignedMediaURLResponse(url=url, expires_at=expires_at)
 
-    variant_path = Path(media.sizes[size])
-    if not variant_path.exists():
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Size variant file not found on disk")
 
-    return FileResponse(
-        path=str(variant_path),
-        media_type=media.mime_type,
-    )
+@router.get("/signed/{media_id}/{variant}")
+async def get_signed_file(
+    request: Request,
+    media_id: int,
+    variant: str,
+    expires: int = Query(...),
+    sig: str = Query(...),
+    db: AsyncSession = Depends(get_db),
+):
+    """Serve a media variant from a signed link (no authentication)."""
+    if variant not in VARIANTS or not verify_signature(media_id, variant, expires, sig):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid or expired link")
+
+    media = await get_media_descriptor(media_id, db)
+    max_age = max(expires - int(time.time()), 0)
+    return serve_variant(request, media, variant, cache_control=f"private, max-age={max_age}")
 
 
 @router.post("/bulk-delete", response_model=BulkOperationResponse)
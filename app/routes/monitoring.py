@@ -1,22 +1,29 @@
 """
 Monitoring Routes
 
-Provides health check endpoints and Prometheus metrics for observability.
+Provides health check endpoints and Prometheus metrics for observability,
+plus admin-only CPU profiling of the worker serving the request.
 """
 
+import os
 import time
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, Literal
 
-from fastapi import APIRouter, Depends, Response
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import JSONResponse, PlainTextResponse
 from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from pydantic import BaseModel
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.auth import require_role
 from app.config import settings
 from app.database import ReadAsyncSessionLocal, get_db, get_pool_stats
+from app.models.user import User
 from app.utils.metrics import set_app_info, update_health_status, update_uptime
+from app.utils.profiler import ProfilerBusyError, profile_worker, request_sampler
+from app.utils.query_monitor import endpoint_query_stats
 
 router = APIRouter(tags=["Monitoring"])
 
@@ -245,6 +252,75 @@ async def metrics_summary() -> dict[str, Any]:
     }
 
 
+@router.get("/metrics/queries")
+async def query_profile(limit: int = Query(20, ge=1, le=500)) -> dict[str, Any]:
+    """
+    Worst endpoints by SQL queries per request (development mode only).
+
+    Aggregated by this worker since it started; ``worst_repeat`` is the
+    statement behind the largest N+1 pattern seen on the endpoint.
+    """
+    if not settings.debug:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return {
+        "n_plus_one_threshold": settings.query_n_plus_one_threshold,
+        "endpoints": endpoint_query_stats.worst(limit),
+    }
+
+
+@router.post("/metrics/profile")
+async def cpu_profile(
+    seconds: float = Query(10, gt=0, le=settings.profiler_max_seconds),
+    interval_ms: float = Query(5, ge=1, le=100),
+    format: Literal["collapsed", "speedscope", "hot"] = "collapsed",
+    current_user: User = Depends(require_role(["admin", "superadmin"])),
+) -> Response:
+    """
+    Sample the CPU of the worker serving this request for ``seconds``.
+
+    ``collapsed`` returns folded stacks for flamegraph.pl or speedscope,
+    ``speedscope`` a speedscope.app JSON file, ``hot`` the top functions by
+    self time.  Stacks are rooted at the asyncio task that was running.
+    Only this worker is profiled; one session runs at a time (409 otherwise).
+    """
+    try:
+        profile = await profile_worker(seconds, interval_ms / 1000)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e)) from e
+
+    if format == "collapsed":
+        return PlainTextResponse(profile.collapsed())
+    if format == "speedscope":
+        return JSONResponse(
+            profile.speedscope(name=f"cms worker {os.getpid()}"),
+            headers={"Content-Disposition": 'attachment; filename="profile.speedscope.json"'},
+        )
+    return JSONResponse(
+        {
+            "samples": profile.samples,
+            "duration_seconds": round(profile.duration, 3),
+            "functions": profile.hot_functions(),
+        }
+    )
+
+
+@router.get("/metrics/profile/hot")
+async def hot_functions(
+    limit: int = Query(50, ge=1, le=500),
+    current_user: User = Depends(require_role(["admin", "superadmin"])),
+) -> dict[str, Any]:
+    """
+    Hottest functions seen by the always-on request sampler in this worker.
+
+    Empty unless ``PROFILER_SAMPLE_RATE`` is set.
+    """
+    return {
+        "sample_rate": settings.profiler_sample_rate,
+        "window_seconds": settings.profiler_window_seconds,
+        **request_sampler.hot_functions(limit),
+    }
+
+
 async def _check_database(db: AsyncSession) -> dict[str, Any]:
     """Check database connectivity and update health metrics."""
     try:
@@ -15,6 +15,7 @@ Route table (all under /api/v1/permissions prefix):
   POST /content/{content_id}          — grant/deny object-level permission (admin)
   DELETE /content/{content_id}/{id}   — revoke object-level permission (admin)
   GET  /check                         — check a permission for current user (auth)
+  GET  /check/batch                   — check a permission on a page of content items (auth)
   GET  /me                            — all effective permissions for current user (auth)
 """
 
@@ -219,6 +220,25 @@ async def check_my_permission(
     return {"permission": permission, "content_id": content_id, "allowed": allowed}
 
 
+@router.get("/check/batch")
+async def check_my_permission_batch(
+    permission: str = Query(..., description="Permission token to check"),
+    content_ids: list[int] = Query(..., description="Content IDs to check, e.g. one page of a listing"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> dict:
+    """
+    Check *permission* for the current user on every item in *content_ids*.
+
+    Object-level overrides for all items are read in one query.
+
+    Returns ``{"permission": "...", "allowed": {"<content_id>": true/false}}``.
+    """
+    service = PermissionService(db)
+    allowed = await service.check_permissions(current_user, permission, content_ids)
+    return {"permission": permission, "allowed": allowed}
+
+
 @router.get("/me")
 async def get_my_permissions(
     content_id: int | None = Query(None, description="Optional content ID for scoped view"),
@@ -28,6 +28,8 @@ from app.models.content import Content
 from app.models.media import Media
 from app.models.notification import Notification
 from app.models.user import User
+from app.services.upload_service import upload_service
+from app.utils.redirects import invalidate_redirects
 
 router = APIRouter(tags=["Privacy & GDPR"])
 
@@ -282,7 +284,7 @@ async def request_account_deletion(
 
     try:
         # Delete user's content
-        await db.execute(delete(Content).where(Content.author_id == current_user.id))
+        deleted_content = (await db.execute(delete(Content).where(Content.author_id == current_user.id))).rowcount
 
         # Delete activity logs
         await db.execute(delete(ActivityLog).where(ActivityLog.user_id == current_user.id))
@@ -290,13 +292,17 @@ async def request_account_deletion(
         # Delete notifications
         await db.execute(delete(Notification).where(Notification.user_id == current_user.id))
 
-        # Delete media (metadata - actual files should be cleaned separately)
-        await db.execute(delete(Media).where(Media.uploaded_by == current_user.id))
+        # Delete media; files go once no other record shares their blob
+        media_ids, unused_paths = await upload_service.release_user_media(current_user.id, db)
 
         # Delete the user
         await db.execute(delete(User).where(User.id == current_user.id))
 
         await db.commit()
+        await upload_service.discard_media(media_ids, unused_paths)
+        if deleted_content:
+            # Redirects to the deleted items must stop resolving
+            await invalidate_redirects()
 
         logger.info(f"Account deleted for user {current_user.id}")
 
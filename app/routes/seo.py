@@ -4,12 +4,15 @@ SEO Routes
 Provides endpoints for sitemap.xml, RSS feeds, and robots.txt.
 """
 
-from fastapi import APIRouter, Depends, Query, Request
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from fastapi.responses import Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
-from app.services.seo_service import SEOService
+from app.services.seo_service import RenderedFeed, SEOService
 
 router = APIRouter(tags=["SEO"])
 
@@ -25,14 +28,54 @@ async def get_sitemap(
     db: AsyncSession = Depends(get_db),
 ) -> Response:
     """
-    Generate XML sitemap for search engines.
+    Generate the sitemap index for search engines.
 
-    Includes all published content, categories, and static pages.
+    Lists the pages sitemap and one content sitemap per shard of at most
+    50,000 published URLs, each with its own lastmod.
     """
     base_url = get_base_url(request)
     service = SEOService(db, base_url)
 
-    sitemap_xml = await service.generate_sitemap()
+    sitemap_xml = await service.generate_sitemap_index()
+
+    return Response(
+        content=sitemap_xml,
+        media_type="application/xml",
+        headers={"Cache-Control": "public, max-age=3600"},
+    )
+
+
+@router.get("/sitemap-pages.xml")
+async def get_pages_sitemap(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    """Sitemap shard with the static pages and category pages."""
+    base_url = get_base_url(request)
+    service = SEOService(db, base_url)
+
+    sitemap_xml = await service.get_pages_sitemap()
+
+    return Response(
+        content=sitemap_xml,
+        media_type="application/xml",
+        headers={"Cache-Control": "public, max-age=3600"},
+    )
+
+
+@router.get("/sitemap-content-{shard}.xml")
+async def get_content_sitemap(
+    shard: int,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    """Sitemap shard with up to 50,000 published content URLs."""
+    base_url = get_base_url(request)
+    service = SEOService(db, base_url)
+
+    sitemap_xml = await service.get_content_sitemap(shard)
+    if sitemap_xml is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sitemap not found")
 
     return Response(
         content=sitemap_xml,
@@ -69,6 +112,7 @@ async def get_rss_feed(
     db: AsyncSession = Depends(get_db),
     limit: int = Query(20, ge=1, le=100, description="Number of items in feed"),
     category: int | None = Query(None, description="Filter by category ID"),
+    author: int | None = Query(None, description="Filter by author ID"),
 ) -> Response:
     """
     Generate RSS 2.0 feed for content syndication.
@@ -78,16 +122,9 @@ async def get_rss_feed(
     base_url = get_base_url(request)
     service = SEOService(db, base_url)
 
-    rss_xml = await service.generate_rss_feed(limit=limit, category_id=category)
+    feed = await service.get_feed("rss", limit=limit, category_id=category, author_id=author)
 
-    return Response(
-        content=rss_xml,
-        media_type="application/rss+xml",
-        headers={
-            "Cache-Control": "public, max-age=1800",
-            "Content-Type": "application/rss+xml; charset=utf-8",
-        },
-    )
+    return _feed_response(request, feed, "application/rss+xml")
 
 
 @router.get("/atom.xml")
@@ -96,6 +133,7 @@ async def get_atom_feed(
     db: AsyncSession = Depends(get_db),
     limit: int = Query(20, ge=1, le=100, description="Number of items in feed"),
     category: int | None = Query(None, description="Filter by category ID"),
+    author: int | None = Query(None, description="Filter by author ID"),
 ) -> Response:
     """
     Generate Atom feed for content syndication.
@@ -105,16 +143,9 @@ async def get_atom_feed(
     base_url = get_base_url(request)
     service = SEOService(db, base_url)
 
-    atom_xml = await service.generate_atom_feed(limit=limit, category_id=category)
+    feed = await service.get_feed("atom", limit=limit, category_id=category, author_id=author)
 
-    return Response(
-        content=atom_xml,
-        media_type="application/atom+xml",
-        headers={
-            "Cache-Control": "public, max-age=1800",
-            "Content-Type": "application/atom+xml; charset=utf-8",
-        },
-    )
+    return _feed_response(request, feed, "application/atom+xml")
 
 
 @router.get("/feed/category/{category_id}")
@@ -132,13 +163,59 @@ async def get_category_rss_feed(
     base_url = get_base_url(request)
     service = SEOService(db, base_url)
 
-    rss_xml = await service.generate_rss_feed(limit=limit, category_id=category_id)
+    feed = await service.get_feed("rss", limit=limit, category_id=category_id)
 
-    return Response(
-        content=rss_xml,
-        media_type="application/rss+xml",
-        headers={
-            "Cache-Control": "public, max-age=1800",
-            "Content-Type": "application/rss+xml; charset=utf-8",
-        },
-    )
+    return _feed_response(request, feed, "application/rss+xml")
+
+
+@router.get("/feed/author/{author_id}")
+async def get_author_rss_feed(
+    author_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    limit: int = Query(20, ge=1, le=100, description="Number of items in feed"),
+) -> Response:
+    """
+    Generate RSS feed for a specific author.
+
+    Returns published content written by the specified user.
+    """
+    base_url = get_base_url(request)
+    service = SEOService(db, base_url)
+
+    feed = await service.get_feed("rss", limit=limit, author_id=author_id)
+
+    return _feed_response(request, feed, "application/rss+xml")
+
+
+def _feed_response(request: Request, feed: RenderedFeed, media_type: str) -> Response:
+    """Serve a rendered feed, answering conditional GETs with 304 Not Modified."""
+    headers = {
+        "Cache-Control": "public, max-age=1800",
+        "ETag": feed.etag,
+        "Last-Modified": feed.last_modified,
+    }
+    if _is_not_modified(request, feed):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    headers["Content-Type"] = f"{media_type}; charset=utf-8"
+    return Response(content=feed.body, media_type=media_type, headers=headers)
+
+
+def _is_not_modified(request: Request, feed: RenderedFeed) -> bool:
+    """Evaluate If-None-Match (preferred) or If-Modified-Since against the feed."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or feed.etag in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if not if_modified_since:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return parsedate_to_datetime(feed.last_modified) <= since
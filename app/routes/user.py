@@ -22,6 +22,7 @@ from app.permissions_config.permissions import get_role_permissions
 from app.schemas.notifications import PaginatedNotifications
 from app.schemas.user import RoleUpdate, UserCreate, UserResponse, UserUpdate
 from app.utils.activity_log import log_activity
+from app.utils.serializers import USER_SERIALIZER
 
 router = APIRouter()
 templates = Jinja2Templates(directory="templates")
@@ -53,16 +54,8 @@ async def list_users(skip: int = 0, limit: int = 50, db: AsyncSession = Depends(
     query = select(User).options(selectinload(User.role)).offset(skip).limit(limit)
     result = await db.execute(query)
     users = result.scalars().all()
-    response = [
-        {
-            "id": user.id,
-            "username": user.username,
-            "email": user.email,
-            "role": user.role.name,  # Direct access - no additional query
-        }
-        for user in users
-    ]
-    return response
+    # Role names come from the eager-loaded relationship - no additional query
+    return USER_SERIALIZER.response(users)
 
 
 @router.put("/{user_id}/role", response_model=UserResponse, dependencies=[Depends(get_role_validator(["admin"]))])
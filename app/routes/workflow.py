@@ -4,7 +4,7 @@ Workflow Routes
 API endpoints for content workflow management.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -229,6 +229,25 @@ async def create_workflow_transition(
 # ============== Content Workflow Operations ==============
 
 
+@router.get("/content/transitions", response_model=dict[int, list[WorkflowTransitionResponse]])
+async def get_available_transitions_for_contents(
+    content_ids: list[int] = Query(..., min_length=1, max_length=100),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> dict[int, list[WorkflowTransitionResponse]]:
+    """
+    Get available transitions for a page of content items (e.g. an editorial queue).
+
+    Unknown content ids are omitted from the result.
+    """
+    service = WorkflowService(db)
+    available = await service.get_available_transitions_for_contents(content_ids, current_user)
+    return {
+        content_id: [WorkflowTransitionResponse(**t) for t in transitions]
+        for content_id, transitions in available.items()
+    }
+
+
 @router.get("/content/{content_id}/transitions", response_model=list[WorkflowTransitionResponse])
 async def get_available_transitions(
     content_id: int,
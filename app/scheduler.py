@@ -7,6 +7,8 @@ from sqlalchemy.future import select
 
 from app.database import AsyncSessionLocal
 from app.models.content import Content, ContentStatus
+from app.utils.cache import cache_manager
+from app.utils.recommendations import schedule_recommendation_refresh
 
 scheduler = AsyncIOScheduler()
 
@@ -23,6 +25,8 @@ async def publish_scheduled_content(content_id: int):
             content.publish_date = datetime.now(timezone.utc)
             content.updated_at = datetime.now(timezone.utc)
             await db.commit()
+            await cache_manager.invalidate_content(content_id)
+            schedule_recommendation_refresh(content_id)
             logger.info(f"[Scheduler] Content ID {content_id} published at scheduled  time.")
 
 
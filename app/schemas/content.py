@@ -119,6 +119,8 @@ class ContentResponse(BaseModel):
         ..., title="Updated At", description="The timestamp when the content was last updated."
     )
     author_id: int = Field(..., title="Author ID", description="The ID of the user who authored the content.")
+    view_count: int = Field(0, title="View Count", description="Total recorded views (updated every few seconds).")
+    comment_count: int = Field(0, title="Comment Count", description="Approved comments (updated every few seconds).")
 
     model_config = ConfigDict(
         from_attributes=True,
@@ -132,6 +134,8 @@ class ContentResponse(BaseModel):
                 "created_at": "2024-11-22T12:00:00.000Z",
                 "updated_at": "2024-11-22T12:30:00.000Z",
                 "author_id": 42,
+                "view_count": 120,
+                "comment_count": 4,
             }
         },
     )
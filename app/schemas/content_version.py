@@ -8,12 +8,19 @@ class ContentVersionOut(BaseModel):
 
     id: int
     content_id: int
+    version_number: int | None = None
     title: str
-    body: str
     meta_title: str | None
     meta_description: str | None
     meta_keywords: str | None
-    slug: str
+    slug: str | None
     status: str
     author_id: int | None
+    editor_id: int | None = None
+    is_keyframe: bool = True
+    body_length: int | None = None
     created_at: datetime
+
+
+class ContentVersionDetail(ContentVersionOut):
+    body: str
@@ -125,6 +125,35 @@ class BulkOperationResponse(BaseModel):
     failed_items: list[dict[str, Any]] = Field(default_factory=list)
 
 
+class SignedMediaURLResponse(BaseModel):
+    """A short-lived link to a media variant that needs no authentication"""
+
+    url: str
+    expires_at: int
+
+
+class ResumableUploadCreate(BaseModel):
+    """Request to start a resumable (chunked) upload"""
+
+    filename: str = Field(..., min_length=1, max_length=255)
+    content_type: str
+    total_size: int = Field(..., gt=0)
+    checksum: str | None = Field(None, pattern=r"^[0-9a-fA-F]{64}$", description="Hex SHA-256 of the whole file")
+
+
+class ResumableUploadResponse(BaseModel):
+    """State of a resumable upload; the next chunk must start at offset"""
+
+    id: str
+    filename: str
+    total_size: int
+    offset: int
+    chunk_size: int
+    completed: bool
+    media_id: int | None = None
+    expires_at: datetime
+
+
 class MediaFolderCreate(BaseModel):
     """Request to create a media folder"""
 
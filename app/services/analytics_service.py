@@ -21,6 +21,7 @@ from app.models.media import Media
 from app.models.user import User
 from app.models.user_session import UserSession
 from app.utils.cache import CacheManager, get_cache_manager
+from app.utils.counters import counter_buffer
 
 logger = logging.getLogger(__name__)
 
@@ -370,6 +371,7 @@ class AnalyticsService:
         )
         db.add(view)
         await db.commit()
+        await counter_buffer.incr("content", content_id, "view_count")
         return True
 
     @staticmethod
@@ -414,12 +416,21 @@ class AnalyticsService:
         )
         daily_views = [{"date": str(r[0]), "views": r[1]} for r in daily_result.all()]
 
+        # All-time totals come from the denormalized counters, not an aggregate
+        counters_result = await db.execute(
+            select(Content.view_count, Content.comment_count).where(Content.id == content_id)
+        )
+        counters = counters_result.one_or_none()
+        pending = (await counter_buffer.pending("content", [content_id])).get(content_id, {})
+
         return {
             "content_id": content_id,
             "period_days": days,
             "total_views": row.total_views or 0,
             "unique_visitors": row.unique_visitors or 0,
             "daily_views": daily_views,
+            "lifetime_views": (counters.view_count if counters else 0) + pending.get("view_count", 0),
+            "comment_count": (counters.comment_count if counters else 0) + pending.get("comment_count", 0),
         }
 
     @staticmethod
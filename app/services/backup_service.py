@@ -2,11 +2,26 @@
 Backup Service
 
 Provides database backup and restore functionality.
+
+Archives are written straight to BACKUP_DIR as a stream; nothing but the
+pg_dump output is staged.  Media is tracked by a content-hash manifest
+kept next to each archive (``<archive>.manifest.json``): a run re-hashes
+only files whose size or mtime changed, and incremental runs store only
+content no existing archive already holds.  The manifest names the archive
+and member of every file, so restoring an incremental backup needs the
+archives it references; retention cleanup keeps those archives for as long
+as a retained backup points at them.
 """
 
+import asyncio
+import hashlib
+import io
+import json
 import logging
+import os
 import shutil
-import subprocess  # nosec B404 - subprocess needed for pg_dump
+import tarfile
+import time
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -22,6 +37,63 @@ logger = logging.getLogger(__name__)
 BACKUP_DIR = Path("backups")
 BACKUP_DIR.mkdir(exist_ok=True)
 
+MEDIA_DIR = Path("uploads")
+MANIFEST_NAME = "manifest.json"
+MEDIA_PROGRESS_BATCH = 200  # media files archived between progress updates
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def _manifest_path(archive_path: Path) -> Path:
+    return archive_path.with_name(archive_path.name + ".manifest.json")
+
+
+def _media_manifest(archive_path: Path) -> dict[str, dict] | None:
+    """Media entries of an archive's manifest, or None if it has no manifest on disk."""
+    manifest_path = _manifest_path(archive_path)
+    if not manifest_path.exists():
+        return None
+    return json.loads(manifest_path.read_text()).get("media", {})
+
+
+def _referenced_archives(archive_path: Path) -> set[str]:
+    """Names of the other archives holding media this archive's manifest points at."""
+    media = _media_manifest(archive_path) or {}
+    return {entry["archive"] for entry in media.values()} - {archive_path.name}
+
+
+def _dump_placeholder(staging_dir: Path, reason: str) -> Path:
+    dump_file = staging_dir / "database.sql"
+    dump_file.write_text(f"-- Database dump placeholder\n-- {reason}\n")
+    return dump_file
+
+
+def _scan_media(media_dir: Path, previous: dict[str, dict]) -> dict[str, dict]:
+    """sha256, size and mtime of every media file; unchanged files reuse the previous hash."""
+    files: dict[str, dict] = {}
+    if not media_dir.exists():
+        return files
+    for root, _, names in os.walk(media_dir):
+        for name in sorted(names):
+            path = Path(root) / name
+            relative = path.relative_to(media_dir).as_posix()
+            stat = path.stat()
+            known = previous.get(relative)
+            if known and known["size"] == stat.st_size and known["mtime_ns"] == stat.st_mtime_ns:
+                sha256 = known["sha256"]
+            else:
+                digest = hashlib.sha256()
+                with path.open("rb") as f:
+                    while chunk := f.read(HASH_CHUNK_SIZE):
+                        digest.update(chunk)
+                sha256 = digest.hexdigest()
+            files[relative] = {"sha256": sha256, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    return files
+
+
+def _add_media(tar: tarfile.TarFile, batch: list[tuple[str, str]]) -> None:
+    for relative, member in batch:
+        tar.add(MEDIA_DIR / relative, member, recursive=False)
+
 
 class BackupService:
     """Service for managing database backups."""
@@ -126,43 +198,67 @@ class BackupService:
         """
         Perform the actual backup operation.
 
-        This creates a compressed archive containing:
-        - Database dump (if include_database)
-        - Media files (if include_media)
+        This streams a compressed archive straight to its destination:
+        - Database dump (if include_database), from a non-blocking pg_dump
+        - Media files (if include_media); all of them for full backups,
+          otherwise only files whose content is not already in an earlier
+          backup listed by the previous manifest
         - Config files (if include_config)
+        - manifest.json, also written next to the archive for the next run
+
+        Progress is committed to the backup row as each stage advances.
         """
         backup.status = BackupStatus.IN_PROGRESS
         backup.started_at = datetime.now(timezone.utc)
-        await self.db.commit()
+        await self._set_progress(backup, "starting", 0)
 
-        temp_dir = BACKUP_DIR / f"temp_{backup.id}"
-        temp_dir.mkdir(exist_ok=True)
+        archive_path = BACKUP_DIR / backup.filename
+        # Only pg_dump's directory output is staged; media is read from where it lives
+        staging_dir = BACKUP_DIR / f"staging_{backup.id}"
+        media_start = 40 if backup.include_database else 0
 
         try:
-            # Database backup
-            if backup.include_database:
-                await self._backup_database(temp_dir)
-
-            # Media backup
-            if backup.include_media:
-                await self._backup_media(temp_dir)
-
-            # Config backup
-            if backup.include_config:
-                await self._backup_config(temp_dir)
-
-            # Create compressed archive
-            archive_path = shutil.make_archive(
-                str(BACKUP_DIR / backup.filename.replace(".tar.gz", "")),
-                "gztar",
-                temp_dir,
+            tar = await asyncio.to_thread(
+                tarfile.open, archive_path, "w:gz", compresslevel=settings.backup_compress_level
             )
+            try:
+                # Database backup
+                if backup.include_database:
+                    await self._set_progress(backup, "database", 0)
+                    dump_path = await self._backup_database(staging_dir)
+                    await asyncio.to_thread(tar.add, dump_path, dump_path.name)
+
+                # Media backup
+                media_manifest: dict[str, dict] = {}
+                if backup.include_media:
+                    await self._set_progress(backup, "media", media_start)
+                    media_manifest = await self._backup_media(backup, tar, media_start, 95)
+
+                # Config backup
+                if backup.include_config:
+                    await self._set_progress(backup, "config", 95)
+                    await asyncio.to_thread(self._backup_config, tar)
+
+                await self._set_progress(backup, "finalizing", 98)
+                manifest = json.dumps(
+                    {"backup": backup.filename, "backup_type": backup.backup_type.value, "media": media_manifest}
+                ).encode()
+                info = tarfile.TarInfo(MANIFEST_NAME)
+                info.size = len(manifest)
+                info.mtime = int(time.time())
+                await asyncio.to_thread(tar.addfile, info, io.BytesIO(manifest))
+            finally:
+                await asyncio.to_thread(tar.close)
+
+            _manifest_path(archive_path).write_bytes(manifest)
 
             # Update backup record
-            backup.file_path = archive_path
-            backup.file_size = Path(archive_path).stat().st_size
+            backup.file_path = str(archive_path)
+            backup.file_size = archive_path.stat().st_size
             backup.status = BackupStatus.COMPLETED
             backup.completed_at = datetime.now(timezone.utc)
+            backup.progress_percent = 100
+            backup.progress_stage = None
 
             logger.info(f"Backup completed: {backup.filename} ({backup.file_size_mb} MB)")
 
@@ -170,18 +266,41 @@ class BackupService:
             backup.status = BackupStatus.FAILED
             backup.error_message = str(e)
             logger.error(f"Backup failed: {e}")
+            archive_path.unlink(missing_ok=True)
             raise
 
         finally:
-            # Clean up temp directory
-            if temp_dir.exists():
-                shutil.rmtree(temp_dir)
+            # Clean up staged dump
+            if staging_dir.exists():
+                await asyncio.to_thread(shutil.rmtree, staging_dir)
 
             await self.db.commit()
 
-    async def _backup_database(self, temp_dir: Path) -> None:
-        """Create database dump using pg_dump."""
-        dump_file = temp_dir / "database.sql"
+    async def _set_progress(self, backup: Backup, stage: str, percent: float) -> None:
+        backup.progress_stage = stage
+        backup.progress_percent = int(percent)
+        await self.db.commit()
+
+    async def _run_pg_dump(self, db_url: str, dump_dir: Path, jobs: int) -> tuple[int, str]:
+        """Run pg_dump without blocking the event loop; returns (returncode, stderr)."""
+        args = ["pg_dump", "--dbname", db_url, "--format=directory", "--file", str(dump_dir)]
+        if jobs > 1:
+            args.append(f"--jobs={jobs}")
+        process = await asyncio.create_subprocess_exec(  # nosec B603 B607
+            *args, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            _, stderr = await asyncio.wait_for(process.communicate(), timeout=settings.backup_pg_dump_timeout_seconds)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            raise
+        return process.returncode, stderr.decode(errors="replace")
+
+    async def _backup_database(self, staging_dir: Path) -> Path:
+        """Dump the database with pg_dump (directory format); returns the path to archive."""
+        staging_dir.mkdir(parents=True, exist_ok=True)
+        dump_dir = staging_dir / "database"
 
         # Parse database URL for connection details
         db_url = settings.database_url
@@ -190,53 +309,96 @@ class BackupService:
         db_url_sync = db_url.replace("+asyncpg", "")
 
         try:
-            # Use pg_dump to create database dump
-            result = subprocess.run(  # nosec B603 B607
-                ["pg_dump", "--dbname", db_url_sync, "-f", str(dump_file)],
-                capture_output=True,
-                text=True,
-                timeout=300,  # 5 minute timeout
-            )
-
-            if result.returncode != 0:
+            jobs = max(settings.backup_pg_dump_jobs, 1)
+            returncode, stderr = await self._run_pg_dump(db_url_sync, dump_dir, jobs)
+            if returncode != 0 and jobs > 1:
+                # Parallel dumps need synchronized snapshots, which not every server offers
+                logger.warning(f"Parallel pg_dump failed, retrying serially: {stderr}")
+                await asyncio.to_thread(shutil.rmtree, dump_dir, ignore_errors=True)
+                returncode, stderr = await self._run_pg_dump(db_url_sync, dump_dir, 1)
+
+            if returncode != 0:
                 # If pg_dump is not available, create a placeholder
-                logger.warning(f"pg_dump failed: {result.stderr}")
-                dump_file.write_text("-- Database dump placeholder\n-- pg_dump not available or failed\n")
+                logger.warning(f"pg_dump failed: {stderr}")
+                return _dump_placeholder(staging_dir, "pg_dump not available or failed")
+            return dump_dir
 
         except FileNotFoundError:
             # pg_dump not installed, create placeholder
             logger.warning("pg_dump not found, creating placeholder")
-            dump_file.write_text("-- Database dump placeholder\n-- pg_dump not installed\n")
+            return _dump_placeholder(staging_dir, "pg_dump not installed")
 
-        except subprocess.TimeoutExpired:
+        except asyncio.TimeoutError:
             logger.error("Database dump timed out")
             raise
 
-    async def _backup_media(self, temp_dir: Path) -> None:
-        """Copy media files to backup directory."""
-        media_dir = Path("uploads")
-        if media_dir.exists():
-            dest = temp_dir / "media"
-            shutil.copytree(media_dir, dest, dirs_exist_ok=True)
-        else:
-            # Create empty media directory marker
-            (temp_dir / "media").mkdir(exist_ok=True)
-            (temp_dir / "media" / ".keep").touch()
-
-    async def _backup_config(self, temp_dir: Path) -> None:
-        """Copy configuration files to backup directory."""
-        config_dir = temp_dir / "config"
-        config_dir.mkdir(exist_ok=True)
+    async def _previous_media_manifest(self) -> dict[str, dict]:
+        """Media entries of the newest completed backup whose manifest is still on disk."""
+        result = await self.db.execute(
+            select(Backup.file_path)
+            .where(Backup.status == BackupStatus.COMPLETED, Backup.include_media.is_(True))
+            .order_by(Backup.completed_at.desc())
+        )
+        for file_path in result.scalars():
+            media = _media_manifest(Path(file_path))
+            if media is not None:
+                return media
+        return {}
+
+    async def _backup_media(
+        self, backup: Backup, tar: tarfile.TarFile, progress_start: float, progress_end: float
+    ) -> dict[str, dict]:
+        """
+        Add media files to the archive; returns the media manifest.
+
+        Each manifest entry records a file's content hash and the archive
+        member holding that content.  Files unchanged since the previous
+        manifest (same size and mtime) are not re-hashed; in an incremental
+        backup, content already held by an existing archive is not stored
+        again.
+        """
+        previous = await self._previous_media_manifest()
+        files = await asyncio.to_thread(_scan_media, MEDIA_DIR, previous)
+
+        stored: dict[str, tuple[str, str]] = {}
+        if backup.backup_type == BackupType.INCREMENTAL:
+            for entry in previous.values():
+                if (BACKUP_DIR / entry["archive"]).exists():
+                    stored.setdefault(entry["sha256"], (entry["archive"], entry["member"]))
+
+        manifest: dict[str, dict] = {}
+        to_store: list[tuple[str, str]] = []
+        for relative, entry in files.items():
+            if entry["sha256"] not in stored:
+                # Identical files in this run are stored once too
+                stored[entry["sha256"]] = (backup.filename, f"media/{relative}")
+                to_store.append((relative, f"media/{relative}"))
+            archive, member = stored[entry["sha256"]]
+            manifest[relative] = {**entry, "archive": archive, "member": member}
+
+        for start in range(0, len(to_store), MEDIA_PROGRESS_BATCH):
+            batch = to_store[start : start + MEDIA_PROGRESS_BATCH]
+            await asyncio.to_thread(_add_media, tar, batch)
+            done = start + len(batch)
+            await self._set_progress(
+                backup, "media", progress_start + (progress_end - progress_start) * done / len(to_store)
+            )
+
+        logger.info(f"Backup media: {len(to_store)} of {len(files)} files stored, the rest referenced")
+        return manifest
 
+    @staticmethod
+    def _backup_config(tar: tarfile.TarFile) -> None:
+        """Add configuration files to the archive."""
         # Copy .env.example (not .env for security)
         env_example = Path(".env.example")
         if env_example.exists():
-            shutil.copy(env_example, config_dir / ".env.example")
+            tar.add(env_example, "config/.env.example")
 
         # Copy alembic.ini
         alembic_ini = Path("alembic.ini")
         if alembic_ini.exists():
-            shutil.copy(alembic_ini, config_dir / "alembic.ini")
+            tar.add(alembic_ini, "config/alembic.ini")
 
     async def delete_backup(self, backup_id: int) -> bool:
         """
@@ -249,11 +411,13 @@ class BackupService:
         if not backup:
             return False
 
-        # Delete the file
+        # Delete the file and its manifest
         file_path = Path(backup.file_path) if backup.file_path else None
         if file_path and file_path.exists():
             file_path.unlink()
             logger.info(f"Deleted backup file: {backup.file_path}")
+        if file_path:
+            _manifest_path(file_path).unlink(missing_ok=True)
 
         # Delete the record
         await self.db.execute(delete(Backup).where(Backup.id == backup_id))
@@ -267,8 +431,18 @@ class BackupService:
 
         WARNING: This is a destructive operation that will overwrite current data.
 
+        Only the preconditions are checked so far: the archive must exist, and
+        so must every earlier archive its media manifest references (an
+        incremental backup stores only new content and points at older
+        archives for the rest).  Extracting the database dump and media is
+        not implemented yet.
+
         Returns:
-            True if restored successfully
+            True if the backup is complete enough to restore from
+
+        Raises:
+            ValueError: If the backup does not exist or did not complete
+            FileNotFoundError: If the archive or an archive it references is missing
         """
         backup = await self.get_backup(backup_id)
         if not backup:
@@ -277,14 +451,18 @@ class BackupService:
         if backup.status != BackupStatus.COMPLETED:
             raise ValueError(f"Cannot restore from backup with status {backup.status}")
 
-        if not Path(backup.file_path).exists():
+        archive_path = Path(backup.file_path)
+        if not archive_path.exists():
             raise FileNotFoundError(f"Backup file not found: {backup.file_path}")
+        missing = sorted(name for name in _referenced_archives(archive_path) if not (BACKUP_DIR / name).exists())
+        if missing:
+            raise FileNotFoundError(f"Backup {backup.filename} references missing archives: {', '.join(missing)}")
 
         # TODO: Implement actual restore logic
         # This would involve:
         # 1. Extracting the archive
         # 2. Running pg_restore for database
-        # 3. Copying media files back
+        # 3. Copying media files back, each manifest entry from the archive and member it names
         # 4. Restarting services if needed
 
         logger.warning("Restore functionality is not yet fully implemented")
@@ -381,6 +559,10 @@ class BackupService:
         """
         Clean up old backups based on retention policy.
 
+        Archives that a retained backup's media manifest references are kept
+        even when the policy would remove them, since the incremental backups
+        built on them cannot be restored without them.
+
         Returns:
             Number of backups deleted
         """
@@ -392,13 +574,8 @@ class BackupService:
         )
         backups = list(result.scalars().all())
 
-        # Delete backups beyond max_backups limit
-        if len(backups) > max_backups:
-            for backup in backups[max_backups:]:
-                await self.delete_backup(backup.id)
-                deleted_count += 1
-
-        # Delete backups older than retention_days
+        # Backups beyond max_backups, then those older than retention_days
+        expired = {backup.id for backup in backups[max_backups:]}
         cutoff = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
         from datetime import timedelta
 
@@ -406,6 +583,24 @@ class BackupService:
 
         for backup in backups[:max_backups]:  # Check remaining backups
             if backup.created_at < cutoff:
+                expired.add(backup.id)
+
+        # Keep what retained backups still reference, following references of references
+        by_filename = {backup.filename: backup for backup in backups}
+        pending = [backup for backup in backups if backup.id not in expired]
+        while pending:
+            backup = pending.pop()
+            if not backup.file_path:
+                continue
+            for name in _referenced_archives(Path(backup.file_path)):
+                referenced = by_filename.get(name)
+                if referenced is not None and referenced.id in expired:
+                    logger.info(f"Keeping backup {name}: {backup.filename} references its media")
+                    expired.discard(referenced.id)
+                    pending.append(referenced)
+
+        for backup in backups:
+            if backup.id in expired:
                 await self.delete_backup(backup.id)
                 deleted_count += 1
 
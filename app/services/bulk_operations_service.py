@@ -2,18 +2,51 @@
 Bulk Operations Service
 
 Handles bulk operations on content, users, and other entities for efficiency.
+
+Content operations are set-based: each chunk of CHUNK_SIZE ids is one
+``UPDATE/DELETE ... WHERE id = ANY(:ids) RETURNING ...`` (tags: multi-row
+``INSERT ... ON CONFLICT DO NOTHING``), activity rows go in with batched
+multi-row inserts, and the whole operation commits once.  No Content
+objects are loaded.
 """
 
+from collections.abc import Iterator
 from typing import Any
 
 from fastapi import HTTPException, status
-from sqlalchemy import delete, update
+from sqlalchemy import ColumnElement, Integer, any_, delete, literal, update
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from app.models.content import Content, ContentStatus
+from app.models.content_tags import content_tags
 from app.models.user import User
-from app.utils.activity_log import log_activity
+from app.utils.activity_log import log_activities, log_activity
+from app.utils.cache import cache_manager
+from app.utils.redirects import invalidate_redirects
+
+CHUNK_SIZE = 1000  # ids per statement; keeps statements and row locks bounded
+
+
+def _chunks(ids: list[int]) -> Iterator[list[int]]:
+    """Distinct ids in order, CHUNK_SIZE at a time."""
+    ids = list(dict.fromkeys(ids))
+    for start in range(0, len(ids), CHUNK_SIZE):
+        yield ids[start : start + CHUNK_SIZE]
+
+
+def _expire_loaded(db: AsyncSession, content_ids: list[int], attribute: str) -> None:
+    """Expire attribute on Content objects the session already holds (set-based writes bypass them)."""
+    ids = set(content_ids)
+    for obj in list(db.identity_map.values()):
+        if isinstance(obj, Content) and obj.id in ids:
+            db.expire(obj, [attribute])
+
+
+def _any_id(ids: list[int]) -> ColumnElement[bool]:
+    """``content.id = ANY(:ids)``: one array parameter however many ids"""
+    return Content.id == any_(literal(ids, ARRAY(Integer)))
 
 
 class BulkOperationsService:
@@ -36,42 +69,50 @@ class BulkOperationsService:
         Returns:
             Dict with success count and failed IDs
         """
-        # Verify all content exists and user has permission
-        stmt = select(Content).where(Content.id.in_(content_ids))
-        result = await db.execute(stmt)
-        content_items = result.scalars().all()
-
-        if not content_items:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No content found with provided IDs")
-
-        # Update status to published
         success_ids = []
         failed_ids = []
+        activities = []
+
+        for chunk in _chunks(content_ids):
+            # Only pending content is published
+            result = await db.execute(
+                update(Content)
+                .where(_any_id(chunk), Content.status == ContentStatus.PENDING)
+                .values(status=ContentStatus.PUBLISHED)
+                .returning(Content.id, Content.title)
+                .execution_options(synchronize_session="fetch")
+            )
+            published = result.all()
+            success_ids.extend(content_id for content_id, _ in published)
+            activities.extend(
+                {
+                    "action": "content_bulk_published",
+                    "user_id": current_user.id,
+                    "description": f"Bulk published content: {title}",
+                    "content_id": content_id,
+                }
+                for content_id, title in published
+            )
 
-        for content in content_items:
-            try:
-                if content.status == ContentStatus.PENDING:
-                    content.status = ContentStatus.PUBLISHED
-
-                    # Log activity
-                    await log_activity(
-                        action="content_bulk_published",
-                        user_id=current_user.id,
-                        description=f"Bulk published content: {content.title}",
-                        content_id=content.id,
-                    )
-                    success_ids.append(content.id)
-                else:
-                    failed_ids.append(
-                        {
-                            "id": content.id,
-                            "reason": f"Content must be in pending status, currently {content.status.value}",
-                        }
-                    )
-            except Exception as e:
-                failed_ids.append({"id": content.id, "reason": str(e)})
+            # Explain the rest; ids that do not exist are left out as before
+            published_ids = {content_id for content_id, _ in published}
+            remaining = [content_id for content_id in chunk if content_id not in published_ids]
+            if remaining:
+                result = await db.execute(select(Content.id, Content.status).where(_any_id(remaining)))
+                failed_ids.extend(
+                    {
+                        "id": content_id,
+                        "reason": f"Content must be in pending status, currently {content_status.value}",
+                    }
+                    for content_id, content_status in result.all()
+                )
+
+        if not success_ids and not failed_ids:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No content found with provided IDs")
 
+        await log_activities(db, activities)
         await db.commit()
+        await cache_manager.invalidate_content()
 
         return {
             "success_count": len(success_ids),
@@ -107,39 +148,45 @@ class BulkOperationsService:
                 status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid status: {new_status}"
             ) from err
 
-        # Fetch content
-        stmt = select(Content).where(Content.id.in_(content_ids))
-        result = await db.execute(stmt)
-        content_items = result.scalars().all()
-
-        if not content_items:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No content found")
-
         success_ids = []
-        failed_ids = []
+        activities = []
 
-        for content in content_items:
-            try:
-                old_status = content.status
-                content.status = status_enum
+        for chunk in _chunks(content_ids):
+            # Lock the rows and read the statuses being replaced
+            result = await db.execute(select(Content.id, Content.status).where(_any_id(chunk)).with_for_update())
+            old_statuses = dict(result.all())
+            if not old_statuses:
+                continue
 
-                await log_activity(
-                    action="content_status_bulk_updated",
-                    user_id=current_user.id,
-                    description=f"Changed status from {old_status.value} to {new_status}",
-                    content_id=content.id,
-                )
-                success_ids.append(content.id)
-            except Exception as e:
-                failed_ids.append({"id": content.id, "reason": str(e)})
+            await db.execute(
+                update(Content)
+                .where(_any_id(list(old_statuses)))
+                .values(status=status_enum)
+                .execution_options(synchronize_session="fetch")
+            )
+            success_ids.extend(old_statuses)
+            activities.extend(
+                {
+                    "action": "content_status_bulk_updated",
+                    "user_id": current_user.id,
+                    "description": f"Changed status from {old_status.value} to {new_status}",
+                    "content_id": content_id,
+                }
+                for content_id, old_status in old_statuses.items()
+            )
+
+        if not success_ids:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No content found")
 
+        await log_activities(db, activities)
         await db.commit()
+        await cache_manager.invalidate_content()
 
         return {
             "success_count": len(success_ids),
             "success_ids": success_ids,
-            "failed_count": len(failed_ids),
-            "failed_items": failed_ids,
+            "failed_count": 0,
+            "failed_items": [],
         }
 
     @staticmethod
@@ -159,28 +206,36 @@ class BulkOperationsService:
         Returns:
             Dict with success/failure counts
         """
-        # Fetch content to verify existence and log before deletion
-        stmt = select(Content).where(Content.id.in_(content_ids))
-        result = await db.execute(stmt)
-        content_items = result.scalars().all()
+        deleted_ids = []
+        activities = []
+
+        for chunk in _chunks(content_ids):
+            result = await db.execute(
+                delete(Content)
+                .where(_any_id(chunk))
+                .returning(Content.id, Content.title)
+                .execution_options(synchronize_session="fetch")
+            )
+            for content_id, title in result.all():
+                deleted_ids.append(content_id)
+                # content_id would be nulled by the foreign key; keep the id in details
+                activities.append(
+                    {
+                        "action": "content_bulk_deleted",
+                        "user_id": current_user.id,
+                        "description": f"Bulk deleted content: {title}",
+                        "details": {"content_id": content_id},
+                    }
+                )
 
-        if not content_items:
+        if not deleted_ids:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No content found")
 
-        # Log deletions
-        for content in content_items:
-            await log_activity(
-                action="content_bulk_deleted",
-                user_id=current_user.id,
-                description=f"Bulk deleted content: {content.title}",
-                content_id=content.id,
-            )
-
-        # Delete content
-        deleted_ids = [c.id for c in content_items]
-        stmt = delete(Content).where(Content.id.in_(content_ids))
-        await db.execute(stmt)
+        await log_activities(db, activities)
         await db.commit()
+        await cache_manager.invalidate_content()
+        # Redirects to the deleted items were removed with them
+        await invalidate_redirects()
 
         return {
             "success_count": len(deleted_ids),
@@ -206,47 +261,49 @@ class BulkOperationsService:
         Returns:
             Dict with success/failure counts
         """
-        # Verify content exists
-        stmt = select(Content).where(Content.id.in_(content_ids))
-        result = await db.execute(stmt)
-        content_items = result.scalars().all()
-
-        if not content_items:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No content found")
-
         # Verify tags exist
         from app.models.tag import Tag
 
-        stmt = select(Tag).where(Tag.id.in_(tag_ids))
-        result = await db.execute(stmt)
-        tags = result.scalars().all()
-
-        if len(tags) != len(tag_ids):
+        tag_ids = list(dict.fromkeys(tag_ids))
+        result = await db.execute(select(Tag.id).where(Tag.id.in_(tag_ids)))
+        if len(result.all()) != len(tag_ids):
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="One or more tags not found")
 
-        success_count = 0
-
-        for content in content_items:
-            try:
-                # Add tags (avoiding duplicates)
-                for tag in tags:
-                    if tag not in content.tags:
-                        content.tags.append(tag)
+        tagged_ids = []
+        for chunk in _chunks(content_ids):
+            result = await db.execute(select(Content.id).where(_any_id(chunk)))
+            existing_ids = result.scalars().all()
+            if not existing_ids:
+                continue
+            tagged_ids.extend(existing_ids)
 
-                await log_activity(
-                    action="tags_bulk_assigned",
-                    user_id=current_user.id,
-                    description=f"Assigned {len(tag_ids)} tags to content",
-                    content_id=content.id,
+            # Pairs that already exist are skipped by the primary key
+            pairs = [{"content_id": content_id, "tag_id": tag_id} for content_id in existing_ids for tag_id in tag_ids]
+            for start in range(0, len(pairs), CHUNK_SIZE):
+                await db.execute(
+                    pg_insert(content_tags).values(pairs[start : start + CHUNK_SIZE]).on_conflict_do_nothing()
                 )
-                success_count += 1
-            except Exception as e:
-                print(f"Error assigning tags to content {content.id}: {e}")
 
+        if not tagged_ids:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No content found")
+
+        await log_activities(
+            db,
+            [
+                {
+                    "action": "tags_bulk_assigned",
+                    "user_id": current_user.id,
+                    "description": f"Assigned {len(tag_ids)} tags to content",
+                    "content_id": content_id,
+                }
+                for content_id in tagged_ids
+            ],
+        )
         await db.commit()
+        _expire_loaded(db, tagged_ids, "tags")
 
         return {
-            "success_count": success_count,
+            "success_count": len(tagged_ids),
             "tags_assigned": len(tag_ids),
         }
 
@@ -280,18 +337,29 @@ class BulkOperationsService:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Category not found")
 
         # Update content
-        stmt = update(Content).where(Content.id.in_(content_ids)).values(category_id=category_id)
-        result = await db.execute(stmt)
-        await db.commit()
-
-        updated_count = result.rowcount  # type: ignore[attr-defined]
-
-        # Log activity
-        await log_activity(
-            action="category_bulk_updated",
-            user_id=current_user.id,
-            description=f"Updated category for {updated_count} content items to {category.name}",
+        updated_count = 0
+        for chunk in _chunks(content_ids):
+            result = await db.execute(
+                update(Content)
+                .where(_any_id(chunk))
+                .values(category_id=category_id)
+                .returning(Content.id)
+                .execution_options(synchronize_session="fetch")
+            )
+            updated_count += len(result.all())
+
+        await log_activities(
+            db,
+            [
+                {
+                    "action": "category_bulk_updated",
+                    "user_id": current_user.id,
+                    "description": f"Updated category for {updated_count} content items to {category.name}",
+                }
+            ],
         )
+        await db.commit()
+        await cache_manager.invalidate_content()
 
         return {
             "success_count": updated_count,
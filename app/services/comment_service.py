@@ -2,17 +2,23 @@
 Comment Service
 
 Provides CRUD operations for comments with moderation support.
+
+Threads are loaded with one query over (thread_id, path) and assembled
+in memory; comments missing those columns are found by walking
+parent_id. Public comment counts and reaction counts are denormalized
+counter columns maintained through app.utils.counters.
 """
 
 import logging
 from datetime import datetime, timezone
 
-from sqlalchemy import and_, func, select
+from sqlalchemy import and_, func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload, noload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.config import settings
-from app.models.comment import Comment, CommentStatus
+from app.models.comment import Comment, CommentStatus, comment_path_segment
 from app.models.comment_engagement import (
     CommentEditHistory,
     CommentReaction,
@@ -22,6 +28,9 @@ from app.models.comment_engagement import (
     ReportStatus,
 )
 from app.models.content import Content
+from app.models.user import User
+from app.utils.cache import CacheManager, cache_manager
+from app.utils.counters import counter_buffer
 
 logger = logging.getLogger(__name__)
 
@@ -59,6 +68,7 @@ class CommentService:
             raise ValueError(f"Content with ID {content_id} not found")
 
         # Verify parent comment exists if provided
+        parent = None
         if parent_id:
             parent = await self.db.get(Comment, parent_id)
             if not parent:
@@ -77,8 +87,17 @@ class CommentService:
         )
 
         self.db.add(comment)
+        await self.db.flush()
+
+        # Path and thread root need the new id, so they are set after the INSERT
+        comment.path = (parent.path if parent else "") + comment_path_segment(comment.id)
+        comment.thread_id = parent.thread_id if parent else comment.id
+
         await self.db.commit()
         await self.db.refresh(comment)
+        await cache_manager.invalidate_comments(content_id)
+        if status == CommentStatus.APPROVED:
+            await counter_buffer.incr("content", content_id, "comment_count")
 
         logger.info(f"Comment created: id={comment.id}, content={content_id}, user={user_id}")
         return comment
@@ -106,6 +125,17 @@ class CommentService:
         """
         Get top-level comments for a content item.
 
+        With include_replies, the page of top-level comments and all of their
+        descendants are fetched in a single query on (thread_id, path) and
+        assembled into a tree; each comment's ``replies`` is populated in
+        memory, so no further loads happen while rendering.  Replies whose
+        ancestor is hidden (deleted or not approved) are dropped.
+
+        Rows without a thread_id (written by an instance that predates the
+        column, or inserted outside this service) come back from the same
+        query; when there are any, the page is reloaded by walking
+        parent_id from its roots instead.
+
         Args:
             content_id: ID of the content
             include_pending: Include pending (unmoderated) comments
@@ -116,48 +146,83 @@ class CommentService:
         Returns:
             List of top-level comments
         """
-        query = select(Comment).where(
-            and_(
-                Comment.content_id == content_id,
-                Comment.parent_id.is_(None),  # Top-level only
-                Comment.is_deleted.is_(False),
-            )
-        )
-
+        visible = [Comment.content_id == content_id, Comment.is_deleted.is_(False)]
         if not include_pending:
-            query = query.where(Comment.status == CommentStatus.APPROVED)
+            visible.append(Comment.status == CommentStatus.APPROVED)
 
-        if include_replies:
-            query = query.options(
-                selectinload(Comment.user),
-                selectinload(Comment.replies).selectinload(Comment.user),
+        roots = (
+            select(Comment.id)
+            .where(*visible, Comment.parent_id.is_(None))  # Top-level only
+            .order_by(Comment.created_at.desc(), Comment.id.desc())
+            .offset(skip)
+            .limit(limit)
+        )
+
+        if not include_replies:
+            result = await self.db.execute(
+                select(Comment)
+                .options(joinedload(Comment.user), noload(Comment.replies), noload(Comment.reactions))
+                .where(Comment.id.in_(roots))
+                .order_by(Comment.created_at.desc(), Comment.id.desc())
             )
-        else:
-            query = query.options(selectinload(Comment.user))
+            comments = list(result.scalars().all())
+            for comment in comments:
+                set_committed_value(comment, "replies", [])
+            return comments
 
-        query = query.order_by(Comment.created_at.desc()).offset(skip).limit(limit)
+        options = (joinedload(Comment.user).joinedload(User.role), noload(Comment.replies), noload(Comment.reactions))
+        result = await self.db.execute(
+            select(Comment)
+            .options(*options)
+            .where(*visible, or_(Comment.thread_id.in_(roots), Comment.thread_id.is_(None)))
+            .order_by(Comment.thread_id, Comment.path)
+        )
+        comments = list(result.scalars().all())
+        if all(comment.thread_id is not None for comment in comments):
+            return _assemble_threads(comments)
 
-        result = await self.db.execute(query)
-        return list(result.scalars().all())
+        tree = select(Comment.id).where(Comment.id.in_(roots)).cte("tree", recursive=True)
+        tree = tree.union_all(select(Comment.id).where(Comment.parent_id == tree.c.id))
+        result = await self.db.execute(
+            select(Comment).options(*options).where(*visible, Comment.id.in_(select(tree.c.id)))
+        )
+        return _assemble_by_parent(result.scalars().all())
 
     async def get_comment_count(
         self,
         content_id: int,
         include_pending: bool = False,
     ) -> int:
-        """Get total comment count for a content item."""
-        query = select(func.count(Comment.id)).where(
-            and_(
-                Comment.content_id == content_id,
-                Comment.is_deleted.is_(False),
-            )
-        )
+        """
+        Get total comment count for a content item.
 
+        The public (approved) count is the Content.comment_count counter plus
+        pending deltas; the moderation count including pending comments is
+        aggregated and cached until comments on this content change.
+        """
         if not include_pending:
-            query = query.where(Comment.status == CommentStatus.APPROVED)
+            result = await self.db.execute(select(Content.comment_count).where(Content.id == content_id))
+            count = result.scalar() or 0
+            pending = await counter_buffer.pending("content", [content_id])
+            return max(0, count + pending.get(content_id, {}).get("comment_count", 0))
 
-        result = await self.db.execute(query)
-        return result.scalar() or 0
+        cache_key = f"{CacheManager.PREFIX_COMMENTS}{content_id}:count:all"
+        cached = await cache_manager.get(cache_key)
+        if cached is not None:
+            return cached
+
+        result = await self.db.execute(
+            select(func.count(Comment.id)).where(
+                and_(
+                    Comment.content_id == content_id,
+                    Comment.is_deleted.is_(False),
+                )
+            )
+        )
+        count = result.scalar() or 0
+
+        await cache_manager.set(cache_key, count, CacheManager.TTL_LONG)
+        return count
 
     async def update_comment(
         self,
@@ -219,10 +284,15 @@ class CommentService:
         if not is_admin and comment.user_id != user_id:
             raise PermissionError("Only the author or admin can delete this comment")
 
+        content_id = comment.content_id
+        was_public = _is_public(comment.status, comment.is_deleted)
         comment.is_deleted = True
         comment.updated_at = datetime.now(timezone.utc)
 
         await self.db.commit()
+        await cache_manager.invalidate_comments(content_id)
+        if was_public:
+            await counter_buffer.incr("content", content_id, "comment_count", -1)
 
         logger.info(f"Comment deleted: id={comment_id}, by_user={user_id}")
         return True
@@ -243,11 +313,14 @@ class CommentService:
             return None
 
         old_status = comment.status
+        delta = int(_is_public(status, comment.is_deleted)) - int(_is_public(old_status, comment.is_deleted))
         comment.status = status
         comment.updated_at = datetime.now(timezone.utc)
 
         await self.db.commit()
         await self.db.refresh(comment)
+        await cache_manager.invalidate_comments(comment.content_id)
+        await counter_buffer.incr("content", comment.content_id, "comment_count", delta)
 
         logger.info(
             f"Comment moderated: id={comment_id}, status={old_status.value}->{status.value}, moderator={moderator_id}"
@@ -344,6 +417,7 @@ class CommentService:
         comment = await self.db.get(Comment, comment_id)
         if not comment:
             raise ValueError(f"Comment with ID {comment_id} not found")
+        content_id = comment.content_id
 
         # Check for existing reaction
         result = await self.db.execute(
@@ -356,14 +430,18 @@ class CommentService:
         )
         existing = result.scalar_one_or_none()
 
+        deltas: list[tuple[ReactionType, int]] = []
         if existing:
             if existing.reaction_type == reaction_type:
                 # Same type — toggle off (remove)
+                deltas.append((existing.reaction_type, -1))
                 await self.db.delete(existing)
             else:
                 # Different type — switch
+                deltas += [(existing.reaction_type, -1), (reaction_type, 1)]
                 existing.reaction_type = reaction_type
         else:
+            deltas.append((reaction_type, 1))
             # No existing reaction — create
             reaction = CommentReaction(
                 comment_id=comment_id,
@@ -373,6 +451,9 @@ class CommentService:
             self.db.add(reaction)
 
         await self.db.commit()
+        await cache_manager.invalidate_comments(content_id)
+        for changed_type, delta in deltas:
+            await counter_buffer.incr("comment", comment_id, _REACTION_COLUMNS[changed_type], delta)
 
         counts = await self.get_reaction_counts(comment_id)
         user_reaction = await self.get_user_reaction(comment_id, user_id)
@@ -383,19 +464,42 @@ class CommentService:
         }
 
     async def get_reaction_counts(self, comment_id: int) -> dict:
-        """Get like/dislike counts for a comment."""
+        """Get like/dislike counts for a comment (counter columns plus pending deltas)."""
+        result = await self.db.execute(
+            select(Comment.like_count, Comment.dislike_count).where(Comment.id == comment_id)
+        )
+        row = result.one_or_none()
+        pending = (await counter_buffer.pending("comment", [comment_id])).get(comment_id, {})
+        return {
+            "like_count": max(0, (row.like_count if row else 0) + pending.get("like_count", 0)),
+            "dislike_count": max(0, (row.dislike_count if row else 0) + pending.get("dislike_count", 0)),
+        }
+
+    async def get_content_reaction_counts(self, content_id: int) -> dict[int, dict]:
+        """
+        Like/dislike counts for every comment on a content item.
+
+        Reads the counter columns of the content's comments in one indexed
+        query and merges pending deltas.  Comments without reactions are
+        omitted.
+
+        Returns:
+            Mapping of comment_id to {"like_count", "dislike_count"}
+        """
         result = await self.db.execute(
-            select(
-                func.count(CommentReaction.id)
-                .filter(CommentReaction.reaction_type == ReactionType.LIKE)
-                .label("likes"),
-                func.count(CommentReaction.id)
-                .filter(CommentReaction.reaction_type == ReactionType.DISLIKE)
-                .label("dislikes"),
-            ).where(CommentReaction.comment_id == comment_id)
+            select(Comment.id, Comment.like_count, Comment.dislike_count).where(Comment.content_id == content_id)
         )
-        row = result.one()
-        return {"like_count": row.likes or 0, "dislike_count": row.dislikes or 0}
+        rows = result.all()
+        pending = await counter_buffer.pending("comment", [row.id for row in rows])
+
+        counts = {}
+        for row in rows:
+            deltas = pending.get(row.id, {})
+            likes = max(0, row.like_count + deltas.get("like_count", 0))
+            dislikes = max(0, row.dislike_count + deltas.get("dislike_count", 0))
+            if likes or dislikes:
+                counts[row.id] = {"like_count": likes, "dislike_count": dislikes}
+        return counts
 
     async def get_user_reaction(self, comment_id: int, user_id: int) -> ReactionType | None:
         """Get a user's reaction on a comment, or None."""
@@ -456,9 +560,13 @@ class CommentService:
         report_count = count_result.scalar() or 0
 
         if report_count >= settings.comment_report_auto_flag_threshold and comment.status != CommentStatus.SPAM:
+            was_public = _is_public(comment.status, comment.is_deleted)
+            content_id = comment.content_id
             comment.status = CommentStatus.PENDING
             comment.updated_at = datetime.now(timezone.utc)
             await self.db.commit()
+            if was_public:
+                await counter_buffer.incr("content", content_id, "comment_count", -1)
             logger.warning(f"Comment {comment_id} auto-flagged after {report_count} reports")
 
         logger.info(f"Comment reported: comment={comment_id}, user={user_id}, reason={reason.value}")
@@ -528,6 +636,69 @@ class CommentService:
         return list(result.scalars().all())
 
 
+_REACTION_COLUMNS = {ReactionType.LIKE: "like_count", ReactionType.DISLIKE: "dislike_count"}
+
+
+def _is_public(status: CommentStatus, is_deleted: bool) -> bool:
+    """Whether a comment counts towards Content.comment_count."""
+    return status == CommentStatus.APPROVED and not is_deleted
+
+
+def _assemble_threads(comments: list[Comment]) -> list[Comment]:
+    """
+    Build comment trees from rows ordered by (thread_id, path).
+
+    Path order guarantees a parent precedes its descendants, so one pass
+    suffices.  A reply whose parent was filtered out is dropped along with
+    its own subtree.  Roots are returned newest first.
+    """
+    children: dict[int, list[Comment]] = {}
+    roots: list[Comment] = []
+
+    attached: list[Comment] = []
+
+    for comment in comments:
+        if comment.parent_id is None:
+            roots.append(comment)
+        elif comment.parent_id in children:
+            children[comment.parent_id].append(comment)
+        else:
+            continue
+        children[comment.id] = []
+        attached.append(comment)
+
+    # Populate the relationship without triggering a lazy load
+    for comment in attached:
+        set_committed_value(comment, "replies", children[comment.id])
+
+    roots.sort(key=lambda c: (c.created_at, c.id), reverse=True)
+    return roots
+
+
+def _assemble_by_parent(comments: list[Comment]) -> list[Comment]:
+    """
+    Build comment trees from unordered rows by following parent_id.
+
+    Same result as _assemble_threads(): replies in id order (the order their
+    paths sort in), subtrees of filtered-out parents dropped, roots newest first.
+    """
+    by_parent: dict[int, list[Comment]] = {}
+    for comment in comments:
+        if comment.parent_id is not None:
+            by_parent.setdefault(comment.parent_id, []).append(comment)
+
+    roots = [comment for comment in comments if comment.parent_id is None]
+    pending = list(roots)
+    while pending:
+        comment = pending.pop()
+        replies = sorted(by_parent.get(comment.id, []), key=lambda c: c.id)
+        set_committed_value(comment, "replies", replies)
+        pending.extend(replies)
+
+    roots.sort(key=lambda c: (c.created_at, c.id), reverse=True)
+    return roots
+
+
 # Dependency for FastAPI
 async def get_comment_service(db: AsyncSession) -> CommentService:
     """FastAPI dependency for CommentService."""
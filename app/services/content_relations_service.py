@@ -1,23 +1,27 @@
 """
 Content Relations Service
 
-Provides CRUD operations for content relationships, series, and redirects.
+Provides CRUD operations for content relationships, series, and redirects,
+and the related-content read path that merges curated relations with
+precomputed recommendations (see app.utils.recommendations).
 """
 
 import logging
 
-from sqlalchemy import func, or_, select
+from sqlalchemy import case, false, func, literal, or_, select, true, union_all
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.models.content import Content
+from app.models.content import Content, ContentStatus
 from app.models.content_relations import (
+    ContentRecommendation,
     ContentRedirect,
     ContentRelation,
     ContentSeries,
     ContentSeriesItem,
     RelationType,
 )
+from app.utils.redirects import ResolvedRedirect, invalidate_redirects, redirect_resolver
 
 logger = logging.getLogger(__name__)
 
@@ -105,6 +109,50 @@ class ContentRelationsService:
         result = await self.db.execute(query)
         return list(result.scalars().all())
 
+    async def get_related_content(self, content_id: int, limit: int = 10) -> list:
+        """
+        Published items related to content_id: curated RELATED_TO links first, then recommendations.
+
+        One round trip: both sources are indexed lookups combined with UNION ALL.
+        Rows carry id, title, slug, status, score (None for curated) and curated.
+        """
+        curated = select(
+            case(
+                (ContentRelation.source_content_id == content_id, ContentRelation.target_content_id),
+                else_=ContentRelation.source_content_id,
+            ).label("related_id"),
+            literal(None).label("score"),
+            true().label("curated"),
+        ).where(
+            ContentRelation.relation_type == RelationType.RELATED_TO,
+            or_(
+                ContentRelation.source_content_id == content_id,
+                ContentRelation.target_content_id == content_id,
+            ),
+        )
+        computed = select(
+            ContentRecommendation.related_content_id,
+            ContentRecommendation.score,
+            false(),
+        ).where(ContentRecommendation.content_id == content_id)
+        related = union_all(curated, computed).subquery()
+
+        result = await self.db.execute(
+            select(Content.id, Content.title, Content.slug, Content.status, related.c.score, related.c.curated)
+            .join(related, Content.id == related.c.related_id)
+            .where(Content.status == ContentStatus.PUBLISHED)
+            .order_by(related.c.curated.desc(), related.c.score.desc(), Content.id)
+        )
+        items, seen = [], set()
+        for row in result:
+            if row.id in seen:
+                continue
+            seen.add(row.id)
+            items.append(row)
+            if len(items) == limit:
+                break
+        return items
+
     async def delete_relation(self, relation_id: int) -> bool:
         """Delete a content relation."""
         relation = await self.db.get(ContentRelation, relation_id)
@@ -302,17 +350,13 @@ class ContentRelationsService:
         self.db.add(redirect)
         await self.db.commit()
         await self.db.refresh(redirect)
+        await invalidate_redirects()
         logger.info("Created redirect: %s -> content %d", old_slug, content_id)
         return redirect
 
-    async def resolve_redirect(self, slug: str) -> ContentRedirect | None:
-        """Resolve a slug to a redirect, if one exists."""
-        result = await self.db.execute(
-            select(ContentRedirect)
-            .options(selectinload(ContentRedirect.content))
-            .where(ContentRedirect.old_slug == slug)
-        )
-        return result.scalar_one_or_none()
+    async def resolve_redirect(self, slug: str) -> ResolvedRedirect | None:
+        """Resolve a slug to its final redirect target from the in-memory redirect table."""
+        return await redirect_resolver.resolve(slug, self.db)
 
     async def list_redirects(
         self,
@@ -335,5 +379,6 @@ class ContentRelationsService:
             return False
         await self.db.delete(redirect)
         await self.db.commit()
+        await invalidate_redirects()
         logger.info("Deleted redirect: id=%d", redirect_id)
         return True
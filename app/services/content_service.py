@@ -4,7 +4,7 @@ from datetime import datetime, timezone
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import load_only, raiseload, selectinload
 
 from app.auth import hash_password
 from app.models.content import Content
@@ -87,13 +87,22 @@ async def get_all_content(
     status: str | None = None,
     category_id: int | None = None,
     author_id: int | None = None,
+    columns: list | None = None,
+    load_relationships: bool = True,
 ) -> list[Content]:
-    # Use eager loading to avoid N+1 queries for author and category
-    query = select(Content).options(
-        selectinload(Content.author),
-        selectinload(Content.category),
-        selectinload(Content.tags),
-    )
+    if columns:
+        # Sparse fieldset: load only the requested columns and no relationships
+        query = select(Content).options(load_only(*columns))
+    elif not load_relationships:
+        # Callers that batch relationships themselves (GraphQL DataLoaders)
+        query = select(Content).options(raiseload("*"))
+    else:
+        # Use eager loading to avoid N+1 queries for author and category
+        query = select(Content).options(
+            selectinload(Content.author),
+            selectinload(Content.category),
+            selectinload(Content.tags),
+        )
 
     if category_id:
         query = query.where(Content.category_id == category_id)
@@ -1,44 +1,138 @@
 from fastapi import HTTPException, status
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import attributes, undefer
 
+from app.config import settings
 from app.models.content import Content
 from app.models.content_version import ContentVersion
 from app.models.user import User
+from app.utils.redirects import invalidate_redirects
+from app.utils.text_delta import apply_delta, encode_delta, worth_chaining
 
+# Attempts at claiming the next version number when concurrent saves race for it
+VERSION_NUMBER_ATTEMPTS = 3
 
-async def create_version_from_content(content: Content, db: AsyncSession, current_user: User):
-    version = ContentVersion(
+
+async def create_version_from_content(content: Content, db: AsyncSession, current_user: User, commit: bool = True):
+    """
+    Snapshot the current state of content as a new version.
+
+    The body is stored as a compressed diff against the latest keyframe, or
+    as a new keyframe when there is none, the chain has reached
+    ``content_version_keyframe_interval`` versions, or the diff would not be
+    meaningfully smaller than the body.  Pass commit=False to leave the
+    version in the caller's transaction.
+
+    The version number is the current maximum plus one; (content_id,
+    version_number) is unique, so if a concurrent save claims the same
+    number first, the insert is rolled back to a savepoint and retried.
+    """
+    for attempt in range(VERSION_NUMBER_ATTEMPTS):
+        version = await _new_version(content, db, current_user)
+        try:
+            async with db.begin_nested():
+                db.add(version)
+        except IntegrityError:
+            if attempt == VERSION_NUMBER_ATTEMPTS - 1:
+                raise
+            continue
+        break
+
+    if commit:
+        await db.commit()
+    return version
+
+
+async def _new_version(content: Content, db: AsyncSession, current_user: User) -> ContentVersion:
+    body = content.body or ""
+
+    last_number = (
+        await db.execute(select(func.max(ContentVersion.version_number)).where(ContentVersion.content_id == content.id))
+    ).scalar() or 0
+    keyframe = (
+        await db.execute(
+            select(ContentVersion.id, ContentVersion.version_number, ContentVersion.body)
+            .where(ContentVersion.content_id == content.id, ContentVersion.base_version_id.is_(None))
+            .order_by(ContentVersion.id.desc())
+            .limit(1)
+        )
+    ).first()
+
+    base_version_id = None
+    body_delta = None
+    number = last_number + 1
+    if keyframe is not None and number - (keyframe.version_number or 0) < settings.content_version_keyframe_interval:
+        delta = encode_delta(keyframe.body or "", body)
+        if worth_chaining(delta, body):
+            base_version_id, body_delta = keyframe.id, delta
+
+    return ContentVersion(
         content_id=content.id,
+        version_number=number,
         title=content.title,
-        body=content.body,
+        body=None if body_delta is not None else body,
+        base_version_id=base_version_id,
+        body_delta=body_delta,
+        body_length=len(body),
         meta_title=content.meta_title,
         meta_description=content.meta_description,
         meta_keywords=content.meta_keywords,
         slug=content.slug,
         status=content.status,
         author_id=current_user.id,
+        editor_id=current_user.id,
     )
-    db.add(version)
-    await db.commit()
 
 
 async def get_versions(content_id: int, db: AsyncSession):
+    """List version metadata, newest first; bodies and deltas are not loaded."""
     result = await db.execute(
-        select(ContentVersion).where(ContentVersion.content_id == content_id).order_by(ContentVersion.created_at.desc())
+        select(ContentVersion)
+        .where(ContentVersion.content_id == content_id)
+        .order_by(ContentVersion.created_at.desc(), ContentVersion.id.desc())
     )
     return result.scalars().all()
 
 
-async def rollback_to_version(content_id: int, version_id: int, db: AsyncSession, current_user: User):
+async def get_version_body(version: ContentVersion, db: AsyncSession) -> str:
+    """Reconstruct a version's body: its own keyframe, or its keyframe plus one delta."""
+    if version.is_keyframe:
+        return (await db.execute(select(ContentVersion.body).where(ContentVersion.id == version.id))).scalar() or ""
+
+    row = (
+        await db.execute(
+            select(ContentVersion.body, ContentVersion.body_delta)
+            .where(ContentVersion.id.in_([version.id, version.base_version_id]))
+            .order_by(ContentVersion.base_version_id.is_(None).desc())
+        )
+    ).all()
+    base_body, delta = row[0].body or "", row[1].body_delta
+    return apply_delta(base_body, delta)
+
+
+async def get_version(content_id: int, version_id: int, db: AsyncSession) -> ContentVersion:
+    """Load one version with its body reconstructed (read-only; never written back)."""
     result = await db.execute(
-        select(ContentVersion).where(ContentVersion.id == version_id, ContentVersion.content_id == content_id)
+        select(ContentVersion)
+        .options(undefer(ContentVersion.body))
+        .where(ContentVersion.id == version_id, ContentVersion.content_id == content_id)
     )
     version = result.scalars().first()
 
     if not version:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Version not found")
 
+    if not version.is_keyframe:
+        attributes.set_committed_value(version, "body", await get_version_body(version, db))
+    return version
+
+
+async def rollback_to_version(content_id: int, version_id: int, db: AsyncSession, current_user: User):
+    version = await get_version(content_id, version_id, db)
+
     result = await db.execute(select(Content).where(Content.id == content_id))
     content = result.scalars().first()
 
@@ -46,16 +140,19 @@ async def rollback_to_version(content_id: int, version_id: int, db: AsyncSession
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Content not found")
 
     # Create backup version before rollback
-    await create_version_from_content(content, db, current_user)
+    await create_version_from_content(content, db, current_user, commit=False)
 
     content.title = version.title
     content.body = version.body
     content.meta_title = version.meta_title
     content.meta_description = version.meta_description
     content.meta_keywords = version.meta_keywords
+    slug_changed = content.slug != version.slug
     content.slug = version.slug
     content.status = version.status
 
     await db.commit()
     await db.refresh(content)
+    if slug_changed:
+        await invalidate_redirects()
     return content
@@ -2,19 +2,143 @@
 Email Service
 
 Handles sending emails for password resets, notifications, and user communications.
+
+Single emails open one SMTP connection each.  Batches (digests, the
+notification queue) go through send_notification_emails(): messages are
+rendered and sent on a small thread pool, each thread reusing a persistent
+connection from SMTPConnectionPool, so a run of thousands of emails costs a
+handful of TLS handshakes and logins instead of one per email.
 """
 
+import asyncio
+import logging
+import queue
 import smtplib
 import ssl
+import threading
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from pathlib import Path
+from typing import NamedTuple
 
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 
 from app.config import settings
 from app.utils.security import sanitize_email_header
 
+logger = logging.getLogger(__name__)
+
+
+class NotificationEmail(NamedTuple):
+    """One notification email of a batch"""
+
+    to_email: str
+    username: str
+    subject: str
+    message: str
+
+
+def _tls_context() -> ssl.SSLContext:
+    """Secure SSL/TLS context with certificate verification"""
+    context = ssl.create_default_context()
+    context.check_hostname = True
+    context.verify_mode = ssl.CERT_REQUIRED
+    return context
+
+
+class SMTPConnectionPool:
+    """
+    Persistent SMTP connections shared by sender threads.
+
+    A connection is used by one thread at a time and returned afterwards;
+    at most ``size`` are kept open.  A connection the server dropped while
+    idle is replaced and the message retried once.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        user: str | None = None,
+        password: str | None = None,
+        starttls: bool = True,
+        timeout: float = 30,
+        size: int = 4,
+    ):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self._idle: queue.LifoQueue[smtplib.SMTP] = queue.LifoQueue(maxsize=size)
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                server.starttls(context=_tls_context())
+            if self.user and self.password:
+                server.login(self.user, self.password)
+        except Exception:
+            server.close()
+            raise
+        with self._lock:
+            self.connections_opened += 1
+        return server
+
+    def _acquire(self) -> smtplib.SMTP:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._connect()
+
+    def _release(self, server: smtplib.SMTP) -> None:
+        try:
+            self._idle.put_nowait(server)
+        except queue.Full:
+            self._quit(server)
+
+    @staticmethod
+    def _quit(server: smtplib.SMTP) -> None:
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+    def send(self, msg: MIMEMultipart) -> None:
+        """Send msg on a pooled connection; raises on failure."""
+        server = self._acquire()
+        try:
+            try:
+                server.send_message(msg)
+            except smtplib.SMTPServerDisconnected:
+                # Idle connection timed out on the server side
+                server.close()
+                server = self._connect()
+                server.send_message(msg)
+        except smtplib.SMTPRecipientsRefused:
+            # The connection itself is still good
+            self._release(server)
+            raise
+        except Exception:
+            server.close()
+            raise
+        self._release(server)
+
+    def close(self) -> None:
+        """Quit every idle connection."""
+        while True:
+            try:
+                server = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._quit(server)
+
 
 class EmailService:
     """Service for sending emails with template support"""
@@ -34,6 +158,44 @@ class EmailService:
         self.smtp_user = settings.smtp_user
         self.smtp_password = settings.smtp_password
         self.smtp_from = settings.smtp_from
+        self.smtp_starttls = settings.smtp_starttls
+        self.max_connections = settings.smtp_max_connections
+
+        # Created on the first batch send
+        self._pool: SMTPConnectionPool | None = None
+        self._executor: ThreadPoolExecutor | None = None
+
+    def build_message(
+        self,
+        to_email: str | list[str],
+        subject: str,
+        html_body: str,
+        text_body: str | None = None,
+    ) -> MIMEMultipart:
+        """Build a multipart message with sanitized headers."""
+        # Sanitize email headers to prevent injection attacks
+        subject = sanitize_email_header(subject)
+
+        if isinstance(to_email, str):
+            to_email_str = sanitize_email_header(to_email)
+        else:
+            to_email_str = ", ".join(sanitize_email_header(e) for e in to_email)
+
+        # Create message
+        msg = MIMEMultipart("alternative")
+        msg["Subject"] = subject
+        msg["From"] = sanitize_email_header(self.smtp_from)
+        msg["To"] = to_email_str
+
+        # Add plain text version if provided
+        if text_body:
+            part1 = MIMEText(text_body, "plain")
+            msg.attach(part1)
+
+        # Add HTML version
+        part2 = MIMEText(html_body, "html")
+        msg.attach(part2)
+        return msg
 
     def _send_email(
         self,
@@ -55,37 +217,12 @@ class EmailService:
             bool: True if email sent successfully, False otherwise
         """
         try:
-            # Sanitize email headers to prevent injection attacks
-            subject = sanitize_email_header(subject)
-
-            if isinstance(to_email, str):
-                to_email_str = sanitize_email_header(to_email)
-            else:
-                to_email_str = ", ".join(sanitize_email_header(e) for e in to_email)
-
-            # Create message
-            msg = MIMEMultipart("alternative")
-            msg["Subject"] = subject
-            msg["From"] = sanitize_email_header(self.smtp_from)
-            msg["To"] = to_email_str
-
-            # Add plain text version if provided
-            if text_body:
-                part1 = MIMEText(text_body, "plain")
-                msg.attach(part1)
-
-            # Add HTML version
-            part2 = MIMEText(html_body, "html")
-            msg.attach(part2)
-
-            # Create secure SSL/TLS context with certificate verification
-            context = ssl.create_default_context()
-            context.check_hostname = True
-            context.verify_mode = ssl.CERT_REQUIRED
+            msg = self.build_message(to_email, subject, html_body, text_body)
 
             # Send email with TLS
             with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-                server.starttls(context=context)
+                if self.smtp_starttls:
+                    server.starttls(context=_tls_context())
                 if self.smtp_user and self.smtp_password:
                     server.login(self.smtp_user, self.smtp_password)
                 server.send_message(msg)
@@ -286,14 +423,22 @@ class EmailService:
             bool: True if email sent successfully
         """
         try:
-            template = self.env.get_template("notification.html")
-            html_body = template.render(
-                username=username,
-                message=message,
-                app_name=settings.app_name,
-            )
+            return self._send_email(to_email, *self._render_notification(username, subject, message))
 
-            text_body = f"""
+        except Exception as e:
+            print(f"Failed to send notification email: {e}")
+            return False
+
+    def _render_notification(self, username: str, subject: str, message: str) -> tuple[str, str, str]:
+        """Subject, HTML body and text body of a notification email."""
+        template = self.env.get_template("notification.html")
+        html_body = template.render(
+            username=username,
+            message=message,
+            app_name=settings.app_name,
+        )
+
+        text_body = f"""
             Hello {username},
 
             {message}
@@ -302,17 +447,58 @@ class EmailService:
             The {settings.app_name} Team
             """
 
-            return self._send_email(
-                to_email=to_email,
-                subject=f"{subject} - {settings.app_name}",
-                html_body=html_body,
-                text_body=text_body,
-            )
+        return f"{subject} - {settings.app_name}", html_body, text_body
 
+    def _send_pooled(self, email: NotificationEmail) -> bool:
+        try:
+            msg = self.build_message(
+                email.to_email, *self._render_notification(email.username, email.subject, email.message)
+            )
+            self._pool.send(msg)
+            return True
         except Exception as e:
-            print(f"Failed to send notification email: {e}")
+            logger.warning("Failed to send notification email to %s: %s", email.to_email, e)
             return False
 
+    async def send_notification_emails(self, emails: Sequence[NotificationEmail]) -> list[bool]:
+        """
+        Send a batch of notification emails over pooled SMTP connections.
+
+        At most ``smtp_max_connections`` emails are in flight at once.
+
+        Args:
+            emails: The emails to send
+
+        Returns:
+            list[bool]: Whether each email was sent, in order
+        """
+        if not emails:
+            return []
+        if self._executor is None:
+            self._pool = SMTPConnectionPool(
+                self.smtp_host,
+                self.smtp_port,
+                self.smtp_user,
+                self.smtp_password,
+                starttls=self.smtp_starttls,
+                timeout=settings.smtp_timeout_seconds,
+                size=self.max_connections,
+            )
+            self._executor = ThreadPoolExecutor(max_workers=self.max_connections, thread_name_prefix="smtp")
+        loop = asyncio.get_running_loop()
+        return list(
+            await asyncio.gather(*(loop.run_in_executor(self._executor, self._send_pooled, email) for email in emails))
+        )
+
+    def close(self) -> None:
+        """Stop the sender threads and quit pooled connections (app shutdown)."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
+
 
 # Singleton instance
 email_service = EmailService()
@@ -13,10 +13,10 @@ import json
 import logging
 from datetime import datetime, timedelta, timezone
 
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
+from app.config import settings
 from app.models.notification import Notification
 from app.models.notification_preference import (
     DigestFrequency,
@@ -28,11 +28,16 @@ from app.models.notification_preference import (
     NotificationTemplate,
 )
 from app.models.user import User
-from app.services.email_service import email_service
+from app.services.email_service import NotificationEmail, email_service
 
 logger = logging.getLogger(__name__)
 
 
+def _utcnow() -> datetime:
+    """Naive UTC, as stored in the queue and digest DateTime columns."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 class NotificationService:
     """Service for managing notifications with preferences and templates."""
 
@@ -301,13 +306,11 @@ class NotificationService:
         """Queue an email notification or send immediately."""
         if not is_digest:
             # Send immediately
-            user = await self.db.get(User, user_id)
-            if user and user.email:
-                email_sent = email_service.send_notification_email(
-                    to_email=user.email,
-                    username=user.username,
-                    subject=subject,
-                    message=body,
+            recipient = (await self._get_recipients([user_id])).get(user_id)
+            if recipient:
+                # Pooled send: reuses an SMTP connection and keeps the event loop free
+                [email_sent] = await email_service.send_notification_emails(
+                    [NotificationEmail(*recipient, subject=subject, message=body)]
                 )
                 if email_sent:
                     logger.info(f"Immediate email sent to user {user_id}: {subject}")
@@ -436,108 +439,154 @@ class NotificationService:
 
     # ============== Digest Processing ==============
 
-    async def process_digests(self, frequency: DigestFrequency) -> int:
+    async def process_digests(self, frequency: DigestFrequency, batch_size: int | None = None) -> int:
         """
         Process digest emails for users with the specified frequency.
 
         Should be called by a scheduled task:
         - Daily: Every day at configured time
         - Weekly: Every week at configured time
+
+        Users are handled ``batch_size`` at a time (default
+        ``settings.notification_batch_size``): one query for the batch's
+        pending items, one for their recipients, a pooled concurrent send and
+        one commit.
         """
-        # Get users with this digest frequency
+        batch_size = batch_size or settings.notification_batch_size
+
+        # Categories each user receives as a digest of this frequency
         result = await self.db.execute(
-            select(NotificationPreference)
-            .where(NotificationPreference.digest_frequency == frequency)
-            .options(selectinload(NotificationPreference.user))
+            select(NotificationPreference.user_id, NotificationPreference.category).where(
+                NotificationPreference.digest_frequency == frequency
+            )
         )
-        preferences = result.scalars().all()
-
-        # Group by user
-        user_prefs: dict[int, list] = {}
-        for pref in preferences:
-            if pref.user_id not in user_prefs:
-                user_prefs[pref.user_id] = []
-            user_prefs[pref.user_id].append(pref.category)
+        user_categories: dict[int, set[NotificationCategory]] = {}
+        for user_id, category in result.all():
+            user_categories.setdefault(user_id, set()).add(category)
 
+        user_ids = sorted(user_categories)
         processed_count = 0
-        for user_id, categories in user_prefs.items():
-            # Get queued notifications for digest
-            result = await self.db.execute(
-                select(NotificationQueue).where(
-                    NotificationQueue.user_id == user_id,
-                    NotificationQueue.is_digest.is_(True),
-                    NotificationQueue.is_sent.is_(False),
-                    NotificationQueue.category.in_(categories),
-                )
+        for start in range(0, len(user_ids), batch_size):
+            processed_count += await self._send_digest_batch(
+                user_ids[start : start + batch_size], user_categories, frequency
             )
-            queue_items = result.scalars().all()
-
-            if queue_items:
-                # Create digest
-                await self._send_digest(user_id, queue_items, frequency)
-                processed_count += 1
 
         logger.info(f"Processed {processed_count} {frequency.value} digests")
         return processed_count
 
-    async def _send_digest(
+    async def _send_digest_batch(
         self,
-        user_id: int,
-        items: list[NotificationQueue],
+        user_ids: list[int],
+        user_categories: dict[int, set[NotificationCategory]],
         frequency: DigestFrequency,
-    ) -> None:
-        """Send a digest email to a user."""
-        # Get user email
-        user = await self.db.get(User, user_id)
-        if not user or not user.email:
-            logger.warning(f"Cannot send digest: User {user_id} not found or has no email")
-            return
-
-        # Build digest content
-        digest_content = f"You have {len(items)} notification(s) this {frequency.value}:\n\n"
-
-        for item in items:
-            body_preview = item.body[:100] + "..." if len(item.body) > 100 else item.body
-            digest_content += f"• {item.subject}\n  {body_preview}\n\n"
+    ) -> int:
+        """Send the digests of one batch of users; returns the number sent."""
+        result = await self.db.execute(
+            select(
+                NotificationQueue.id,
+                NotificationQueue.user_id,
+                NotificationQueue.category,
+                NotificationQueue.subject,
+                NotificationQueue.body,
+            )
+            .where(
+                NotificationQueue.user_id.in_(user_ids),
+                NotificationQueue.is_digest.is_(True),
+                NotificationQueue.is_sent.is_(False),
+                NotificationQueue.attempts < settings.notification_max_attempts,
+            )
+            .order_by(NotificationQueue.id)
+        )
+        items_by_user: dict[int, list] = {}
+        for item in result.all():
+            if item.category in user_categories[item.user_id]:
+                items_by_user.setdefault(item.user_id, []).append(item)
+        if not items_by_user:
+            return 0
 
-        # Send the digest email
-        email_sent = email_service.send_notification_email(
-            to_email=user.email,
-            username=user.username,
-            subject=f"Your {frequency.value.capitalize()} Notification Digest",
-            message=digest_content,
+        recipients = await self._get_recipients(items_by_user)
+        pending = []
+        for user_id, items in items_by_user.items():
+            if user_id not in recipients:
+                logger.warning(f"Cannot send digest: User {user_id} not found or has no email")
+                continue
+            pending.append((user_id, items))
+
+        results = await email_service.send_notification_emails(
+            [
+                NotificationEmail(
+                    *recipients[user_id],
+                    subject=f"Your {frequency.value.capitalize()} Notification Digest",
+                    message=self._digest_content(items, frequency),
+                )
+                for user_id, items in pending
+            ]
         )
 
-        if not email_sent:
-            logger.error(f"Failed to send digest email to user {user_id}")
-            return
+        now = _utcnow()
+        sent_ids, failed_ids, digests = [], [], []
+        for (user_id, items), email_sent in zip(pending, results, strict=True):
+            item_ids = [item.id for item in items]
+            if not email_sent:
+                logger.error(f"Failed to send digest email to user {user_id}")
+                failed_ids.extend(item_ids)
+                continue
+            sent_ids.extend(item_ids)
+            digests.append(
+                NotificationDigest(
+                    user_id=user_id,
+                    frequency=frequency,
+                    period_start=now - timedelta(days=7 if frequency == DigestFrequency.WEEKLY else 1),
+                    period_end=now,
+                    notification_count=len(items),
+                    is_sent=True,
+                    sent_at=now,
+                )
+            )
 
-        # Mark items as sent
-        for item in items:
-            item.is_sent = True
-            item.sent_at = datetime.now(timezone.utc)
+        self.db.add_all(digests)
+        await self._record_delivery(sent_ids, failed_ids, now)
+        return len(digests)
 
-        # Record digest
-        digest = NotificationDigest(
-            user_id=user_id,
-            frequency=frequency,
-            period_start=datetime.now(timezone.utc) - timedelta(days=7 if frequency == DigestFrequency.WEEKLY else 1),
-            period_end=datetime.now(timezone.utc),
-            notification_count=len(items),
-            is_sent=True,
-            sent_at=datetime.now(timezone.utc),
-        )
-        self.db.add(digest)
+    @staticmethod
+    def _digest_content(items: list, frequency: DigestFrequency) -> str:
+        """Plain-text digest body listing each item with a short preview."""
+        digest_content = f"You have {len(items)} notification(s) this {frequency.value}:\n\n"
 
+        for item in items:
+            body_preview = item.body[:100] + "..." if len(item.body) > 100 else item.body
+            digest_content += f"• {item.subject}\n  {body_preview}\n\n"
+        return digest_content
+
+    async def _get_recipients(self, user_ids) -> dict[int, tuple[str, str]]:
+        """(email, username) of every listed user that exists and has an email, in one query."""
+        result = await self.db.execute(select(User.id, User.email, User.username).where(User.id.in_(list(user_ids))))
+        return {user_id: (email, username) for user_id, email, username in result.all() if email}
+
+    async def _record_delivery(self, sent_ids: list[int], failed_ids: list[int], now: datetime) -> None:
+        """Mark queue items sent or count a failed attempt, then commit the batch."""
+        if sent_ids:
+            await self.db.execute(
+                update(NotificationQueue)
+                .where(NotificationQueue.id.in_(sent_ids))
+                .values(is_sent=True, sent_at=now)
+                .execution_options(synchronize_session=False)
+            )
+        if failed_ids:
+            await self.db.execute(
+                update(NotificationQueue)
+                .where(NotificationQueue.id.in_(failed_ids))
+                .values(attempts=NotificationQueue.attempts + 1, last_error="SMTP send failed")
+                .execution_options(synchronize_session=False)
+            )
         await self.db.commit()
 
-        logger.info(f"Digest email sent to user {user_id}: {len(items)} items")
-
     async def process_immediate_queue(self, limit: int = 100) -> int:
         """
         Process queued immediate emails that haven't been sent yet.
 
         Useful for retry mechanism when email service was temporarily unavailable.
+        Items that failed ``settings.notification_max_attempts`` times are skipped.
 
         Args:
             limit: Maximum number of emails to process in one batch
@@ -547,43 +596,47 @@ class NotificationService:
         """
         # Get unsent immediate (non-digest) queue items
         result = await self.db.execute(
-            select(NotificationQueue)
+            select(
+                NotificationQueue.id,
+                NotificationQueue.user_id,
+                NotificationQueue.subject,
+                NotificationQueue.body,
+            )
             .where(
                 NotificationQueue.is_digest.is_(False),
                 NotificationQueue.is_sent.is_(False),
+                NotificationQueue.attempts < settings.notification_max_attempts,
             )
+            # Fresh items before retries, so failing addresses cannot hold up the head of the queue
+            .order_by(NotificationQueue.attempts, NotificationQueue.id)
             .limit(limit)
         )
-        queue_items = result.scalars().all()
+        queue_items = result.all()
 
         if not queue_items:
             return 0
 
-        sent_count = 0
-        for item in queue_items:
-            user = await self.db.get(User, item.user_id)
-            if not user or not user.email:
-                # Mark as sent to prevent retries for invalid users
-                item.is_sent = True
-                item.sent_at = datetime.now(timezone.utc)
-                continue
+        recipients = await self._get_recipients({item.user_id for item in queue_items})
+        # Mark as sent to prevent retries for invalid users
+        sent_ids = [item.id for item in queue_items if item.user_id not in recipients]
+        pending = [item for item in queue_items if item.user_id in recipients]
 
-            email_sent = email_service.send_notification_email(
-                to_email=user.email,
-                username=user.username,
-                subject=item.subject,
-                message=item.body,
-            )
+        results = await email_service.send_notification_emails(
+            [NotificationEmail(*recipients[item.user_id], subject=item.subject, message=item.body) for item in pending]
+        )
 
+        sent_count = 0
+        failed_ids = []
+        for item, email_sent in zip(pending, results, strict=True):
             if email_sent:
-                item.is_sent = True
-                item.sent_at = datetime.now(timezone.utc)
+                sent_ids.append(item.id)
                 sent_count += 1
                 logger.info(f"Queued email sent to user {item.user_id}: {item.subject}")
             else:
+                failed_ids.append(item.id)
                 logger.error(f"Failed to send queued email to user {item.user_id}")
 
-        await self.db.commit()
+        await self._record_delivery(sent_ids, failed_ids, _utcnow())
         logger.info(f"Processed immediate queue: {sent_count}/{len(queue_items)} emails sent")
         return sent_count
 
@@ -11,9 +11,15 @@ Grant/deny precedence for object-level overrides:
   - Explicit grant (granted=True) beats the global role deny.
   - If no object-level row exists for the user/role + permission, fall
     back to the global role result.
+
+Global checks use the compiled role matrix (ROLE_PERMISSION_MASKS).
+check_permissions() resolves a whole page of content items with a single
+override query, and every content-scoped decision is memoised on the
+service instance; get_permission_service() shares one instance per request.
 """
 
 import logging
+from collections.abc import Iterable
 from datetime import datetime, timezone
 
 from sqlalchemy import select
@@ -21,7 +27,13 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.content_permission import ContentPermission
 from app.models.user import Role, User
-from app.permissions_config.permissions import ALL_PERMISSIONS, get_role_permissions
+from app.permissions_config.permissions import (
+    ALL_PERMISSIONS,
+    ROLE_PERMISSION_MASKS,
+    WILDCARD_MASK,
+    get_role_permissions,
+    role_has_permission,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +41,8 @@ logger = logging.getLogger(__name__)
 class PermissionService:
     def __init__(self, db: AsyncSession) -> None:
         self.db = db
+        # (user_id, role_name, permission, content_id) -> decision, for the life of the instance
+        self._decisions: dict[tuple[int, str, str, int], bool] = {}
 
     # ── Core check ────────────────────────────────────────────────────────────
 
@@ -49,26 +63,57 @@ class PermissionService:
         """
         role_name: str = user.role.name if user.role else "user"
 
+        # Global role check (compiled matrix, inheritance already resolved)
+        globally_allowed = role_has_permission(role_name, permission)
+
         # 1. Wildcard → always allowed
-        global_perms = get_role_permissions(role_name)
-        if "*" in global_perms:
+        if ROLE_PERMISSION_MASKS[role_name] == WILDCARD_MASK:
             return True
 
-        # 2. Global role check (with inheritance already resolved)
-        globally_allowed = permission in global_perms
+        # 2. No content scope → global result
+        if content_id is None:
+            return globally_allowed
 
-        # 3. Object-level override
-        if content_id is not None:
+        # 3. Object-level override (explicit grant or deny wins)
+        key = (user.id, role_name, permission, content_id)
+        if key not in self._decisions:
             override = await self._get_object_level_decision(
                 content_id=content_id,
                 user_id=user.id,
                 role_name=role_name,
                 permission=permission,
             )
-            if override is not None:
-                return override  # explicit grant or deny wins
+            self._decisions[key] = globally_allowed if override is None else override
+        return self._decisions[key]
+
+    async def check_permissions(
+        self,
+        user: User,
+        permission: str,
+        content_ids: Iterable[int],
+    ) -> dict[int, bool]:
+        """
+        Batched check_permission() for a page of content items.
+
+        Object-level overrides for every item not already decided are read
+        in one query.
+
+        Returns:
+            Mapping of content_id to whether *permission* is allowed on it.
+        """
+        role_name: str = user.role.name if user.role else "user"
+        content_ids = list(dict.fromkeys(content_ids))
 
-        return globally_allowed
+        globally_allowed = role_has_permission(role_name, permission)
+        if ROLE_PERMISSION_MASKS[role_name] == WILDCARD_MASK:
+            return dict.fromkeys(content_ids, True)
+        undecided = [cid for cid in content_ids if (user.id, role_name, permission, cid) not in self._decisions]
+        if undecided:
+            overrides = await self._fetch_override_decisions(undecided, user.id, role_name, permission)
+            for cid in undecided:
+                self._decisions[(user.id, role_name, permission, cid)] = overrides.get(cid, globally_allowed)
+
+        return {cid: self._decisions[(user.id, role_name, permission, cid)] for cid in content_ids}
 
     async def get_effective_permissions(
         self,
@@ -129,6 +174,7 @@ class PermissionService:
             raise ValueError(f"Unknown permission: {permission!r}")
 
         # Upsert — replace any existing row for same (content, user/role, permission)
+        self._decisions.clear()
         existing = await self._find_existing(content_id, user_id, role_name, permission)
         if existing:
             existing.granted = granted
@@ -185,6 +231,7 @@ class PermissionService:
             raise ValueError(f"ContentPermission {permission_id} not found")
         await self.db.delete(row)
         await self.db.commit()
+        self._decisions.clear()
         logger.info("Object permission revoked: id=%s", permission_id)
 
     # ── Role permissions (DB-backed) ─────────────────────────────────────────
@@ -229,32 +276,38 @@ class PermissionService:
 
         User-specific rows take precedence over role-based rows.
         """
-        # User-specific check first
-        result = await self.db.execute(
-            select(ContentPermission).where(
-                ContentPermission.content_id == content_id,
-                ContentPermission.user_id == user_id,
-                ContentPermission.permission == permission,
-            )
-        )
-        user_row = result.scalar_one_or_none()
-        if user_row is not None:
-            return user_row.granted
+        decisions = await self._fetch_override_decisions([content_id], user_id, role_name, permission)
+        return decisions.get(content_id)  # None = no override
+
+    async def _fetch_override_decisions(
+        self,
+        content_ids: list[int],
+        user_id: int,
+        role_name: str,
+        permission: str,
+    ) -> dict[int, bool]:
+        """
+        Return {content_id: granted} for the items that have an override, in one query.
 
-        # Role-based check
+        A user-specific row beats a role-based row for the same item.
+        """
         result = await self.db.execute(
-            select(ContentPermission).where(
-                ContentPermission.content_id == content_id,
-                ContentPermission.role_name == role_name,
+            select(ContentPermission.content_id, ContentPermission.user_id, ContentPermission.granted).where(
+                ContentPermission.content_id.in_(content_ids),
                 ContentPermission.permission == permission,
-                ContentPermission.user_id.is_(None),
+                (ContentPermission.user_id == user_id)
+                | ((ContentPermission.role_name == role_name) & ContentPermission.user_id.is_(None)),
             )
         )
-        role_row = result.scalar_one_or_none()
-        if role_row is not None:
-            return role_row.granted
-
-        return None  # no override
+        decisions: dict[int, bool] = {}
+        user_specific: set[int] = set()
+        for content_id, row_user_id, granted in result.all():
+            if row_user_id is not None:
+                decisions[content_id] = granted
+                user_specific.add(content_id)
+            elif content_id not in user_specific:
+                decisions[content_id] = granted
+        return decisions
 
     async def _fetch_object_permissions(
         self,
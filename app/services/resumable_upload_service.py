@@ -0,0 +1,361 @@
+"""
+Resumable Upload Service
+
+Chunked uploads that survive dropped connections:
+
+1. ``create()`` declares the file (name, type, size, optional SHA-256) and
+   returns an upload id.
+2. ``write_chunk()`` streams one chunk into the part file at the current
+   offset.  If the connection drops mid-chunk the bytes that did arrive are
+   kept, so the client asks for the offset and resumes from there.  No row
+   lock or pooled connection is held while the body arrives: the offset is
+   checked up front and advanced afterwards with a compare-and-set, so of
+   two racing chunks only one moves it.
+3. ``complete()`` checks the size, verifies the declared checksum and hands
+   the file to ``UploadService.create_media()`` (deduplicated, processed on
+   the shared pool).  Chunks are hashed as they arrive, so the assembled file
+   is only re-read when they did not all pass through this worker.
+   Completing twice returns the same media.
+
+Part files live under ``uploads/incoming`` on the shared upload volume, and
+state is in the ``resumable_uploads`` table, so chunks may land on any
+instance.  Idle uploads are purged by install_resumable_upload_cleanup().
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import uuid
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from apscheduler.triggers.interval import IntervalTrigger
+from fastapi import HTTPException, status
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.requests import ClientDisconnect
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.media import Media
+from app.models.resumable_upload import ResumableUpload
+from app.models.user import User
+from app.services.upload_service import UPLOAD_DIR, hash_file, upload_service
+
+logger = logging.getLogger(__name__)
+
+# Running SHA-256 of each upload written through this worker, keyed by upload
+# id: (offset the digest covers, hash object).  Bounded so abandoned uploads
+# cannot grow it; a missing entry only means complete() re-reads the file.
+RUNNING_HASH_LIMIT = 1024
+_running_hashes: OrderedDict[str, tuple] = OrderedDict()
+
+
+def _take_running_hash(upload_id: str, offset: int):
+    """Claim the digest of bytes [0, offset), or None if this worker does not have it."""
+    entry = _running_hashes.pop(upload_id, None)
+    if entry is not None and entry[0] == offset:
+        return entry[1]
+    return hashlib.sha256() if offset == 0 else None
+
+
+def _remember_running_hash(upload_id: str, offset: int, hasher) -> None:
+    _running_hashes[upload_id] = (offset, hasher)
+    while len(_running_hashes) > RUNNING_HASH_LIMIT:
+        _running_hashes.popitem(last=False)
+
+
+def _part_path(upload: ResumableUpload) -> Path:
+    # Keep the extension: image processing picks the format from it
+    return UPLOAD_DIR / "incoming" / f"{upload.id}{Path(upload.filename).suffix.lower()}"
+
+
+def _open_part(part_path: Path, offset: int):
+    part = part_path.open("r+b")
+    part.seek(offset)
+    return part
+
+
+def _write_part(part, chunk: bytes, hasher) -> None:
+    part.write(chunk)
+    if hasher is not None:
+        hasher.update(chunk)
+
+
+def _expiry() -> datetime:
+    return datetime.now(timezone.utc) + timedelta(hours=settings.media_resumable_expiry_hours)
+
+
+class ResumableUploadService:
+    """Service for chunked, resumable uploads"""
+
+    @staticmethod
+    async def create(
+        filename: str,
+        content_type: str,
+        total_size: int,
+        checksum: str | None,
+        current_user: User,
+        db: AsyncSession,
+    ) -> ResumableUpload:
+        """
+        Start a resumable upload.
+
+        Raises:
+            HTTPException: If the type is not allowed (400) or the file is too large (413)
+        """
+        file_type, mime_type = upload_service.classify_file(filename, content_type)
+        if total_size > settings.media_resumable_max_file_size:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"File size exceeds maximum allowed size of "
+                f"{settings.media_resumable_max_file_size // (1024 * 1024)}MB",
+            )
+
+        upload = ResumableUpload(
+            id=uuid.uuid4().hex,
+            user_id=current_user.id,
+            filename=filename,
+            mime_type=mime_type,
+            file_type=file_type,
+            total_size=total_size,
+            received=0,
+            checksum=checksum.lower() if checksum else None,
+            expires_at=_expiry(),
+        )
+        part_path = _part_path(upload)
+        part_path.parent.mkdir(parents=True, exist_ok=True)
+        part_path.touch()
+
+        db.add(upload)
+        await db.commit()
+        return upload
+
+    @staticmethod
+    async def get(upload_id: str, current_user: User, db: AsyncSession, lock: bool = False) -> ResumableUpload:
+        """
+        Load one of the current user's uploads.
+
+        Raises:
+            HTTPException: 404 if it does not exist, has expired or belongs to someone else
+        """
+        query = select(ResumableUpload).where(
+            ResumableUpload.id == upload_id,
+            ResumableUpload.user_id == current_user.id,
+            ResumableUpload.expires_at > datetime.now(timezone.utc),
+        )
+        if lock:
+            query = query.with_for_update()
+        upload = (await db.execute(query)).scalars().first()
+        if upload is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload not found")
+        return upload
+
+    @staticmethod
+    async def write_chunk(
+        upload_id: str, offset: int, chunks: AsyncIterator[bytes], current_user: User, db: AsyncSession
+    ) -> ResumableUpload:
+        """
+        Append a chunk starting at offset.
+
+        The offset is checked without locking and the connection is released
+        before the body is read, so a slow client holds neither a row lock nor
+        a pooled connection.  File writes run on a worker thread.  Once the
+        body ends the offset is advanced only if it still equals ``offset``;
+        a chunk that lost a race to another one gets 409.
+
+        Raises:
+            HTTPException: 409 if offset is not the current offset or the upload
+                is already completed; 413 if the chunk runs past the declared size
+        """
+        upload = await ResumableUploadService.get(upload_id, current_user, db)
+        ResumableUploadService._check_offset(upload, offset)
+        part_path = _part_path(upload)
+        total_size = upload.total_size
+        # Release the connection; the body may take minutes to arrive
+        await db.commit()
+
+        hasher = _take_running_hash(upload_id, offset)
+        try:
+            part = await asyncio.to_thread(_open_part, part_path, offset)
+        except FileNotFoundError as e:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload not found") from e
+
+        written = 0
+        try:
+            async for chunk in chunks:
+                if offset + written + len(chunk) > total_size:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail="Chunk exceeds the declared upload size",
+                    )
+                await asyncio.to_thread(_write_part, part, chunk, hasher)
+                written += len(chunk)
+        except ClientDisconnect:
+            # Keep what arrived; the client resumes from the new offset
+            logger.info("resumable_upload: %s disconnected after %d bytes", upload_id, written)
+        finally:
+            await asyncio.to_thread(part.close)
+
+        result = await db.execute(
+            update(ResumableUpload)
+            .where(
+                ResumableUpload.id == upload_id,
+                ResumableUpload.received == offset,
+                ResumableUpload.media_id.is_(None),
+            )
+            .values(received=offset + written, expires_at=_expiry())
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 0:
+            # Another chunk moved the offset (or finalized) while this one streamed;
+            # its bytes may have overlapped ours, so the running digest is unusable
+            await db.commit()
+            _running_hashes.pop(upload_id, None)
+            db.expire(upload)
+            ResumableUploadService._check_offset(await ResumableUploadService.get(upload_id, current_user, db), offset)
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Offset changed during upload")
+
+        if hasher is not None:
+            _remember_running_hash(upload_id, offset + written, hasher)
+        try:
+            await db.commit()
+        except Exception:
+            _running_hashes.pop(upload_id, None)
+            raise
+        await db.refresh(upload)
+        return upload
+
+    @staticmethod
+    def _check_offset(upload: ResumableUpload, offset: int) -> None:
+        if upload.completed:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Upload already completed")
+        if offset != upload.received:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Offset mismatch: expected {upload.received}",
+                headers={"Upload-Offset": str(upload.received)},
+            )
+
+    @staticmethod
+    async def complete(upload_id: str, current_user: User, db: AsyncSession) -> Media:
+        """
+        Finalize an upload into a media record.
+
+        Raises:
+            HTTPException: 409 if bytes are missing; 422 if the checksum does not
+                match (the upload is discarded)
+        """
+        upload = await ResumableUploadService.get(upload_id, current_user, db, lock=True)
+        if upload.completed:
+            media = await db.get(Media, upload.media_id)
+            if media is None:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Media not found")
+            return media
+        if upload.received != upload.total_size:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Upload incomplete: received {upload.received} of {upload.total_size} bytes",
+                headers={"Upload-Offset": str(upload.received)},
+            )
+
+        part_path = _part_path(upload)
+        # Drop bytes past the committed offset left by a chunk whose commit failed
+        try:
+            await asyncio.to_thread(os.truncate, part_path, upload.total_size)
+        except FileNotFoundError as e:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload not found") from e
+        running = _running_hashes.pop(upload_id, None)
+        if running is not None and running[0] == upload.total_size:
+            content_hash = running[1].hexdigest()
+        else:
+            # Some chunks were written by another worker: hash the assembled file
+            content_hash = await asyncio.to_thread(hash_file, part_path)
+        if content_hash is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload not found")
+        if upload.checksum and upload.checksum != content_hash:
+            await db.delete(upload)
+            await db.commit()
+            part_path.unlink(missing_ok=True)
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Checksum mismatch; upload discarded"
+            )
+
+        media = await upload_service.create_media(
+            str(part_path),
+            upload.total_size,
+            content_hash,
+            upload.filename,
+            upload.file_type,
+            upload.mime_type,
+            current_user,
+            db,
+        )
+        upload.media_id = media.id
+        await db.commit()
+        await db.refresh(media)
+        return media
+
+    @staticmethod
+    async def abort(upload_id: str, current_user: User, db: AsyncSession) -> None:
+        """Discard an upload and its part file."""
+        upload = await ResumableUploadService.get(upload_id, current_user, db, lock=True)
+        part_path = _part_path(upload)
+        await db.delete(upload)
+        await db.commit()
+        _running_hashes.pop(upload_id, None)
+        part_path.unlink(missing_ok=True)
+
+    @staticmethod
+    async def purge_expired(db: AsyncSession) -> int:
+        """Delete expired uploads and their part files; returns how many were removed."""
+        result = await db.execute(
+            select(ResumableUpload).where(ResumableUpload.expires_at <= datetime.now(timezone.utc))
+        )
+        expired = list(result.scalars().all())
+        part_paths = [_part_path(upload) for upload in expired]
+        for upload in expired:
+            await db.delete(upload)
+        await db.commit()
+        for upload in expired:
+            _running_hashes.pop(upload.id, None)
+        for part_path in part_paths:
+            part_path.unlink(missing_ok=True)
+        return len(expired)
+
+
+async def _purge_expired_uploads() -> None:
+    """Scheduled job: discard idle resumable uploads."""
+    try:
+        async with AsyncSessionLocal() as db:
+            removed = await ResumableUploadService.purge_expired(db)
+    except Exception as exc:
+        logger.warning("resumable_upload: cleanup failed: %s", exc)
+        return
+    if removed:
+        logger.info("resumable_upload: purged %d expired uploads", removed)
+
+
+def install_resumable_upload_cleanup(scheduler, interval_minutes: int = 60) -> None:
+    """
+    Register the expired-upload cleanup job with the shared APScheduler instance.
+
+    Args:
+        scheduler: The application's AsyncIOScheduler (from app.scheduler).
+        interval_minutes: How often to purge (default hourly).
+    """
+    scheduler.add_job(
+        _purge_expired_uploads,
+        trigger=IntervalTrigger(minutes=interval_minutes),
+        id="resumable_upload_cleanup",
+        replace_existing=True,
+        max_instances=1,
+    )
+    logger.info("resumable_upload: cleanup installed (interval=%dmin)", interval_minutes)
+
+
+# Singleton instance
+resumable_upload_service = ResumableUploadService()
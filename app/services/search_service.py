@@ -18,8 +18,9 @@ from app.config import settings
 from app.models.category import Category
 from app.models.content import Content
 from app.models.content_tags import content_tags
-from app.models.search_query import SearchQuery
+from app.models.search_query import SearchQueryRollup
 from app.models.tag import Tag
+from app.utils.search_analytics import SearchEvent, search_analytics_buffer
 
 logger = logging.getLogger(__name__)
 
@@ -388,8 +389,7 @@ class SearchService:
             execution_time_ms = (time.time() - start_time) * 1000
             # Track analytics
             if settings.search_analytics_enabled:
-                await SearchService.track_search(
-                    db=db,
+                SearchService.track_search(
                     query=query,
                     results_count=0,
                     execution_time_ms=execution_time_ms,
@@ -485,8 +485,7 @@ class SearchService:
 
         # Track analytics
         if settings.search_analytics_enabled:
-            await SearchService.track_search(
-                db=db,
+            SearchService.track_search(
                 query=query,
                 results_count=total,
                 execution_time_ms=execution_time_ms,
@@ -633,8 +632,7 @@ class SearchService:
     # ========================================================================
 
     @staticmethod
-    async def track_search(
-        db: AsyncSession,
+    def track_search(
         query: str,
         results_count: int,
         execution_time_ms: float,
@@ -644,8 +642,11 @@ class SearchService:
         """
         Track a search query for analytics.
 
+        The event is queued in the in-process analytics buffer and persisted in
+        batches by the scheduled writer (app/utils/search_analytics.py), so the
+        search request itself never opens a write transaction.
+
         Args:
-            db: Database session
             query: The search query
             results_count: Number of results found
             execution_time_ms: Execution time in ms
@@ -653,19 +654,17 @@ class SearchService:
             filters_used: Filters applied to the search
         """
         try:
-            search_record = SearchQuery(
-                query=query,
-                normalized_query=query.strip().lower(),
-                results_count=results_count,
-                user_id=user_id,
-                filters_used=filters_used,
-                execution_time_ms=round(execution_time_ms, 2),
+            search_analytics_buffer.record(
+                SearchEvent(
+                    query=query,
+                    results_count=results_count,
+                    execution_time_ms=execution_time_ms,
+                    user_id=user_id,
+                    filters_used=filters_used,
+                )
             )
-            db.add(search_record)
-            await db.commit()
         except Exception:
             logger.warning("Failed to track search query", exc_info=True)
-            await db.rollback()
 
     @staticmethod
     async def get_search_analytics(
@@ -675,6 +674,11 @@ class SearchService:
         """
         Get search analytics for the specified period.
 
+        Reads only the per-day search_query_rollups table, so cost scales with
+        the number of distinct queries per day rather than raw search volume.
+        Events still buffered in-process (up to one flush interval) are not
+        included.
+
         Args:
             db: Database session
             days: Number of days to analyze
@@ -682,79 +686,64 @@ class SearchService:
         Returns:
             dict matching SearchAnalyticsResponse schema
         """
-        since = datetime.now(timezone.utc) - timedelta(days=days)
+        since = (datetime.now(timezone.utc) - timedelta(days=days)).date()
+        in_period = SearchQueryRollup.day >= since
 
-        # Total searches
-        total_result = await db.execute(select(func.count(SearchQuery.id)).where(SearchQuery.created_at >= since))
-        total_searches = total_result.scalar() or 0
-
-        # Unique queries
-        unique_result = await db.execute(
-            select(func.count(func.distinct(SearchQuery.normalized_query))).where(SearchQuery.created_at >= since)
-        )
-        unique_queries = unique_result.scalar() or 0
-
-        # Average results count
-        avg_results_result = await db.execute(
-            select(func.avg(SearchQuery.results_count)).where(SearchQuery.created_at >= since)
-        )
-        avg_results_count = float(avg_results_result.scalar() or 0)
-
-        # Average execution time
-        avg_time_result = await db.execute(
-            select(func.avg(SearchQuery.execution_time_ms)).where(SearchQuery.created_at >= since)
+        # Totals in a single pass
+        totals_result = await db.execute(
+            select(
+                func.coalesce(func.sum(SearchQueryRollup.search_count), 0),
+                func.count(func.distinct(SearchQueryRollup.normalized_query)),
+                func.coalesce(func.sum(SearchQueryRollup.total_results), 0),
+                func.coalesce(func.sum(SearchQueryRollup.total_execution_time_ms), 0.0),
+            ).where(in_period)
         )
-        avg_execution_time_ms = float(avg_time_result.scalar() or 0)
+        total_searches, unique_queries, total_results, total_time_ms = totals_result.one()
+        total_searches = int(total_searches)
+        avg_results_count = float(total_results) / total_searches if total_searches else 0.0
+        avg_execution_time_ms = float(total_time_ms) / total_searches if total_searches else 0.0
 
         # Top queries
+        query_count = func.sum(SearchQueryRollup.search_count)
         top_queries_result = await db.execute(
             select(
-                SearchQuery.normalized_query,
-                func.count(SearchQuery.id).label("count"),
-                func.avg(SearchQuery.results_count).label("avg_results"),
+                SearchQueryRollup.normalized_query,
+                query_count.label("count"),
+                func.sum(SearchQueryRollup.total_results).label("total_results"),
             )
-            .where(SearchQuery.created_at >= since)
-            .group_by(SearchQuery.normalized_query)
-            .order_by(func.count(SearchQuery.id).desc())
+            .where(in_period)
+            .group_by(SearchQueryRollup.normalized_query)
+            .order_by(query_count.desc())
             .limit(20)
         )
         top_queries = [
             {
                 "query": row[0],
-                "count": row[1],
-                "avg_results": round(float(row[2] or 0), 1),
+                "count": int(row[1]),
+                "avg_results": round(float(row[2] or 0) / row[1], 1) if row[1] else 0.0,
             }
             for row in top_queries_result.all()
         ]
 
         # Zero-result queries
+        zero_count = func.sum(SearchQueryRollup.zero_result_count)
         zero_result = await db.execute(
-            select(
-                SearchQuery.normalized_query,
-                func.count(SearchQuery.id).label("count"),
-            )
-            .where(
-                SearchQuery.created_at >= since,
-                SearchQuery.results_count == 0,
-            )
-            .group_by(SearchQuery.normalized_query)
-            .order_by(func.count(SearchQuery.id).desc())
+            select(SearchQueryRollup.normalized_query, zero_count.label("count"))
+            .where(in_period, SearchQueryRollup.zero_result_count > 0)
+            .group_by(SearchQueryRollup.normalized_query)
+            .order_by(zero_count.desc())
             .limit(10)
         )
-        zero_result_queries = [{"query": row[0], "count": row[1]} for row in zero_result.all()]
+        zero_result_queries = [{"query": row[0], "count": int(row[1])} for row in zero_result.all()]
 
         # Searches over time (per day)
         daily_result = await db.execute(
-            text(
-                "SELECT DATE(created_at) as day, COUNT(*) as count "
-                "FROM search_queries "
-                "WHERE created_at >= :since "
-                "GROUP BY DATE(created_at) "
-                "ORDER BY day"
-            ),
-            {"since": since},
+            select(SearchQueryRollup.day, func.sum(SearchQueryRollup.search_count))
+            .where(in_period)
+            .group_by(SearchQueryRollup.day)
+            .order_by(SearchQueryRollup.day)
         )
-        searches_over_time = [{"date": str(row[0]), "count": row[1]} for row in daily_result.all()]
+        searches_over_time = [{"date": str(row[0]), "count": int(row[1])} for row in daily_result.all()]
 
         return {
             "total_searches": total_searches,
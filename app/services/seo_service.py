@@ -2,21 +2,61 @@
 SEO Service
 
 Provides sitemap.xml and RSS feed generation for search engine optimization.
+
+Sitemaps are sharded (at most 50,000 URLs per file, per the sitemap protocol)
+and rendered directly to bytes from column-only queries, so memory use stays
+flat regardless of how much content is published.
+
+RSS/Atom feeds are cached as rendered bytes with an ETag and Last-Modified
+taken from their newest item, so conditional GETs from feed readers are
+answered without a database query.
 """
 
+import hashlib
 import logging
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
 from datetime import datetime, timezone
+from email.utils import format_datetime
 from xml.etree.ElementTree import Element, SubElement, tostring  # nosec B405
+from xml.sax.saxutils import escape  # nosec B406
 
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
 from app.config import settings
 from app.models.category import Category
 from app.models.content import Content, ContentStatus
+from app.utils.cache import CacheManager, cache_manager
 
 logger = logging.getLogger(__name__)
 
+# Sitemap protocol limit: at most 50,000 URLs per sitemap file
+SITEMAP_MAX_URLS = 50000
+SITEMAP_STREAM_BATCH = 1000
+SITEMAP_PAGES_PATH = "/sitemap-pages.xml"
+SITEMAP_CONTENT_PATH = "/sitemap-content-{shard}.xml"
+SITEMAP_STATIC_PAGES = [
+    ("/about", "0.8", "monthly"),
+    ("/contact", "0.6", "monthly"),
+]
+SITEMAP_URLSET_OPEN = (
+    b'<?xml version="1.0" encoding="UTF-8"?>\n'
+    b'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9" '
+    b'xmlns:news="http://www.google.com/schemas/sitemap-news/0.9">'
+)
+SITEMAP_URLSET_CLOSE = b"</urlset>"
+
+
+@dataclass
+class RenderedFeed:
+    """A feed rendered to bytes plus its conditional-GET validators."""
+
+    body: bytes
+    etag: str
+    last_modified: str  # HTTP-date of the newest item
+
 
 class SEOService:
     """Service for generating SEO-related content."""
@@ -27,91 +67,235 @@ class SEOService:
 
     async def generate_sitemap(self) -> str:
         """
-        Generate XML sitemap for all published content.
+        Generate a single XML sitemap for all published content.
+
+        Kept for small sites and tooling; the public /sitemap.xml route serves
+        the sharded index (generate_sitemap_index) instead.
 
         Returns:
             XML string in sitemap format
         """
-        # Create root element
-        urlset = Element("urlset")
-        urlset.set("xmlns", "http://www.sitemaps.org/schemas/sitemap/0.9")
-        urlset.set("xmlns:news", "http://www.google.com/schemas/sitemap-news/0.9")
-
-        # Add homepage
-        self._add_url(urlset, "/", priority="1.0", changefreq="daily")
-
-        # Add static pages
-        static_pages = [
-            ("/about", "0.8", "monthly"),
-            ("/contact", "0.6", "monthly"),
-        ]
-        for path, priority, freq in static_pages:
-            self._add_url(urlset, path, priority=priority, changefreq=freq)
+        chunks = [SITEMAP_URLSET_OPEN]
+        chunks.extend(await self._page_url_entries())
+        async for chunk in self._iter_content_url_entries():
+            chunks.append(chunk)
+        chunks.append(SITEMAP_URLSET_CLOSE)
+        return b"".join(chunks).decode()
+
+    async def get_sitemap_shards(self) -> list[dict]:
+        """
+        Split published content into sitemap shards of at most SITEMAP_MAX_URLS.
 
-        # Add published content
+        One aggregate query over (id, updated_at) — no ORM objects are loaded.
+        The result is cached until content changes (see
+        CacheManager.invalidate_content) or TTL_MEDIUM elapses.
+
+        Returns:
+            List of dicts: shard, first_id, count, lastmod (ISO date or None)
+            and version (newest updated_at, part of the shard cache key)
+        """
+        cache_key = f"{CacheManager.PREFIX_SITEMAP}shards"
+        cached = await cache_manager.get(cache_key)
+        if cached is not None:
+            return cached
+
+        numbered = (
+            select(
+                Content.id,
+                Content.updated_at,
+                ((func.row_number().over(order_by=Content.id) - 1) // SITEMAP_MAX_URLS).label("shard"),
+            )
+            .where(Content.status == ContentStatus.PUBLISHED)
+            .subquery()
+        )
         result = await self.db.execute(
-            select(Content).where(Content.status == ContentStatus.PUBLISHED).order_by(Content.updated_at.desc())
+            select(
+                numbered.c.shard,
+                func.min(numbered.c.id),
+                func.count(),
+                func.max(numbered.c.updated_at),
+            )
+            .group_by(numbered.c.shard)
+            .order_by(numbered.c.shard)
         )
-        contents = result.scalars().all()
+        shards = [
+            {
+                "shard": int(shard),
+                "first_id": first_id,
+                "count": count,
+                "lastmod": lastmod.strftime("%Y-%m-%d") if lastmod else None,
+                "version": lastmod.isoformat() if lastmod else "",
+            }
+            for shard, first_id, count, lastmod in result.all()
+        ]
 
-        for content in contents:
-            lastmod = content.updated_at.strftime("%Y-%m-%d") if content.updated_at else None
-            self._add_url(
-                urlset,
-                f"/content/{content.slug}",
-                lastmod=lastmod,
-                priority="0.7",
-                changefreq="weekly",
-            )
+        await cache_manager.set(cache_key, shards, CacheManager.TTL_MEDIUM)
+        return shards
 
-        # Add categories
-        result = await self.db.execute(select(Category))
-        categories = result.scalars().all()
+    async def get_content_sitemap(self, shard: int) -> bytes | None:
+        """
+        Return the XML for one content shard, regenerating it only on change.
 
-        for category in categories:
-            self._add_url(
-                urlset,
-                f"/category/{category.slug}",
-                priority="0.6",
-                changefreq="weekly",
-            )
+        The cache key embeds the shard's first id, URL count and newest
+        updated_at, so a shard is re-rendered only when one of its own
+        rows was published, edited or removed.
 
-        # Generate XML string
-        xml_declaration = '<?xml version="1.0" encoding="UTF-8"?>\n'
-        xml_content = tostring(urlset, encoding="unicode")
+        Args:
+            shard: Zero-based shard number
 
-        logger.info(f"Generated sitemap with {len(contents)} content items")
-        return xml_declaration + xml_content
+        Returns:
+            UTF-8 encoded XML bytes, or None if the shard does not exist
+        """
+        info = next((s for s in await self.get_sitemap_shards() if s["shard"] == shard), None)
+        if info is None:
+            return None
+
+        cache_key = (
+            f"{CacheManager.PREFIX_SITEMAP}{self.base_url}:content:{shard}:"
+            f"{info['first_id']}:{info['count']}:{info['version']}"
+        )
+        cached = await cache_manager.get(cache_key)
+        if cached is not None:
+            return cached.encode()
+
+        xml = await self.generate_content_sitemap(first_id=info["first_id"], limit=info["count"])
+        await cache_manager.set(cache_key, xml.decode(), CacheManager.TTL_SITEMAP)
+        return xml
+
+    async def get_pages_sitemap(self) -> bytes:
+        """Return the pages sitemap shard, cached for TTL_MEDIUM."""
+        cache_key = f"{CacheManager.PREFIX_SITEMAP}{self.base_url}:pages"
+        cached = await cache_manager.get(cache_key)
+        if cached is not None:
+            return cached.encode()
+
+        xml = await self.generate_pages_sitemap()
+        await cache_manager.set(cache_key, xml.decode(), CacheManager.TTL_MEDIUM)
+        return xml
+
+    async def generate_pages_sitemap(self) -> bytes:
+        """
+        Generate the sitemap shard for the homepage, static pages and categories.
 
-    async def generate_sitemap_index(self, sitemap_urls: list[str]) -> str:
+        Returns:
+            UTF-8 encoded XML bytes in sitemap format
+        """
+        return b"".join([SITEMAP_URLSET_OPEN, *await self._page_url_entries(), SITEMAP_URLSET_CLOSE])
+
+    async def generate_content_sitemap(self, first_id: int, limit: int = SITEMAP_MAX_URLS) -> bytes:
+        """
+        Generate one content sitemap shard.
+
+        Rows are streamed from a column-only (id, slug, updated_at) query
+        starting at first_id and rendered straight to bytes.
+
+        Args:
+            first_id: Lowest content id in the shard (from get_sitemap_shards)
+            limit: Maximum URLs in the shard
+
+        Returns:
+            UTF-8 encoded XML bytes in sitemap format
+        """
+        chunks = [SITEMAP_URLSET_OPEN]
+        count = 0
+        async for chunk in self._iter_content_url_entries(first_id=first_id, limit=limit):
+            chunks.append(chunk)
+            count += 1
+        chunks.append(SITEMAP_URLSET_CLOSE)
+
+        logger.info(f"Generated sitemap shard starting at content {first_id} with {count} URLs")
+        return b"".join(chunks)
+
+    async def generate_sitemap_index(self, sitemap_urls: list[str] | None = None) -> str:
         """
         Generate sitemap index for large sites with multiple sitemaps.
 
         Args:
-            sitemap_urls: List of individual sitemap URLs
+            sitemap_urls: List of individual sitemap URLs. When omitted, the
+                index lists the pages sitemap plus one entry per content shard
+                (see get_sitemap_shards), each with its real lastmod.
 
         Returns:
             XML string in sitemap index format
         """
-        sitemapindex = Element("sitemapindex")
-        sitemapindex.set("xmlns", "http://www.sitemaps.org/schemas/sitemap/0.9")
+        if sitemap_urls is not None:
+            today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+            entries = [(url, today) for url in sitemap_urls]
+        else:
+            entries = [(SITEMAP_PAGES_PATH, None)]
+            entries.extend(
+                (SITEMAP_CONTENT_PATH.format(shard=shard["shard"]), shard["lastmod"])
+                for shard in await self.get_sitemap_shards()
+            )
 
-        for url in sitemap_urls:
-            sitemap = SubElement(sitemapindex, "sitemap")
-            loc = SubElement(sitemap, "loc")
-            loc.text = f"{self.base_url}{url}"
-            lastmod = SubElement(sitemap, "lastmod")
-            lastmod.text = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        chunks = [
+            b'<?xml version="1.0" encoding="UTF-8"?>\n',
+            b'<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">',
+        ]
+        for url, lastmod in entries:
+            chunks.append(b"<sitemap><loc>" + escape(f"{self.base_url}{url}").encode() + b"</loc>")
+            if lastmod:
+                chunks.append(b"<lastmod>" + lastmod.encode() + b"</lastmod>")
+            chunks.append(b"</sitemap>")
+        chunks.append(b"</sitemapindex>")
 
-        xml_declaration = '<?xml version="1.0" encoding="UTF-8"?>\n'
-        xml_content = tostring(sitemapindex, encoding="unicode")
+        return b"".join(chunks).decode()
 
-        return xml_declaration + xml_content
+    async def get_feed(
+        self,
+        feed_format: str = "rss",
+        limit: int = 20,
+        category_id: int | None = None,
+        author_id: int | None = None,
+    ) -> RenderedFeed:
+        """
+        Return a feed rendered to bytes together with its HTTP validators.
+
+        Rendered feeds are cached per (format, category, author, limit) until
+        content is published or changed (CacheManager.invalidate_content), so
+        a cache hit — including a conditional GET answered with 304 — never
+        queries the database.
+
+        Args:
+            feed_format: "rss" or "atom"
+            limit: Maximum number of items in feed
+            category_id: Optional category filter
+            author_id: Optional author filter
+
+        Returns:
+            RenderedFeed with body, ETag and Last-Modified
+        """
+        cache_key = (
+            f"{CacheManager.PREFIX_FEED}{self.base_url}:{feed_format}:{category_id or '-'}:{author_id or '-'}:{limit}"
+        )
+        cached = await cache_manager.get(cache_key)
+        if cached is not None:
+            return RenderedFeed(cached["body"].encode(), cached["etag"], cached["last_modified"])
+
+        contents = await self._get_feed_items(limit, category_id, author_id)
+        self_path = _feed_self_path(feed_format, category_id, author_id)
+        if feed_format == "atom":
+            xml = self._render_atom_feed(contents, self_path)
+        else:
+            xml = self._render_rss_feed(contents, self_path)
+
+        feed = RenderedFeed(
+            body=xml.encode(),
+            etag=_feed_etag(feed_format, self_path, contents),
+            last_modified=format_datetime(_feed_updated(contents), usegmt=True),
+        )
+        await cache_manager.set(
+            cache_key,
+            {"body": xml, "etag": feed.etag, "last_modified": feed.last_modified},
+            CacheManager.TTL_LONG,
+        )
+        return feed
 
     async def generate_rss_feed(
         self,
         limit: int = 20,
         category_id: int | None = None,
+        author_id: int | None = None,
     ) -> str:
         """
         Generate RSS 2.0 feed for published content.
@@ -119,10 +303,54 @@ class SEOService:
         Args:
             limit: Maximum number of items in feed
             category_id: Optional category filter
+            author_id: Optional author filter
 
         Returns:
             XML string in RSS 2.0 format
         """
+        contents = await self._get_feed_items(limit, category_id, author_id)
+        return self._render_rss_feed(contents, _feed_self_path("rss", category_id, author_id))
+
+    async def generate_atom_feed(
+        self,
+        limit: int = 20,
+        category_id: int | None = None,
+        author_id: int | None = None,
+    ) -> str:
+        """
+        Generate Atom feed for published content.
+
+        Args:
+            limit: Maximum number of items in feed
+            category_id: Optional category filter
+            author_id: Optional author filter
+
+        Returns:
+            XML string in Atom format
+        """
+        contents = await self._get_feed_items(limit, category_id, author_id)
+        return self._render_atom_feed(contents, _feed_self_path("atom", category_id, author_id))
+
+    async def _get_feed_items(
+        self,
+        limit: int,
+        category_id: int | None = None,
+        author_id: int | None = None,
+    ) -> list[Content]:
+        """Newest published content for a feed, with author and category loaded."""
+        query = select(Content).where(Content.status == ContentStatus.PUBLISHED).options(selectinload(Content.category))
+
+        if category_id:
+            query = query.where(Content.category_id == category_id)
+        if author_id:
+            query = query.where(Content.author_id == author_id)
+
+        query = query.order_by(Content.publish_date.desc()).limit(limit)
+
+        result = await self.db.execute(query)
+        return list(result.scalars().all())
+
+    def _render_rss_feed(self, contents: list[Content], self_path: str) -> str:
         # Create RSS structure
         rss = Element("rss")
         rss.set("version", "2.0")
@@ -144,27 +372,16 @@ class SEOService:
         language = SubElement(channel, "language")
         language.text = "en-us"
 
-        # Last build date
+        # Last build date follows the newest item so identical content renders identically
         last_build_date = SubElement(channel, "lastBuildDate")
-        last_build_date.text = datetime.now(timezone.utc).strftime("%a, %d %b %Y %H:%M:%S +0000")
+        last_build_date.text = _feed_updated(contents).strftime("%a, %d %b %Y %H:%M:%S +0000")
 
         # Atom self link
         atom_link = SubElement(channel, "{http://www.w3.org/2005/Atom}link")
-        atom_link.set("href", f"{self.base_url}/feed.xml")
+        atom_link.set("href", f"{self.base_url}{self_path}")
         atom_link.set("rel", "self")
         atom_link.set("type", "application/rss+xml")
 
-        # Build query
-        query = select(Content).where(Content.status == ContentStatus.PUBLISHED)
-
-        if category_id:
-            query = query.where(Content.category_id == category_id)
-
-        query = query.order_by(Content.publish_date.desc()).limit(limit)
-
-        result = await self.db.execute(query)
-        contents = result.scalars().all()
-
         # Add items
         for content in contents:
             item = SubElement(channel, "item")
@@ -207,21 +424,7 @@ class SEOService:
         logger.info(f"Generated RSS feed with {len(contents)} items")
         return xml_declaration + xml_content
 
-    async def generate_atom_feed(
-        self,
-        limit: int = 20,
-        category_id: int | None = None,
-    ) -> str:
-        """
-        Generate Atom feed for published content.
-
-        Args:
-            limit: Maximum number of items in feed
-            category_id: Optional category filter
-
-        Returns:
-            XML string in Atom format
-        """
+    def _render_atom_feed(self, contents: list[Content], self_path: str) -> str:
         # Create Atom structure
         feed = Element("feed")
         feed.set("xmlns", "http://www.w3.org/2005/Atom")
@@ -234,7 +437,7 @@ class SEOService:
         subtitle.text = getattr(settings, "app_description", "Content Management System")
 
         link_self = SubElement(feed, "link")
-        link_self.set("href", f"{self.base_url}/atom.xml")
+        link_self.set("href", f"{self.base_url}{self_path}")
         link_self.set("rel", "self")
         link_self.set("type", "application/atom+xml")
 
@@ -247,18 +450,7 @@ class SEOService:
         feed_id.text = self.base_url
 
         updated = SubElement(feed, "updated")
-        updated.text = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
-
-        # Build query
-        query = select(Content).where(Content.status == ContentStatus.PUBLISHED)
-
-        if category_id:
-            query = query.where(Content.category_id == category_id)
-
-        query = query.order_by(Content.publish_date.desc()).limit(limit)
-
-        result = await self.db.execute(query)
-        contents = result.scalars().all()
+        updated.text = _feed_updated(contents).strftime("%Y-%m-%dT%H:%M:%SZ")
 
         # Add entries
         for content in contents:
@@ -393,32 +585,89 @@ class SEOService:
             tags["fb:app_id"] = settings.facebook_app_id
         return tags
 
-    def _add_url(
+    def _url_entry(
         self,
-        parent: Element,
         path: str,
         lastmod: str | None = None,
         changefreq: str = "weekly",
         priority: str = "0.5",
-    ) -> None:
-        """Add a URL entry to the sitemap."""
-        url = SubElement(parent, "url")
-
-        loc = SubElement(url, "loc")
-        loc.text = f"{self.base_url}{path}"
-
+    ) -> bytes:
+        """Render a single sitemap <url> entry."""
+        parts = [f"<url><loc>{escape(self.base_url + path)}</loc>"]
         if lastmod:
-            lastmod_elem = SubElement(url, "lastmod")
-            lastmod_elem.text = lastmod
-
-        changefreq_elem = SubElement(url, "changefreq")
-        changefreq_elem.text = changefreq
-
-        priority_elem = SubElement(url, "priority")
-        priority_elem.text = priority
+            parts.append(f"<lastmod>{lastmod}</lastmod>")
+        parts.append(f"<changefreq>{changefreq}</changefreq><priority>{priority}</priority></url>")
+        return "".join(parts).encode()
+
+    async def _page_url_entries(self) -> list[bytes]:
+        """Homepage, static pages and category URLs."""
+        entries = [self._url_entry("/", priority="1.0", changefreq="daily")]
+        for path, priority, freq in SITEMAP_STATIC_PAGES:
+            entries.append(self._url_entry(path, priority=priority, changefreq=freq))
+
+        result = await self.db.execute(select(Category.slug).order_by(Category.id))
+        for (slug,) in result.all():
+            entries.append(self._url_entry(f"/category/{slug}", priority="0.6", changefreq="weekly"))
+        return entries
+
+    async def _iter_content_url_entries(
+        self,
+        first_id: int | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[bytes]:
+        """Stream published content URLs in id order without loading ORM objects."""
+        stmt = (
+            select(Content.slug, Content.updated_at)
+            .where(Content.status == ContentStatus.PUBLISHED)
+            .order_by(Content.id)
+            .execution_options(yield_per=SITEMAP_STREAM_BATCH)
+        )
+        if first_id is not None:
+            stmt = stmt.where(Content.id >= first_id)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+
+        result = await self.db.stream(stmt)
+        async for slug, updated_at in result:
+            yield self._url_entry(
+                f"/content/{slug}",
+                lastmod=updated_at.strftime("%Y-%m-%d") if updated_at else None,
+                priority="0.7",
+                changefreq="weekly",
+            )
 
 
 # Dependency for FastAPI
 async def get_seo_service(db: AsyncSession, base_url: str | None = None) -> SEOService:
     """FastAPI dependency for SEOService."""
     return SEOService(db, base_url)
+
+
+def _feed_self_path(feed_format: str, category_id: int | None, author_id: int | None) -> str:
+    """Public path of a feed, used for its rel="self" link."""
+    if feed_format == "atom":
+        if category_id:
+            return f"/atom.xml?category={category_id}"
+        return f"/atom.xml?author={author_id}" if author_id else "/atom.xml"
+    if category_id:
+        return f"/feed/category/{category_id}"
+    return f"/feed/author/{author_id}" if author_id else "/feed.xml"
+
+
+def _feed_updated(contents: list[Content]) -> datetime:
+    """Newest modification time among feed items (UTC); epoch for an empty feed."""
+    newest = max(
+        (c.updated_at or c.publish_date or c.created_at for c in contents),
+        default=None,
+    )
+    if newest is None:
+        return datetime(1970, 1, 1, tzinfo=timezone.utc)
+    return newest.replace(tzinfo=timezone.utc) if newest.tzinfo is None else newest.astimezone(timezone.utc)
+
+
+def _feed_etag(feed_format: str, self_path: str, contents: list[Content]) -> str:
+    """Strong ETag derived from the feed identity and its items' (id, updated_at)."""
+    digest = hashlib.md5(f"{feed_format}:{self_path}".encode())  # nosec S324
+    for c in contents:
+        digest.update(f"|{c.id}:{(c.updated_at or c.created_at).isoformat()}".encode())
+    return f'"{digest.hexdigest()}"'
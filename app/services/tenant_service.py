@@ -3,6 +3,9 @@ Tenant Service — Phase 6.1 Multi-Tenancy
 
 Async CRUD operations for Tenant entities.
 All functions accept an injected AsyncSession.
+
+Every write invalidates the tenant registry that TenantMiddleware
+resolves requests from, in all workers.
 """
 
 import logging
@@ -11,6 +14,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.tenant import Tenant, TenantStatus
+from app.utils.tenant_registry import invalidate_tenants
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +39,8 @@ async def create_tenant(
     db.add(tenant)
     await db.commit()
     await db.refresh(tenant)
+    # The slug or domain may be cached as unknown
+    await invalidate_tenants()
     logger.info("Tenant created: id=%d slug=%s", tenant.id, tenant.slug)
     return tenant
 
@@ -87,6 +93,7 @@ async def update_tenant(
             setattr(tenant, field, value)
     await db.commit()
     await db.refresh(tenant)
+    await invalidate_tenants()
     return tenant
 
 
@@ -102,6 +109,7 @@ async def suspend_tenant(tenant_id: int, db: AsyncSession) -> Tenant | None:
     tenant.status = TenantStatus.suspended.value
     await db.commit()
     await db.refresh(tenant)
+    await invalidate_tenants()
     logger.info("Tenant suspended: id=%d slug=%s", tenant.id, tenant.slug)
     return tenant
 
@@ -117,5 +125,6 @@ async def delete_tenant(tenant_id: int, db: AsyncSession) -> bool:
         return False
     tenant.status = TenantStatus.deleted.value
     await db.commit()
+    await invalidate_tenants()
     logger.info("Tenant soft-deleted: id=%d slug=%s", tenant.id, tenant.slug)
     return True
@@ -11,23 +11,124 @@ Functions:
     publish_translation       — set status=published + reviewer
     delete_translation        — hard-delete by (content_id, locale)
     get_content_in_locale     — fetch with locale-fallback logic
+    resolve_translations      — batched, cached fallback resolution for listings
     list_languages_for_content — list locale codes with translations
+
+Locale fallback (exact → base language → fallback locale) is resolved in SQL:
+one ``DISTINCT ON (content_id)`` query ordered by each row's position in the
+locale chain picks the best published translation for any number of items.
+resolve_translations() keeps the listing fields of each result per worker,
+keyed by (content, locale chain); publishing, updating or deleting a
+translation drops that content item's entries in every worker via the
+cache bus.
 """
 
 from __future__ import annotations
 
 import logging
+from collections import OrderedDict
+from collections.abc import Iterable  # noqa: TC003
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, NamedTuple
 
-from sqlalchemy import select
+from sqlalchemy import Select, case, select
 from sqlalchemy.ext.asyncio import AsyncSession  # noqa: TC002
 
-from app.i18n.locale import is_rtl_locale
+from app.config import settings
+from app.i18n.locale import is_rtl_locale, locale_chain
 from app.models.content_translation import ContentTranslation, TranslationStatus
+from app.utils.cache_bus import cache_bus
+from app.utils.single_flight import SingleFlightCache
 
 logger = logging.getLogger(__name__)
 
+TRANSLATIONS_TOPIC = "translations"
+
+
+class ResolvedTranslation(NamedTuple):
+    """Listing fields of the translation chosen for one content item (no body)"""
+
+    content_id: int
+    translation_id: int
+    locale: str
+    title: str
+    slug: str
+    description: str | None
+    meta_title: str | None
+    meta_description: str | None
+    is_rtl: bool
+
+
+class _ResolvedTranslationCache:
+    """Per-worker LRU of content_id -> {locale chain: ResolvedTranslation or None}"""
+
+    def __init__(self, max_items: int):
+        self.max_items = max_items
+        self._entries: OrderedDict[int, dict[tuple[str, ...], ResolvedTranslation | None]] = OrderedDict()
+        self.loads = SingleFlightCache()
+
+    def get(self, content_id: int, chain: tuple[str, ...]) -> tuple[bool, ResolvedTranslation | None]:
+        """Return (found, value); a cached None means "no translation in this chain"."""
+        by_chain = self._entries.get(content_id)
+        if by_chain is None or chain not in by_chain:
+            return False, None
+        self._entries.move_to_end(content_id)
+        return True, by_chain[chain]
+
+    def put(self, content_id: int, chain: tuple[str, ...], value: ResolvedTranslation | None) -> None:
+        self._entries.setdefault(content_id, {})[chain] = value
+        self._entries.move_to_end(content_id)
+        while len(self._entries) > self.max_items:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: str | None = None) -> None:
+        """Drop one content item's entries, or everything (cache-bus handler)."""
+        self.loads.invalidate()
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(int(key), None)
+
+
+_resolved_cache = _ResolvedTranslationCache(settings.translation_cache_max_items)
+cache_bus.subscribe(TRANSLATIONS_TOPIC, _resolved_cache.invalidate)
+
+
+async def _invalidate_resolved(content_id: int) -> None:
+    await cache_bus.publish(TRANSLATIONS_TOPIC, str(content_id))
+
+
+# Columns behind ResolvedTranslation, in field order; the body is never read for listings
+_RESOLVED_COLUMNS = (
+    ContentTranslation.content_id,
+    ContentTranslation.id,
+    ContentTranslation.locale,
+    ContentTranslation.title,
+    ContentTranslation.slug,
+    ContentTranslation.description,
+    ContentTranslation.meta_title,
+    ContentTranslation.meta_description,
+    ContentTranslation.is_rtl,
+)
+
+
+def _best_translations(content_ids: Iterable[int], chain: list[str], *columns) -> Select:
+    """Select the most preferred published translation per content item in one query.
+
+    Selects the whole row unless specific columns are given.
+    """
+    preference = case({code: rank for rank, code in enumerate(chain)}, value=ContentTranslation.locale)
+    return (
+        select(*(columns or (ContentTranslation,)))
+        .where(
+            ContentTranslation.content_id.in_(list(content_ids)),
+            ContentTranslation.locale.in_(chain),
+            ContentTranslation.status == TranslationStatus.published.value,
+        )
+        .distinct(ContentTranslation.content_id)
+        .order_by(ContentTranslation.content_id, preference)
+    )
+
 
 async def create_translation(
     content_id: int,
@@ -133,6 +234,7 @@ async def update_translation(
     translation.updated_at = datetime.now(timezone.utc)
     await db.commit()
     await db.refresh(translation)
+    await _invalidate_resolved(content_id)
     logger.info("Translation updated: content_id=%d locale=%s", content_id, locale)
     return translation
 
@@ -156,6 +258,7 @@ async def publish_translation(
     translation.updated_at = datetime.now(timezone.utc)
     await db.commit()
     await db.refresh(translation)
+    await _invalidate_resolved(content_id)
     logger.info("Translation published: content_id=%d locale=%s", content_id, locale)
     return translation
 
@@ -175,6 +278,7 @@ async def delete_translation(
 
     await db.delete(translation)
     await db.commit()
+    await _invalidate_resolved(content_id)
     logger.info("Translation deleted: content_id=%d locale=%s", content_id, locale)
     return True
 
@@ -195,29 +299,54 @@ async def get_content_in_locale(
 
     Only ``published`` translations are returned.
     """
-    result = await db.execute(
-        select(ContentTranslation).where(
-            ContentTranslation.content_id == content_id,
-            ContentTranslation.status == TranslationStatus.published.value,
-        )
-    )
-    translations = {t.locale: t for t in result.scalars().all()}
+    result = await db.execute(_best_translations([content_id], locale_chain(locale, fallback_locale)))
+    return result.scalars().first()
 
-    # 1. Exact match
-    if locale in translations:
-        return translations[locale]
 
-    # 2. Base language match
-    base = locale.split("-")[0]
-    if base in translations:
-        return translations[base]
+async def resolve_translations(
+    content_ids: Iterable[int],
+    locale: str,
+    fallback_locale: str,
+    db: AsyncSession,
+) -> dict[int, ResolvedTranslation]:
+    """Resolve the best published translation for many content items at once.
 
-    # 3. Fallback locale
-    if fallback_locale in translations:
-        return translations[fallback_locale]
+    Same fallback order as get_content_in_locale(), for a whole listing:
+    results are served from the per-worker cache and all misses are resolved
+    in a single query.  Items without a translation in the chain are left
+    out of the result (render them in the default language).
 
-    # 4. No match
-    return None
+    Returns:
+        Mapping of content_id to the listing fields of its translation.
+    """
+    chain = locale_chain(locale, fallback_locale)
+    key = tuple(chain)
+    resolved: dict[int, ResolvedTranslation] = {}
+    misses = []
+    for content_id in dict.fromkeys(content_ids):
+        found, value = _resolved_cache.get(content_id, key)
+        if not found:
+            misses.append(content_id)
+        elif value is not None:
+            resolved[content_id] = value
+
+    if misses:
+
+        async def query() -> dict[int, ResolvedTranslation]:
+            result = await db.execute(_best_translations(misses, chain, *_RESOLVED_COLUMNS))
+            return {row.content_id: ResolvedTranslation(*row) for row in result}
+
+        def store(fetched: dict[int, ResolvedTranslation]) -> None:
+            for content_id in misses:
+                _resolved_cache.put(content_id, key, fetched.get(content_id))
+
+        # Concurrent requests for the same page share one query
+        fetched = await _resolved_cache.loads.load((key, tuple(misses)), query, store)
+        for content_id in misses:
+            if content_id in fetched:
+                resolved[content_id] = fetched[content_id]
+
+    return resolved
 
 
 async def list_languages_for_content(
@@ -4,19 +4,26 @@ Upload Service
 Handles file uploads, validation, image processing, optimization, and storage.
 """
 
+import asyncio
+import hashlib
 import logging
+import secrets
 import uuid
+import weakref
 from datetime import datetime, timezone
 from pathlib import Path
 
 from fastapi import HTTPException, UploadFile, status
 from PIL import Image
 from sqlalchemy import func, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
 from app.models.media import Media
+from app.models.media_blob import MediaBlob
 from app.models.user import User
+from app.utils.cache import cache_manager
 
 logger = logging.getLogger(__name__)
 
@@ -53,6 +60,33 @@ ALLOWED_DOCUMENT_TYPES = {
 
 ALLOWED_MIME_TYPES = {**ALLOWED_IMAGE_TYPES, **ALLOWED_DOCUMENT_TYPES}
 
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Image post-processing is CPU-bound and runs on threads; this caps how many run at once (per event loop)
+_processing_semaphores: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _processing_slots() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    semaphore = _processing_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _processing_semaphores[loop] = asyncio.Semaphore(settings.media_processing_workers)
+    return semaphore
+
+
+def hash_file(path: str | Path) -> str | None:
+    """Hex SHA-256 of a file's contents, or None if it does not exist."""
+    digest = hashlib.sha256()
+    try:
+        with Path(path).open("rb") as f:
+            while chunk := f.read(HASH_CHUNK_SIZE):
+                digest.update(chunk)
+    except FileNotFoundError:
+        return None
+    return digest.hexdigest()
+
 
 class UploadService:
     """Service for handling file uploads and media management"""
@@ -83,8 +117,24 @@ class UploadService:
         if not file.filename:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No file provided")
 
+        return UploadService.classify_file(file.filename, file.content_type)
+
+    @staticmethod
+    def classify_file(filename: str, mime_type: str | None) -> tuple[str, str]:
+        """
+        Check a declared filename and MIME type against the allowed types.
+
+        Args:
+            filename: Original filename
+            mime_type: Declared MIME type
+
+        Returns:
+            Tuple of (file_type, validated_mime_type)
+
+        Raises:
+            HTTPException: If the type is not allowed or the extension does not match
+        """
         # Check MIME type
-        mime_type = file.content_type
         if not mime_type or mime_type not in ALLOWED_MIME_TYPES:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -92,7 +142,7 @@ class UploadService:
             )
 
         # Validate file extension
-        file_ext = Path(file.filename).suffix.lower()
+        file_ext = Path(filename).suffix.lower()
         allowed_extensions = ALLOWED_MIME_TYPES[mime_type]
         if file_ext not in allowed_extensions:
             raise HTTPException(
@@ -126,13 +176,14 @@ class UploadService:
         return f"{unique_id}{file_ext}"
 
     @staticmethod
-    async def save_file(file: UploadFile, filename: str) -> tuple[str, int]:
+    async def save_file(file: UploadFile, filename: str, hasher=None) -> tuple[str, int]:
         """
         Save uploaded file to disk.
 
         Args:
             file: Uploaded file
             filename: Filename to save as
+            hasher: Optional hashlib object updated with every chunk as it is written
 
         Returns:
             Tuple of (file_path, file_size)
@@ -159,6 +210,8 @@ class UploadService:
                         )
 
                     buffer.write(chunk)
+                    if hasher is not None:
+                        hasher.update(chunk)
 
             return str(file_path), file_size
 
@@ -286,13 +339,189 @@ class UploadService:
         # Validate file
         file_type, mime_type = self.validate_file(file)
 
-        # Generate unique filename
-        unique_filename = self.generate_unique_filename(file.filename)
+        # Save under a temporary name, hashing the stream as it is written
+        temp_path, file_size = await self.save_file(
+            file, self.generate_unique_filename(file.filename), hasher := hashlib.sha256()
+        )
+
+        media = await self.create_media(
+            temp_path, file_size, hasher.hexdigest(), file.filename, file_type, mime_type, current_user, db
+        )
+        await db.commit()
+        await db.refresh(media)
+
+        return media
+
+    async def bulk_upload(
+        self, files: list[UploadFile], current_user: User, db: AsyncSession
+    ) -> tuple[list[Media], list[dict]]:
+        """
+        Handle several uploads in one transaction.
+
+        Files are saved and hashed one after another, then every distinct new
+        content is optimized and resized concurrently on the processing pool
+        (at most MEDIA_PROCESSING_WORKERS at a time).  Duplicates within the
+        batch or of stored content are not processed again.
+
+        Returns:
+            Tuple of (created media, failed items as {"filename", "error"})
+        """
+        saved: list[tuple[UploadFile, str, int, str, str, str]] = []
+        failed_items: list[dict] = []
+
+        for file in files:
+            try:
+                file_type, mime_type = self.validate_file(file)
+                temp_path, file_size = await self.save_file(
+                    file, self.generate_unique_filename(file.filename), hasher := hashlib.sha256()
+                )
+            except HTTPException as e:
+                failed_items.append({"filename": file.filename or "unknown", "error": e.detail})
+                continue
+            saved.append((file, temp_path, file_size, hasher.hexdigest(), file_type, mime_type))
+
+        hashes = {content_hash for _, _, _, content_hash, _, _ in saved}
+        known = set(
+            (await db.execute(select(MediaBlob.content_hash).where(MediaBlob.content_hash.in_(hashes)))).scalars()
+        )
+
+        # First occurrence of each new content gets processed
+        pending: dict[str, tuple[UploadFile, str, int, str, str, str]] = {}
+        for item in saved:
+            if item[3] not in known:
+                pending.setdefault(item[3], item)
+        processed = await asyncio.gather(
+            *(
+                self.process_blob(temp_path, content_hash, file.filename, file_type, mime_type)
+                for file, temp_path, _, content_hash, file_type, mime_type in pending.values()
+            )
+        )
+        stored_by_hash = dict(zip(pending, processed, strict=True))
+
+        media_items = []
+        for file, temp_path, file_size, content_hash, file_type, mime_type in saved:
+            media_items.append(
+                await self.create_media(
+                    temp_path,
+                    file_size,
+                    content_hash,
+                    file.filename,
+                    file_type,
+                    mime_type,
+                    current_user,
+                    db,
+                    stored=stored_by_hash.pop(content_hash, None),
+                )
+            )
+        await db.commit()
+        for media in media_items:
+            await db.refresh(media)
+
+        return media_items, failed_items
+
+    async def create_media(
+        self,
+        temp_path: str,
+        file_size: int,
+        content_hash: str,
+        original_filename: str,
+        file_type: str,
+        mime_type: str,
+        current_user: User,
+        db: AsyncSession,
+        stored: dict | None = None,
+    ) -> Media:
+        """
+        Add a media record for a saved upload, sharing stored content when possible.
+
+        Identical content is stored, optimized and resized only once: if a blob
+        exists the temporary file (or the already processed files, see stored)
+        is discarded and a reference is taken, otherwise the file is processed
+        and becomes a new blob.  The caller commits.
+
+        Args:
+            temp_path: Temporary path of the saved upload
+            file_size: Size of the upload in bytes
+            content_hash: Hex SHA-256 of the upload
+            original_filename: Filename as uploaded
+            file_type: File type category from classify_file()
+            mime_type: Validated MIME type
+            current_user: Uploading user
+            db: Database session
+            stored: Result of process_blob() when the file has already been processed
+
+        Returns:
+            The new (flushed, uncommitted) Media object
+        """
+        blob = await self.acquire_blob(content_hash, db)
+        if blob is None:
+            if stored is None:
+                stored = await self.process_blob(temp_path, content_hash, original_filename, file_type, mime_type)
+            blob = await self.insert_blob(content_hash, file_size, stored, db)
+        elif stored is None:
+            Path(temp_path).unlink(missing_ok=True)
+        if stored is not None and blob.file_path != stored["file_path"]:
+            # Another upload stored this content first; our copy is unreferenced
+            self._delete_media_files(self._stored_file_paths(stored))
+
+        media = Media(
+            filename=Path(blob.file_path).name,
+            original_filename=original_filename,
+            file_path=blob.file_path,
+            file_size=file_size,
+            mime_type=mime_type,
+            file_type=file_type,
+            width=blob.width,
+            height=blob.height,
+            thumbnail_path=blob.thumbnail_path,
+            sizes=dict(blob.sizes or {}),
+            content_hash=content_hash,
+            tags=[],
+            uploaded_by=current_user.id,
+        )
+        db.add(media)
+        await db.flush()
+        return media
+
+    async def process_blob(
+        self, temp_path: str, content_hash: str, original_filename: str, file_type: str, mime_type: str
+    ) -> dict:
+        """Run store_blob() on a worker thread, bounded by the shared processing pool."""
+        async with _processing_slots():
+            return await asyncio.to_thread(
+                self.store_blob, temp_path, content_hash, original_filename, file_type, mime_type
+            )
+
+    @staticmethod
+    async def acquire_blob(content_hash: str, db: AsyncSession) -> MediaBlob | None:
+        """
+        Take a reference on the stored blob for content_hash.
 
-        # Save file
-        file_path, file_size = await self.save_file(file, unique_filename)
+        Returns:
+            The row-locked blob with its ref_count incremented, or None if the
+            content has not been stored yet
+        """
+        result = await db.execute(select(MediaBlob).where(MediaBlob.content_hash == content_hash).with_for_update())
+        blob = result.scalars().first()
+        if blob is not None:
+            blob.ref_count += 1
+        return blob
+
+    def store_blob(
+        self, temp_path: str, content_hash: str, original_filename: str, file_type: str, mime_type: str
+    ) -> dict:
+        """
+        Process a newly uploaded file and move it to its content-addressed name.
 
-        # Process image (optimize, create thumbnail, create variants)
+        Images are optimized and get a thumbnail and size variants.  Every file
+        is named after the content hash plus a token unique to this copy, so a
+        later upload of the same content never writes to the paths of a blob
+        that is being deleted, and a concurrent upload never overwrites ours.
+
+        Returns:
+            Dict of MediaBlob column values (file_path, thumbnail_path, width, height, sizes)
+        """
+        filename = f"{content_hash}-{secrets.token_hex(4)}{Path(original_filename).suffix.lower()}"
         thumbnail_path = None
         width = None
         height = None
@@ -300,36 +529,38 @@ class UploadService:
 
         if file_type == "image":
             # Optimize image (strip EXIF, compress)
-            self.optimize_image(file_path, mime_type)
+            self.optimize_image(temp_path, mime_type)
 
             # Create thumbnail
-            thumbnail_filename = f"thumb_{unique_filename}"
-            thumbnail_path, width, height = self.create_thumbnail(file_path, thumbnail_filename)
+            thumbnail_path, width, height = self.create_thumbnail(temp_path, f"thumb_{filename}")
 
             # Create size variants
-            sizes = self.create_image_variants(file_path, unique_filename)
+            sizes = self.create_image_variants(temp_path, filename)
 
-        # Create media record
-        media = Media(
-            filename=unique_filename,
-            original_filename=file.filename,
-            file_path=file_path,
-            file_size=file_size,
-            mime_type=mime_type,
-            file_type=file_type,
-            width=width,
-            height=height,
-            thumbnail_path=thumbnail_path,
-            sizes=sizes,
-            tags=[],
-            uploaded_by=current_user.id,
-        )
+        file_path = Path(temp_path).replace(UPLOAD_DIR / filename)
+        return {
+            "file_path": str(file_path),
+            "thumbnail_path": thumbnail_path,
+            "width": width,
+            "height": height,
+            "sizes": sizes,
+        }
 
-        db.add(media)
-        await db.commit()
-        await db.refresh(media)
+    @staticmethod
+    async def insert_blob(content_hash: str, file_size: int, stored: dict, db: AsyncSession) -> MediaBlob:
+        """
+        Insert a blob row, or take a reference if a concurrent upload inserted it first.
 
-        return media
+        In the latter case the returned blob's paths differ from *stored*, whose
+        files the caller must delete.
+        """
+        stmt = (
+            pg_insert(MediaBlob)
+            .values(content_hash=content_hash, file_size=file_size, ref_count=1, **stored)
+            .on_conflict_do_update(index_elements=[MediaBlob.content_hash], set_={"ref_count": MediaBlob.ref_count + 1})
+            .returning(MediaBlob)
+        )
+        return (await db.scalars(stmt)).one()
 
     @staticmethod
     async def get_media_by_id(media_id: int, db: AsyncSession) -> Media:
@@ -426,6 +657,7 @@ class UploadService:
         media.updated_at = datetime.now(timezone.utc)
         await db.commit()
         await db.refresh(media)
+        await cache_manager.invalidate_media(media_id)
 
         return media
 
@@ -546,6 +778,8 @@ class UploadService:
 
         success_count = 0
         failed_items = []
+        deleted_ids = []
+        unused_paths: list[str] = []
 
         for media_id in media_ids:
             try:
@@ -559,16 +793,17 @@ class UploadService:
                     failed_items.append({"id": media_id, "error": "Not authorized"})
                     continue
 
-                # Delete physical files
-                UploadService._delete_media_files(media)
-
                 await db.delete(media)
+                await db.flush()
+                unused_paths.extend(await UploadService._release_media_files(media, db))
+                deleted_ids.append(media_id)
                 success_count += 1
 
             except HTTPException:
                 failed_items.append({"id": media_id, "error": "Media not found"})
 
         await db.commit()
+        await UploadService.discard_media(deleted_ids, unused_paths)
 
         return {
             "success_count": success_count,
@@ -632,26 +867,59 @@ class UploadService:
         }
 
     @staticmethod
-    def _delete_media_files(media: Media) -> None:
-        """Delete all physical files associated with a media record."""
-        try:
-            file_path = Path(media.file_path)
-            if file_path.exists():
-                file_path.unlink()
+    def _media_file_paths(media: Media | MediaBlob) -> list[str]:
+        """Paths of the original, thumbnail and size variants of a media record or blob."""
+        paths = [media.file_path]
+        if media.thumbnail_path:
+            paths.append(media.thumbnail_path)
+        paths.extend((media.sizes or {}).values())
+        return paths
 
-            if media.thumbnail_path:
-                thumbnail_path = Path(media.thumbnail_path)
-                if thumbnail_path.exists():
-                    thumbnail_path.unlink()
-
-            # Delete size variants
-            if media.sizes:
-                for variant_path in media.sizes.values():
-                    p = Path(variant_path)
-                    if p.exists():
-                        p.unlink()
-        except Exception as e:
-            logger.warning("Error deleting physical files for media %s: %s", media.id, e)
+    @staticmethod
+    def _stored_file_paths(stored: dict) -> list[str]:
+        """Paths of the files written by store_blob()."""
+        paths = [stored["file_path"]]
+        if stored.get("thumbnail_path"):
+            paths.append(stored["thumbnail_path"])
+        paths.extend((stored.get("sizes") or {}).values())
+        return paths
+
+    @staticmethod
+    def _delete_media_files(paths: list[str]) -> None:
+        """Delete physical files, ignoring ones that are already gone."""
+        for path in paths:
+            try:
+                Path(path).unlink(missing_ok=True)
+            except Exception as e:
+                logger.warning("Error deleting physical file %s: %s", path, e)
+
+    @staticmethod
+    async def _release_media_files(media: Media, db: AsyncSession) -> list[str]:
+        """
+        Drop a deleted media record's reference on its stored files.
+
+        Must run after the record's delete has been flushed.
+
+        Returns:
+            Paths that are no longer referenced and should be deleted once the
+            transaction commits (empty while other records share the blob)
+        """
+        paths = UploadService._media_file_paths(media)
+        if not media.content_hash:
+            return paths
+
+        result = await db.execute(
+            select(MediaBlob).where(MediaBlob.content_hash == media.content_hash).with_for_update()
+        )
+        blob = result.scalars().first()
+        if blob is None:
+            return paths
+
+        blob.ref_count -= 1
+        if blob.ref_count > 0:
+            return []
+        await db.delete(blob)
+        return UploadService._media_file_paths(blob)
 
     @staticmethod
     async def delete_media(media_id: int, current_user: User, db: AsyncSession) -> None:
@@ -677,12 +945,41 @@ class UploadService:
         ]:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to delete this media")
 
-        # Delete physical files
-        UploadService._delete_media_files(media)
-
-        # Delete database record
+        # Delete database record, then the files once nothing references them
         await db.delete(media)
+        await db.flush()
+        unused_paths = await UploadService._release_media_files(media, db)
         await db.commit()
+        await UploadService.discard_media([media_id], unused_paths)
+
+    @staticmethod
+    async def release_user_media(user_id: int, db: AsyncSession) -> tuple[list[int], list[str]]:
+        """
+        Delete every media record a user uploaded, inside the caller's transaction.
+
+        Shared blobs only lose this user's references, exactly as when the
+        records are deleted one by one.
+
+        Returns:
+            The deleted media ids and the paths to pass to discard_media()
+            once the transaction commits
+        """
+        result = await db.execute(select(Media).where(Media.uploaded_by == user_id))
+        media_ids: list[int] = []
+        unused_paths: list[str] = []
+        for media in result.scalars().all():
+            media_ids.append(media.id)
+            await db.delete(media)
+            await db.flush()
+            unused_paths.extend(await UploadService._release_media_files(media, db))
+        return media_ids, unused_paths
+
+    @staticmethod
+    async def discard_media(media_ids: list[int], unused_paths: list[str]) -> None:
+        """After deleted media records are committed: remove unreferenced files and cached entries."""
+        UploadService._delete_media_files(unused_paths)
+        for media_id in media_ids:
+            await cache_manager.invalidate_media(media_id)
 
 
 # Singleton instance
@@ -3,13 +3,20 @@ Workflow Service
 
 Provides content workflow management with state machine functionality.
 Supports custom states, transitions, and approval chains.
+
+States and transitions are read from the compiled per-worker graph
+(app.utils.workflow_graph); only content rows and approvals are queried per
+call.  Available transitions for a page of content cost two queries in
+total: content statuses and the approval counts of every candidate
+transition.
 """
 
 import contextlib
 import logging
+from collections.abc import Iterable
 from datetime import datetime, timezone
 
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -22,6 +29,8 @@ from app.models.workflow import (
     WorkflowTransition,
     WorkflowType,
 )
+from app.utils.recommendations import schedule_recommendation_refresh
+from app.utils.workflow_graph import StateNode, TransitionEdge, invalidate_workflow, workflow_graph
 
 logger = logging.getLogger(__name__)
 
@@ -36,12 +45,11 @@ class WorkflowService:
 
     async def get_states(self, workflow_type: WorkflowType = WorkflowType.CONTENT) -> list[dict]:
         """Get all states for a workflow type."""
-        result = await self.db.execute(
-            select(WorkflowState)
-            .where(WorkflowState.workflow_type == workflow_type, WorkflowState.is_active.is_(True))
-            .order_by(WorkflowState.order)
+        graph = await workflow_graph.get(self.db)
+        states = sorted(
+            (s for s in graph.states.values() if s.workflow_type == workflow_type and s.is_active),
+            key=lambda s: (s.order, s.id),
         )
-        states = result.scalars().all()
 
         return [
             {
@@ -117,6 +125,7 @@ class WorkflowService:
         self.db.add(state)
         await self.db.commit()
         await self.db.refresh(state)
+        await invalidate_workflow()
 
         logger.info(f"Created workflow state: {name}")
 
@@ -148,34 +157,18 @@ class WorkflowService:
         workflow_type: WorkflowType = WorkflowType.CONTENT,
     ) -> list[dict]:
         """Get transitions, optionally filtered by from_state."""
-        query = (
-            select(WorkflowTransition)
-            .options(selectinload(WorkflowTransition.from_state), selectinload(WorkflowTransition.to_state))
-            .where(WorkflowTransition.is_active.is_(True))
-        )
+        graph = await workflow_graph.get(self.db)
 
         if from_state_id:
-            query = query.where(WorkflowTransition.from_state_id == from_state_id)
+            transitions = graph.transitions_from(from_state_id)
         else:
-            query = query.join(WorkflowState, WorkflowTransition.from_state_id == WorkflowState.id).where(
-                WorkflowState.workflow_type == workflow_type
-            )
+            transitions = [
+                t
+                for t in sorted(graph.transitions.values(), key=lambda t: t.id)
+                if t.is_active and graph.states[t.from_state_id].workflow_type == workflow_type
+            ]
 
-        result = await self.db.execute(query)
-        transitions = result.scalars().all()
-
-        return [
-            {
-                "id": t.id,
-                "name": t.name,
-                "from_state": {"id": t.from_state.id, "name": t.from_state.name},
-                "to_state": {"id": t.to_state.id, "name": t.to_state.name},
-                "requires_approval": t.requires_approval,
-                "approval_count": t.approval_count,
-                "required_roles": t.get_required_roles(),
-            }
-            for t in transitions
-        ]
+        return [graph.transition_dict(t) for t in transitions]
 
     async def create_transition(
         self,
@@ -220,6 +213,7 @@ class WorkflowService:
         self.db.add(transition)
         await self.db.commit()
         await self.db.refresh(transition)
+        await invalidate_workflow()
 
         logger.info(f"Created workflow transition: {name}")
 
@@ -242,27 +236,51 @@ class WorkflowService:
         if not content:
             raise ValueError("Content not found")
 
-        # Get current state
-        current_state = await self._get_content_state(content)
-        if not current_state:
-            return []
-
-        # Get transitions from current state
-        transitions = await self.get_transitions(from_state_id=current_state.id)
+        available = await self._available_transitions({content.id: content.status}, user)
+        return available[content.id]
 
-        # Filter by user role
+    async def get_available_transitions_for_contents(
+        self,
+        content_ids: Iterable[int],
+        user: User,
+    ) -> dict[int, list[dict]]:
+        """
+        Batched get_available_transitions() for a page of content.
+
+        Returns a mapping of content_id to its available transitions; ids of
+        content that does not exist are left out.
+        """
+        content_ids = list(dict.fromkeys(content_ids))
+        if not content_ids:
+            return {}
+        result = await self.db.execute(select(Content.id, Content.status).where(Content.id.in_(content_ids)))
+        return await self._available_transitions(dict(result.all()), user)
+
+    async def _available_transitions(self, statuses: dict, user: User) -> dict[int, list[dict]]:
+        """Transitions user may take from each content's status, with approval counts where needed."""
+        graph = await workflow_graph.get(self.db)
         user_role = user.role.name if user.role else "user"
-        available = []
 
-        for t in transitions:
-            required_roles = t.get("required_roles", [])
-            if not required_roles or user_role in required_roles or user_role == "superadmin":
-                # Check if approval is pending
-                if t.get("requires_approval"):
-                    approval_status = await self._get_approval_status(content_id, t["id"])
-                    t["approval_status"] = approval_status
-                available.append(t)
+        candidates: dict[int, list[TransitionEdge]] = {}
+        for content_id, status in statuses.items():
+            state = graph.state_by_name(status)
+            candidates[content_id] = (
+                [t for t in graph.transitions_from(state.id) if t.allows(user_role)] if state else []
+            )
+
+        # Approval counts for every (content, transition) pair that needs them, in one query
+        approval_statuses = await self._get_approval_statuses(
+            {(content_id, t.id) for content_id, ts in candidates.items() for t in ts if t.requires_approval}
+        )
 
+        available: dict[int, list[dict]] = {}
+        for content_id, transitions in candidates.items():
+            available[content_id] = []
+            for t in transitions:
+                entry = graph.transition_dict(t)
+                if t.requires_approval:
+                    entry["approval_status"] = approval_statuses[(content_id, t.id)]
+                available[content_id].append(entry)
         return available
 
     async def execute_transition(
@@ -277,19 +295,19 @@ class WorkflowService:
         if not content:
             raise ValueError("Content not found")
 
-        transition = await self.db.get(WorkflowTransition, transition_id)
+        graph = await workflow_graph.get(self.db)
+        transition = graph.transitions.get(transition_id)
         if not transition:
             raise ValueError("Transition not found")
 
         # Verify current state matches transition's from_state
-        current_state = await self._get_content_state(content)
+        current_state = graph.state_by_name(content.status)
         if not current_state or current_state.id != transition.from_state_id:
             raise ValueError("Content is not in the correct state for this transition")
 
         # Check user permission
         user_role = user.role.name if user.role else "user"
-        required_roles = transition.get_required_roles()
-        if required_roles and user_role not in required_roles and user_role != "superadmin":
+        if not transition.allows(user_role):
             raise ValueError("You don't have permission for this transition")
 
         # Handle approval workflow
@@ -302,7 +320,7 @@ class WorkflowService:
     async def _handle_approval_transition(
         self,
         content: Content,
-        transition: WorkflowTransition,
+        transition: TransitionEdge,
         user: User,
         comment: str | None,
     ) -> dict:
@@ -350,13 +368,14 @@ class WorkflowService:
     async def _execute_immediate_transition(
         self,
         content: Content,
-        transition: WorkflowTransition,
+        transition: TransitionEdge,
         user: User,
         comment: str | None,
     ) -> dict:
         """Execute a transition immediately."""
-        from_state = await self.db.get(WorkflowState, transition.from_state_id)
-        to_state = await self.db.get(WorkflowState, transition.to_state_id)
+        graph = await workflow_graph.get(self.db)
+        from_state = graph.states.get(transition.from_state_id)
+        to_state = graph.states[transition.to_state_id]
 
         # Update content status based on state
         content.status = to_state.name
@@ -387,6 +406,10 @@ class WorkflowService:
 
         await self.db.commit()
 
+        # Publishing and unpublishing both change related-content recommendations
+        if to_state.name == "published" or (from_state and from_state.name == "published"):
+            schedule_recommendation_refresh(content.id)
+
         logger.info(f"Executed transition '{transition.name}' for content {content.id}")
 
         return {
@@ -478,7 +501,7 @@ class WorkflowService:
 
         if approved:
             # Check if this was the last required approval
-            transition = await self.db.get(WorkflowTransition, approval.transition_id)
+            transition = (await workflow_graph.get(self.db)).transitions.get(approval.transition_id)
             content = await self.db.get(Content, approval.content_id)
 
             if transition and content:
@@ -501,25 +524,38 @@ class WorkflowService:
 
     # ============== Private Methods ==============
 
-    async def _get_content_state(self, content: Content) -> WorkflowState | None:
+    async def _get_content_state(self, content: Content) -> StateNode | None:
         """Get the workflow state for content."""
-        return await self.get_state_by_name(content.status, WorkflowType.CONTENT)
+        return (await workflow_graph.get(self.db)).state_by_name(content.status, WorkflowType.CONTENT)
 
     async def _get_approval_status(self, content_id: int, transition_id: int) -> dict:
         """Get approval status for a content/transition."""
+        return (await self._get_approval_statuses({(content_id, transition_id)}))[(content_id, transition_id)]
+
+    async def _get_approval_statuses(self, pairs: set[tuple[int, int]]) -> dict[tuple[int, int], dict]:
+        """Approval counts for many (content_id, transition_id) pairs in one grouped query."""
+        statuses = {pair: {"approved": 0, "rejected": 0, "pending": 0} for pair in pairs}
+        if not pairs:
+            return statuses
+
         result = await self.db.execute(
-            select(WorkflowApproval).where(
-                WorkflowApproval.content_id == content_id,
-                WorkflowApproval.transition_id == transition_id,
+            select(
+                WorkflowApproval.content_id,
+                WorkflowApproval.transition_id,
+                WorkflowApproval.approved,
+                func.count(),
+            )
+            .where(
+                WorkflowApproval.content_id.in_({content_id for content_id, _ in pairs}),
+                WorkflowApproval.transition_id.in_({transition_id for _, transition_id in pairs}),
             )
+            .group_by(WorkflowApproval.content_id, WorkflowApproval.transition_id, WorkflowApproval.approved)
         )
-        approvals = result.scalars().all()
-
-        return {
-            "approved": len([a for a in approvals if a.approved is True]),
-            "rejected": len([a for a in approvals if a.approved is False]),
-            "pending": len([a for a in approvals if a.approved is None]),
-        }
+        outcome = {True: "approved", False: "rejected", None: "pending"}
+        for content_id, transition_id, approved, count in result.all():
+            if (content_id, transition_id) in statuses:
+                statuses[(content_id, transition_id)][outcome[approved]] = count
+        return statuses
 
 
 async def get_workflow_service(db: AsyncSession) -> WorkflowService:
@@ -2,6 +2,9 @@ import json
 import logging
 from datetime import datetime, timezone
 
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
 from app.database import AsyncSessionLocal
 from app.models.activity_log import ActivityLog
 
@@ -52,3 +55,24 @@ async def log_activity(
 
     except Exception as e:
         logger.error(f"Failed to log activity: {str(e)}")
+
+
+ACTIVITY_INSERT_BATCH_SIZE = 1000
+
+
+async def log_activities(db: AsyncSession, entries: list[dict]) -> None:
+    """
+    Add many activity rows with multi-row INSERTs on the caller's session.
+
+    Each entry holds ActivityLog columns (action, user_id and description are
+    required).  Unlike log_activity(), the rows belong to the caller's
+    transaction: they are committed, or rolled back, with the change they
+    describe.
+    """
+    timestamp = datetime.now(timezone.utc).replace(tzinfo=None)
+    rows = [
+        {"content_id": None, "target_user_id": None, "details": None, "timestamp": timestamp, **entry}
+        for entry in entries
+    ]
+    for start in range(0, len(rows), ACTIVITY_INSERT_BATCH_SIZE):
+        await db.execute(insert(ActivityLog).values(rows[start : start + ACTIVITY_INSERT_BATCH_SIZE]))
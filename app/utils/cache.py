@@ -32,12 +32,18 @@ class CacheManager:
     PREFIX_ANALYTICS = "cache:analytics:"
     PREFIX_CONTENT = "cache:content:"
     PREFIX_USER = "cache:user:"
+    PREFIX_SITEMAP = "cache:sitemap:"
+    PREFIX_FEED = "cache:feed:"
+    PREFIX_COMMENTS = "cache:comments:"
+    PREFIX_RESPONSE = "cache:response:"
+    PREFIX_MEDIA = "cache:media:"
 
     # Default TTLs in seconds
     TTL_SHORT = 60  # 1 minute
     TTL_MEDIUM = 300  # 5 minutes
     TTL_LONG = 3600  # 1 hour
     TTL_ANALYTICS = 120  # 2 minutes for analytics
+    TTL_SITEMAP = 86400  # 1 day; shard keys change whenever their content does
 
     def __init__(self):
         """Initialize Redis connection pool"""
@@ -137,6 +143,15 @@ class CacheManager:
             self._enabled = True  # reset so connect() proceeds
             await self.connect()
 
+    async def get_client(self) -> redis.Redis | None:
+        """Return the connected Redis client for raw commands, or None when Redis is unavailable"""
+        await self._maybe_retry_connect()
+        if not self._enabled:
+            return None
+        if not self._redis:
+            await self.connect()
+        return self._redis
+
     async def get(self, key: str) -> Any | None:
         """
         Get a cached value by key.
@@ -255,11 +270,35 @@ class CacheManager:
 
     async def invalidate_content(self, content_id: int | None = None) -> int:
         """Invalidate content cache, optionally for specific content"""
+        # Sitemaps, feeds and pre-serialized listings are rendered from the content set
+        await self.invalidate_sitemap()
+        await self.invalidate_feeds()
+        await self.invalidate_responses()
         if content_id:
             await self.delete(f"{self.PREFIX_CONTENT}{content_id}")
             return 1
         return await self.delete_pattern(f"{self.PREFIX_CONTENT}*")
 
+    async def invalidate_sitemap(self) -> bool:
+        """Drop the cached sitemap shard list so signatures are recomputed"""
+        return await self.delete(f"{self.PREFIX_SITEMAP}shards")
+
+    async def invalidate_feeds(self) -> int:
+        """Drop every cached RSS/Atom feed"""
+        return await self.delete_pattern(f"{self.PREFIX_FEED}*")
+
+    async def invalidate_responses(self, route: str | None = None) -> int:
+        """Drop pre-serialized responses, optionally for one route"""
+        return await self.delete_pattern(f"{self.PREFIX_RESPONSE}{route + ':' if route else ''}*")
+
+    async def invalidate_media(self, media_id: int) -> bool:
+        """Drop the cached delivery descriptor of a media item"""
+        return await self.delete(f"{self.PREFIX_MEDIA}{media_id}")
+
+    async def invalidate_comments(self, content_id: int) -> int:
+        """Drop cached comment and reaction counts for one content item"""
+        return await self.delete_pattern(f"{self.PREFIX_COMMENTS}{content_id}:*")
+
     async def invalidate_user(self, user_id: int | None = None) -> int:
         """Invalidate user cache, optionally for specific user"""
         if user_id:
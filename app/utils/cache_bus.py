@@ -0,0 +1,124 @@
+"""
+Cache Bus
+
+Cross-worker invalidation for in-process caches.  A worker that changes
+data behind such a cache calls ``cache_bus.publish(topic)``: handlers
+subscribed to the topic run immediately in that worker, and the message
+goes out on a Redis pub/sub channel so every other worker runs its
+handlers too.
+
+Handlers receive the optional key that was published (None means "drop
+everything").  A worker that loses its Redis subscription may have missed
+messages, so after every (re)subscribe all handlers are called with None.
+Without Redis the bus is process-local, which is exact for a single worker.
+
+Start the listener once at startup via start_cache_bus().
+"""
+
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import uuid
+from collections import defaultdict
+from collections.abc import Callable
+
+from app.utils.cache import cache_manager
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "cache:bus"
+RECONNECT_DELAY = 5  # seconds between subscription attempts
+
+Handler = Callable[[str | None], None]
+
+
+class CacheBus:
+    """Topic -> handler registry fanned out over Redis pub/sub"""
+
+    def __init__(self):
+        self._handlers: dict[str, list[Handler]] = defaultdict(list)
+        # Lets a worker skip its own messages, which it already handled locally
+        self.origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._listener: asyncio.Task | None = None
+
+    def subscribe(self, topic: str, handler: Handler) -> None:
+        """Call handler(key) whenever topic is published, in this or any other worker."""
+        if handler not in self._handlers[topic]:
+            self._handlers[topic].append(handler)
+
+    def _dispatch(self, topic: str, key: str | None) -> None:
+        for handler in self._handlers.get(topic, ()):
+            try:
+                handler(key)
+            except Exception as exc:
+                logger.warning("cache_bus: handler for %s failed: %s", topic, exc)
+
+    def _dispatch_all(self) -> None:
+        for topic in list(self._handlers):
+            self._dispatch(topic, None)
+
+    async def publish(self, topic: str, key: str | None = None) -> None:
+        """Invalidate topic (optionally one key) here and in every other worker; never raises."""
+        self._dispatch(topic, key)
+        client = await cache_manager.get_client()
+        if client is None:
+            return
+        try:
+            await client.publish(CHANNEL, json.dumps({"topic": topic, "key": key, "origin": self.origin}))
+        except Exception as exc:
+            logger.warning("cache_bus: publish of %s failed: %s", topic, exc)
+
+    def _on_message(self, data: str) -> None:
+        try:
+            message = json.loads(data)
+        except (TypeError, ValueError):
+            return
+        if message.get("origin") != self.origin:
+            self._dispatch(message.get("topic"), message.get("key"))
+
+    async def listen(self) -> None:
+        """Apply messages from other workers until cancelled, resubscribing after errors."""
+        while True:
+            client = await cache_manager.get_client()
+            if client is None:
+                await asyncio.sleep(RECONNECT_DELAY)
+                continue
+            pubsub = client.pubsub()
+            try:
+                await pubsub.subscribe(CHANNEL)
+                # Anything published while unsubscribed was missed
+                self._dispatch_all()
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self._on_message(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("cache_bus: subscription lost, retrying in %ds: %s", RECONNECT_DELAY, exc)
+                await asyncio.sleep(RECONNECT_DELAY)
+            finally:
+                with contextlib.suppress(Exception):
+                    await pubsub.aclose()
+
+    def start(self) -> None:
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self.listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._listener
+            self._listener = None
+
+
+# Process-wide bus shared by every in-process cache
+cache_bus = CacheBus()
+
+
+def start_cache_bus() -> None:
+    """Start listening for invalidations from other workers (call from the app lifespan)."""
+    cache_bus.start()
+    logger.info("cache_bus: listening on %s", CHANNEL)
@@ -0,0 +1,376 @@
+"""
+Engagement Counters
+
+Denormalized counter columns (content view/comment counts, comment
+like/dislike counts) kept up to date without touching the row on every
+write.
+
+Writers call ``counter_buffer.incr()``, which is a single Redis HINCRBY
+(or an in-process dict when Redis is unavailable).  A recurring APScheduler
+job applies the accumulated deltas to the counter columns in one
+executemany UPDATE per column, and a slower reconciliation job recomputes
+every counter from its source table to repair any drift (lost deltas,
+crashes mid-flush, rows changed outside the service layer).
+
+Reads are ``column + pending delta`` — O(1) per row instead of an
+aggregate over reactions/comments/views.
+
+Attach once at startup via install_counter_jobs().
+"""
+
+import asyncio
+import contextlib
+import logging
+from collections import defaultdict
+
+from apscheduler.triggers.interval import IntervalTrigger
+from sqlalchemy import Update, bindparam, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.comment import Comment, CommentStatus
+from app.models.comment_engagement import CommentReaction, ReactionType
+from app.models.content import Content
+from app.models.content_view import ContentView
+from app.utils.cache import cache_manager
+
+logger = logging.getLogger(__name__)
+
+# entity name -> (model, counter columns)
+COUNTER_COLUMNS: dict[str, tuple[type, tuple[str, ...]]] = {
+    "content": (Content, ("view_count", "comment_count")),
+    "comment": (Comment, ("like_count", "dislike_count")),
+}
+
+KEY_PREFIX = "counters:pending:"
+FLUSH_LOCK_KEY = "counters:flush-lock"
+FLUSH_LOCK_TTL = 60  # seconds; longer than any sane flush
+
+
+class CounterBuffer:
+    """
+    Pending counter deltas, shared across workers through Redis hashes.
+
+    Each entity has one hash (``counters:pending:<entity>``) whose fields are
+    ``"<row_id>:<column>"``.  A flush RENAMEs the hash away atomically, so
+    increments that arrive mid-flush start a fresh hash and are never lost
+    or applied twice.
+    """
+
+    def __init__(self):
+        self._local: dict[tuple[str, int, str], int] = defaultdict(int)
+        self._lock = asyncio.Lock()
+
+    def clear(self) -> None:
+        """Drop in-process deltas (tests, or after a manual reconcile)."""
+        self._local.clear()
+
+    async def incr(self, entity: str, row_id: int, column: str, delta: int = 1) -> None:
+        """Add delta to a counter; never raises (counters are repaired by reconciliation)."""
+        _validate(entity, column)
+        if delta == 0:
+            return
+
+        client = await cache_manager.get_client()
+        if client is not None:
+            try:
+                await client.hincrby(f"{KEY_PREFIX}{entity}", f"{row_id}:{column}", delta)
+                return
+            except Exception as exc:
+                logger.warning("counters: HINCRBY failed, buffering in-process: %s", exc)
+
+        self._local[(entity, row_id, column)] += delta
+
+    async def pending(self, entity: str, row_ids: list[int]) -> dict[int, dict[str, int]]:
+        """Deltas not yet written to the counter columns, keyed by row id (zeros omitted)."""
+        _, columns = COUNTER_COLUMNS[entity]
+        result: dict[int, dict[str, int]] = defaultdict(dict)
+        if not row_ids:
+            return {}
+
+        fields = [f"{row_id}:{column}" for row_id in row_ids for column in columns]
+        client = await cache_manager.get_client()
+        if client is not None:
+            try:
+                key = f"{KEY_PREFIX}{entity}"
+                # Include a hash that is mid-flush so reads never dip
+                for values in (await client.hmget(key, fields), await client.hmget(f"{key}:flushing", fields)):
+                    for field, value in zip(fields, values, strict=True):
+                        if value:
+                            row_id, column = field.split(":", 1)
+                            row = result[int(row_id)]
+                            row[column] = row.get(column, 0) + int(value)
+            except Exception as exc:
+                logger.warning("counters: pending read failed: %s", exc)
+
+        for row_id in row_ids:
+            for column in columns:
+                delta = self._local.get((entity, row_id, column))
+                if delta:
+                    row = result[row_id]
+                    row[column] = row.get(column, 0) + delta
+
+        return {row_id: deltas for row_id, deltas in result.items() if any(deltas.values())}
+
+    async def flush(self, db: AsyncSession | None = None) -> int:
+        """
+        Apply all pending deltas to the counter columns.
+
+        Opens its own session unless one is supplied.  Returns the number of
+        counters updated, or 0 on failure (deltas are kept for the next run).
+        """
+        async with self._lock:
+            acquired, client = await _acquire_flush_lock()
+            if not acquired:
+                return 0  # another worker is flushing
+            try:
+                return await self._flush_locked(client, db) or 0
+            finally:
+                await _release_flush_lock(client)
+
+    async def _flush_locked(self, client, db: AsyncSession | None) -> int | None:
+        """Flush while holding the flush lock; None if the write failed."""
+        local = dict(self._local)
+        self._local.clear()
+        try:
+            deltas = await self._collect(client, local)
+            if not deltas:
+                return 0
+
+            if db is not None:
+                await _apply(db, deltas)
+            else:
+                from app import database
+
+                async with database.AsyncSessionLocal() as session:
+                    await _apply(session, deltas)
+        except Exception as exc:
+            logger.warning("counters: flush failed: %s", exc)
+            # Redis hashes stay in place for the next run; local deltas go back in the buffer
+            for key, delta in local.items():
+                self._local[key] += delta
+            return None
+
+        if client is not None:
+            await client.delete(*(f"{KEY_PREFIX}{entity}:flushing" for entity in COUNTER_COLUMNS))
+        return len(deltas)
+
+    async def _collect(self, client, local: dict[tuple[str, int, str], int]) -> dict[tuple[str, int, str], int]:
+        deltas: dict[tuple[str, int, str], int] = defaultdict(int)
+
+        if client is not None:
+            for entity in COUNTER_COLUMNS:
+                key = f"{KEY_PREFIX}{entity}"
+                flushing = f"{key}:flushing"
+                # A leftover hash from a failed flush is retried before taking new deltas
+                if not await client.exists(flushing):
+                    try:
+                        await client.rename(key, flushing)
+                    except Exception:
+                        continue  # nothing pending for this entity
+                for field, value in (await client.hgetall(flushing)).items():
+                    row_id, column = field.split(":", 1)
+                    deltas[(entity, int(row_id), column)] += int(value)
+
+        for key, delta in local.items():
+            deltas[key] += delta
+
+        return {key: delta for key, delta in deltas.items() if delta}
+
+    async def reconcile(self, db: AsyncSession | None = None) -> int:
+        """
+        Recompute every counter from its source table and fix rows that drifted.
+
+        Runs under the flush lock (skipped if another worker holds it) and
+        flushes pending deltas first.  A repaired row already counts every
+        source row, so deltas that arrived for it in the meantime are dropped
+        rather than applied on top.  Returns the number of rows repaired.
+        """
+        if db is None:
+            from app import database
+
+            async with database.AsyncSessionLocal() as session:
+                return await self.reconcile(session)
+
+        async with self._lock:
+            acquired, client = await _acquire_flush_lock()
+            if not acquired:
+                logger.info("counters: flush lock held elsewhere, skipping reconciliation")
+                return 0
+            try:
+                if await self._flush_locked(client, db) is None:
+                    return 0  # deltas are still pending; recounting now would apply them twice
+
+                repaired: dict[tuple[str, str], list[int]] = {}
+                for entity, column, stmt in reconcile_statements():
+                    repaired[(entity, column)] = list((await db.execute(stmt.returning(stmt.table.c.id))).scalars())
+                await db.commit()
+                await self._drop_pending(client, repaired)
+            finally:
+                await _release_flush_lock(client)
+
+        return len({(entity, row_id) for (entity, _), row_ids in repaired.items() for row_id in row_ids})
+
+    async def _drop_pending(self, client, repaired: dict[tuple[str, str], list[int]]) -> None:
+        """Discard deltas for counters that reconciliation just set to their true value."""
+        fields: dict[str, list[str]] = defaultdict(list)
+        for (entity, column), row_ids in repaired.items():
+            for row_id in row_ids:
+                self._local.pop((entity, row_id, column), None)
+                fields[entity].append(f"{row_id}:{column}")
+
+        if client is None:
+            return
+        for entity, names in fields.items():
+            key = f"{KEY_PREFIX}{entity}"
+            try:
+                await client.hdel(key, *names)
+                await client.hdel(f"{key}:flushing", *names)
+            except Exception as exc:
+                logger.warning("counters: could not drop reconciled deltas for %s: %s", entity, exc)
+
+
+async def _acquire_flush_lock():
+    """Take the cross-worker flush lock; returns (acquired, Redis client or None)."""
+    client = await cache_manager.get_client()
+    if client is None:
+        return True, None
+    try:
+        if not await client.set(FLUSH_LOCK_KEY, "1", nx=True, ex=FLUSH_LOCK_TTL):
+            return False, client
+    except Exception as exc:
+        logger.warning("counters: Redis unavailable, flushing in-process deltas only: %s", exc)
+        return True, None
+    return True, client
+
+
+async def _release_flush_lock(client) -> None:
+    if client is not None:
+        with contextlib.suppress(Exception):
+            await client.delete(FLUSH_LOCK_KEY)
+
+
+def _validate(entity: str, column: str) -> None:
+    if entity not in COUNTER_COLUMNS or column not in COUNTER_COLUMNS[entity][1]:
+        raise ValueError(f"Unknown counter {entity}.{column}")
+
+
+async def _apply(db: AsyncSession, deltas: dict[tuple[str, int, str], int]) -> None:
+    """One executemany UPDATE per (entity, column)."""
+    grouped: dict[tuple[str, str], list[dict]] = defaultdict(list)
+    for (entity, row_id, column), delta in deltas.items():
+        grouped[(entity, column)].append({"_id": row_id, "_delta": delta})
+
+    for (entity, column), params in grouped.items():
+        table = COUNTER_COLUMNS[entity][0].__table__
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam("_id"))
+            # updated_at is pinned so counter traffic does not look like an edit
+            .values({column: func.greatest(table.c[column] + bindparam("_delta"), 0), "updated_at": table.c.updated_at})
+        )
+        await db.execute(stmt, params)
+
+    await db.commit()
+
+
+def reconcile_statements() -> list[tuple[str, str, Update]]:
+    """
+    (entity, column, UPDATE ... WHERE counter <> actual), one per counter column.
+
+    Used by ``CounterBuffer.reconcile()``; also usable on its own to set every
+    counter from its source table (e.g. after a bulk load).
+    """
+    content = Content.__table__
+    comments = Comment.__table__
+
+    comment_count = (
+        select(func.count())
+        .where(
+            Comment.content_id == content.c.id,
+            Comment.status == CommentStatus.APPROVED,
+            Comment.is_deleted.is_(False),
+        )
+        .scalar_subquery()
+    )
+    view_count = select(func.count()).where(ContentView.content_id == content.c.id).scalar_subquery()
+
+    def reactions(reaction_type: ReactionType):
+        return (
+            select(func.count())
+            .where(CommentReaction.comment_id == comments.c.id, CommentReaction.reaction_type == reaction_type)
+            .scalar_subquery()
+        )
+
+    statements = []
+    for entity, table, column, actual in (
+        ("content", content, "comment_count", comment_count),
+        ("content", content, "view_count", view_count),
+        ("comment", comments, "like_count", reactions(ReactionType.LIKE)),
+        ("comment", comments, "dislike_count", reactions(ReactionType.DISLIKE)),
+    ):
+        statements.append(
+            (
+                entity,
+                column,
+                update(table)
+                .where(table.c[column] != actual)
+                .values({column: actual, "updated_at": table.c.updated_at}),
+            )
+        )
+    return statements
+
+
+# Process-wide buffer shared by services and the scheduled jobs
+counter_buffer = CounterBuffer()
+
+
+async def _flush_counters() -> None:
+    """Scheduled job: apply pending counter deltas."""
+    written = await counter_buffer.flush()
+    if written:
+        logger.debug("counters: flushed %d counters", written)
+
+
+async def _reconcile_counters() -> None:
+    """Scheduled job: repair counter drift."""
+    try:
+        repaired = await counter_buffer.reconcile()
+    except Exception as exc:
+        logger.warning("counters: reconciliation failed: %s", exc)
+        return
+    if repaired:
+        logger.info("counters: reconciliation repaired %d rows", repaired)
+
+
+def install_counter_jobs(
+    scheduler,
+    flush_interval_seconds: int = 10,
+    reconcile_interval_minutes: int = 60,
+) -> None:
+    """
+    Register the counter flush and reconciliation jobs with the shared APScheduler instance.
+
+    Args:
+        scheduler: The application's AsyncIOScheduler (from app.scheduler).
+        flush_interval_seconds: How often pending deltas are written (default 10 s).
+        reconcile_interval_minutes: How often counters are recomputed from source rows (default 60 min).
+    """
+    scheduler.add_job(
+        _flush_counters,
+        trigger=IntervalTrigger(seconds=flush_interval_seconds),
+        id="counter_flush",
+        replace_existing=True,
+        max_instances=1,
+    )
+    scheduler.add_job(
+        _reconcile_counters,
+        trigger=IntervalTrigger(minutes=reconcile_interval_minutes),
+        id="counter_reconcile",
+        replace_existing=True,
+        max_instances=1,
+    )
+    logger.info(
+        "counters: installed (flush=%ds, reconcile=%dmin)",
+        flush_interval_seconds,
+        reconcile_interval_minutes,
+    )
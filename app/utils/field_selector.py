@@ -2,14 +2,21 @@
 Field Selection Utility
 
 Provides sparse fieldset support for API responses via ``?fields=id,title,slug``.
-Use as a FastAPI dependency on any list or detail endpoint.
+Use as a FastAPI dependency on any list or detail endpoint.  Hot endpoints
+should push the selection down — ``columns()`` into the SQL ``load_only()``
+list and ``requested_fields`` into a ``SchemaSerializer`` — rather than
+filtering full objects with ``apply()``.
 """
 
 from __future__ import annotations
 
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from fastapi import Query
+from sqlalchemy import inspect as sa_inspect
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
 
 
 class FieldSelector:
@@ -40,6 +47,19 @@ class FieldSelector:
         """Return True when the caller requested specific fields."""
         return self.requested_fields is not None
 
+    def columns(self, model: type, required: Iterable[str] = ("id",)) -> list[Any] | None:
+        """
+        Mapped columns of model for the requested fields (plus required), for ``load_only()``.
+
+        Returns None when no selection was made.  Requested names that are not
+        columns (relationships, computed fields) are ignored.
+        """
+        if self.requested_fields is None:
+            return None
+        mapper_columns = sa_inspect(model).column_attrs
+        names = [*required, *sorted(self.requested_fields - set(required))]
+        return [getattr(model, name) for name in names if name in mapper_columns]
+
     def apply(self, data: Any) -> Any:
         """Filter response data to only include requested fields."""
         if self.requested_fields is None:
@@ -52,10 +72,9 @@ class FieldSelector:
         """Filter a single item to requested fields."""
         if isinstance(item, dict):
             return {k: v for k, v in item.items() if k in self.requested_fields}
-        # Pydantic model
+        # Pydantic model — let the serializer skip unrequested fields
         if hasattr(item, "model_dump"):
-            full = item.model_dump(mode="json")
-            return {k: v for k, v in full.items() if k in self.requested_fields}
+            return item.model_dump(mode="json", include=self.requested_fields)
         # Plain object
         if hasattr(item, "__dict__"):
             full = {k: v for k, v in item.__dict__.items() if not k.startswith("_")}
@@ -0,0 +1,156 @@
+"""
+Media Library Deduplication
+
+Folds media uploaded before content-addressed storage (``content_hash`` is
+NULL) into shared ``MediaBlob`` rows.  Each file is hashed off the event
+loop; a record whose content is already stored is repointed at the
+existing blob's files and its own copies are deleted after the commit,
+otherwise its files become a new blob.
+
+Legacy images are hashed as stored (after optimization), so they merge
+with each other but not with blobs created by new uploads, which are keyed
+by the raw upload bytes.  Documents are stored unmodified and merge with
+both.
+
+Attach once at startup via install_media_dedupe_job().
+"""
+
+import asyncio
+import logging
+from pathlib import Path
+
+from apscheduler.triggers.interval import IntervalTrigger
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import AsyncSessionLocal
+from app.models.media import Media
+from app.models.media_blob import MediaBlob
+from app.services.upload_service import UploadService, hash_file
+from app.utils.cache import cache_manager
+
+logger = logging.getLogger(__name__)
+
+
+async def _fold_into_blob(media: Media, content_hash: str, db: AsyncSession) -> list[str]:
+    """Attach media to the blob for content_hash, creating it from media's files if needed; returns redundant paths."""
+    result = await db.execute(select(MediaBlob).where(MediaBlob.content_hash == content_hash).with_for_update())
+    blob = result.scalars().first()
+
+    if blob is None:
+        db.add(
+            MediaBlob(
+                content_hash=content_hash,
+                file_path=media.file_path,
+                file_size=media.file_size,
+                width=media.width,
+                height=media.height,
+                thumbnail_path=media.thumbnail_path,
+                sizes=dict(media.sizes or {}),
+                ref_count=1,
+            )
+        )
+        await db.flush()  # the blob row must exist before media references it
+        await _update_media(media.id, content_hash=content_hash, db=db)
+        return []
+
+    shared = set(UploadService._media_file_paths(blob))
+    redundant = [path for path in UploadService._media_file_paths(media) if path not in shared]
+    await _update_media(
+        media.id,
+        db=db,
+        content_hash=content_hash,
+        filename=Path(blob.file_path).name,
+        file_path=blob.file_path,
+        width=blob.width,
+        height=blob.height,
+        thumbnail_path=blob.thumbnail_path,
+        sizes=dict(blob.sizes or {}),
+    )
+    blob.ref_count += 1
+    return redundant
+
+
+async def _update_media(media_id: int, db: AsyncSession, **values) -> None:
+    # Moving storage is not an edit: keep updated_at as it was
+    await db.execute(
+        update(Media)
+        .where(Media.id == media_id)
+        .values(updated_at=Media.updated_at, **values)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def dedupe_media_library(db: AsyncSession, batch_size: int = 100) -> int:
+    """
+    Move every not-yet-deduplicated media record onto shared blobs.
+
+    Works in id-ordered batches, committing after each.  Records whose file
+    is missing are skipped and retried on the next run.
+
+    Args:
+        db: Database session.
+        batch_size: Records hashed and committed per batch.
+
+    Returns:
+        Number of records attached to a blob.
+    """
+    last_id = 0
+    attached = 0
+    while True:
+        result = await db.execute(
+            select(Media).where(Media.content_hash.is_(None), Media.id > last_id).order_by(Media.id).limit(batch_size)
+        )
+        batch = list(result.scalars().all())
+        if not batch:
+            return attached
+        last_id = batch[-1].id
+
+        redundant: list[str] = []
+        changed: list[int] = []
+        for media in batch:
+            content_hash = await asyncio.to_thread(hash_file, media.file_path)
+            if content_hash is None:
+                continue
+            redundant.extend(await _fold_into_blob(media, content_hash, db))
+            changed.append(media.id)
+
+        await db.commit()
+        UploadService._delete_media_files(redundant)
+        for media_id in changed:
+            await cache_manager.invalidate_media(media_id)
+        attached += len(changed)
+        if redundant:
+            logger.info("media_dedupe: merged duplicates, removed %d files", len(redundant))
+
+
+async def _run_dedupe(batch_size: int) -> None:
+    """Scheduled job: deduplicate the media library."""
+    try:
+        async with AsyncSessionLocal() as db:
+            attached = await dedupe_media_library(db, batch_size)
+    except Exception as exc:
+        logger.warning("media_dedupe: run failed: %s", exc)
+        return
+    if attached:
+        logger.info("media_dedupe: attached %d media records to shared blobs", attached)
+
+
+def install_media_dedupe_job(scheduler, interval_minutes: int = 360, batch_size: int = 100) -> None:
+    """
+    Register the media deduplication job with the shared APScheduler instance.
+
+    Args:
+        scheduler: The application's AsyncIOScheduler (from app.scheduler).
+        interval_minutes: How often to look for undeduplicated media (default 6 h).
+        batch_size: Records hashed and committed per batch.
+    """
+    scheduler.add_job(
+        _run_dedupe,
+        trigger=IntervalTrigger(minutes=interval_minutes),
+        args=[batch_size],
+        id="media_dedupe",
+        replace_existing=True,
+        max_instances=1,
+    )
+    logger.info("media_dedupe: installed (interval=%dmin, batch=%d)", interval_minutes, batch_size)
@@ -0,0 +1,286 @@
+"""
+Media Delivery
+
+Serves uploaded files without tying up workers on the database or on byte
+copying.
+
+* Signed URLs — ``sign_media_url()`` issues short-lived HMAC-signed links to
+  a media variant.  The ``/media/signed/...`` route checks the signature
+  instead of authenticating, so public pages and ``<img>`` tags need neither
+  a session nor a database round trip.  Expiries are rounded up to a window
+  boundary so every link issued within a window is identical and stays
+  browser-cacheable.
+* Cached descriptors — the few columns needed to authorize and locate a file
+  are cached in Redis under ``cache:media:{id}`` and dropped by
+  ``CacheManager.invalidate_media()`` whenever the record changes.
+* nginx handoff — with ``MEDIA_ACCEL_REDIRECT_PREFIX`` set, responses carry
+  only an ``X-Accel-Redirect`` header and nginx streams the file with
+  sendfile, handling Range and conditional requests itself.
+* Without nginx, ``serve_file()`` answers If-None-Match / If-Modified-Since
+  with 304 and single byte ranges with 206 (or 416).
+"""
+
+import base64
+import hashlib
+import hmac
+import re
+import time
+from dataclasses import asdict, dataclass, field
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from urllib.parse import quote
+
+import anyio
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.requests import Request
+from starlette.responses import FileResponse, Response, StreamingResponse
+
+from app.config import settings
+from app.constants.roles import RoleEnum
+from app.models.media import Media
+from app.models.user import User
+from app.services.upload_service import IMAGE_SIZES, UPLOAD_DIR, upload_service
+from app.utils.cache import CacheManager, cache_manager
+from app.utils.security import validate_file_path
+
+SIGNED_URL_PREFIX = "/api/v1/media/signed/"
+VARIANTS = ("original", "thumbnail", *IMAGE_SIZES)
+
+CHUNK_SIZE = 64 * 1024
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeNotSatisfiableError(ValueError):
+    """The requested byte range lies entirely outside the file."""
+
+
+@dataclass
+class MediaDescriptor:
+    """The cached subset of a media record needed to authorize and serve its files."""
+
+    id: int
+    uploaded_by: int | None
+    mime_type: str
+    original_filename: str
+    file_path: str
+    thumbnail_path: str | None = None
+    sizes: dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def from_media(cls, media: Media) -> "MediaDescriptor":
+        return cls(
+            id=media.id,
+            uploaded_by=media.uploaded_by,
+            mime_type=media.mime_type,
+            original_filename=media.original_filename,
+            file_path=media.file_path,
+            thumbnail_path=media.thumbnail_path,
+            sizes=dict(media.sizes or {}),
+        )
+
+    def can_access(self, user: User) -> bool:
+        """Owners and admins may read a file; the same rule the media routes apply."""
+        return self.uploaded_by == user.id or user.role.name in (RoleEnum.ADMIN.value, RoleEnum.SUPERADMIN.value)
+
+    def path_for(self, variant: str) -> Path:
+        """Resolved on-disk path of a variant, confined to the upload directory."""
+        if variant == "original":
+            return validate_file_path(self.file_path, UPLOAD_DIR)
+        if variant == "thumbnail":
+            if not self.thumbnail_path:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND, detail="No thumbnail available for this media"
+                )
+            return validate_file_path(self.thumbnail_path, UPLOAD_DIR.parent)
+        if variant not in self.sizes:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Size variant '{variant}' not available")
+        return validate_file_path(self.sizes[variant], UPLOAD_DIR)
+
+
+async def get_media_descriptor(media_id: int, db: AsyncSession) -> MediaDescriptor:
+    """Media descriptor from Redis, loading and caching it on a miss (404 if the record does not exist)."""
+    key = f"{CacheManager.PREFIX_MEDIA}{media_id}"
+    cached = await cache_manager.get(key)
+    if cached:
+        return MediaDescriptor(**cached)
+
+    descriptor = MediaDescriptor.from_media(await upload_service.get_media_by_id(media_id, db))
+    await cache_manager.set(key, asdict(descriptor), CacheManager.TTL_LONG)
+    return descriptor
+
+
+# ============== Signed URLs ==============
+
+
+def _signature(media_id: int, variant: str, expires: int) -> str:
+    message = f"{media_id}:{variant}:{expires}".encode()
+    digest = hmac.new(settings.secret_key.encode(), message, hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+
+def sign_media_url(media_id: int, variant: str, ttl: int | None = None, now: float | None = None) -> tuple[str, int]:
+    """
+    Signed path for a media variant and its expiry timestamp.
+
+    The expiry is the end of the window after the current one, so a link
+    is valid for between ttl and 2 * ttl seconds and is stable within a window.
+    """
+    ttl = ttl or settings.media_signed_url_ttl_seconds
+    now = int(now if now is not None else time.time())
+    expires = (now // ttl + 2) * ttl
+    return (
+        f"{SIGNED_URL_PREFIX}{media_id}/{variant}?expires={expires}&sig={_signature(media_id, variant, expires)}",
+        expires,
+    )
+
+
+def verify_signature(media_id: int, variant: str, expires: int, sig: str, now: float | None = None) -> bool:
+    """True when sig was issued for this media variant and has not expired."""
+    if expires < (now if now is not None else time.time()):
+        return False
+    return hmac.compare_digest(sig, _signature(media_id, variant, expires))
+
+
+# ============== File responses ==============
+
+
+def parse_range(header: str, size: int) -> tuple[int, int] | None:
+    """
+    Parse a single-range ``Range`` header into inclusive (start, end) offsets.
+
+    Returns None for headers that should be ignored (malformed or multiple
+    ranges), so the full file is sent.  Raises RangeNotSatisfiableError when
+    the range lies beyond the end of the file.
+    """
+    match = _RANGE_RE.match(header.strip())
+    if not match or not any(match.groups()):
+        return None
+    first, last = match.groups()
+
+    if first:
+        start = int(first)
+        end = int(last) if last else size - 1
+        if last and end < start:
+            return None
+        if start >= size:
+            raise RangeNotSatisfiableError(header)
+        return start, min(end, size - 1)
+
+    suffix = int(last)
+    if suffix == 0 or size == 0:
+        raise RangeNotSatisfiableError(header)
+    return max(size - suffix, 0), size - 1
+
+
+def _not_modified(request: Request, etag: str, mtime: float) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return if_none_match.strip() == "*" or etag in (tag.strip() for tag in if_none_match.split(","))
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+async def _iter_range(path: Path, start: int, end: int):
+    async with await anyio.open_file(path, "rb") as file:
+        await file.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await file.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def _content_disposition(filename: str) -> str:
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+
+def serve_file(
+    request: Request,
+    path: Path,
+    media_type: str,
+    *,
+    filename: str | None = None,
+    cache_control: str = "private, no-cache",
+) -> Response:
+    """
+    Stream a file with validators, conditional requests and single byte ranges.
+
+    Raises 404 if the file is missing.  A stale If-Range validator turns a
+    range request into a full response.
+    """
+    try:
+        stat_result = path.stat()
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found on disk") from e
+
+    size = stat_result.st_size
+    last_modified = formatdate(stat_result.st_mtime, usegmt=True)
+    etag = f'"{stat_result.st_mtime_ns:x}-{size:x}"'
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Cache-Control": cache_control,
+        "ETag": etag,
+        "Last-Modified": last_modified,
+    }
+    if filename:
+        headers["Content-Disposition"] = _content_disposition(filename)
+
+    if _not_modified(request, etag, stat_result.st_mtime):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and request.method == "GET" and (if_range is None or if_range in (etag, last_modified)):
+        try:
+            byte_range = parse_range(range_header, size)
+        except RangeNotSatisfiableError:
+            headers["Content-Range"] = f"bytes */{size}"
+            return Response(status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE, headers=headers)
+        if byte_range is not None:
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+            headers["Content-Length"] = str(end - start + 1)
+            return StreamingResponse(
+                _iter_range(path, start, end),
+                status_code=status.HTTP_206_PARTIAL_CONTENT,
+                media_type=media_type,
+                headers=headers,
+            )
+
+    return FileResponse(path, media_type=media_type, headers=headers, stat_result=stat_result)
+
+
+def accel_redirect_response(path: Path, media_type: str, *, filename: str | None, cache_control: str) -> Response:
+    """Hand the file to nginx via X-Accel-Redirect; nginx handles ranges and validators."""
+    relative = path.relative_to(UPLOAD_DIR.resolve()).as_posix()
+    headers = {
+        "X-Accel-Redirect": settings.media_accel_redirect_prefix.rstrip("/") + "/" + quote(relative),
+        "Cache-Control": cache_control,
+    }
+    if filename:
+        headers["Content-Disposition"] = _content_disposition(filename)
+    return Response(media_type=media_type, headers=headers)
+
+
+def serve_variant(
+    request: Request, descriptor: MediaDescriptor, variant: str, *, cache_control: str = "private, no-cache"
+) -> Response:
+    """Serve one variant of a media item, through nginx when an accel prefix is configured."""
+    path = descriptor.path_for(variant)
+    filename = descriptor.original_filename if variant == "original" else None
+    if settings.media_accel_redirect_prefix and path.is_relative_to(UPLOAD_DIR.resolve()):
+        return accel_redirect_response(path, descriptor.mime_type, filename=filename, cache_control=cache_control)
+    return serve_file(request, path, descriptor.mime_type, filename=filename, cache_control=cache_control)
@@ -0,0 +1,318 @@
+"""
+Sampling Profiler
+
+A pure-Python sampling profiler for live workers.  A daemon thread reads
+the event-loop thread's stack with ``sys._current_frames()`` every few
+milliseconds, so profiled code runs unmodified and each sample costs one
+stack walk.  Samples are asyncio-aware: the event loop's own frames are
+dropped and the stack is rooted at the running task (``task:<name>``);
+time the loop spends waiting in its selector is counted as ``<idle>``.
+
+- ``profile_worker()`` samples for a fixed time and returns a ``Profile``
+  that renders collapsed stacks (flamegraph.pl, speedscope import) or
+  speedscope JSON.  One session runs per worker at a time.
+- ``request_sampler`` is the always-on mode: while a request picked by
+  SampledProfilingMiddleware (1 in ``profiler_sample_rate``) is in flight,
+  the worker is sampled and the hottest functions are kept in a ring
+  buffer of ``profiler_window_seconds`` windows.
+
+Everything is per worker process; nothing leaves the process.
+"""
+
+import asyncio
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter, deque
+from collections.abc import Callable
+from functools import lru_cache
+from typing import NamedTuple
+
+from app.config import settings
+
+IDLE = ("<idle>", "", 0)
+MAX_STACK_DEPTH = 256
+
+_TASK_NUMBER_RE = re.compile(r"-\d+$")
+_LOOP_RUN_SUFFIX = f"asyncio{os.sep}events.py"
+_SELECTORS_SUFFIX = "selectors.py"
+
+
+class ProfilerBusyError(RuntimeError):
+    """A profiling session is already running in this worker."""
+
+
+class FrameKey(NamedTuple):
+    """One stack entry: function name, shortened file and first line."""
+
+    name: str
+    file: str
+    line: int
+
+    def label(self) -> str:
+        return f"{self.name} ({self.file}:{self.line})" if self.file else self.name
+
+
+@lru_cache(maxsize=4096)
+def _short_path(filename: str) -> str:
+    """Path relative to site-packages / the stdlib / the working directory."""
+    for prefix in sorted({p for p in sys.path if p}, key=len, reverse=True):
+        if filename.startswith(prefix + os.sep):
+            return filename[len(prefix) + 1 :]
+    return filename
+
+
+def sample_stack(thread_id: int, loop: asyncio.AbstractEventLoop | None) -> tuple[FrameKey, ...] | None:
+    """Root-to-leaf stack of a thread, rooted at its running asyncio task if any."""
+    frame = sys._current_frames().get(thread_id)
+    if frame is None:
+        return None
+    frames = []
+    while frame is not None and len(frames) < MAX_STACK_DEPTH:
+        frames.append(frame)
+        frame = frame.f_back
+    frames.reverse()
+
+    task = asyncio.current_task(loop) if loop is not None else None
+    if task is None:
+        if frames[-1].f_code.co_filename.endswith(_SELECTORS_SUFFIX):
+            return (FrameKey(*IDLE),)
+        root = FrameKey("<loop>", "", 0)
+    else:
+        # Drop the loop machinery below the task's first coroutine frame
+        for index in range(len(frames) - 1, -1, -1):
+            code = frames[index].f_code
+            if code.co_name == "_run" and code.co_filename.endswith(_LOOP_RUN_SUFFIX):
+                frames = frames[index + 1 :]
+                break
+        root = FrameKey(f"task:{_TASK_NUMBER_RE.sub('', task.get_name())}", "", 0)
+
+    return (root,) + tuple(
+        FrameKey(f.f_code.co_name, _short_path(f.f_code.co_filename), f.f_code.co_firstlineno) for f in frames
+    )
+
+
+def _sample_loop(
+    thread_id: int,
+    loop: asyncio.AbstractEventLoop,
+    interval: float,
+    record: Callable[[tuple[FrameKey, ...]], None],
+    stop: threading.Event,
+) -> None:
+    while not stop.wait(interval):
+        stack = sample_stack(thread_id, loop)
+        if stack:
+            record(stack)
+
+
+def _function_counts(stack: tuple[FrameKey, ...], self_counts: Counter, total_counts: Counter, weight: int = 1) -> None:
+    if stack[0] == IDLE:
+        return
+    self_counts[stack[-1]] += weight
+    # A recursive function is counted once per sample
+    for key in set(stack[1:]):
+        total_counts[key] += weight
+
+
+def _hot_rows(self_counts: Counter, total_counts: Counter, samples: int, limit: int) -> list[dict]:
+    return [
+        {
+            "function": key.label(),
+            "self_samples": count,
+            "total_samples": total_counts[key],
+            "self_percent": round(count / samples * 100, 2) if samples else 0.0,
+        }
+        for key, count in self_counts.most_common(limit)
+    ]
+
+
+class Profile:
+    """Aggregated stacks of one profiling session"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.stacks: Counter[tuple[FrameKey, ...]] = Counter()
+        self.started_at = time.time()
+        self.duration = 0.0
+
+    @property
+    def samples(self) -> int:
+        return sum(self.stacks.values())
+
+    def add(self, stack: tuple[FrameKey, ...]) -> None:
+        self.stacks[stack] += 1
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's folded format: ``root;child;leaf count`` per line."""
+        lines = [f"{';'.join(key.label() for key in stack)} {count}" for stack, count in self.stacks.items()]
+        return "\n".join(sorted(lines)) + ("\n" if lines else "")
+
+    def speedscope(self, name: str = "cms worker") -> dict:
+        """A speedscope.app file with one sampled profile (weights in milliseconds)."""
+        frames: dict[FrameKey, int] = {}
+        samples, weights = [], []
+        for stack, count in self.stacks.items():
+            samples.append([frames.setdefault(key, len(frames)) for key in stack])
+            weights.append(round(count * self.interval * 1000, 3))
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "cms-project",
+            "activeProfileIndex": 0,
+            "shared": {
+                "frames": [{"name": key.name, "file": key.file or None, "line": key.line or None} for key in frames]
+            },
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": name,
+                    "unit": "milliseconds",
+                    "startValue": 0,
+                    "endValue": round(sum(weights), 3),
+                    "samples": samples,
+                    "weights": weights,
+                }
+            ],
+        }
+
+    def hot_functions(self, limit: int = 50) -> list[dict]:
+        """Functions by self samples (idle time excluded)."""
+        self_counts: Counter = Counter()
+        total_counts: Counter = Counter()
+        for stack, count in self.stacks.items():
+            _function_counts(stack, self_counts, total_counts, count)
+        return _hot_rows(self_counts, total_counts, self.samples, limit)
+
+
+_session_lock = threading.Lock()
+
+
+async def profile_worker(seconds: float, interval: float = 0.005) -> Profile:
+    """Sample this worker's event loop for seconds; raises ProfilerBusyError if a session is running."""
+    if not _session_lock.acquire(blocking=False):
+        raise ProfilerBusyError("A profiling session is already running in this worker")
+    try:
+        profile = Profile(interval)
+        stop = threading.Event()
+        sampler = threading.Thread(
+            target=_sample_loop,
+            args=(threading.get_ident(), asyncio.get_running_loop(), interval, profile.add, stop),
+            name="cms-profiler",
+            daemon=True,
+        )
+        # The sampler needs the GIL on time; a busy loop thread would otherwise only
+        # hand it over when it blocks, biasing samples towards idle moments
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(switch_interval, interval / 2))
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            stop.set()
+            await asyncio.to_thread(sampler.join)
+            profile.duration = time.perf_counter() - start
+            sys.setswitchinterval(switch_interval)
+        return profile
+    finally:
+        _session_lock.release()
+
+
+class RequestSampler:
+    """Always-on low-rate sampling while sampled requests are in flight"""
+
+    def __init__(self, interval: float = 0.01, window_seconds: int = 60, windows: int = 60, top_n: int = 50):
+        self.interval = interval
+        self.window_seconds = window_seconds
+        self.top_n = top_n
+        self._ring: deque[tuple[float, int, Counter, Counter]] = deque(maxlen=windows)
+        self._window_start = time.time()
+        self._samples = 0
+        self._self: Counter = Counter()
+        self._total: Counter = Counter()
+        self._active = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._target: tuple[int, asyncio.AbstractEventLoop] | None = None
+
+    def begin(self) -> None:
+        """A sampled request started (call from the event loop thread)."""
+        with self._lock:
+            self._active += 1
+            if self._thread is None:
+                self._target = (threading.get_ident(), asyncio.get_running_loop())
+                self._thread = threading.Thread(target=self._run, name="cms-request-sampler", daemon=True)
+                self._thread.start()
+            self._wakeup.set()
+
+    def end(self) -> None:
+        with self._lock:
+            self._active -= 1
+            if self._active <= 0:
+                self._active = 0
+                self._wakeup.clear()
+
+    def _run(self) -> None:
+        thread_id, loop = self._target
+        while True:
+            self._wakeup.wait()
+            time.sleep(self.interval)
+            if self._active:
+                stack = sample_stack(thread_id, loop)
+                if stack:
+                    self.record(stack)
+
+    def record(self, stack: tuple[FrameKey, ...]) -> None:
+        with self._lock:
+            now = time.time()
+            if now - self._window_start >= self.window_seconds:
+                self._rotate(now)
+            self._samples += 1
+            _function_counts(stack, self._self, self._total)
+
+    def _rotate(self, now: float) -> None:
+        # Keep only each window's hottest functions
+        top = Counter(dict(self._self.most_common(self.top_n)))
+        self._ring.append((self._window_start, self._samples, top, Counter({k: self._total[k] for k in top})))
+        self._window_start = now
+        self._samples = 0
+        self._self = Counter()
+        self._total = Counter()
+
+    def hot_functions(self, limit: int | None = None) -> dict:
+        """Hottest functions over the ring buffer and the current window."""
+        with self._lock:
+            windows = [*self._ring, (self._window_start, self._samples, self._self, self._total)]
+            self_counts: Counter = Counter()
+            total_counts: Counter = Counter()
+            samples = 0
+            for _, window_samples, window_self, window_total in windows:
+                samples += window_samples
+                self_counts.update(window_self)
+                total_counts.update(window_total)
+            since = windows[0][0]
+        return {
+            "since": since,
+            "samples": samples,
+            "functions": _hot_rows(self_counts, total_counts, samples, limit or self.top_n),
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._ring.clear()
+            self._window_start = time.time()
+            self._samples = 0
+            self._self = Counter()
+            self._total = Counter()
+
+
+# Process-wide always-on sampler fed by SampledProfilingMiddleware
+request_sampler = RequestSampler(
+    interval=settings.profiler_sample_interval_ms / 1000,
+    window_seconds=settings.profiler_window_seconds,
+    windows=settings.profiler_windows,
+    top_n=settings.profiler_hot_functions,
+)
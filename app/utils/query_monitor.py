@@ -4,10 +4,26 @@ Database Query Monitor
 Automatic slow query logging and Prometheus instrumentation
 via SQLAlchemy event listeners. Attach once at startup to
 instrument ALL queries without per-service decorators.
+
+Queries are also attributed to the request that ran them: while a
+``QueryStats`` is active in ``current_query_stats`` (QueryProfilingMiddleware
+sets one per request), every statement adds to its count, its total time and
+the tally of its normalized fingerprint.  A fingerprint repeated more than
+``query_n_plus_one_threshold`` times in one request is the N+1 signature.
+``endpoint_query_stats`` aggregates finished requests per endpoint for the
+dev-mode ``/metrics/queries`` report.
 """
 
 import logging
+import re
+import threading
 import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from weakref import WeakKeyDictionary
 
 from sqlalchemy import event
 
@@ -15,33 +31,166 @@ from app.utils.metrics import DB_QUERIES_TOTAL, DB_QUERY_DURATION_SECONDS
 
 logger = logging.getLogger(__name__)
 
+MAX_TRACKED_ENDPOINTS = 500  # endpoints beyond this are not aggregated
+
+_slow_thresholds_ms: WeakKeyDictionary = WeakKeyDictionary()
+
+_PLACEHOLDER_RE = re.compile(r"\$\d+|%\([^)]*\)s|%s")
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\bIN \(\?(?:, \?)*\)", re.IGNORECASE)
+_ROWS_RE = re.compile(r"(\(\?(?:, \?)*\))(?:, \1)+")
+_SPACE_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    """
+    Normalize a statement so executions differing only in values compare equal.
+
+    Literals and bind placeholders become ``?``, ``IN`` lists and multi-row
+    ``VALUES`` collapse to one element, whitespace is collapsed.
+    """
+    normalized = _SPACE_RE.sub(" ", statement).strip()
+    normalized = _STRING_RE.sub("?", normalized)
+    normalized = _PLACEHOLDER_RE.sub("?", normalized)
+    normalized = _NUMBER_RE.sub("?", normalized)
+    normalized = _IN_LIST_RE.sub("IN (...)", normalized)
+    return _ROWS_RE.sub(r"\1, ...", normalized)
+
+
+class QueryStats:
+    """Queries run while one request (or a ``track_queries`` block) was active"""
+
+    __slots__ = ("count", "total_ms", "fingerprints")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_ms = 0.0
+        self.fingerprints: Counter[str] = Counter()
+
+    def record(self, statement: str, duration_ms: float) -> None:
+        self.count += 1
+        self.total_ms += duration_ms
+        self.fingerprints[fingerprint(statement)] += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Fingerprints executed more than threshold times, most frequent first."""
+        return [(fp, n) for fp, n in self.fingerprints.most_common() if n > threshold]
+
+
+current_query_stats: ContextVar[QueryStats | None] = ContextVar("current_query_stats", default=None)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Attribute the queries run inside the block (and tasks it starts) to a new QueryStats."""
+    stats = QueryStats()
+    token = current_query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        current_query_stats.reset(token)
+
+
+class EndpointQueryStats:
+    """Per-worker query totals of finished requests, by endpoint"""
+
+    def __init__(self, max_endpoints: int = MAX_TRACKED_ENDPOINTS):
+        self.max_endpoints = max_endpoints
+        self._endpoints: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint: str, stats: QueryStats, n_plus_one: list[tuple[str, int]]) -> None:
+        with self._lock:
+            entry = self._endpoints.get(endpoint)
+            if entry is None:
+                if len(self._endpoints) >= self.max_endpoints:
+                    return
+                entry = self._endpoints[endpoint] = {
+                    "requests": 0,
+                    "queries": 0,
+                    "max_queries": 0,
+                    "db_ms": 0.0,
+                    "n_plus_one_requests": 0,
+                    "worst_repeat": None,
+                }
+            entry["requests"] += 1
+            entry["queries"] += stats.count
+            entry["max_queries"] = max(entry["max_queries"], stats.count)
+            entry["db_ms"] += stats.total_ms
+            if n_plus_one:
+                entry["n_plus_one_requests"] += 1
+                statement, count = n_plus_one[0]
+                if entry["worst_repeat"] is None or count > entry["worst_repeat"]["count"]:
+                    entry["worst_repeat"] = {"statement": statement, "count": count}
+
+    def worst(self, limit: int | None = 20) -> list[dict]:
+        """Endpoints by average queries per request, highest first."""
+        with self._lock:
+            rows = [
+                {
+                    "endpoint": endpoint,
+                    "requests": entry["requests"],
+                    "avg_queries": round(entry["queries"] / entry["requests"], 2),
+                    "max_queries": entry["max_queries"],
+                    "avg_db_ms": round(entry["db_ms"] / entry["requests"], 2),
+                    "n_plus_one_requests": entry["n_plus_one_requests"],
+                    "worst_repeat": entry["worst_repeat"],
+                }
+                for endpoint, entry in self._endpoints.items()
+            ]
+        rows.sort(key=lambda row: (row["avg_queries"], row["max_queries"]), reverse=True)
+        return rows[:limit]
+
+    def get(self, endpoint: str) -> dict | None:
+        with self._lock:
+            entry = self._endpoints.get(endpoint)
+            return dict(entry) if entry else None
+
+    def reset(self) -> None:
+        with self._lock:
+            self._endpoints.clear()
+
+
+# Process-wide aggregate fed by QueryProfilingMiddleware
+endpoint_query_stats = EndpointQueryStats()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info["query_start_time"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = conn.info.pop("query_start_time", None)
+    if start is None:
+        return
+    duration = time.perf_counter() - start
+    duration_ms = duration * 1000
+
+    # Determine operation type from statement
+    trimmed = statement.strip()
+    operation = trimmed.split()[0].lower() if trimmed else "unknown"
+
+    DB_QUERIES_TOTAL.labels(operation=operation).inc()
+    DB_QUERY_DURATION_SECONDS.labels(operation=operation).observe(duration)
+
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.record(statement, duration_ms)
+
+    if duration_ms > _slow_thresholds_ms.get(conn.engine, 100):
+        logger.warning(
+            "Slow query detected (%.1fms): %s",
+            duration_ms,
+            trimmed[:200],
+        )
+
 
 def install_query_monitor(engine, slow_threshold_ms: int = 100) -> None:
-    """Install event listeners on the async engine for query monitoring."""
+    """Install event listeners on the async engine for query monitoring (idempotent)."""
     sync_engine = engine.sync_engine
-
-    @event.listens_for(sync_engine, "before_cursor_execute")
-    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
-        conn.info["query_start_time"] = time.perf_counter()
-
-    @event.listens_for(sync_engine, "after_cursor_execute")
-    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
-        start = conn.info.pop("query_start_time", None)
-        if start is None:
-            return
-        duration = time.perf_counter() - start
-        duration_ms = duration * 1000
-
-        # Determine operation type from statement
-        trimmed = statement.strip()
-        operation = trimmed.split()[0].lower() if trimmed else "unknown"
-
-        DB_QUERIES_TOTAL.labels(operation=operation).inc()
-        DB_QUERY_DURATION_SECONDS.labels(operation=operation).observe(duration)
-
-        if duration_ms > slow_threshold_ms:
-            logger.warning(
-                "Slow query detected (%.1fms): %s",
-                duration_ms,
-                trimmed[:200],
-            )
+    _slow_thresholds_ms[sync_engine] = slow_threshold_ms
+    if not event.contains(sync_engine, "after_cursor_execute", _after_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
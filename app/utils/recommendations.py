@@ -0,0 +1,505 @@
+"""
+Related-Content Recommendations
+
+Precomputes the top-k most similar published items for every published
+content item and stores them in ``content_recommendations``, so an
+article page reads its related items with one indexed lookup instead of
+an ad-hoc tag-overlap query.
+
+Each item becomes a sparse TF-IDF vector over its tags, category, title,
+keywords, description and the start of its body (tags and title weigh
+most).  Vectors are L2-normalized and pruned to their heaviest terms, so
+similarity is a cosine computed through an inverted index: only items
+that share a term are ever compared.  Terms carried by more than
+``MAX_DF`` of a non-trivial corpus are dropped because they relate
+everything to everything.
+
+- install_recommendation_job() rebuilds the whole table periodically.
+- schedule_recommendation_refresh() recomputes one item's neighbors when
+  it is published and upserts it into its neighbors' lists, so new
+  content shows up without waiting for the rebuild.  Refreshes are queued
+  and coalesced, and run one at a time on a single background task.
+
+The index built by the last rebuild is kept per worker and a refresh only
+re-vectorizes the published item (and any neighbor this worker has not
+indexed yet), so publishing does not reload the corpus.  Other items keep
+the IDF weights they were built with until the next rebuild.
+
+Vector math for the full build runs on a worker thread; only loading the
+corpus and writing rows touch the event loop.
+"""
+
+import asyncio
+import heapq
+import logging
+import math
+import re
+from collections import Counter, defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+from apscheduler.triggers.interval import IntervalTrigger
+from sqlalchemy import delete, func, insert, or_, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.content import Content, ContentStatus
+from app.models.content_relations import ContentRecommendation
+from app.models.content_tags import content_tags
+
+logger = logging.getLogger(__name__)
+
+BODY_CHARS = 2000  # only the opening of the body is indexed
+MAX_TERMS = 64  # terms kept per vector after weighting
+MAX_DF = 0.5  # terms in more than this share of the corpus are not indexed
+MIN_CORPUS_FOR_MAX_DF = 20  # below this many items MAX_DF is not applied
+MIN_SCORE = 0.05  # weaker matches are noise, not recommendations
+INSERT_BATCH_SIZE = 1000
+REFRESH_DEBOUNCE_SECONDS = 2.0  # publishes within this window are refreshed together
+
+# Per-field multipliers applied to term counts before TF-IDF
+FIELD_WEIGHTS = {"tag": 3.0, "category": 1.5, "title": 2.0, "keywords": 2.0, "description": 1.0, "body": 0.5}
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_TOKEN_RE = re.compile(r"[a-z0-9]{3,}")
+_STOPWORDS = frozenset(
+    [
+        "the",
+        "and",
+        "for",
+        "are",
+        "but",
+        "not",
+        "you",
+        "all",
+        "any",
+        "can",
+        "had",
+        "her",
+        "was",
+        "one",
+        "our",
+        "out",
+        "day",
+        "get",
+        "has",
+        "him",
+        "his",
+        "how",
+        "man",
+        "new",
+        "now",
+        "old",
+        "see",
+        "two",
+        "way",
+        "who",
+        "boy",
+        "did",
+        "its",
+        "let",
+        "put",
+        "say",
+        "she",
+        "too",
+        "use",
+        "that",
+        "with",
+        "have",
+        "this",
+        "will",
+        "your",
+        "from",
+        "they",
+        "know",
+        "want",
+        "been",
+        "good",
+        "much",
+        "some",
+        "time",
+        "very",
+        "when",
+        "come",
+        "here",
+        "just",
+        "like",
+        "long",
+        "make",
+        "many",
+        "more",
+        "only",
+        "over",
+        "such",
+        "take",
+        "than",
+        "them",
+        "well",
+        "were",
+        "what",
+        "into",
+        "about",
+        "after",
+        "also",
+        "could",
+        "first",
+        "other",
+        "their",
+        "there",
+        "these",
+        "those",
+        "which",
+        "would",
+    ]
+)
+
+# One neighbor: (content id, cosine similarity)
+Neighbor = tuple[int, float]
+
+
+def _tokens(text: str | None) -> list[str]:
+    if not text:
+        return []
+    return [t for t in _TOKEN_RE.findall(_TAG_RE.sub(" ", text).lower()) if t not in _STOPWORDS]
+
+
+def extract_features(
+    title: str | None,
+    description: str | None = None,
+    keywords: str | None = None,
+    body: str | None = None,
+    category_id: int | None = None,
+    tag_ids: Iterable[int] = (),
+) -> Counter:
+    """Weighted term counts for one item; tags and category become synthetic terms."""
+    features: Counter = Counter()
+    for tag_id in tag_ids:
+        features[f"tag:{tag_id}"] += FIELD_WEIGHTS["tag"]
+    if category_id is not None:
+        features[f"category:{category_id}"] += FIELD_WEIGHTS["category"]
+    for name, text in (("title", title), ("keywords", keywords), ("description", description), ("body", body)):
+        for token in _tokens(text):
+            features[token] += FIELD_WEIGHTS[name]
+    return features
+
+
+@dataclass
+class SimilarityIndex:
+    """Normalized sparse vectors plus the inverted index used to compare them."""
+
+    vectors: dict[int, dict[str, float]] = field(default_factory=dict)
+    postings: dict[str, dict[int, float]] = field(default_factory=dict)
+    df: Counter = field(default_factory=Counter)
+    terms: dict[int, frozenset[str]] = field(default_factory=dict)  # raw terms per item, to undo its df
+    max_terms: int = MAX_TERMS
+    max_df: float = MAX_DF
+
+    @classmethod
+    def build(cls, documents: dict[int, Counter], max_terms: int = MAX_TERMS, max_df: float = MAX_DF):
+        """Weight, normalize and index documents (content id -> weighted term counts)."""
+        index = cls(max_terms=max_terms, max_df=max_df)
+        for doc_id, features in documents.items():
+            index.terms[doc_id] = frozenset(features)
+            index.df.update(features.keys())
+        for doc_id, features in documents.items():
+            index._add_vector(doc_id, features)
+        return index
+
+    def update(self, doc_id: int, features: Counter) -> None:
+        """Add or re-vectorize one item; other vectors keep their weights."""
+        self.remove(doc_id)
+        self.terms[doc_id] = frozenset(features)
+        self.df.update(features.keys())
+        self._add_vector(doc_id, features)
+
+    def remove(self, doc_id: int) -> None:
+        for term in self.terms.pop(doc_id, ()):
+            self.df[term] -= 1
+            if self.df[term] <= 0:
+                del self.df[term]
+        for term in self.vectors.pop(doc_id, {}):
+            posting = self.postings.get(term, {})
+            posting.pop(doc_id, None)
+            if not posting:
+                self.postings.pop(term, None)
+
+    def _add_vector(self, doc_id: int, features: Counter) -> None:
+        n = len(self.terms)
+        # Document frequency says little in a tiny corpus; there only idf damps common terms
+        df_limit = int(self.max_df * n) if n >= MIN_CORPUS_FOR_MAX_DF else n
+        weights = {
+            term: (1 + math.log(tf)) * math.log((n + 1) / (self.df[term] + 1))
+            for term, tf in features.items()
+            if self.df[term] <= df_limit
+        }
+        top = heapq.nlargest(self.max_terms, ((w, t) for t, w in weights.items() if w > 0))
+        norm = math.sqrt(sum(w * w for w, _ in top))
+        if not norm:
+            return
+        vector = {term: w / norm for w, term in top}
+        self.vectors[doc_id] = vector
+        # Terms only this item has stay posted, so an item published later can match them
+        for term, w in vector.items():
+            self.postings.setdefault(term, {})[doc_id] = w
+
+    def similarity(self, a: int, b: int) -> float:
+        va, vb = self.vectors.get(a), self.vectors.get(b)
+        if not va or not vb:
+            return 0.0
+        if len(vb) < len(va):
+            va, vb = vb, va
+        return sum(w * vb.get(term, 0.0) for term, w in va.items())
+
+    def neighbors(self, doc_id: int, k: int, min_score: float = MIN_SCORE) -> list[Neighbor]:
+        """Top-k most similar items to doc_id, best first."""
+        scores: dict[int, float] = defaultdict(float)
+        for term, w in self.vectors.get(doc_id, {}).items():
+            for other, other_w in self.postings.get(term, {}).items():
+                if other != doc_id:
+                    scores[other] += w * other_w
+        best = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [(other, round(score, 6)) for other, score in best if score >= min_score]
+
+    def all_neighbors(self, k: int, min_score: float = MIN_SCORE) -> dict[int, list[Neighbor]]:
+        return {doc_id: self.neighbors(doc_id, k, min_score) for doc_id in self.vectors}
+
+
+async def load_corpus(db: AsyncSession, content_ids: Iterable[int] | None = None) -> dict[int, Counter]:
+    """Features of every published item, or of those among content_ids (two queries; bodies are truncated in SQL)."""
+    published = Content.status == ContentStatus.PUBLISHED
+    if content_ids is not None:
+        published = published & Content.id.in_(list(content_ids))
+    rows = await db.execute(
+        select(
+            Content.id,
+            Content.title,
+            Content.description,
+            Content.meta_keywords,
+            Content.category_id,
+            func.left(Content.body, BODY_CHARS),
+        ).where(published)
+    )
+    tag_rows = await db.execute(
+        select(content_tags.c.content_id, content_tags.c.tag_id)
+        .join(Content, Content.id == content_tags.c.content_id)
+        .where(published)
+    )
+    tags: dict[int, list[int]] = defaultdict(list)
+    for content_id, tag_id in tag_rows:
+        tags[content_id].append(tag_id)
+
+    return {
+        content_id: extract_features(title, description, keywords, body, category_id, tags.get(content_id, ()))
+        for content_id, title, description, keywords, category_id, body in rows
+    }
+
+
+async def _insert_rows(rows: list[dict], db: AsyncSession) -> None:
+    for start in range(0, len(rows), INSERT_BATCH_SIZE):
+        await db.execute(insert(ContentRecommendation), rows[start : start + INSERT_BATCH_SIZE])
+
+
+# Index from the last rebuild on this worker, kept current by refreshes
+_cached_index: SimilarityIndex | None = None
+
+
+async def _similarity_index(db: AsyncSession) -> SimilarityIndex:
+    """The cached index, built from the corpus the first time a worker needs it."""
+    global _cached_index
+    if _cached_index is None:
+        documents = await load_corpus(db)
+        _cached_index = await asyncio.to_thread(SimilarityIndex.build, documents)
+    return _cached_index
+
+
+async def rebuild_recommendations(db: AsyncSession, top_k: int = 10) -> int:
+    """Recompute the whole table in one transaction; returns the number of rows written."""
+    global _cached_index
+    documents = await load_corpus(db)
+
+    def compute() -> tuple[SimilarityIndex, dict[int, list[Neighbor]]]:
+        index = SimilarityIndex.build(documents)
+        return index, index.all_neighbors(top_k)
+
+    index, neighbors = await asyncio.to_thread(compute)
+    rows = [
+        {"content_id": content_id, "related_content_id": other, "score": score}
+        for content_id, items in neighbors.items()
+        for other, score in items
+    ]
+    await db.execute(delete(ContentRecommendation))
+    await _insert_rows(rows, db)
+    await db.commit()
+    _cached_index = index
+    return len(rows)
+
+
+async def _live_neighbors(index: SimilarityIndex, content_id: int, top_k: int, db: AsyncSession) -> list[Neighbor]:
+    """Top-k neighbors that are still published; items unpublished elsewhere leave the index."""
+    while True:
+        own = index.neighbors(content_id, top_k)
+        if not own:
+            return own
+        ids = [other for other, _ in own]
+        live = set(
+            (
+                await db.execute(
+                    select(Content.id).where(Content.id.in_(ids), Content.status == ContentStatus.PUBLISHED)
+                )
+            ).scalars()
+        )
+        if len(live) == len(ids):
+            return own
+        for other in set(ids) - live:
+            index.remove(other)
+
+
+async def refresh_recommendations(content_id: int, db: AsyncSession, top_k: int = 10) -> int:
+    """
+    Recompute one item's neighbors and fold it into the lists that should now include it.
+
+    Only the item itself (and neighbors this worker has not indexed yet) is
+    loaded and vectorized.  Similarity is symmetric, so the item's score in
+    any other list is its cosine with that list's owner.  Lists that held
+    the item but no longer rank it drop it.  Unpublished items simply lose
+    their rows.  Rows are upserted, so a concurrent refresh on another
+    worker cannot make this one fail.
+
+    Returns:
+        The number of neighbors stored for the item.
+    """
+    index = await _similarity_index(db)
+    affected_rows = await db.execute(
+        select(ContentRecommendation.content_id).where(ContentRecommendation.related_content_id == content_id)
+    )
+    listing_it = set(affected_rows.scalars().all())
+
+    documents = await load_corpus(db, {content_id} | (listing_it - index.vectors.keys()))
+    for doc_id, features in documents.items():
+        index.update(doc_id, features)
+
+    if content_id not in documents:
+        index.remove(content_id)
+        await db.execute(
+            delete(ContentRecommendation).where(
+                or_(
+                    ContentRecommendation.content_id == content_id,
+                    ContentRecommendation.related_content_id == content_id,
+                )
+            )
+        )
+        await db.commit()
+        return 0
+
+    own = await _live_neighbors(index, content_id, top_k, db)
+    owners = (listing_it | {other for other, _ in own}) - {content_id}
+
+    current: dict[int, list[Neighbor]] = defaultdict(list)
+    if owners:
+        result = await db.execute(
+            select(
+                ContentRecommendation.content_id,
+                ContentRecommendation.related_content_id,
+                ContentRecommendation.score,
+            ).where(
+                ContentRecommendation.content_id.in_(owners),
+                ContentRecommendation.related_content_id != content_id,
+            )
+        )
+        for owner, other, score in result:
+            current[owner].append((other, score))
+
+    rows = [{"content_id": content_id, "related_content_id": other, "score": score} for other, score in own]
+    for owner in owners:
+        score = round(index.similarity(owner, content_id), 6)
+        candidates = current[owner] + ([(content_id, score)] if score >= MIN_SCORE else [])
+        kept = heapq.nlargest(top_k, candidates, key=lambda item: item[1])
+        rows.extend({"content_id": owner, "related_content_id": other, "score": s} for other, s in kept)
+
+    pairs = [(row["content_id"], row["related_content_id"]) for row in rows]
+    stale = delete(ContentRecommendation).where(ContentRecommendation.content_id.in_(owners | {content_id}))
+    if pairs:
+        stale = stale.where(
+            tuple_(ContentRecommendation.content_id, ContentRecommendation.related_content_id).not_in(pairs)
+        )
+    await db.execute(stale)
+    for start in range(0, len(rows), INSERT_BATCH_SIZE):
+        stmt = pg_insert(ContentRecommendation).values(rows[start : start + INSERT_BATCH_SIZE])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ContentRecommendation.content_id, ContentRecommendation.related_content_id],
+            set_={"score": stmt.excluded.score},
+        )
+        await db.execute(stmt)
+    await db.commit()
+    return len(own)
+
+
+async def _refresh_in_background(content_id: int, top_k: int) -> None:
+    try:
+        async with AsyncSessionLocal() as db:
+            await refresh_recommendations(content_id, db, top_k)
+    except Exception as exc:
+        logger.warning("recommendations: refresh for content %d failed: %s", content_id, exc)
+
+
+# content id -> top_k of refreshes waiting for the worker task
+_queued_refreshes: dict[int, int] = {}
+_refresh_worker: asyncio.Task | None = None
+
+
+async def _drain_refreshes() -> None:
+    """Run queued refreshes one at a time until the queue stays empty for a debounce window."""
+    while _queued_refreshes:
+        await asyncio.sleep(REFRESH_DEBOUNCE_SECONDS)
+        batch = dict(_queued_refreshes)
+        _queued_refreshes.clear()
+        for content_id, top_k in batch.items():
+            await _refresh_in_background(content_id, top_k)
+
+
+def schedule_recommendation_refresh(content_id: int, top_k: int | None = None) -> None:
+    """
+    Queue a refresh after a publish; uses its own session.
+
+    Publishing the same item again before the queue drains refreshes it
+    once, and a single task per worker applies the queue in order, so
+    refreshes never race each other over the same neighbor lists.
+    """
+    global _refresh_worker
+    _queued_refreshes[content_id] = top_k or settings.recommendations_top_k
+    # The module holds the task, so it is not garbage-collected mid-flight
+    if _refresh_worker is None or _refresh_worker.done():
+        _refresh_worker = asyncio.create_task(_drain_refreshes())
+
+
+async def _run_rebuild(top_k: int) -> None:
+    """Scheduled job: recompute every item's neighbors."""
+    try:
+        async with AsyncSessionLocal() as db:
+            written = await rebuild_recommendations(db, top_k)
+    except Exception as exc:
+        logger.warning("recommendations: rebuild failed: %s", exc)
+        return
+    logger.info("recommendations: rebuilt %d rows", written)
+
+
+def install_recommendation_job(scheduler, interval_minutes: int = 1440, top_k: int = 10) -> None:
+    """
+    Register the periodic full rebuild with the shared APScheduler instance.
+
+    Args:
+        scheduler: The application's AsyncIOScheduler (from app.scheduler).
+        interval_minutes: How often to rebuild (default daily).
+        top_k: Neighbors stored per item.
+    """
+    scheduler.add_job(
+        _run_rebuild,
+        trigger=IntervalTrigger(minutes=interval_minutes),
+        args=[top_k],
+        id="recommendation_rebuild",
+        replace_existing=True,
+        max_instances=1,
+    )
+    logger.info("recommendations: rebuild installed (interval=%dmin, top_k=%d)", interval_minutes, top_k)
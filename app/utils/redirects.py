@@ -0,0 +1,184 @@
+"""
+Redirect Resolution Table
+
+Legacy slugs are looked up on every unknown-slug request, much of it
+crawler traffic.  Instead of a ``content_redirects`` query per lookup, each
+worker holds every redirect in a dict keyed by old slug, so hits and misses
+alike are answered from memory.
+
+- The table is loaded lazily in one streamed query (joined to the target's
+  current slug) and shared by concurrent lookups while it loads.
+- Chains are collapsed at load time: if a redirect's target slug is itself
+  a redirected slug (legacy imports), the entry points at the end of the
+  chain, so A -> B -> C resolves in one hop.  A temporary (302) hop makes
+  the collapsed redirect temporary.
+- Anything that changes redirects or a redirected item's slug publishes
+  ``REDIRECTS_TOPIC`` on the cache bus; every worker drops its table and
+  reloads on the next lookup.
+- Hits are counted in memory and written to ``content_redirects.hit_count``
+  by install_redirect_jobs() in one executemany UPDATE per flush.
+"""
+
+import logging
+from collections import Counter
+from typing import NamedTuple
+
+from apscheduler.triggers.interval import IntervalTrigger
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import AsyncSessionLocal
+from app.models.content import Content
+from app.models.content_relations import ContentRedirect
+from app.utils.cache_bus import cache_bus
+from app.utils.single_flight import SingleFlightCache
+
+logger = logging.getLogger(__name__)
+
+REDIRECTS_TOPIC = "redirects"
+LOAD_BATCH_SIZE = 10000
+MAX_CHAIN_HOPS = 16
+
+
+class ResolvedRedirect(NamedTuple):
+    """One table entry; a tuple keeps hundreds of thousands of them compact"""
+
+    redirect_id: int
+    old_slug: str
+    content_id: int
+    new_slug: str
+    status_code: int
+
+
+def collapse_chains(table: dict[str, ResolvedRedirect]) -> dict[str, ResolvedRedirect]:
+    """Point every entry at the end of its chain; entries in a cycle are left as they are."""
+    collapsed = {}
+    for old_slug, entry in table.items():
+        final, status_code, seen = entry, entry.status_code, {old_slug}
+        while final.new_slug in table and final.new_slug not in seen and len(seen) <= MAX_CHAIN_HOPS:
+            seen.add(final.new_slug)
+            final = table[final.new_slug]
+            if final.status_code == 302:
+                status_code = 302
+        if final is entry or final.new_slug in seen:
+            collapsed[old_slug] = entry
+        else:
+            collapsed[old_slug] = entry._replace(
+                content_id=final.content_id, new_slug=final.new_slug, status_code=status_code
+            )
+    return collapsed
+
+
+class RedirectResolver:
+    """Per-worker redirect table with cache-bus invalidation and batched hit counts"""
+
+    def __init__(self):
+        self._table: dict[str, ResolvedRedirect] | None = None
+        self._loads = SingleFlightCache()
+        self._hits: Counter = Counter()
+
+    def invalidate(self, key: str | None = None) -> None:
+        """Drop the table; the next lookup reloads it (cache-bus handler)."""
+        self._table = None
+        self._loads.invalidate()
+
+    def clear(self) -> None:
+        """Drop the table and uncounted hits (tests)."""
+        self.invalidate()
+        self._hits.clear()
+
+    @staticmethod
+    async def _load(db: AsyncSession) -> dict[str, ResolvedRedirect]:
+        result = await db.stream(
+            select(
+                ContentRedirect.id,
+                ContentRedirect.old_slug,
+                ContentRedirect.content_id,
+                Content.slug,
+                ContentRedirect.status_code,
+            )
+            .join(Content, Content.id == ContentRedirect.content_id)
+            .execution_options(yield_per=LOAD_BATCH_SIZE)
+        )
+        table = {}
+        async for partition in result.partitions():
+            for row in partition:
+                table[row[1]] = ResolvedRedirect(*row)
+        return collapse_chains(table)
+
+    async def table(self, db: AsyncSession) -> dict[str, ResolvedRedirect]:
+        """The current table, loading it with db if needed."""
+        if self._table is not None:
+            return self._table
+        return await self._loads.load(None, lambda: self._load(db), self._store)
+
+    def _store(self, table: dict[str, ResolvedRedirect]) -> None:
+        self._table = table
+        logger.info("redirects: loaded %d redirects", len(table))
+
+    async def resolve(self, slug: str, db: AsyncSession) -> ResolvedRedirect | None:
+        """Look up an old slug; counts the hit."""
+        entry = (await self.table(db)).get(slug)
+        if entry is not None:
+            self._hits[entry.redirect_id] += 1
+        return entry
+
+    async def flush_hits(self, db: AsyncSession) -> int:
+        """Add counted hits to hit_count; returns the number of redirects updated."""
+        hits, self._hits = self._hits, Counter()
+        if not hits:
+            return 0
+        table = ContentRedirect.__table__
+        try:
+            await db.execute(
+                update(table)
+                .where(table.c.id == bindparam("_id"))
+                .values(hit_count=table.c.hit_count + bindparam("_hits")),
+                [{"_id": redirect_id, "_hits": count} for redirect_id, count in hits.items()],
+            )
+            await db.commit()
+        except Exception:
+            # Keep the counts for the next flush
+            self._hits.update(hits)
+            raise
+        return len(hits)
+
+
+# Process-wide table shared by the routes and the flush job
+redirect_resolver = RedirectResolver()
+cache_bus.subscribe(REDIRECTS_TOPIC, redirect_resolver.invalidate)
+
+
+async def invalidate_redirects() -> None:
+    """Tell every worker that redirects (or a redirected item's slug) changed."""
+    await cache_bus.publish(REDIRECTS_TOPIC)
+
+
+async def flush_redirect_hits() -> None:
+    """Scheduled job (and shutdown hook): write counted redirect hits."""
+    try:
+        async with AsyncSessionLocal() as db:
+            written = await redirect_resolver.flush_hits(db)
+    except Exception as exc:
+        logger.warning("redirects: hit count flush failed: %s", exc)
+        return
+    if written:
+        logger.debug("redirects: flushed hits for %d redirects", written)
+
+
+def install_redirect_jobs(scheduler, hit_flush_interval_seconds: int = 60) -> None:
+    """
+    Register the redirect hit-count flush with the shared APScheduler instance.
+
+    Args:
+        scheduler: The application's AsyncIOScheduler (from app.scheduler).
+        hit_flush_interval_seconds: How often counted hits are written (default 60 s).
+    """
+    scheduler.add_job(
+        flush_redirect_hits,
+        trigger=IntervalTrigger(seconds=hit_flush_interval_seconds),
+        id="redirect_hit_flush",
+        replace_existing=True,
+        max_instances=1,
+    )
+    logger.info("redirects: hit flush installed (interval=%ds)", hit_flush_interval_seconds)
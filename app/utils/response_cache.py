@@ -0,0 +1,113 @@
+"""
+Pre-serialized Response Cache
+
+Caches the final encoded JSON body of public read endpoints together with
+its ETag, so a hit is one Redis HGETALL returned as a raw ``Response`` —
+no Pydantic validation and no JSON encoding.
+
+Keys are built from the route name, the endpoint's *resolved* parameters
+(so ``?skip=0`` and no ``skip`` share an entry) and the caller's principal
+class.  Entries are dropped by ``CacheManager.invalidate_responses()``,
+which ``invalidate_content()`` calls on every content event.
+"""
+
+import hashlib
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.utils.cache import CacheManager, cache_manager
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedResponse:
+    """An encoded JSON body and its strong ETag."""
+
+    body: bytes
+    etag: str
+
+    @classmethod
+    def from_body(cls, body: bytes) -> "CachedResponse":
+        return cls(body=body, etag='"' + hashlib.md5(body).hexdigest() + '"')  # nosec S324
+
+
+def principal_class(request: Request) -> str:
+    """Coarse caller class for cache partitioning: "anon" or "auth" (credentials are not decoded)."""
+    if request.headers.get("authorization") or request.cookies.get("access_token"):
+        return "auth"
+    return "anon"
+
+
+def response_cache_key(route: str, params: dict[str, Any], principal: str) -> str:
+    """Cache key for a route, its normalized parameters and the principal class."""
+    normalized = "&".join(
+        f"{name}={','.join(sorted(map(str, value))) if isinstance(value, set | list | tuple) else value}"
+        for name, value in sorted(params.items())
+        if value is not None
+    )
+    digest = hashlib.sha1(normalized.encode()).hexdigest()  # nosec S324
+    return f"{CacheManager.PREFIX_RESPONSE}{route}:{principal}:{digest}"
+
+
+async def get_cached_response(key: str) -> CachedResponse | None:
+    """Return the cached body for key, or None on a miss or when Redis is unavailable."""
+    client = await cache_manager.get_client()
+    if client is None:
+        return None
+    try:
+        entry = await client.hgetall(key)
+    except Exception as exc:
+        logger.warning("response_cache: get failed for %s: %s", key, exc)
+        return None
+    if not entry:
+        return None
+    body = entry["body"]
+    return CachedResponse(body=body.encode() if isinstance(body, str) else body, etag=entry["etag"])
+
+
+async def store_response(key: str, body: bytes, ttl: int = CacheManager.TTL_SHORT) -> CachedResponse:
+    """Cache an encoded body; failures are logged and ignored."""
+    cached = CachedResponse.from_body(body)
+    client = await cache_manager.get_client()
+    if client is None:
+        return cached
+    try:
+        async with client.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping={"body": body, "etag": cached.etag})
+            pipe.expire(key, ttl)
+            await pipe.execute()
+    except Exception as exc:
+        logger.warning("response_cache: set failed for %s: %s", key, exc)
+    return cached
+
+
+async def cached_json_response(
+    request: Request,
+    route: str,
+    params: dict[str, Any],
+    render: Callable[[], Any],
+    ttl: int = CacheManager.TTL_SHORT,
+) -> Response:
+    """
+    Serve a JSON body from the response cache, rendering and storing it on a miss.
+
+    render is an async callable returning the encoded body (bytes); it only
+    runs on a miss.  Answers a matching If-None-Match with 304.
+    """
+    key = response_cache_key(route, params, principal_class(request))
+    cached = await get_cached_response(key)
+    status = "HIT"
+    if cached is None:
+        cached = await store_response(key, await render(), ttl)
+        status = "MISS"
+
+    headers = {"ETag": cached.etag, "X-Cache": status}
+    if request.headers.get("if-none-match") == cached.etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
@@ -0,0 +1,217 @@
+"""
+Search Analytics Writer
+
+Buffers search events in memory and writes them in batches from a recurring
+APScheduler job, so search requests never open a write transaction.
+
+Each flush performs one multi-row INSERT into search_queries and one
+INSERT ... ON CONFLICT upsert into search_query_rollups keyed by
+(day, normalized_query).  The analytics endpoint reads only the rollups.
+
+Attach once at startup via install_search_analytics_writer().
+"""
+
+import asyncio
+import contextlib
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+
+from apscheduler.triggers.interval import IntervalTrigger
+from sqlalchemy import insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.search_query import SearchQuery, SearchQueryRollup
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SearchEvent:
+    """A single search awaiting persistence."""
+
+    query: str
+    results_count: int
+    execution_time_ms: float
+    user_id: int | None = None
+    filters_used: dict | None = None
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc).replace(tzinfo=None))
+
+    @property
+    def normalized_query(self) -> str:
+        return self.query.strip().lower()
+
+    @property
+    def day(self) -> date:
+        return self.created_at.date()
+
+
+class SearchAnalyticsBuffer:
+    """
+    In-process buffer of search events with batched persistence.
+
+    record() is synchronous and O(1); it never touches the database.  When the
+    buffer exceeds max_size the oldest events are dropped (analytics are
+    best-effort and must never slow down or fail a search).
+    """
+
+    def __init__(self, max_size: int = 10000, batch_size: int = 1000):
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self._events: deque[SearchEvent] = deque(maxlen=max_size)
+        self._lock = asyncio.Lock()
+        self._flush_task: asyncio.Task | None = None
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def record(self, event: SearchEvent) -> None:
+        """Queue an event; schedules an early flush once a full batch is waiting."""
+        if len(self._events) == self.max_size:
+            self.dropped += 1
+        self._events.append(event)
+
+        if len(self._events) >= self.batch_size and (self._flush_task is None or self._flush_task.done()):
+            # No running loop (sync caller) — the scheduled job will pick it up
+            with contextlib.suppress(RuntimeError):
+                self._flush_task = asyncio.get_running_loop().create_task(self.flush())
+
+    async def flush(self, db: AsyncSession | None = None) -> int:
+        """
+        Persist all buffered events.
+
+        Opens its own session unless one is supplied; a supplied session is
+        rolled back on failure so the caller can keep using it.  Returns the
+        number of events written, or 0 on failure (graceful degradation — the
+        batch is discarded rather than retried so a bad row cannot wedge the
+        writer, and counted in ``dropped``).
+        """
+        async with self._lock:
+            events = list(self._events)
+            self._events.clear()
+            if not events:
+                return 0
+
+            try:
+                if db is not None:
+                    await self._write(db, events)
+                else:
+                    # Resolved at call time so tests can swap the session factory
+                    from app import database
+
+                    async with database.AsyncSessionLocal() as session:
+                        await self._write(session, events)
+            except Exception as exc:
+                if db is not None:
+                    with contextlib.suppress(Exception):
+                        await db.rollback()
+                self.dropped += len(events)
+                logger.warning("search_analytics: flush failed, %d events lost: %s", len(events), exc)
+                return 0
+
+            return len(events)
+
+    async def _write(self, db: AsyncSession, events: list[SearchEvent]) -> None:
+        for start in range(0, len(events), self.batch_size):
+            chunk = events[start : start + self.batch_size]
+
+            await db.execute(
+                insert(SearchQuery),
+                [
+                    {
+                        "query": e.query,
+                        "normalized_query": e.normalized_query,
+                        "results_count": e.results_count,
+                        "user_id": e.user_id,
+                        "filters_used": e.filters_used,
+                        "execution_time_ms": round(e.execution_time_ms, 2),
+                        "created_at": e.created_at,
+                    }
+                    for e in chunk
+                ],
+            )
+
+            stmt = pg_insert(SearchQueryRollup).values(_aggregate(chunk))
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[SearchQueryRollup.day, SearchQueryRollup.normalized_query],
+                set_={
+                    "search_count": SearchQueryRollup.search_count + stmt.excluded.search_count,
+                    "zero_result_count": SearchQueryRollup.zero_result_count + stmt.excluded.zero_result_count,
+                    "total_results": SearchQueryRollup.total_results + stmt.excluded.total_results,
+                    "total_execution_time_ms": SearchQueryRollup.total_execution_time_ms
+                    + stmt.excluded.total_execution_time_ms,
+                },
+            )
+            await db.execute(stmt)
+
+        await db.commit()
+
+
+def _aggregate(events: list[SearchEvent]) -> list[dict]:
+    """Collapse events into one rollup row per (day, normalized_query)."""
+    rollups: dict[tuple[date, str], dict] = {}
+    for e in events:
+        key = (e.day, e.normalized_query)
+        row = rollups.get(key)
+        if row is None:
+            row = rollups[key] = {
+                "day": e.day,
+                "normalized_query": e.normalized_query,
+                "search_count": 0,
+                "zero_result_count": 0,
+                "total_results": 0,
+                "total_execution_time_ms": 0.0,
+            }
+        row["search_count"] += 1
+        row["zero_result_count"] += 1 if e.results_count == 0 else 0
+        row["total_results"] += e.results_count
+        row["total_execution_time_ms"] += e.execution_time_ms
+    return list(rollups.values())
+
+
+# Process-wide buffer shared by SearchService and the scheduled flush job
+search_analytics_buffer = SearchAnalyticsBuffer()
+
+
+async def _flush_search_analytics() -> None:
+    """Scheduled job: drain the buffer into search_queries / search_query_rollups."""
+    written = await search_analytics_buffer.flush()
+    if written:
+        logger.debug("search_analytics: flushed %d events", written)
+
+
+def install_search_analytics_writer(
+    scheduler,
+    interval_seconds: int = 5,
+    batch_size: int = 1000,
+    max_buffer_size: int = 10000,
+) -> None:
+    """
+    Register the search-analytics flush job with the shared APScheduler instance.
+
+    Args:
+        scheduler: The application's AsyncIOScheduler (from app.scheduler).
+        interval_seconds: How often buffered events are written (default 5 s).
+        batch_size: Rows per INSERT; also the queue depth that triggers an early flush.
+        max_buffer_size: Upper bound on buffered events before the oldest are dropped.
+    """
+    search_analytics_buffer.batch_size = batch_size
+    search_analytics_buffer.max_size = max_buffer_size
+    search_analytics_buffer._events = deque(search_analytics_buffer._events, maxlen=max_buffer_size)
+
+    scheduler.add_job(
+        _flush_search_analytics,
+        trigger=IntervalTrigger(seconds=interval_seconds),
+        id="search_analytics_writer",
+        replace_existing=True,
+        max_instances=1,
+    )
+    logger.info(
+        "search_analytics: installed (interval=%ds, batch=%d, max_buffer=%d)",
+        interval_seconds,
+        batch_size,
+        max_buffer_size,
+    )
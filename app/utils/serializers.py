@@ -0,0 +1,131 @@
+"""
+Fast JSON Serialization
+
+High-throughput response encoding for hot listing endpoints.
+
+* ``FastJSONResponse`` — an orjson-backed ``JSONResponse``; installed as the
+  application's default response class when ``FAST_JSON_RESPONSES`` is on.
+* ``SchemaSerializer`` — a per-schema serializer compiled once from a
+  Pydantic response model.  It reads attributes straight off ORM rows and
+  encodes them with orjson, skipping model validation, ``jsonable_encoder``
+  and the stdlib ``json`` module.  Output is byte-for-byte what
+  ``Model.model_validate(row).model_dump_json()`` produces for the same row.
+  Field selection is applied by compiling a narrower plan, so unrequested
+  attributes are never read.
+
+Serializers are only correct for flat schemas (scalars, datetimes, enums and
+JSON columns); anything needing validators or nested models should keep
+using the Pydantic model.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from decimal import Decimal
+from operator import attrgetter
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from starlette.responses import Response
+
+from app.schemas.content import ContentResponse
+from app.schemas.media import MediaResponse
+from app.schemas.user import UserResponse
+
+# UTC datetimes as "Z" to match Pydantic's JSON mode
+_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if isinstance(obj, set | frozenset):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(data: Any) -> bytes:
+    """Encode data with orjson using Pydantic-compatible conventions."""
+    return orjson.dumps(data, default=_default, option=_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+Getter = Callable[[Any], Any]
+
+
+class SchemaSerializer:
+    """
+    Serializer compiled from a flat Pydantic response model.
+
+    Usage::
+
+        CONTENT_SERIALIZER.dumps(rows, fields={"id", "title"})
+
+    Args:
+        model: Response model whose fields (in declaration order) define the output.
+        sources: Per-field getters for values that are not plain attributes
+            (e.g. ``{"role": lambda user: user.role.name}``).
+    """
+
+    def __init__(self, model: type[BaseModel], sources: dict[str, Getter] | None = None):
+        self.model = model
+        plan = []
+        for name, field in model.model_fields.items():
+            getter = (sources or {}).get(name) or attrgetter(name)
+            default = None if field.is_required() else field.get_default(call_default_factory=True)
+            plan.append((name, getter, default))
+        self._plan: tuple[tuple[str, Getter, Any], ...] = tuple(plan)
+        self._selected: dict[frozenset[str], tuple[tuple[str, Getter, Any], ...]] = {}
+
+    @property
+    def field_names(self) -> tuple[str, ...]:
+        return tuple(name for name, _, _ in self._plan)
+
+    def _compile(self, fields: Iterable[str] | None) -> tuple[tuple[str, Getter, Any], ...]:
+        if fields is None:
+            return self._plan
+        key = frozenset(fields)
+        plan = self._selected.get(key)
+        if plan is None:
+            plan = self._selected[key] = tuple(step for step in self._plan if step[0] in key)
+        return plan
+
+    def to_dict(self, obj: Any, fields: Iterable[str] | None = None) -> dict[str, Any]:
+        return self._row(obj, self._compile(fields))
+
+    def to_dicts(self, objs: Iterable[Any], fields: Iterable[str] | None = None) -> list[dict[str, Any]]:
+        plan = self._compile(fields)
+        return [self._row(obj, plan) for obj in objs]
+
+    def dumps(self, data: Any, fields: Iterable[str] | None = None) -> bytes:
+        """Encode one object or a list of objects to JSON bytes."""
+        if isinstance(data, list | tuple):
+            return dumps(self.to_dicts(data, fields))
+        return dumps(self.to_dict(data, fields))
+
+    def response(self, data: Any, fields: Iterable[str] | None = None, status_code: int = 200) -> Response:
+        """Encode data into a ready-to-send JSON ``Response``."""
+        return Response(content=self.dumps(data, fields), status_code=status_code, media_type="application/json")
+
+    @staticmethod
+    def _row(obj: Any, plan: tuple[tuple[str, Getter, Any], ...]) -> dict[str, Any]:
+        row = {}
+        for name, getter, default in plan:
+            value = getter(obj)
+            row[name] = default if value is None else value
+        return row
+
+
+CONTENT_SERIALIZER = SchemaSerializer(ContentResponse)
+MEDIA_SERIALIZER = SchemaSerializer(MediaResponse)
+USER_SERIALIZER = SchemaSerializer(UserResponse, sources={"role": lambda user: user.role.name})
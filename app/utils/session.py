@@ -3,6 +3,13 @@ Session Management with Redis (with in-memory fallback)
 
 Provides Redis-based session storage for user authentication and session tracking.
 Falls back to in-memory storage if Redis is not available.
+
+Reading a session is one round-trip: a Lua script returns it, stamps
+last_activity and slides the TTLs of the session and its user's session set.
+Creating a session is one transactional pipeline and listing a user's
+sessions reads them with one MGET.  Deleting a session is GETDEL followed
+by SREM; revoking all of a user's sessions is SMEMBERS followed by one
+transaction, whatever the number of sessions.
 """
 
 import json
@@ -17,6 +24,27 @@ from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+SESSION_PREFIX = "session:"
+USER_SESSIONS_PREFIX = "user_sessions:"
+
+# Return the session with last_activity updated, refreshing its TTL and the user's session set TTL.
+# The timestamp is replaced in the stored JSON rather than re-encoded, since
+# cjson would turn empty arrays in session data into objects.  The session set
+# key depends on the stored user_id, so it is built from the prefix in ARGV
+# (sessions live on a single primary, so the key need not be declared).
+# KEYS[1] session key; ARGV: last_activity, ttl, user sessions key prefix
+_GET_AND_TOUCH = """
+local raw = redis.call('GET', KEYS[1])
+if not raw then return false end
+local updated = string.gsub(raw, '"last_activity": *"[^"]*"', '"last_activity": "' .. ARGV[1] .. '"', 1)
+redis.call('SET', KEYS[1], updated, 'EX', ARGV[2])
+local ok, data = pcall(cjson.decode, raw)
+if ok and type(data) == 'table' and data['user_id'] then
+    redis.call('EXPIRE', ARGV[3] .. tostring(data['user_id']), ARGV[2])
+end
+return updated
+"""
+
 
 class InMemorySessionManager:
     """
@@ -147,6 +175,16 @@ class RedisSessionManager:
         self._redis: redis.Redis | None = None
         self._pool: redis.ConnectionPool | None = None
         self._sentinel: redis.Sentinel | None = None
+        self._scripts: dict[str, Any] = {}
+
+    async def _run_script(self, source: str, keys: list[str], args: list[Any]) -> Any:
+        """Run a Lua script via EVALSHA, loading it on first use (one round-trip once cached)."""
+        if not self._redis:
+            await self.connect()
+        script = self._scripts.get(source)
+        if script is None:
+            script = self._scripts[source] = self._redis.register_script(source)
+        return await script(keys=keys, args=args)
 
     @staticmethod
     def _parse_sentinel_hosts(hosts_str: str) -> list[tuple[str, int]]:
@@ -220,6 +258,7 @@ class RedisSessionManager:
         if self._pool:
             await self._pool.aclose()
             self._pool = None
+        self._scripts.clear()
         logger.info("Disconnected from Redis")
 
     async def create_session(
@@ -256,14 +295,13 @@ class RedisSessionManager:
         if additional_data:
             session_data.update(additional_data)
 
-        # Store in Redis with expiration
-        session_key = f"session:{session_id}"
-        await self._redis.setex(session_key, settings.session_expire_seconds, json.dumps(session_data))
-
-        # Track active sessions for this user
-        user_sessions_key = f"user_sessions:{user_id}"
-        await self._redis.sadd(user_sessions_key, session_id)
-        await self._redis.expire(user_sessions_key, settings.session_expire_seconds)
+        # Store the session and track it in the user's set in one transaction
+        user_sessions_key = f"{USER_SESSIONS_PREFIX}{user_id}"
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.setex(f"{SESSION_PREFIX}{session_id}", settings.session_expire_seconds, json.dumps(session_data))
+            pipe.sadd(user_sessions_key, session_id)
+            pipe.expire(user_sessions_key, settings.session_expire_seconds)
+            await pipe.execute()
 
         logger.info(f"Created session {session_id} for user {user_email}")
         return session_id
@@ -272,30 +310,27 @@ class RedisSessionManager:
         """
         Retrieve session data by session ID.
 
+        Updates last_activity and slides the session's expiration (and that
+        of the user's session set) in the same round-trip.
+
         Args:
             session_id: Session UUID
 
         Returns:
             Session data dict or None if not found/expired
         """
-        if not self._redis:
-            await self.connect()
-
-        session_key = f"session:{session_id}"
-        session_data = await self._redis.get(session_key)
+        session_data = await self._run_script(
+            _GET_AND_TOUCH,
+            keys=[f"{SESSION_PREFIX}{session_id}"],
+            args=[datetime.utcnow().isoformat(), settings.session_expire_seconds, USER_SESSIONS_PREFIX],
+        )
 
         if not session_data:
             logger.debug(f"Session {session_id} not found or expired")
             return None
 
         try:
-            data = json.loads(session_data)
-
-            # Update last activity timestamp
-            data["last_activity"] = datetime.utcnow().isoformat()
-            await self._redis.setex(session_key, settings.session_expire_seconds, json.dumps(data))
-
-            return data
+            return json.loads(session_data)
         except json.JSONDecodeError:
             logger.error(f"Failed to decode session data for {session_id}")
             return None
@@ -313,7 +348,7 @@ class RedisSessionManager:
         if not self._redis:
             await self.connect()
 
-        session_key = f"session:{session_id}"
+        session_key = f"{SESSION_PREFIX}{session_id}"
         exists = await self._redis.exists(session_key)
         return bool(exists)
 
@@ -330,20 +365,19 @@ class RedisSessionManager:
         if not self._redis:
             await self.connect()
 
-        # Get session data to find user_id
-        session_data = await self.get_session(session_id)
-
-        # Delete session key
-        session_key = f"session:{session_id}"
-        deleted = await self._redis.delete(session_key)
+        raw = await self._redis.getdel(f"{SESSION_PREFIX}{session_id}")
+        if raw is None:
+            return False
 
-        # Remove from user's active sessions
-        if session_data and "user_id" in session_data:
-            user_sessions_key = f"user_sessions:{session_data['user_id']}"
-            await self._redis.srem(user_sessions_key, session_id)
+        try:
+            user_id = json.loads(raw).get("user_id")
+        except (json.JSONDecodeError, AttributeError):
+            user_id = None
+        if user_id is not None:
+            await self._redis.srem(f"{USER_SESSIONS_PREFIX}{user_id}", session_id)
 
         logger.info(f"Deleted session {session_id}")
-        return bool(deleted)
+        return True
 
     async def delete_all_user_sessions(self, user_id: int) -> int:
         """
@@ -358,29 +392,27 @@ class RedisSessionManager:
         if not self._redis:
             await self.connect()
 
-        user_sessions_key = f"user_sessions:{user_id}"
-        session_ids = await self._redis.smembers(user_sessions_key)
-
+        user_sessions_key = f"{USER_SESSIONS_PREFIX}{user_id}"
+        session_ids = list(await self._redis.smembers(user_sessions_key))
         if not session_ids:
             return 0
 
-        # Delete all session keys
-        count = 0
-        for session_id in session_ids:
-            session_key = f"session:{session_id}"
-            deleted = await self._redis.delete(session_key)
-            count += deleted
-
-        # Delete the user sessions set
-        await self._redis.delete(user_sessions_key)
+        # Only the ids read are removed from the set, so a session created mid-revocation stays tracked
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.delete(*[f"{SESSION_PREFIX}{session_id}" for session_id in session_ids])
+            pipe.srem(user_sessions_key, *session_ids)
+            count, _ = await pipe.execute()
 
         logger.info(f"Deleted {count} sessions for user {user_id}")
-        return count
+        return int(count)
 
     async def get_active_sessions(self, user_id: int) -> list[dict[str, Any]]:
         """
         Get all active sessions for a user.
 
+        Reads every session with one MGET (listing does not count as
+        activity) and trims ids of expired sessions from the user's set.
+
         Args:
             user_id: User's database ID
 
@@ -390,15 +422,29 @@ class RedisSessionManager:
         if not self._redis:
             await self.connect()
 
-        user_sessions_key = f"user_sessions:{user_id}"
-        session_ids = await self._redis.smembers(user_sessions_key)
+        user_sessions_key = f"{USER_SESSIONS_PREFIX}{user_id}"
+        session_ids = list(await self._redis.smembers(user_sessions_key))
+        if not session_ids:
+            return []
+
+        values = await self._redis.mget([f"{SESSION_PREFIX}{session_id}" for session_id in session_ids])
 
         sessions = []
-        for session_id in session_ids:
-            session_data = await self.get_session(session_id)
-            if session_data:
-                session_data["session_id"] = session_id
-                sessions.append(session_data)
+        expired = []
+        for session_id, raw in zip(session_ids, values, strict=True):
+            if raw is None:
+                expired.append(session_id)
+                continue
+            try:
+                session_data = json.loads(raw)
+            except json.JSONDecodeError:
+                logger.error(f"Failed to decode session data for {session_id}")
+                continue
+            session_data["session_id"] = session_id
+            sessions.append(session_data)
+
+        if expired:
+            await self._redis.srem(user_sessions_key, *expired)
 
         return sessions
 
@@ -415,7 +461,7 @@ class RedisSessionManager:
         if not self._redis:
             await self.connect()
 
-        session_key = f"session:{session_id}"
+        session_key = f"{SESSION_PREFIX}{session_id}"
         extended = await self._redis.expire(session_key, settings.session_expire_seconds)
 
         if extended:
@@ -0,0 +1,59 @@
+"""
+Single-Flight Loads
+
+The per-worker caches behind the cache bus (workflow graph, redirect table,
+tenant registry, resolved translations) fill themselves from the database
+on a miss.  SingleFlightCache is the part they share:
+
+- Concurrent misses of the same key run one load and all get its result
+  (or its error).
+- Every invalidation bumps a generation counter.  A load that raced an
+  invalidation is returned to its callers but not stored, and callers that
+  arrive after the invalidation start a fresh load instead of joining it.
+
+Where the loaded value is kept (a single attribute, a TTL map, an LRU) is
+up to the cache; it passes a ``store`` callback to load().
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlightCache:
+    """Generation-guarded, de-duplicated loads for one in-process cache"""
+
+    def __init__(self):
+        # Bumped on every invalidation so a load that raced one is not kept
+        self.generation = 0
+        self._pending: dict[Hashable, asyncio.Future] = {}
+
+    def invalidate(self) -> None:
+        """Discard the results of loads in flight; later callers load again."""
+        self.generation += 1
+        self._pending.clear()
+
+    async def load(self, key: Hashable, loader: Callable[[], Awaitable[T]], store: Callable[[T], Any]) -> T:
+        """Run loader() once for all concurrent callers of key; store(value) unless invalidated meanwhile."""
+        pending = self._pending.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = self._pending[key] = asyncio.get_running_loop().create_future()
+        generation = self.generation
+        try:
+            value = await loader()
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Waiters see the error; retrieve it here so an unawaited future does not warn
+            future.exception()
+            raise
+        finally:
+            if self._pending.get(key) is future:
+                del self._pending[key]
+        future.set_result(value)
+        if generation == self.generation:
+            store(value)
+        return value
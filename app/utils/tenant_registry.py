@@ -0,0 +1,111 @@
+"""
+Tenant Registry
+
+Per-worker cache of tenant lookups for TenantMiddleware, so resolving the
+tenant of a request does not check out a database connection.
+
+- Slugs and custom domains map to a ResolvedTenant (id, slug, status, plan)
+  for ``tenant_cache_ttl_seconds``.
+- Unknown slugs and hosts are cached as misses for the shorter
+  ``tenant_negative_cache_ttl_seconds``; the map is LRU-bounded so arbitrary
+  Host headers cannot grow it without limit.
+- Concurrent lookups of the same key share one query.
+- Creating, updating, suspending or deleting a tenant publishes
+  ``TENANTS_TOPIC`` on the cache bus and every worker drops its map; the
+  TTL bounds staleness if a message is lost.
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+from app.config import settings
+from app.utils.cache_bus import cache_bus
+from app.utils.single_flight import SingleFlightCache
+
+logger = logging.getLogger(__name__)
+
+TENANTS_TOPIC = "tenants"
+
+
+class ResolvedTenant(NamedTuple):
+    """What request handling needs to know about a tenant"""
+
+    id: int
+    slug: str
+    status: str
+    plan: str | None
+
+
+class TenantRegistry:
+    """TTL-bounded slug/domain -> ResolvedTenant map with negative caching"""
+
+    def __init__(
+        self,
+        ttl_seconds: float = 300,
+        negative_ttl_seconds: float = 30,
+        max_entries: int = 10000,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.max_entries = max_entries
+        # (kind, value) -> (expires_at, tenant or None for "unknown")
+        self._entries: OrderedDict[tuple[str, str], tuple[float, ResolvedTenant | None]] = OrderedDict()
+        self._loads = SingleFlightCache()
+
+    def invalidate(self, key: str | None = None) -> None:
+        """Drop every cached lookup (cache-bus handler)."""
+        self._entries.clear()
+        self._loads.invalidate()
+
+    @staticmethod
+    async def _load(kind: str, value: str) -> ResolvedTenant | None:
+        # Deferred import avoids circular dependency at module load time
+        from app.database import AsyncSessionLocal
+        from app.services.tenant_service import get_tenant_by_domain, get_tenant_by_slug
+
+        lookup = get_tenant_by_slug if kind == "slug" else get_tenant_by_domain
+        async with AsyncSessionLocal() as db:
+            tenant = await lookup(value, db)
+        if tenant is None:
+            return None
+        return ResolvedTenant(tenant.id, tenant.slug, tenant.status, tenant.plan)
+
+    def _store(self, key: tuple[str, str], tenant: ResolvedTenant | None) -> None:
+        ttl = self.ttl_seconds if tenant is not None else self.negative_ttl_seconds
+        self._entries[key] = (time.monotonic() + ttl, tenant)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _lookup(self, kind: str, value: str) -> ResolvedTenant | None:
+        key = (kind, value)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self._entries.move_to_end(key)
+            return entry[1]
+
+        return await self._loads.load(key, lambda: self._load(kind, value), lambda tenant: self._store(key, tenant))
+
+    async def by_slug(self, slug: str) -> ResolvedTenant | None:
+        """Tenant with this slug, or None if there is none."""
+        return await self._lookup("slug", slug)
+
+    async def by_domain(self, domain: str) -> ResolvedTenant | None:
+        """Tenant with this custom domain, or None if there is none."""
+        return await self._lookup("domain", domain.lower())
+
+
+# Process-wide registry used by TenantMiddleware
+tenant_registry = TenantRegistry(
+    ttl_seconds=settings.tenant_cache_ttl_seconds,
+    negative_ttl_seconds=settings.tenant_negative_cache_ttl_seconds,
+    max_entries=settings.tenant_cache_max_entries,
+)
+cache_bus.subscribe(TENANTS_TOPIC, tenant_registry.invalidate)
+
+
+async def invalidate_tenants() -> None:
+    """Tell every worker that a tenant was created or changed."""
+    await cache_bus.publish(TENANTS_TOPIC)
@@ -0,0 +1,61 @@
+"""
+Text Delta Codec
+
+Line-based diffs between two strings, serialized compactly and zlib
+compressed.  Used by the content version store to keep edits between full
+keyframes.
+
+A delta is a JSON list of operations applied to the base text's lines in
+order:
+
+    n > 0   copy the next n lines of the base
+    n < 0   skip the next -n lines of the base
+    "text"  insert text
+"""
+
+import difflib
+import json
+import zlib
+
+# Above this size relative to the compressed target a delta saves too little to be worth chaining
+MAX_DELTA_RATIO = 0.5
+
+
+def encode_delta(base: str, target: str) -> bytes:
+    """Return a compressed delta that turns base into target."""
+    base_lines = base.splitlines(keepends=True)
+    target_lines = target.splitlines(keepends=True)
+
+    ops: list[int | str] = []
+    matcher = difflib.SequenceMatcher(None, base_lines, target_lines)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append(i2 - i1)
+            continue
+        if i2 > i1:
+            ops.append(i1 - i2)
+        if j2 > j1:
+            ops.append("".join(target_lines[j1:j2]))
+
+    return zlib.compress(json.dumps(ops, separators=(",", ":")).encode())
+
+
+def apply_delta(base: str, delta: bytes) -> str:
+    """Rebuild the target text from base and a delta produced by encode_delta()."""
+    base_lines = base.splitlines(keepends=True)
+    out: list[str] = []
+    pos = 0
+    for op in json.loads(zlib.decompress(delta)):
+        if isinstance(op, str):
+            out.append(op)
+        elif op > 0:
+            out.extend(base_lines[pos : pos + op])
+            pos += op
+        else:
+            pos -= op
+    return "".join(out)
+
+
+def worth_chaining(delta: bytes, target: str) -> bool:
+    """True when the delta is meaningfully smaller than target in full (which Postgres would compress too)."""
+    return len(delta) <= len(zlib.compress(target.encode())) * MAX_DELTA_RATIO
@@ -0,0 +1,168 @@
+"""
+Compiled Workflow Graph
+
+Workflow states and transitions change rarely but are consulted on every
+editorial action, so each worker compiles them into an immutable in-memory
+graph: states by id and by (workflow type, name), transitions by id, and
+the active outgoing transitions of every state.
+
+- The graph is loaded lazily (two queries) and shared by concurrent callers
+  while it loads.
+- Creating states or transitions publishes ``WORKFLOW_TOPIC`` on the cache
+  bus; every worker drops its graph and recompiles on next use.
+"""
+
+import logging
+from types import MappingProxyType
+from typing import NamedTuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.workflow import WorkflowState, WorkflowTransition, WorkflowType
+from app.utils.cache_bus import cache_bus
+from app.utils.single_flight import SingleFlightCache
+
+logger = logging.getLogger(__name__)
+
+WORKFLOW_TOPIC = "workflow"
+
+
+class StateNode(NamedTuple):
+    """Immutable copy of a WorkflowState row"""
+
+    id: int
+    name: str
+    display_name: str
+    description: str | None
+    workflow_type: WorkflowType
+    is_initial: bool
+    is_final: bool
+    is_active: bool
+    color: str
+    order: int
+
+
+class TransitionEdge(NamedTuple):
+    """Immutable copy of a WorkflowTransition row (roles already split)"""
+
+    id: int
+    name: str
+    from_state_id: int
+    to_state_id: int
+    required_roles: tuple[str, ...]
+    requires_approval: bool
+    approval_count: int
+    is_active: bool
+
+    def get_required_roles(self) -> list[str]:
+        """Same accessor as WorkflowTransition."""
+        return list(self.required_roles)
+
+    def allows(self, role_name: str) -> bool:
+        """Whether a user with role_name may take this transition."""
+        return not self.required_roles or role_name in self.required_roles or role_name == "superadmin"
+
+
+class WorkflowGraph:
+    """Read-only view of every workflow definition"""
+
+    def __init__(self, states: list[StateNode], transitions: list[TransitionEdge]):
+        self.states = MappingProxyType({s.id: s for s in states})
+        self.transitions = MappingProxyType({t.id: t for t in transitions})
+        self._by_name = MappingProxyType({(s.workflow_type, s.name): s for s in states})
+        outgoing: dict[int, list[TransitionEdge]] = {}
+        for t in sorted(transitions, key=lambda t: t.id):
+            if t.is_active:
+                outgoing.setdefault(t.from_state_id, []).append(t)
+        self._outgoing = MappingProxyType({state_id: tuple(edges) for state_id, edges in outgoing.items()})
+
+    def state_by_name(self, name, workflow_type: WorkflowType = WorkflowType.CONTENT) -> StateNode | None:
+        """State called name (a str or a str-valued enum such as ContentStatus)."""
+        return self._by_name.get((workflow_type, getattr(name, "value", name)))
+
+    def transitions_from(self, state_id: int) -> tuple[TransitionEdge, ...]:
+        """Active transitions leaving a state, in creation order."""
+        return self._outgoing.get(state_id, ())
+
+    def transition_dict(self, transition: TransitionEdge) -> dict:
+        """The dict shape WorkflowService has always returned for a transition."""
+        from_state = self.states[transition.from_state_id]
+        to_state = self.states[transition.to_state_id]
+        return {
+            "id": transition.id,
+            "name": transition.name,
+            "from_state": {"id": from_state.id, "name": from_state.name},
+            "to_state": {"id": to_state.id, "name": to_state.name},
+            "requires_approval": transition.requires_approval,
+            "approval_count": transition.approval_count,
+            "required_roles": transition.get_required_roles(),
+        }
+
+
+class WorkflowGraphCache:
+    """Per-worker compiled graph with cache-bus invalidation"""
+
+    def __init__(self):
+        self._graph: WorkflowGraph | None = None
+        self._loads = SingleFlightCache()
+
+    def invalidate(self, key: str | None = None) -> None:
+        """Drop the graph; the next use recompiles it (cache-bus handler)."""
+        self._graph = None
+        self._loads.invalidate()
+
+    @staticmethod
+    async def _load(db: AsyncSession) -> WorkflowGraph:
+        states = (await db.execute(select(WorkflowState))).scalars().all()
+        transitions = (await db.execute(select(WorkflowTransition))).scalars().all()
+        return WorkflowGraph(
+            [
+                StateNode(
+                    s.id,
+                    s.name,
+                    s.display_name,
+                    s.description,
+                    s.workflow_type,
+                    s.is_initial,
+                    s.is_final,
+                    s.is_active,
+                    s.color,
+                    s.order,
+                )
+                for s in states
+            ],
+            [
+                TransitionEdge(
+                    t.id,
+                    t.name,
+                    t.from_state_id,
+                    t.to_state_id,
+                    tuple(t.get_required_roles()),
+                    t.requires_approval,
+                    t.approval_count,
+                    t.is_active,
+                )
+                for t in transitions
+            ],
+        )
+
+    async def get(self, db: AsyncSession) -> WorkflowGraph:
+        """The current graph, compiling it with db if needed."""
+        if self._graph is not None:
+            return self._graph
+        return await self._loads.load(None, lambda: self._load(db), self._store)
+
+    def _store(self, graph: WorkflowGraph) -> None:
+        self._graph = graph
+        logger.info("workflow: compiled %d states and %d transitions", len(graph.states), len(graph.transitions))
+
+
+# Process-wide graph shared by every WorkflowService
+workflow_graph = WorkflowGraphCache()
+cache_bus.subscribe(WORKFLOW_TOPIC, workflow_graph.invalidate)
+
+
+async def invalidate_workflow() -> None:
+    """Tell every worker that workflow states or transitions changed."""
+    await cache_bus.publish(WORKFLOW_TOPIC)
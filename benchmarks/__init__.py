@@ -0,0 +1,12 @@
+"""
+Performance benchmarks.
+
+Run individual benchmarks as modules, e.g. ``python -m benchmarks.serialization``.
+
+End-to-end benchmarks seed a database, run the hot-endpoint scenarios and
+compare results between commits:
+
+    python -m benchmarks.dataset --database-url URL --scale 10000 --create-schema
+    python -m benchmarks.run --database-url URL --scale 10000 --output head.json
+    python -m benchmarks.compare base.json head.json
+"""
@@ -0,0 +1,130 @@
+"""
+Compare two benchmark result files and flag regressions.
+
+A scenario regresses when, relative to the base run, its p95 latency grows
+or its throughput drops by more than ``--threshold`` percent, it runs more
+SQL queries per request (beyond ``QUERY_TOLERANCE``, which absorbs cache
+hits that differ between runs), or it returns more errors.  Latency and
+throughput are not compared for a scenario that failed in either run (see
+benchmarks.run); its error count still is.  Exits with status 1 if
+anything regressed, so CI can fail the build.
+
+    python -m benchmarks.compare base.json head.json [--threshold 10]
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+DEFAULT_THRESHOLD = 10.0
+QUERY_TOLERANCE = 0.5
+
+
+def _change(base: float | None, head: float | None) -> float | None:
+    """Percent change from base to head, None when either is missing."""
+    if base is None or head is None:
+        return None
+    if base == 0:
+        return 0.0 if head == 0 else float("inf")
+    return (head - base) / base * 100
+
+
+def compare(base: dict, head: dict, threshold: float = DEFAULT_THRESHOLD) -> list[dict]:
+    """One row per scenario present in both runs, with its regressions (if any)."""
+    rows = []
+    for name, base_result in base["scenarios"].items():
+        head_result = head["scenarios"].get(name)
+        if head_result is None or "skipped" in base_result or "skipped" in head_result:
+            continue
+        # A failed run's timings mostly measure its errors, so only its error count is compared
+        failed = "failed" in base_result or "failed" in head_result
+        base_p95 = None if failed else base_result["latency_ms"]["p95"]
+        head_p95 = None if failed else head_result["latency_ms"]["p95"]
+        base_rps = None if failed else base_result["rps"]
+        head_rps = None if failed else head_result["rps"]
+        p95 = _change(base_p95, head_p95)
+        rps = _change(base_rps, head_rps)
+        base_queries = base_result.get("queries_per_request")
+        head_queries = head_result.get("queries_per_request")
+
+        regressions = []
+        if p95 is not None and p95 > threshold:
+            regressions.append(f"p95 +{p95:.1f}%")
+        if rps is not None and rps < -threshold:
+            regressions.append(f"throughput {rps:.1f}%")
+        if base_queries is not None and head_queries is not None and head_queries > base_queries + QUERY_TOLERANCE:
+            regressions.append(f"queries/request {base_queries:g} -> {head_queries:g}")
+        if head_result["errors"] > base_result["errors"]:
+            regressions.append(f"errors {base_result['errors']} -> {head_result['errors']}")
+
+        rows.append(
+            {
+                "scenario": name,
+                "base_p95_ms": base_p95,
+                "head_p95_ms": head_p95,
+                "p95_change": p95,
+                "base_rps": base_rps,
+                "head_rps": head_rps,
+                "rps_change": rps,
+                "base_queries": base_queries,
+                "head_queries": head_queries,
+                "failed": failed,
+                "regressions": regressions,
+            }
+        )
+    return rows
+
+
+def _percent(value: float | None) -> str:
+    return "n/a" if value is None else f"{value:+.1f}%"
+
+
+def _number(value: float | None, spec: str) -> str:
+    return "n/a" if value is None else format(value, spec)
+
+
+def _warnings(base: dict, head: dict) -> list[str]:
+    """Differences in setup that make the numbers hard to compare."""
+    base_meta, head_meta = base["metadata"], head["metadata"]
+    return [
+        f"{key} differs: {base_meta.get(key)} vs {head_meta.get(key)}"
+        for key in ("scale", "seed", "database", "target", "requests", "concurrency")
+        if base_meta.get(key) != head_meta.get(key)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base", type=Path, help="results of the baseline commit")
+    parser.add_argument("head", type=Path, help="results of the commit under test")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed change in percent")
+    parser.add_argument("--json", action="store_true", help="print the comparison as JSON")
+    args = parser.parse_args()
+
+    base = json.loads(args.base.read_text())
+    head = json.loads(args.head.read_text())
+    rows = compare(base, head, args.threshold)
+    regressed = [row for row in rows if row["regressions"]]
+
+    if args.json:
+        print(json.dumps({"threshold": args.threshold, "scenarios": rows, "regressed": len(regressed)}, indent=2))
+    else:
+        for warning in _warnings(base, head):
+            print(f"warning: {warning}")
+        print(f"base {base['metadata'].get('git_commit')}  head {head['metadata'].get('git_commit')}")
+        print(f"{'scenario':<20} {'p95 ms':>21} {'change':>8} {'req/s':>19} {'change':>8}  regressions")
+        for row in rows:
+            print(
+                f"{row['scenario']:<20} {_number(row['base_p95_ms'], '.2f'):>9} -> "
+                f"{_number(row['head_p95_ms'], '.2f'):>8} {_percent(row['p95_change']):>8} "
+                f"{_number(row['base_rps'], '.1f'):>8} -> {_number(row['head_rps'], '.1f'):>7} "
+                f"{_percent(row['rps_change']):>8}  {', '.join(row['regressions']) or '-'}"
+                + ("  (failed)" if row["failed"] else "")
+            )
+        print(f"{len(regressed)} of {len(rows)} scenarios regressed (threshold {args.threshold:g}%)")
+    sys.exit(1 if regressed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,522 @@
+"""
+Synthetic dataset generator for the end-to-end benchmarks.
+
+Seeds users, categories, tags, content, content tags, comments, content
+views and media rows sized from ``--scale`` (the number of content items,
+10k to 10M).  The rows are a pure function of ``(scale, seed)``: every
+table draws from its own ``random.Random`` seeded with the table name, ids
+are explicit and timestamps are offsets from a fixed epoch, so two runs
+build identical databases and results stay comparable across commits.
+
+Postgres tables are loaded with ``COPY``; SQLite gets batched inserts and
+stores ``TSVECTOR`` as text.  The target tables must be empty.
+
+    python -m benchmarks.dataset --database-url postgresql+asyncpg://... --scale 10000 [--seed 42] [--create-schema]
+
+Every generated user (and the ``bench-admin@example.com`` admin) logs in
+with ``BENCH_PASSWORD``.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from itertools import islice
+
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+from sqlalchemy.ext.compiler import compiles
+
+# The app reads DATABASE_URL when it is imported, so app modules are imported
+# inside functions, after use_database() has run
+
+BENCH_ADMIN_EMAIL = "bench-admin@example.com"
+BENCH_PASSWORD = "bench-password"
+DEFAULT_SEED = 42
+BATCH_SIZE = 5000
+EPOCH = datetime(2024, 1, 1)
+SPAN_SECONDS = 365 * 24 * 3600
+
+DEFAULT_ROLES = {
+    "user": [],
+    "editor": ["view_content", "edit_content"],
+    "manager": ["view_content", "edit_content", "approve_content"],
+    "admin": ["*"],
+    "superadmin": ["*"],
+}
+
+# Search and autocomplete scenarios query these words
+WORDS = [
+    "analysis",
+    "api",
+    "architecture",
+    "async",
+    "backend",
+    "benchmark",
+    "browser",
+    "cache",
+    "cloud",
+    "cluster",
+    "code",
+    "compiler",
+    "config",
+    "container",
+    "data",
+    "database",
+    "debug",
+    "deploy",
+    "design",
+    "developer",
+    "devops",
+    "docker",
+    "engine",
+    "error",
+    "event",
+    "feature",
+    "framework",
+    "frontend",
+    "function",
+    "gateway",
+    "graph",
+    "guide",
+    "index",
+    "infrastructure",
+    "integration",
+    "interface",
+    "kernel",
+    "kubernetes",
+    "latency",
+    "library",
+    "linux",
+    "load",
+    "logging",
+    "machine",
+    "memory",
+    "metrics",
+    "microservice",
+    "migration",
+    "mobile",
+    "model",
+    "module",
+    "monitoring",
+    "network",
+    "node",
+    "open",
+    "optimization",
+    "package",
+    "performance",
+    "pipeline",
+    "platform",
+    "plugin",
+    "postgres",
+    "process",
+    "profile",
+    "protocol",
+    "python",
+    "query",
+    "queue",
+    "react",
+    "redis",
+    "release",
+    "replica",
+    "request",
+    "research",
+    "resource",
+    "runtime",
+    "scale",
+    "schema",
+    "search",
+    "security",
+    "server",
+    "service",
+    "session",
+    "storage",
+    "stream",
+    "system",
+    "template",
+    "testing",
+    "thread",
+    "throughput",
+    "tutorial",
+    "update",
+    "upgrade",
+    "user",
+    "version",
+    "video",
+    "web",
+    "worker",
+    "workflow",
+]
+
+CONTENT_STATUSES = (("PUBLISHED", 80), ("DRAFT", 15), ("PENDING", 5))
+COMMENT_STATUSES = (("APPROVED", 85), ("PENDING", 10), ("SPAM", 5))
+MEDIA_KINDS = (
+    ("image/jpeg", "image", "jpg"),
+    ("image/png", "image", "png"),
+    ("application/pdf", "document", "pdf"),
+    ("video/mp4", "video", "mp4"),
+)
+REFERRERS = (None, "https://www.google.com/", "https://news.ycombinator.com/", "https://twitter.com/")
+UTM_SOURCES = (None, None, None, "newsletter", "twitter", "google")
+
+
+@compiles(TSVECTOR, "sqlite")
+def _tsvector_as_text(type_, compiler, **kw):
+    return "TEXT"
+
+
+def use_database(database_url: str, redis_url: str | None = None) -> None:
+    """Point the app at database_url; call before anything imports ``app``."""
+    os.environ["DATABASE_URL"] = database_url
+    # The test environment uses NullPool, the only pool aiosqlite supports; production
+    # gets the pooled engine the benchmarks are meant to measure
+    os.environ["ENVIRONMENT"] = "test" if make_url(database_url).get_backend_name() == "sqlite" else "production"
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-" + "0" * 32)
+    if redis_url:
+        os.environ["REDIS_URL"] = redis_url
+
+
+@dataclass(frozen=True)
+class Volumes:
+    """Row counts derived from the scale (number of content items)."""
+
+    content: int
+    users: int
+    categories: int
+    tags: int
+    media: int
+    tags_per_content: int = 3
+    comments_per_content: int = 2
+    views_per_content: int = 5
+
+    @classmethod
+    def for_scale(cls, scale: int) -> "Volumes":
+        return cls(
+            content=scale,
+            users=max(10, scale // 10),
+            categories=50,
+            tags=min(5000, max(50, scale // 20)),
+            media=scale // 10,
+        )
+
+
+class Dataset:
+    """Deterministic rows, as column dicts, for every seeded table."""
+
+    def __init__(
+        self,
+        scale: int,
+        seed: int = DEFAULT_SEED,
+        *,
+        admin_role_id: int = 1,
+        user_role_id: int = 1,
+        password_hash: str = "",
+    ):
+        self.scale = scale
+        self.seed = seed
+        self.volumes = Volumes.for_scale(scale)
+        self.admin_role_id = admin_role_id
+        self.user_role_id = user_role_id
+        self.password_hash = password_hash
+
+    def _rng(self, table: str) -> random.Random:
+        return random.Random(f"{self.seed}:{table}")
+
+    @staticmethod
+    def _timestamp(rng: random.Random) -> datetime:
+        return EPOCH + timedelta(seconds=rng.randrange(SPAN_SECONDS))
+
+    @staticmethod
+    def _weighted(rng: random.Random, choices: tuple[tuple[str, int], ...]) -> str:
+        return rng.choices([value for value, _ in choices], [weight for _, weight in choices])[0]
+
+    @staticmethod
+    def _words(rng: random.Random, count: int) -> str:
+        return " ".join(rng.choices(WORDS, k=count))
+
+    def tables(self) -> list[tuple[str, Iterator[dict]]]:
+        """(table name, rows) in foreign-key order."""
+        return [
+            ("users", self.users()),
+            ("categories", self.categories()),
+            ("tags", self.tags()),
+            ("content", self.content()),
+            ("content_tags", self.content_tags()),
+            ("comments", self.comments()),
+            ("content_views", self.content_views()),
+            ("media", self.media()),
+        ]
+
+    def users(self) -> Iterator[dict]:
+        rng = self._rng("users")
+        for user_id in range(1, self.volumes.users + 1):
+            admin = user_id == 1
+            yield {
+                "id": user_id,
+                "username": "bench-admin" if admin else f"user{user_id}",
+                "email": BENCH_ADMIN_EMAIL if admin else f"user{user_id}@example.com",
+                "hashed_password": self.password_hash,
+                "role_id": self.admin_role_id if admin else self.user_role_id,
+                "preferences": {"language": rng.choice(("en", "en", "en", "de", "fr"))},
+            }
+
+    def categories(self) -> Iterator[dict]:
+        for category_id in range(1, self.volumes.categories + 1):
+            word = WORDS[category_id % len(WORDS)]
+            yield {"id": category_id, "name": f"{word.title()} {category_id}", "slug": f"{word}-{category_id}"}
+
+    def tags(self) -> Iterator[dict]:
+        for tag_id in range(1, self.volumes.tags + 1):
+            rounds, index = divmod(tag_id - 1, len(WORDS))
+            yield {"id": tag_id, "name": f"{WORDS[index]}-{rounds}" if rounds else WORDS[index]}
+
+    def content(self) -> Iterator[dict]:
+        rng = self._rng("content")
+        volumes = self.volumes
+        for content_id in range(1, volumes.content + 1):
+            title = self._words(rng, rng.randint(3, 8)).title()
+            status = self._weighted(rng, CONTENT_STATUSES)
+            created_at = self._timestamp(rng)
+            yield {
+                "id": content_id,
+                "title": title,
+                "slug": f"{title.lower().replace(' ', '-')}-{content_id}",
+                "body": self._words(rng, rng.randint(80, 400)) + ".",
+                "description": self._words(rng, 20) + ".",
+                "status": status,
+                "publish_date": created_at if status == "PUBLISHED" else None,
+                "created_at": created_at,
+                "updated_at": created_at + timedelta(seconds=rng.randrange(30 * 24 * 3600)),
+                "author_id": rng.randint(1, volumes.users),
+                "category_id": rng.randint(1, volumes.categories),
+                "view_count": 0,
+                "comment_count": 0,
+                "meta_keywords": ", ".join(rng.sample(WORDS, 3)),
+            }
+
+    def content_tags(self) -> Iterator[dict]:
+        rng = self._rng("content_tags")
+        tag_ids = range(1, self.volumes.tags + 1)
+        per_content = min(self.volumes.tags_per_content, self.volumes.tags)
+        for content_id in range(1, self.volumes.content + 1):
+            for tag_id in rng.sample(tag_ids, per_content):
+                yield {"content_id": content_id, "tag_id": tag_id}
+
+    def comments(self) -> Iterator[dict]:
+        from app.models.comment import comment_path_segment
+
+        rng = self._rng("comments")
+        volumes = self.volumes
+        comment_id = 0
+        for content_id in range(1, volumes.content + 1):
+            # Threads stay within one content item, so only its comments are kept around
+            thread: list[dict] = []
+            created_at = self._timestamp(rng)
+            for _ in range(rng.randint(0, 2 * volumes.comments_per_content)):
+                comment_id += 1
+                parent = rng.choice(thread) if thread and rng.random() < 0.3 else None
+                created_at += timedelta(seconds=rng.randrange(1, 6 * 3600))
+                row = {
+                    "id": comment_id,
+                    "content_id": content_id,
+                    "user_id": rng.randint(1, volumes.users),
+                    "parent_id": parent["id"] if parent else None,
+                    "thread_id": parent["thread_id"] if parent else comment_id,
+                    "path": (parent["path"] if parent else "") + comment_path_segment(comment_id),
+                    "body": self._words(rng, rng.randint(5, 60)) + ".",
+                    "status": self._weighted(rng, COMMENT_STATUSES),
+                    "is_deleted": False,
+                    "created_at": created_at,
+                    "updated_at": created_at,
+                    "is_edited": False,
+                    "like_count": 0,
+                    "dislike_count": 0,
+                }
+                thread.append(row)
+                yield row
+
+    def content_views(self) -> Iterator[dict]:
+        rng = self._rng("content_views")
+        volumes = self.volumes
+        for view_id in range(1, volumes.content * volumes.views_per_content + 1):
+            # Skewed towards low ids so there is a clear "popular content" head
+            content_id = int(volumes.content * rng.random() ** 3) + 1
+            signed_in = rng.random() < 0.3
+            yield {
+                "id": view_id,
+                "content_id": content_id,
+                "user_id": rng.randint(1, volumes.users) if signed_in else None,
+                "ip_address": f"10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(1, 255)}",
+                "user_agent": "Mozilla/5.0 (benchmark)",
+                "referrer": rng.choice(REFERRERS),
+                "duration_seconds": rng.randint(1, 600),
+                "created_at": self._timestamp(rng),
+                "utm_source": rng.choice(UTM_SOURCES),
+            }
+
+    def media(self) -> Iterator[dict]:
+        rng = self._rng("media")
+        for media_id in range(1, self.volumes.media + 1):
+            mime_type, file_type, extension = rng.choice(MEDIA_KINDS)
+            filename = f"bench-{media_id:08d}.{extension}"
+            uploaded_at = self._timestamp(rng)
+            image = file_type == "image"
+            yield {
+                "id": media_id,
+                "filename": filename,
+                "original_filename": f"{rng.choice(WORDS)}-{media_id}.{extension}",
+                "file_path": f"uploads/{filename}",
+                "file_size": rng.randint(20_000, 5_000_000),
+                "mime_type": mime_type,
+                "file_type": file_type,
+                "width": rng.choice((640, 1280, 1920)) if image else None,
+                "height": rng.choice((480, 720, 1080)) if image else None,
+                "sizes": {},
+                "alt_text": self._words(rng, 4) if image else None,
+                "tags": [],
+                "uploaded_by": rng.randint(1, self.volumes.users),
+                "uploaded_at": uploaded_at,
+                "updated_at": uploaded_at,
+            }
+
+
+async def _ensure_roles(conn: AsyncConnection) -> dict[str, int]:
+    from app.models import Role
+
+    existing = set((await conn.execute(select(Role.name))).scalars())
+    missing = [{"name": name, "permissions": perms} for name, perms in DEFAULT_ROLES.items() if name not in existing]
+    if missing:
+        await conn.execute(insert(Role), missing)
+    return dict((await conn.execute(select(Role.name, Role.id))).all())
+
+
+async def _insert_rows(conn: AsyncConnection, table, rows: Iterator[dict], batch_size: int) -> int:
+    postgres = conn.dialect.name == "postgresql"
+    if postgres:
+        driver = (await conn.get_raw_connection()).driver_connection
+    written = 0
+    while batch := list(islice(rows, batch_size)):
+        if postgres:
+            columns = list(batch[0])
+            await driver.copy_records_to_table(
+                table.name,
+                records=[tuple(_copy_value(row[column]) for column in columns) for row in batch],
+                columns=columns,
+            )
+        else:
+            await conn.execute(insert(table), batch)
+        written += len(batch)
+    return written
+
+
+def _copy_value(value):
+    # COPY bypasses SQLAlchemy's bind processing; JSON columns take their text form
+    if isinstance(value, dict | list):
+        return json.dumps(value)
+    return value
+
+
+async def _finish_postgres(conn: AsyncConnection, tables) -> None:
+    for table in tables:
+        if "id" in table.c:
+            await conn.execute(
+                text(
+                    f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), GREATEST(MAX(id), 1)) FROM {table.name}"
+                )
+            )
+    # Same weights as the content search trigger, for rows it did not see
+    await conn.execute(
+        text(
+            """
+            UPDATE content SET search_vector =
+                setweight(to_tsvector('english', COALESCE(title, '')), 'A') ||
+                setweight(to_tsvector('english', COALESCE(description, '')), 'B') ||
+                setweight(to_tsvector('english', COALESCE(body, '')), 'C') ||
+                setweight(to_tsvector('english', COALESCE(meta_keywords, '')), 'D')
+            WHERE search_vector IS NULL
+            """
+        )
+    )
+
+
+async def load(
+    database_url: str,
+    scale: int,
+    seed: int = DEFAULT_SEED,
+    create_schema: bool = False,
+    batch_size: int = BATCH_SIZE,
+) -> dict[str, int]:
+    """Seed an empty database; returns rows written per table."""
+    from app.auth import hash_password
+    from app.database import Base
+    from app.utils.counters import reconcile_statements
+
+    engine = create_async_engine(database_url)
+    counts: dict[str, int] = {}
+    try:
+        async with engine.begin() as conn:
+            if create_schema:
+                await conn.run_sync(Base.metadata.create_all)
+            for name in ("users", "content"):
+                if await conn.scalar(select(func.count()).select_from(Base.metadata.tables[name])):
+                    raise ValueError(f"Table {name!r} is not empty; the dataset needs an empty database")
+            roles = await _ensure_roles(conn)
+
+        dataset = Dataset(
+            scale,
+            seed,
+            admin_role_id=roles["admin"],
+            user_role_id=roles["user"],
+            password_hash=hash_password(BENCH_PASSWORD),
+        )
+        for name, rows in dataset.tables():
+            started = time.perf_counter()
+            async with engine.begin() as conn:
+                counts[name] = await _insert_rows(conn, Base.metadata.tables[name], rows, batch_size)
+            print(f"  {name:<14} {counts[name]:>12,} rows  {time.perf_counter() - started:8.1f}s", flush=True)
+
+        async with engine.begin() as conn:
+            if conn.dialect.name == "postgresql":
+                await _finish_postgres(conn, [Base.metadata.tables[name] for name in counts])
+            # Denormalized view/comment counters from the generated rows
+            for _, _, statement in reconcile_statements():
+                await conn.execute(statement)
+        if engine.dialect.name == "postgresql":
+            async with engine.connect() as conn:
+                await conn.execution_options(isolation_level="AUTOCOMMIT")
+                await conn.execute(text("ANALYZE"))
+    finally:
+        await engine.dispose()
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"), help="default: $DATABASE_URL")
+    parser.add_argument("--scale", type=int, default=10_000, help="number of content items (default 10000)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--create-schema", action="store_true", help="create missing tables from the models first")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+    if not args.database_url:
+        parser.error("--database-url or DATABASE_URL is required")
+
+    use_database(args.database_url)
+    print(f"Seeding scale={args.scale} seed={args.seed}")
+    started = time.perf_counter()
+    try:
+        counts = asyncio.run(load(args.database_url, args.scale, args.seed, args.create_schema, args.batch_size))
+    except ValueError as exc:
+        parser.exit(1, f"{exc}\n")
+    print(f"{sum(counts.values()):,} rows in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""
+End-to-end benchmark runner.
+
+Runs the scenarios in benchmarks.scenarios against a database seeded by
+benchmarks.dataset and writes machine-readable results: latency
+percentiles, throughput, errors and SQL queries per request, plus the git
+commit, dataset and environment they were measured on.  A scenario with
+any failed request (an HTTP error status, a GraphQL error or no response)
+is marked failed, and benchmarks.compare leaves its timings out.
+
+By default the app runs in-process behind httpx's ASGI transport, which
+needs no server and reports queries per request (background jobs are not
+started, so they add no noise).  ``--base-url`` targets a running
+deployment instead, workers and proxy included.
+
+    python -m benchmarks.dataset --database-url URL --scale 10000 --create-schema
+    python -m benchmarks.run --database-url URL --scale 10000 --output base.json
+    python -m benchmarks.compare base.json head.json
+
+``--scale`` and ``--seed`` must match the dataset.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+from collections.abc import Callable
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+from sqlalchemy.engine import make_url
+
+from benchmarks.dataset import BENCH_ADMIN_EMAIL, BENCH_PASSWORD, DEFAULT_SEED, Volumes, use_database
+from benchmarks.scenarios import SCENARIOS, BenchRequest, RunContext, Scenario
+
+
+def _git(*args: str) -> str | None:
+    try:
+        return subprocess.run(["git", *args], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def summarize(latencies_ms: list[float], statuses: Counter, errors: int, duration: float) -> dict:
+    """Latency percentiles and throughput of one scenario."""
+    ordered = sorted(latencies_ms)
+    # quantiles() needs two points; a single request is its own percentile
+    cuts = statistics.quantiles(ordered, n=100, method="inclusive") if len(ordered) > 1 else ordered * 99
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "status_codes": {str(code): count for code, count in sorted(statuses.items(), key=lambda item: str(item[0]))},
+        "duration_s": round(duration, 3),
+        "rps": round(len(ordered) / duration, 2) if duration else 0.0,
+        "latency_ms": {
+            "mean": round(statistics.fmean(ordered), 3) if ordered else None,
+            "p50": round(cuts[49], 3) if cuts else None,
+            "p95": round(cuts[94], 3) if cuts else None,
+            "p99": round(cuts[98], 3) if cuts else None,
+            "max": round(ordered[-1], 3) if ordered else None,
+        },
+    }
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    context: RunContext,
+    *,
+    requests: int,
+    concurrency: int,
+    warmup: int,
+    seed: int,
+    query_stats: Callable[[], dict | None] | None = None,
+    reset_query_stats: Callable[[], None] | None = None,
+) -> dict:
+    rng = random.Random(f"{seed}:{scenario.name}")
+    plan = [scenario.build(rng, iteration, context) for iteration in range(warmup + requests)]
+
+    async def send(request: BenchRequest) -> int | str:
+        """Status code of the response, or why the request failed without one."""
+        try:
+            response = await client.request(request.method, request.url, **request.options)
+        except httpx.HTTPError:
+            return "error"
+        # GraphQL reports resolver errors in a 200 response
+        if request.url == "/graphql" and response.status_code == 200 and response.json().get("errors"):
+            return "graphql_error"
+        return response.status_code
+
+    for request in plan[:warmup]:
+        await send(request)
+    if reset_query_stats:
+        reset_query_stats()
+
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+    errors = 0
+    pending = iter(plan[warmup:])
+
+    async def worker() -> None:
+        nonlocal errors
+        # Workers share one iterator, so each request is sent once
+        for request in pending:
+            started = time.perf_counter()
+            status = await send(request)
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses[status] += 1
+            if isinstance(status, str) or status >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result = {
+        "description": scenario.description,
+        **summarize(latencies, statuses, errors, time.perf_counter() - started),
+    }
+    if errors:
+        # Errors return early, so their latency says nothing about the endpoint
+        result["failed"] = f"{errors} of {len(latencies)} requests failed"
+    if query_stats:
+        result.update(query_stats())
+    return result
+
+
+def _in_process_query_stats(registry) -> dict:
+    rows = registry.worst(None)
+    requests = sum(row["requests"] for row in rows)
+    if not requests:
+        return {"queries_per_request": None, "db_ms_per_request": None}
+    return {
+        "queries_per_request": round(sum(row["avg_queries"] * row["requests"] for row in rows) / requests, 2),
+        "db_ms_per_request": round(sum(row["avg_db_ms"] * row["requests"] for row in rows) / requests, 3),
+    }
+
+
+async def _login(client: httpx.AsyncClient) -> str:
+    response = await client.post("/auth/token", data={"username": BENCH_ADMIN_EMAIL, "password": BENCH_PASSWORD})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def run(args: argparse.Namespace) -> dict:
+    dialect = make_url(args.database_url).get_backend_name() if args.database_url else None
+    context = RunContext(volumes=Volumes.for_scale(args.scale), run_id=f"{int(time.time())}")
+    names = args.scenarios.split(",") if args.scenarios else list(SCENARIOS)
+    unknown = sorted(set(names) - set(SCENARIOS))
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(unknown)}")
+    # Writers last, so read scenarios see the seeded data only
+    scenarios = sorted((SCENARIOS[name] for name in names), key=lambda scenario: scenario.writes)
+
+    query_stats = reset_query_stats = None
+    redis = None
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout)
+        client.headers["Authorization"] = f"Bearer {await _login(client)}"
+    else:
+        use_database(args.database_url, args.redis_url)
+        from app.auth import create_access_token
+        from app.config import settings
+        from app.database import engine
+        from app.utils.query_monitor import endpoint_query_stats, install_query_monitor
+        from main import app
+
+        # Per-request logs would drown the report; failures show up in each scenario's status codes
+        logging.disable(logging.CRITICAL)
+        install_query_monitor(engine, settings.slow_query_threshold_ms)
+        query_stats = lambda: _in_process_query_stats(endpoint_query_stats)  # noqa: E731
+        reset_query_stats = endpoint_query_stats.reset
+        redis = settings.redis_url or f"{settings.redis_host}:{settings.redis_port}"
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app, raise_app_exceptions=False),
+            base_url="http://benchmark",
+            headers={"Authorization": f"Bearer {create_access_token({'sub': BENCH_ADMIN_EMAIL})}"},
+            timeout=args.timeout,
+        )
+
+    results: dict[str, dict] = {}
+    async with client:
+        for scenario in scenarios:
+            if scenario.postgres_only and dialect == "sqlite":
+                results[scenario.name] = {"description": scenario.description, "skipped": "requires PostgreSQL"}
+                print(f"  {scenario.name:<20} skipped (requires PostgreSQL)", file=sys.stderr)
+                continue
+            result = await run_scenario(
+                client,
+                scenario,
+                context,
+                requests=args.requests,
+                concurrency=args.concurrency,
+                warmup=args.warmup,
+                seed=args.seed,
+                query_stats=query_stats,
+                reset_query_stats=reset_query_stats,
+            )
+            results[scenario.name] = result
+            latency = result["latency_ms"]
+            queries = result.get("queries_per_request")
+            print(
+                f"  {scenario.name:<20} p50 {latency['p50']:8.2f} ms  p95 {latency['p95']:8.2f} ms  "
+                f"{result['rps']:8.1f} req/s  errors {result['errors']:>4}"
+                + (f"  {queries:6.1f} queries/req" if queries is not None else "")
+                + ("  FAILED" if "failed" in result else ""),
+                file=sys.stderr,
+            )
+
+    return {
+        "metadata": {
+            "git_commit": _git("rev-parse", "HEAD"),
+            "git_dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "target": args.base_url or "in-process",
+            "database": dialect,
+            "redis": redis,
+            "scale": args.scale,
+            "seed": args.seed,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "warmup": args.warmup,
+        },
+        "scenarios": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="database seeded by benchmarks.dataset (required in-process)")
+    parser.add_argument("--redis-url", help="Redis for the in-process app (default: the app's settings)")
+    parser.add_argument("--base-url", help="benchmark a running server instead of the in-process app")
+    parser.add_argument("--scale", type=int, default=10_000, help="scale the dataset was seeded with")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--scenarios", help=f"comma-separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=20, help="unmeasured requests per scenario")
+    parser.add_argument("--timeout", type=float, default=60.0, help="per-request timeout in seconds")
+    parser.add_argument("--output", type=Path, help="write results JSON here (default: stdout)")
+    args = parser.parse_args()
+    if not args.base_url and not args.database_url:
+        parser.error("--database-url is required unless --base-url is given")
+
+    results = asyncio.run(run(args))
+    document = json.dumps(results, indent=2)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(document + "\n")
+        print(f"Results written to {args.output}", file=sys.stderr)
+    else:
+        print(document)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Benchmark scenarios for the hot endpoints.
+
+A scenario turns ``(rng, iteration, context)`` into one HTTP request.  The
+runner seeds ``rng`` per scenario, so every run issues the same request
+sequence against the same dataset (see benchmarks.dataset).  Scenarios
+that rely on Postgres-only SQL are skipped on SQLite; scenarios that write
+run last so they do not change the data the read scenarios see.
+"""
+
+import random
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from benchmarks.dataset import WORDS, Volumes
+
+CONTENT_DETAIL_QUERY = """
+query ContentDetail($id: Int!) {
+  content(id: $id) {
+    id title slug body createdAt
+    author { id username }
+    category { id name }
+    tags { id name }
+  }
+}
+"""
+
+
+@dataclass(frozen=True)
+class RunContext:
+    """What scenarios know about the target."""
+
+    volumes: Volumes
+    run_id: str
+
+
+@dataclass(frozen=True)
+class BenchRequest:
+    method: str
+    url: str
+    options: dict = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    description: str
+    build: Callable[[random.Random, int, RunContext], BenchRequest]
+    postgres_only: bool = False
+    writes: bool = False
+
+
+def _content_list(rng: random.Random, iteration: int, context: RunContext) -> BenchRequest:
+    return BenchRequest("GET", f"/api/v1/content/?skip={rng.randrange(50) * 20}&limit=20")
+
+
+def _content_detail(rng: random.Random, iteration: int, context: RunContext) -> BenchRequest:
+    variables = {"id": rng.randint(1, context.volumes.content)}
+    return BenchRequest("POST", "/graphql", {"json": {"query": CONTENT_DETAIL_QUERY, "variables": variables}})
+
+
+def _search(rng: random.Random, iteration: int, context: RunContext) -> BenchRequest:
+    return BenchRequest("GET", f"/api/v1/search/?q={'+'.join(rng.sample(WORDS, 2))}&limit=20")
+
+
+def _autocomplete(rng: random.Random, iteration: int, context: RunContext) -> BenchRequest:
+    word = rng.choice(WORDS)
+    return BenchRequest("GET", f"/api/v1/search/suggestions?q={word[: rng.randint(2, 4)]}")
+
+
+def _sitemap_index(rng: random.Random, iteration: int, context: RunContext) -> BenchRequest:
+    return BenchRequest("GET", "/sitemap.xml")
+
+
+def _sitemap_shard(rng: random.Random, iteration: int, context: RunContext) -> BenchRequest:
+    return BenchRequest("GET", "/sitemap-content-0.xml")
+
+
+def _analytics_dashboard(rng: random.Random, iteration: int, context: RunContext) -> BenchRequest:
+    return BenchRequest("GET", "/api/v1/dashboard")
+
+
+def _export_json(rng: random.Random, iteration: int, context: RunContext) -> BenchRequest:
+    return BenchRequest("GET", "/api/v1/content/json?limit=1000")
+
+
+def _export_csv(rng: random.Random, iteration: int, context: RunContext) -> BenchRequest:
+    return BenchRequest("GET", "/api/v1/content/csv?limit=1000")
+
+
+def _content_create(rng: random.Random, iteration: int, context: RunContext) -> BenchRequest:
+    # The JSON import (POST /api/v1/content/json) is shadowed by the comments route
+    # POST /api/v1/content/{content_id}, so writes go through the draft endpoint instead.
+    # Slugs carry the run id so repeated runs never collide.
+    draft = {
+        "title": f"Draft {context.run_id} {iteration} {' '.join(rng.sample(WORDS, 3))}",
+        "slug": f"draft-{context.run_id}-{iteration}",
+        "description": " ".join(rng.sample(WORDS, 8)),
+        "body": " ".join(rng.choices(WORDS, k=200)),
+    }
+    return BenchRequest("POST", "/api/v1/content/", {"json": draft})
+
+
+SCENARIOS: dict[str, Scenario] = {
+    scenario.name: scenario
+    for scenario in (
+        Scenario("content_list", "GET /api/v1/content/, first 50 pages of 20", _content_list),
+        Scenario("content_detail", "GraphQL content(id) with author, category and tags", _content_detail),
+        Scenario("search", "Full-text search for two random words", _search, postgres_only=True),
+        Scenario("autocomplete", "Title suggestions for a 2-4 letter prefix", _autocomplete),
+        Scenario("sitemap_index", "GET /sitemap.xml", _sitemap_index),
+        Scenario("sitemap_shard", "GET /sitemap-content-0.xml", _sitemap_shard),
+        Scenario("analytics_dashboard", "GET /api/v1/dashboard", _analytics_dashboard),
+        Scenario("export_json", "Export 1000 content items as JSON", _export_json),
+        Scenario("export_csv", "Export 1000 content items as CSV", _export_csv),
+        Scenario("content_create", "POST /api/v1/content/ with a 200-word draft", _content_create, writes=True),
+    )
+}
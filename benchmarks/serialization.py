@@ -0,0 +1,87 @@
+"""
+Listing-page serialization benchmark.
+
+Compares encoding a 100-item content listing the default FastAPI way
+(validate every row into ``ContentResponse``, dump to JSON-mode dicts,
+``json.dumps``) with the precompiled ``CONTENT_SERIALIZER`` (attributes
+straight to orjson), with and without a sparse fieldset.
+
+    python -m benchmarks.serialization [--items 100] [--rounds 2000]
+"""
+
+import argparse
+import json
+import timeit
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from pydantic import TypeAdapter
+
+from app.models.content import ContentStatus
+from app.schemas.content import ContentResponse
+from app.utils.serializers import CONTENT_SERIALIZER
+
+FIELDS = {"id", "title", "status", "updated_at"}
+
+
+def make_rows(count: int) -> list[SimpleNamespace]:
+    now = datetime.now(timezone.utc)
+    return [
+        SimpleNamespace(
+            id=i,
+            title=f"Article {i}",
+            body="Lorem ipsum dolor sit amet. " * 40,
+            status=ContentStatus.PUBLISHED,
+            created_at=now,
+            updated_at=now,
+            author_id=i % 50,
+            view_count=i * 7,
+            comment_count=i % 13,
+        )
+        for i in range(count)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    rows = make_rows(args.items)
+    adapter = TypeAdapter(list[ContentResponse])
+
+    def pydantic_default():
+        # What FastAPI does for response_model=list[ContentResponse] with JSONResponse
+        validated = adapter.validate_python(rows, from_attributes=True)
+        return json.dumps(adapter.dump_python(validated, mode="json")).encode()
+
+    def pydantic_filtered():
+        # The previous FieldSelector path: full dump per item, then drop keys
+        return json.dumps(
+            [
+                {k: v for k, v in ContentResponse.model_validate(r).model_dump(mode="json").items() if k in FIELDS}
+                for r in rows
+            ]
+        ).encode()
+
+    cases = [
+        ("pydantic + json", pydantic_default),
+        ("precompiled + orjson", lambda: CONTENT_SERIALIZER.dumps(rows)),
+        ("pydantic + filter (fields=4)", pydantic_filtered),
+        ("precompiled (fields=4)", lambda: CONTENT_SERIALIZER.dumps(rows, FIELDS)),
+    ]
+
+    print(f"{args.items} items, {args.rounds} rounds")
+    results = {}
+    for name, fn in cases:
+        per_call = min(timeit.repeat(fn, number=args.rounds, repeat=3)) / args.rounds
+        results[name] = per_call
+        print(f"  {name:<30} {per_call * 1e6:9.1f} µs/page")
+
+    print(f"  speedup (full):   {results['pydantic + json'] / results['precompiled + orjson']:.1f}x")
+    print(f"  speedup (fields): {results['pydantic + filter (fields=4)'] / results['precompiled (fields=4)']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,7 +8,7 @@ from fastapi import Depends, FastAPI, Form, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.openapi.utils import get_openapi
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette.middleware.sessions import SessionMiddleware
@@ -46,6 +46,8 @@ from app.middleware.csrf import CSRFMiddleware, get_csrf_token
 from app.middleware.etag import ETagMiddleware
 from app.middleware.language import LanguageMiddleware
 from app.middleware.logging import StructuredLoggingMiddleware, setup_structured_logging
+from app.middleware.profiling import SampledProfilingMiddleware
+from app.middleware.query_profiling import QueryProfilingMiddleware
 from app.middleware.rate_limit import configure_rate_limiting, limiter
 from app.middleware.rbac import RBACMiddleware
 from app.middleware.security_headers import SecurityHeadersMiddleware
@@ -97,11 +99,20 @@ from app.scheduler import scheduler
 from app.schemas.user import UserUpdate
 from app.services.auth_service import authenticate_user, register_user
 from app.services.content_service import update_user_info
+from app.services.email_service import email_service
+from app.services.resumable_upload_service import install_resumable_upload_cleanup
 from app.utils.audit_retention import install_retention_policy
+from app.utils.cache_bus import cache_bus, start_cache_bus
+from app.utils.counters import counter_buffer, install_counter_jobs
+from app.utils.media_dedupe import install_media_dedupe_job
 from app.utils.metrics import PrometheusMiddleware
 from app.utils.pool_monitor import install_pool_monitor
 from app.utils.query_monitor import install_query_monitor
+from app.utils.recommendations import install_recommendation_job
+from app.utils.redirects import flush_redirect_hits, install_redirect_jobs
+from app.utils.search_analytics import install_search_analytics_writer, search_analytics_buffer
 from app.utils.secrets_validator import validate_secret_key
+from app.utils.serializers import FastJSONResponse
 from app.utils.tracing import setup_tracing
 
 # ── OpenAPI metadata ──────────────────────────────────────────────────────────
@@ -307,6 +318,44 @@ async def lifespan(app: FastAPI):
     # Install audit log retention policy (prunes ActivityLog rows older than retention_days)
     install_retention_policy(scheduler, retention_days=settings.audit_log_retention_days)
 
+    # Install batched search-analytics writer (search requests only enqueue events)
+    install_search_analytics_writer(
+        scheduler,
+        interval_seconds=settings.search_analytics_flush_interval_seconds,
+        batch_size=settings.search_analytics_batch_size,
+        max_buffer_size=settings.search_analytics_max_buffer,
+    )
+
+    # Install engagement counter flush + drift reconciliation jobs
+    install_counter_jobs(
+        scheduler,
+        flush_interval_seconds=settings.counter_flush_interval_seconds,
+        reconcile_interval_minutes=settings.counter_reconcile_interval_minutes,
+    )
+
+    # Install background deduplication of media uploaded before content-addressed storage
+    install_media_dedupe_job(
+        scheduler,
+        interval_minutes=settings.media_dedupe_interval_minutes,
+        batch_size=settings.media_dedupe_batch_size,
+    )
+
+    # Install cleanup of idle resumable uploads
+    install_resumable_upload_cleanup(scheduler)
+
+    # Install periodic rebuild of related-content recommendations (publishes update them incrementally)
+    install_recommendation_job(
+        scheduler,
+        interval_minutes=settings.recommendations_rebuild_interval_minutes,
+        top_k=settings.recommendations_top_k,
+    )
+
+    # Listen for cross-worker invalidation of in-process caches (redirects, translations, tenants, workflow)
+    start_cache_bus()
+
+    # Install batched redirect hit-count writes
+    install_redirect_jobs(scheduler, hit_flush_interval_seconds=settings.redirect_hit_flush_interval_seconds)
+
     # Load and register all built-in plugins
     await initialize_plugins(plugin_registry)
 
@@ -316,6 +365,13 @@ async def lifespan(app: FastAPI):
 
     logger.info("Shutting down the application...")
     scheduler.shutdown()
+    # Persist any search events still buffered in this process
+    await search_analytics_buffer.flush()
+    await counter_buffer.flush()
+    await flush_redirect_hits()
+    await cache_bus.stop()
+    # Quit pooled SMTP connections
+    email_service.close()
 
 
 def create_app() -> FastAPI:
@@ -326,6 +382,7 @@ def create_app() -> FastAPI:
         debug=settings.debug,
         version=settings.app_version,
         lifespan=lifespan,
+        default_response_class=FastJSONResponse if settings.fast_json_responses else JSONResponse,
         openapi_tags=_OPENAPI_TAGS,
         contact={"name": "CMS API Support", "url": "https://github.com/TurtleWithGlasses/cms-project"},
         license_info={"name": "MIT"},
@@ -352,6 +409,9 @@ def create_app() -> FastAPI:
     app.add_middleware(StructuredLoggingMiddleware)
     # Prometheus metrics middleware for request tracking
     app.add_middleware(PrometheusMiddleware)
+    # Always-on sampling profiler for 1 in PROFILER_SAMPLE_RATE requests
+    if settings.profiler_sample_rate > 0:
+        app.add_middleware(SampledProfilingMiddleware, sample_rate=settings.profiler_sample_rate)
     # ETag middleware for conditional GET requests (304 Not Modified)
     if settings.etag_enabled:
         app.add_middleware(ETagMiddleware)
@@ -384,6 +444,12 @@ def create_app() -> FastAPI:
         SecurityHeadersMiddleware,
         enable_hsts=not settings.debug,  # Only enable HSTS in production
     )
+    # Per-request SQL profiling, added last so it also sees queries made by the other middleware
+    app.add_middleware(
+        QueryProfilingMiddleware,
+        n_plus_one_threshold=settings.query_n_plus_one_threshold,
+        server_timing=settings.server_timing_enabled,
+    )
 
     # Include routers with API versioning
     # API v1 routes (standardized)
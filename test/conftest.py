@@ -7,6 +7,7 @@ import sys
 import uuid
 from collections.abc import AsyncGenerator
 from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 from fastapi.testclient import TestClient
@@ -571,3 +572,86 @@ def mock_redis_session(monkeypatch, mock_session_manager):
     monkeypatch.setattr(session_module, "get_session_manager", mock_get_session_manager)
 
     return mock_session_manager
+
+
+@pytest.fixture(autouse=True)
+def local_counter_buffer(monkeypatch):
+    """
+    Keep engagement counter deltas in-process and empty for every test.
+
+    Tables are recreated per test, so ids repeat; deltas left over from a
+    previous test (in memory or in a shared Redis) would leak into counts.
+    """
+    from app.utils import counters as counters_module
+
+    stub = MagicMock()
+    stub.get_client = AsyncMock(return_value=None)
+    monkeypatch.setattr(counters_module, "cache_manager", stub)
+
+    counters_module.counter_buffer.clear()
+    yield counters_module.counter_buffer
+    counters_module.counter_buffer.clear()
+
+
+@pytest.fixture(autouse=True)
+def fresh_redirect_table():
+    """Tables are recreated per test, so a redirect table loaded by an earlier test must not be served."""
+    from app.utils.redirects import redirect_resolver
+
+    redirect_resolver.clear()
+    yield redirect_resolver
+    redirect_resolver.clear()
+
+
+@pytest.fixture(autouse=True)
+def fresh_translation_cache():
+    """Content ids are reused across tests, so resolved translations must not outlive a test."""
+    from app.services.translation_service import _resolved_cache
+
+    _resolved_cache.invalidate()
+    yield _resolved_cache
+    _resolved_cache.invalidate()
+
+
+@pytest.fixture(autouse=True)
+def fresh_workflow_graph():
+    """Workflow tables are recreated per test, so a compiled graph must not outlive a test."""
+    from app.utils.workflow_graph import workflow_graph
+
+    workflow_graph.invalidate()
+    yield workflow_graph
+    workflow_graph.invalidate()
+
+
+@pytest.fixture
+def query_budget():
+    """
+    Assert a SQL query budget for the endpoints requested inside a block:
+
+        with query_budget(5):
+            client.get("/api/v1/comments/content/1")
+
+    Fails if any request ran more than max_queries statements, or repeated one
+    statement more than QUERY_N_PLUS_ONE_THRESHOLD times (an N+1).
+    """
+    from contextlib import contextmanager
+
+    from app.utils.query_monitor import endpoint_query_stats, install_query_monitor
+
+    # Idempotent; the app lifespan (which installs it) does not run for TestClient(app)
+    install_query_monitor(test_engine, settings.slow_query_threshold_ms)
+
+    @contextmanager
+    def budget(max_queries: int):
+        endpoint_query_stats.reset()
+        yield endpoint_query_stats
+        endpoints = endpoint_query_stats.worst(limit=None)
+        assert endpoints, "no profiled request was made inside the query budget"
+        for row in endpoints:
+            assert row["max_queries"] <= max_queries, (
+                f"{row['endpoint']} ran {row['max_queries']} queries (budget {max_queries})"
+            )
+            assert not row["n_plus_one_requests"], f"N+1 on {row['endpoint']}: {row['worst_repeat']}"
+
+    yield budget
+    endpoint_query_stats.reset()
@@ -0,0 +1,126 @@
+"""
+Tests for streaming, manifest-based incremental backups.
+"""
+
+import json
+import tarfile
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.backup import BackupStatus, BackupType
+from app.services import backup_service
+from app.services.backup_service import BackupService
+
+
+@pytest.fixture
+def backup_dirs(tmp_path):
+    media_dir = tmp_path / "uploads"
+    media_dir.mkdir()
+    backup_dir = tmp_path / "backups"
+    backup_dir.mkdir()
+    with patch.object(backup_service, "MEDIA_DIR", media_dir), patch.object(backup_service, "BACKUP_DIR", backup_dir):
+        yield media_dir, backup_dir
+
+
+def _members(path: str) -> set[str]:
+    with tarfile.open(path) as tar:
+        return set(tar.getnames())
+
+
+async def _media_backup(db: AsyncSession, backup_type: BackupType):
+    backup = await BackupService(db).create_backup(backup_type=backup_type, include_database=False)
+    assert backup.status == BackupStatus.COMPLETED, backup.error_message
+    return backup
+
+
+class TestIncrementalBackups:
+    """Only new or changed media is stored again."""
+
+    @pytest.mark.asyncio
+    async def test_incremental_stores_only_changes(self, test_db: AsyncSession, backup_dirs):
+        media_dir, _ = backup_dirs
+        (media_dir / "a.txt").write_text("alpha")
+        (media_dir / "nested").mkdir()
+        (media_dir / "nested" / "b.txt").write_text("beta")
+
+        full = await _media_backup(test_db, BackupType.FULL)
+        assert {"media/a.txt", "media/nested/b.txt", "manifest.json"} <= _members(full.file_path)
+        assert (full.progress_percent, full.progress_stage) == (100, None)
+
+        (media_dir / "c.txt").write_text("gamma")
+        # Same content as a.txt: referenced, not stored
+        (media_dir / "copy.txt").write_text("alpha")
+        incremental = await _media_backup(test_db, BackupType.INCREMENTAL)
+
+        members = _members(incremental.file_path)
+        assert "media/c.txt" in members
+        assert not {"media/a.txt", "media/copy.txt", "media/nested/b.txt"} & members
+
+        manifest = json.loads(
+            backup_service._manifest_path(backup_service.BACKUP_DIR / incremental.filename).read_text()
+        )
+        media = manifest["media"]
+        assert set(media) == {"a.txt", "c.txt", "copy.txt", "nested/b.txt"}
+        assert (media["copy.txt"]["archive"], media["copy.txt"]["member"]) == (full.filename, "media/a.txt")
+        assert media["c.txt"]["archive"] == incremental.filename
+
+    @pytest.mark.asyncio
+    async def test_full_backup_stores_everything(self, test_db: AsyncSession, backup_dirs):
+        media_dir, _ = backup_dirs
+        (media_dir / "a.txt").write_text("alpha")
+        # Archive names only differ by type within the same second
+        await _media_backup(test_db, BackupType.INCREMENTAL)
+
+        second = await _media_backup(test_db, BackupType.FULL)
+        assert "media/a.txt" in _members(second.file_path)
+
+    @pytest.mark.asyncio
+    async def test_delete_removes_manifest(self, test_db: AsyncSession, backup_dirs):
+        media_dir, backup_dir = backup_dirs
+        (media_dir / "a.txt").write_text("alpha")
+        backup = await _media_backup(test_db, BackupType.FULL)
+        manifest_path = backup_service._manifest_path(backup_dir / backup.filename)
+        assert manifest_path.exists()
+
+        assert await BackupService(test_db).delete_backup(backup.id)
+        assert not manifest_path.exists()
+
+
+class TestBackupChains:
+    """Incremental backups keep the archives they reference usable."""
+
+    @pytest.mark.asyncio
+    async def test_cleanup_keeps_referenced_archives(self, test_db: AsyncSession, backup_dirs):
+        media_dir, _ = backup_dirs
+        (media_dir / "a.txt").write_text("alpha")
+        full = await _media_backup(test_db, BackupType.FULL)
+        (media_dir / "b.txt").write_text("beta")
+        incremental = await _media_backup(test_db, BackupType.INCREMENTAL)
+        service = BackupService(test_db)
+
+        # The full backup is past max_backups but the incremental one needs it
+        assert await service.cleanup_old_backups(max_backups=1) == 0
+        assert Path(full.file_path).exists()
+
+        # Only incremental backups reference earlier archives
+        media_only = await _media_backup(test_db, BackupType.MEDIA_ONLY)
+        assert {"media/a.txt", "media/b.txt"} <= _members(media_only.file_path)
+        assert await service.cleanup_old_backups(max_backups=1) == 2
+        assert not Path(full.file_path).exists()
+        assert not Path(incremental.file_path).exists()
+
+    @pytest.mark.asyncio
+    async def test_restore_requires_referenced_archives(self, test_db: AsyncSession, backup_dirs):
+        media_dir, _ = backup_dirs
+        (media_dir / "a.txt").write_text("alpha")
+        full = await _media_backup(test_db, BackupType.FULL)
+        incremental = await _media_backup(test_db, BackupType.INCREMENTAL)
+        service = BackupService(test_db)
+        assert await service.restore_backup(incremental.id)
+
+        Path(full.file_path).unlink()
+        with pytest.raises(FileNotFoundError, match=full.filename):
+            await service.restore_backup(incremental.id)
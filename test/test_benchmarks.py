@@ -0,0 +1,160 @@
+"""
+Tests for the benchmark suite: dataset generator, runner statistics and comparison.
+"""
+
+from collections import Counter
+
+import httpx
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from benchmarks.compare import compare
+from benchmarks.dataset import Dataset, Volumes, load
+from benchmarks.run import run_scenario, summarize
+from benchmarks.scenarios import SCENARIOS, RunContext
+
+
+def _rows(dataset: Dataset) -> dict[str, list[dict]]:
+    return {name: list(rows) for name, rows in dataset.tables()}
+
+
+def _result(p95: float, rps: float, queries: float | None = 4.0, errors: int = 0) -> dict:
+    result = {
+        "requests": 100,
+        "errors": errors,
+        "rps": rps,
+        "latency_ms": {"p50": p95 / 2, "p95": p95, "p99": p95 * 1.2},
+        "queries_per_request": queries,
+    }
+    if errors:
+        result["failed"] = f"{errors} of 100 requests failed"
+    return result
+
+
+class TestDataset:
+    """Generated rows depend only on scale and seed."""
+
+    def test_deterministic(self):
+        assert _rows(Dataset(300, seed=7)) == _rows(Dataset(300, seed=7))
+        assert _rows(Dataset(300, seed=7))["content"] != _rows(Dataset(300, seed=8))["content"]
+
+    def test_volumes(self):
+        rows = _rows(Dataset(1000))
+        volumes = Volumes.for_scale(1000)
+        assert len(rows["content"]) == 1000
+        assert len(rows["users"]) == volumes.users == 100
+        assert len(rows["content_tags"]) == 3000
+        assert len(rows["content_views"]) == 5000
+        assert len(rows["media"]) == 100
+        # Comment counts vary per item around the configured average
+        assert 1500 < len(rows["comments"]) < 2500
+        assert len({row["slug"] for row in rows["content"]}) == 1000
+
+    def test_comment_threads(self):
+        comments = {row["id"]: row for row in Dataset(300).comments()}
+        replies = [row for row in comments.values() if row["parent_id"]]
+        assert replies
+        for reply in replies:
+            parent = comments[reply["parent_id"]]
+            assert parent["content_id"] == reply["content_id"]
+            assert reply["path"].startswith(parent["path"])
+            assert reply["thread_id"] == parent["thread_id"]
+            assert parent["created_at"] < reply["created_at"]
+
+    @pytest.mark.asyncio
+    async def test_load_sqlite(self, tmp_path):
+        url = f"sqlite+aiosqlite:///{tmp_path / 'bench.db'}"
+        counts = await load(url, scale=50, create_schema=True)
+        assert counts["content"] == 50
+
+        engine = create_async_engine(url)
+        try:
+            async with engine.connect() as conn:
+                assert await conn.scalar(text("SELECT SUM(view_count) FROM content")) == counts["content_views"]
+                assert await conn.scalar(text("SELECT COUNT(*) FROM roles")) == 5
+        finally:
+            await engine.dispose()
+
+        with pytest.raises(ValueError, match="not empty"):
+            await load(url, scale=50)
+
+
+class TestSummarize:
+    """Scenario statistics."""
+
+    def test_percentiles_and_throughput(self):
+        result = summarize([float(ms) for ms in range(1, 101)], Counter({200: 98, 500: 2}), 2, 2.0)
+        assert result["latency_ms"]["p50"] == 50.5
+        assert result["latency_ms"]["p99"] == 99.01
+        assert result["latency_ms"]["max"] == 100.0
+        assert result["rps"] == 50.0
+        assert result["status_codes"] == {"200": 98, "500": 2}
+
+    def test_single_request(self):
+        assert summarize([12.0], Counter({200: 1}), 0, 0.1)["latency_ms"]["p95"] == 12.0
+
+
+class TestRunScenario:
+    """Any failed request marks the scenario failed."""
+
+    async def _run(self, handler) -> dict:
+        context = RunContext(volumes=Volumes.for_scale(100), run_id="test")
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://test") as client:
+            return await run_scenario(
+                client, SCENARIOS["content_detail"], context, requests=4, concurrency=2, warmup=0, seed=1
+            )
+
+    @pytest.mark.asyncio
+    async def test_success(self):
+        result = await self._run(lambda request: httpx.Response(200, json={"data": {"content": {"id": 1}}}))
+        assert result["errors"] == 0
+        assert "failed" not in result
+
+    @pytest.mark.asyncio
+    async def test_graphql_errors_fail_the_scenario(self):
+        result = await self._run(lambda request: httpx.Response(200, json={"data": None, "errors": [{}]}))
+        assert result["errors"] == 4
+        assert result["status_codes"] == {"graphql_error": 4}
+        assert result["failed"] == "4 of 4 requests failed"
+
+
+class TestCompare:
+    """Regressions are flagged against the base run."""
+
+    def _runs(self, base: dict, head: dict) -> tuple[dict, dict]:
+        return {"metadata": {}, "scenarios": base}, {"metadata": {}, "scenarios": head}
+
+    def test_within_threshold(self):
+        rows = compare(*self._runs({"list": _result(100, 50)}, {"list": _result(108, 47)}), threshold=10)
+        assert rows[0]["regressions"] == []
+
+    def test_flags_latency_throughput_queries_and_errors(self):
+        rows = compare(
+            *self._runs(
+                {"list": _result(100, 50), "search": _result(20, 200)},
+                {"list": _result(130, 40), "search": _result(20, 200, queries=12.0, errors=3)},
+            ),
+            threshold=10,
+        )
+        regressions = {row["scenario"]: row["regressions"] for row in rows}
+        assert regressions["list"] == ["p95 +30.0%", "throughput -20.0%"]
+        assert regressions["search"] == ["queries/request 4 -> 12", "errors 0 -> 3"]
+
+    def test_failed_scenarios_compare_errors_only(self):
+        rows = compare(
+            *self._runs(
+                {"export": _result(5, 500, errors=100), "import": _result(100, 50)},
+                {"export": _result(500, 5, errors=100), "import": _result(5, 500, errors=100)},
+            )
+        )
+        regressions = {row["scenario"]: row for row in rows}
+        assert regressions["export"]["regressions"] == []
+        assert regressions["export"]["p95_change"] is None
+        assert regressions["import"]["regressions"] == ["errors 0 -> 100"]
+        assert regressions["import"]["failed"]
+
+    def test_skipped_and_missing_scenarios_ignored(self):
+        base = {"search": {"skipped": "requires PostgreSQL"}, "gone": _result(1, 1), "list": _result(1, 1)}
+        rows = compare(*self._runs(base, {"search": _result(500, 1), "list": _result(1, 1)}))
+        assert [row["scenario"] for row in rows] == ["list"]
@@ -4,12 +4,17 @@ Tests for Bulk Operations Service
 Tests bulk operations on content and users for efficiency.
 """
 
+from unittest.mock import patch
+
 import pytest
+from sqlalchemy import func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from utils.mock_utils import create_test_category, create_test_content, create_test_tag
 
+from app.models.activity_log import ActivityLog
 from app.models.content import Content, ContentStatus
+from app.models.content_tags import content_tags
 from app.models.user import Role, User
 from app.services.bulk_operations_service import BulkOperationsService, bulk_operations_service
 
@@ -455,3 +460,68 @@ class TestBulkOperationsService:
         """Test bulk_operations_service singleton exists"""
         assert bulk_operations_service is not None
         assert isinstance(bulk_operations_service, BulkOperationsService)
+
+
+class TestSetBasedBulkOperations:
+    """Content operations run chunked set-based statements with batched activity rows"""
+
+    @staticmethod
+    async def _contents(db: AsyncSession, user: User, prefix: str, count: int, status=ContentStatus.PENDING):
+        return [
+            (await create_test_content(db, title=f"{prefix} {i}", body="Body", author_id=user.id, status=status)).id
+            for i in range(count)
+        ]
+
+    @staticmethod
+    async def _activity_count(db: AsyncSession, action: str) -> int:
+        result = await db.execute(select(func.count()).select_from(ActivityLog).where(ActivityLog.action == action))
+        return result.scalar_one()
+
+    @pytest.mark.asyncio
+    async def test_publish_is_chunked(self, async_db_session, test_user):
+        pending_ids = await self._contents(async_db_session, test_user, "Chunked", 5)
+        draft_ids = await self._contents(async_db_session, test_user, "Chunked draft", 1, ContentStatus.DRAFT)
+
+        with patch("app.services.bulk_operations_service.CHUNK_SIZE", 2):
+            result = await bulk_operations_service.bulk_publish_content(
+                content_ids=pending_ids + draft_ids + [99999],
+                current_user=test_user,
+                db=async_db_session,
+            )
+
+        assert sorted(result["success_ids"]) == sorted(pending_ids)
+        assert result["failed_items"] == [
+            {"id": draft_ids[0], "reason": "Content must be in pending status, currently draft"}
+        ]
+        statuses = await async_db_session.execute(select(Content.status).where(Content.id.in_(pending_ids)))
+        assert set(statuses.scalars()) == {ContentStatus.PUBLISHED}
+        assert await self._activity_count(async_db_session, "content_bulk_published") == 5
+
+    @pytest.mark.asyncio
+    async def test_assign_tags_skips_existing_pairs(self, async_db_session, test_user):
+        content_ids = await self._contents(async_db_session, test_user, "Tagged", 3)
+        tag = await create_test_tag(async_db_session, name="setbased")
+        await async_db_session.execute(content_tags.insert().values(content_id=content_ids[0], tag_id=tag.id))
+        await async_db_session.commit()
+
+        result = await bulk_operations_service.bulk_assign_tags(
+            content_ids=content_ids, tag_ids=[tag.id], current_user=test_user, db=async_db_session
+        )
+
+        assert result == {"success_count": 3, "tags_assigned": 1}
+        pairs = await async_db_session.execute(select(func.count()).select_from(content_tags))
+        assert pairs.scalar_one() == 3
+
+    @pytest.mark.asyncio
+    async def test_delete_keeps_ids_in_activity_details(self, async_db_session, test_user):
+        content_ids = await self._contents(async_db_session, test_user, "Removed", 2)
+
+        result = await bulk_operations_service.bulk_delete_content(
+            content_ids=content_ids, current_user=test_user, db=async_db_session
+        )
+
+        assert sorted(result["deleted_ids"]) == sorted(content_ids)
+        details = await async_db_session.execute(
+            select(ActivityLog.details).where(ActivityLog.action == "content_bulk_deleted")
+        )
+        assert sorted(d["content_id"] for d in details.scalars()) == sorted(content_ids)
@@ -2,11 +2,14 @@
 Tests for Comment functionality.
 """
 
+from unittest.mock import AsyncMock, patch
+
 import pytest
 from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.comment import Comment, CommentStatus
+from app.models.comment import Comment, CommentStatus, comment_path_segment
 from app.models.comment_engagement import (
     CommentEditHistory,
     CommentReaction,
@@ -426,6 +429,176 @@ class TestCommentRoutes:
         assert data["status"] == "APPROVED"
 
 
+# ============== Thread Tests ==============
+
+
+@pytest.fixture
+def no_comment_cache():
+    """Bypass Redis so counts are always computed from the database."""
+    with patch("app.services.comment_service.cache_manager") as mock_cache:
+        mock_cache.get = AsyncMock(return_value=None)
+        mock_cache.set = AsyncMock(return_value=True)
+        mock_cache.invalidate_comments = AsyncMock(return_value=0)
+        yield mock_cache
+
+
+class TestCommentThreads:
+    """Tests for materialized-path thread loading."""
+
+    @pytest.mark.asyncio
+    async def test_create_sets_path_and_thread(
+        self, test_db: AsyncSession, test_user: User, test_content: Content, no_comment_cache
+    ):
+        """New comments get their thread root and ancestor path."""
+        service = CommentService(test_db)
+        root = await service.create_comment(test_content.id, test_user.id, "root", auto_approve=True)
+        child = await service.create_comment(test_content.id, test_user.id, "child", parent_id=root.id)
+        grandchild = await service.create_comment(test_content.id, test_user.id, "gc", parent_id=child.id)
+
+        assert root.thread_id == root.id
+        assert root.path == comment_path_segment(root.id)
+        assert child.thread_id == root.id
+        assert grandchild.thread_id == root.id
+        assert grandchild.path == root.path + comment_path_segment(child.id) + comment_path_segment(grandchild.id)
+        no_comment_cache.invalidate_comments.assert_awaited_with(test_content.id)
+
+    @pytest.mark.asyncio
+    async def test_loads_full_tree_in_one_query(
+        self, test_db: AsyncSession, test_user: User, test_content: Content, no_comment_cache
+    ):
+        """All descendants of the page are loaded in a single statement."""
+        service = CommentService(test_db)
+        root = await service.create_comment(test_content.id, test_user.id, "root", auto_approve=True)
+        parent = root
+        for depth in range(4):
+            parent = await service.create_comment(
+                test_content.id, test_user.id, f"depth {depth + 1}", parent_id=parent.id, auto_approve=True
+            )
+        await service.create_comment(test_content.id, test_user.id, "sibling", parent_id=root.id, auto_approve=True)
+        test_db.expunge_all()
+
+        statements = []
+
+        def count(*_args):
+            statements.append(1)
+
+        engine = test_db.bind.sync_engine
+        event.listen(engine, "before_cursor_execute", count)
+        try:
+            comments = await service.get_comments_for_content(test_content.id)
+        finally:
+            event.remove(engine, "before_cursor_execute", count)
+
+        assert len(statements) == 1
+        assert [c.body for c in comments] == ["root"]
+        assert [r.body for r in comments[0].replies] == ["depth 1", "sibling"]
+
+        node = comments[0]
+        for depth in range(4):
+            node = node.replies[0]
+            assert node.body == f"depth {depth + 1}"
+        assert node.replies == []
+
+    @pytest.mark.asyncio
+    async def test_hidden_ancestor_drops_subtree(
+        self, test_db: AsyncSession, test_user: User, test_content: Content, no_comment_cache
+    ):
+        """Replies under a pending or deleted comment are not shown publicly."""
+        service = CommentService(test_db)
+        root = await service.create_comment(test_content.id, test_user.id, "root", auto_approve=True)
+        pending = await service.create_comment(test_content.id, test_user.id, "pending", parent_id=root.id)
+        await service.create_comment(test_content.id, test_user.id, "under pending", pending.id, auto_approve=True)
+        deleted = await service.create_comment(test_content.id, test_user.id, "gone", root.id, auto_approve=True)
+        await service.create_comment(test_content.id, test_user.id, "under gone", deleted.id, auto_approve=True)
+        deleted.is_deleted = True
+        await test_db.commit()
+
+        public = await service.get_comments_for_content(test_content.id)
+        assert public[0].replies == []
+
+        moderation = await service.get_comments_for_content(test_content.id, include_pending=True)
+        assert [r.body for r in moderation[0].replies] == ["pending"]
+        assert [r.body for r in moderation[0].replies[0].replies] == ["under pending"]
+
+    @pytest.mark.asyncio
+    async def test_rows_without_thread_id_found_by_parent(
+        self, test_db: AsyncSession, test_user: User, test_content: Content, no_comment_cache
+    ):
+        """Comments written without thread_id/path still appear under their parents."""
+        service = CommentService(test_db)
+        root = await service.create_comment(test_content.id, test_user.id, "root", auto_approve=True)
+        child = await service.create_comment(test_content.id, test_user.id, "child", root.id, auto_approve=True)
+        late = await service.create_comment(test_content.id, test_user.id, "late", child.id, auto_approve=True)
+        other = await service.create_comment(test_content.id, test_user.id, "other root", auto_approve=True)
+        # As an instance without the materialized-path columns would have written them
+        for comment in (child, late, other):
+            comment.thread_id = None
+            comment.path = ""
+        await test_db.commit()
+        test_db.expunge_all()
+
+        comments = await service.get_comments_for_content(test_content.id)
+
+        assert [c.body for c in comments] == ["other root", "root"]
+        assert [r.body for r in comments[1].replies] == ["child"]
+        assert [r.body for r in comments[1].replies[0].replies] == ["late"]
+        assert comments[0].replies == []
+
+    @pytest.mark.asyncio
+    async def test_paginates_threads(
+        self, test_db: AsyncSession, test_user: User, test_content: Content, no_comment_cache
+    ):
+        """Pagination applies to top-level comments, newest first."""
+        service = CommentService(test_db)
+        for i in range(3):
+            root = await service.create_comment(test_content.id, test_user.id, f"root {i}", auto_approve=True)
+            await service.create_comment(test_content.id, test_user.id, f"reply {i}", root.id, auto_approve=True)
+
+        first = await service.get_comments_for_content(test_content.id, limit=2)
+        second = await service.get_comments_for_content(test_content.id, skip=2, limit=2)
+
+        assert [c.body for c in first] == ["root 2", "root 1"]
+        assert [c.body for c in second] == ["root 0"]
+        assert [r.body for r in second[0].replies] == ["reply 0"]
+
+        flat = await service.get_comments_for_content(test_content.id, include_replies=False)
+        assert [c.body for c in flat] == ["root 2", "root 1", "root 0"]
+        assert all(c.replies == [] for c in flat)
+
+    @pytest.mark.asyncio
+    async def test_content_reaction_counts(
+        self, test_db: AsyncSession, test_user: User, test_admin: User, test_content: Content, no_comment_cache
+    ):
+        """Reaction counts for a whole content item come from one grouped query."""
+        service = CommentService(test_db)
+        first = await service.create_comment(test_content.id, test_user.id, "first", auto_approve=True)
+        second = await service.create_comment(test_content.id, test_user.id, "second", auto_approve=True)
+        await service.create_comment(test_content.id, test_user.id, "quiet", auto_approve=True)
+
+        await service.toggle_reaction(first.id, test_user.id, ReactionType.LIKE)
+        await service.toggle_reaction(first.id, test_admin.id, ReactionType.LIKE)
+        await service.toggle_reaction(second.id, test_admin.id, ReactionType.DISLIKE)
+
+        counts = await service.get_content_reaction_counts(test_content.id)
+
+        assert counts == {
+            first.id: {"like_count": 2, "dislike_count": 0},
+            second.id: {"like_count": 0, "dislike_count": 1},
+        }
+
+    @pytest.mark.asyncio
+    async def test_moderation_count_served_from_cache(
+        self, test_db: AsyncSession, test_content: Content, no_comment_cache
+    ):
+        """The count including pending comments is cached; the public count is a counter column."""
+        service = CommentService(test_db)
+
+        no_comment_cache.get.return_value = 7
+        assert await service.get_comment_count(test_content.id, include_pending=True) == 7
+        assert await service.get_comment_count(test_content.id) == 0
+        no_comment_cache.set.assert_not_awaited()
+
+
 # ============== Reaction Tests ==============
 
 
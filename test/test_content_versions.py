@@ -0,0 +1,202 @@
+"""
+Tests for delta-compressed content version storage.
+"""
+
+from unittest.mock import patch
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.content import Content, ContentStatus
+from app.models.content_version import ContentVersion
+from app.models.user import User
+from app.services import content_version_service
+from app.utils.text_delta import apply_delta, encode_delta, worth_chaining
+
+ARTICLE = "".join(f"Paragraph {i} of a long article with plenty of text.\n" for i in range(200))
+
+
+@pytest.fixture
+async def test_content(test_db: AsyncSession, test_user: User) -> Content:
+    """Create content with a long body."""
+    content = Content(
+        title="Versioned Article",
+        body=ARTICLE,
+        slug="versioned-article",
+        status=ContentStatus.DRAFT,
+        author_id=test_user.id,
+    )
+    test_db.add(content)
+    await test_db.commit()
+    await test_db.refresh(content)
+    return content
+
+
+async def _save_edits(db: AsyncSession, content: Content, user: User, count: int) -> list[str]:
+    """Create count versions, editing one line before each; returns the expected bodies."""
+    bodies = []
+    for i in range(count):
+        content.body = content.body.replace(f"Paragraph {i} ", f"Edited paragraph {i} ", 1)
+        bodies.append(content.body)
+        await content_version_service.create_version_from_content(content, db, user)
+    return bodies
+
+
+class TestTextDelta:
+    """Tests for the line diff codec."""
+
+    @pytest.mark.parametrize(
+        "base,target",
+        [
+            ("", ""),
+            ("", "new\ntext"),
+            ("a\nb\nc\n", ""),
+            ("a\nb\nc\n", "a\nB\nc\nd"),
+            ("no newline", "no newline at end"),
+            (ARTICLE, ARTICLE.replace("Paragraph 100", "Changed 100")),
+        ],
+    )
+    def test_round_trip(self, base, target):
+        """apply_delta(base, encode_delta(base, target)) == target."""
+        assert apply_delta(base, encode_delta(base, target)) == target
+
+    def test_small_edit_is_small(self):
+        """A one-line edit to a long body compresses to a tiny delta."""
+        delta = encode_delta(ARTICLE, ARTICLE.replace("Paragraph 100", "Changed 100"))
+        assert len(delta) < 100
+        assert worth_chaining(delta, ARTICLE)
+
+    def test_rewrite_not_worth_chaining(self):
+        """A full rewrite is stored as a keyframe instead."""
+        target = "".join(f"Entirely different line {i}\n" for i in range(200))
+        assert not worth_chaining(encode_delta(ARTICLE, target), target)
+
+
+class TestContentVersionStore:
+    """Tests for keyframe + delta storage in content_version_service."""
+
+    @pytest.mark.asyncio
+    async def test_versions_chain_to_keyframe(self, test_db: AsyncSession, test_content: Content, test_user: User):
+        """The first version is a keyframe; later ones are deltas against it."""
+        await _save_edits(test_db, test_content, test_user, 3)
+
+        rows = (
+            await test_db.execute(
+                select(ContentVersion.version_number, ContentVersion.base_version_id, ContentVersion.body)
+                .where(ContentVersion.content_id == test_content.id)
+                .order_by(ContentVersion.version_number)
+            )
+        ).all()
+        keyframe_id = (
+            await test_db.execute(select(ContentVersion.id).where(ContentVersion.version_number == 1))
+        ).scalar()
+
+        assert [r.version_number for r in rows] == [1, 2, 3]
+        assert rows[0].base_version_id is None and rows[0].body is not None
+        assert all(r.base_version_id == keyframe_id and r.body is None for r in rows[1:])
+
+    @pytest.mark.asyncio
+    async def test_reconstruct_every_version(self, test_db: AsyncSession, test_content: Content, test_user: User):
+        """Every version's body is reconstructed exactly."""
+        bodies = await _save_edits(test_db, test_content, test_user, 5)
+        versions = sorted(
+            await content_version_service.get_versions(test_content.id, test_db), key=lambda v: v.version_number
+        )
+
+        for version, body in zip(versions, bodies, strict=True):
+            detail = await content_version_service.get_version(test_content.id, version.id, test_db)
+            assert detail.body == body
+            assert detail.body_length == len(body)
+
+    @pytest.mark.asyncio
+    async def test_keyframe_interval(self, test_db: AsyncSession, test_content: Content, test_user: User):
+        """A new keyframe starts once the chain reaches the configured interval."""
+        with patch.object(content_version_service.settings, "content_version_keyframe_interval", 2):
+            await _save_edits(test_db, test_content, test_user, 5)
+
+        versions = sorted(
+            await content_version_service.get_versions(test_content.id, test_db), key=lambda v: v.version_number
+        )
+        assert [v.is_keyframe for v in versions] == [True, False, True, False, True]
+
+    @pytest.mark.asyncio
+    async def test_listing_does_not_load_bodies(self, test_db: AsyncSession, test_content: Content, test_user: User):
+        """get_versions returns metadata only; body columns stay unloaded."""
+        await _save_edits(test_db, test_content, test_user, 2)
+        test_db.expunge_all()
+
+        versions = await content_version_service.get_versions(test_content.id, test_db)
+
+        assert len(versions) == 2
+        for version in versions:
+            assert "body" not in version.__dict__
+            assert "body_delta" not in version.__dict__
+
+    @pytest.mark.asyncio
+    async def test_get_version_not_found(self, test_db: AsyncSession, test_content: Content):
+        """Unknown versions raise 404."""
+        with pytest.raises(HTTPException) as exc:
+            await content_version_service.get_version(test_content.id, 99999, test_db)
+        assert exc.value.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_rollback_restores_delta_version(self, test_db: AsyncSession, test_content: Content, test_user: User):
+        """Rolling back to a delta-stored version restores its full body and keeps a backup."""
+        bodies = await _save_edits(test_db, test_content, test_user, 3)
+        second = (
+            await test_db.execute(
+                select(ContentVersion.id).where(
+                    ContentVersion.content_id == test_content.id, ContentVersion.version_number == 2
+                )
+            )
+        ).scalar()
+        test_content.body = "Scratch"
+        await test_db.commit()
+
+        restored = await content_version_service.rollback_to_version(test_content.id, second, test_db, test_user)
+
+        assert restored.body == bodies[1]
+        versions = await content_version_service.get_versions(test_content.id, test_db)
+        assert len(versions) == 4
+
+    @pytest.mark.asyncio
+    async def test_concurrent_save_takes_next_number(
+        self, test_db: AsyncSession, test_content: Content, test_user: User
+    ):
+        """A version number claimed by a concurrent save is not reused."""
+        await _save_edits(test_db, test_content, test_user, 1)
+        new_version = content_version_service._new_version
+        content_id, user_id = test_content.id, test_user.id
+
+        async def racing_new_version(content, db, current_user):
+            version = await new_version(content, db, current_user)
+            if version.version_number == 2:
+                # Another request saves version 2 between our max() and insert
+                async with AsyncSession(test_db.bind) as other:
+                    other.add(
+                        ContentVersion(
+                            content_id=content_id,
+                            version_number=2,
+                            title="t",
+                            body="b",
+                            status="draft",
+                            author_id=user_id,
+                        )
+                    )
+                    await other.commit()
+            return version
+
+        with patch.object(content_version_service, "_new_version", racing_new_version):
+            version = await content_version_service.create_version_from_content(test_content, test_db, test_user)
+
+        assert version.version_number == 3
+        numbers = (
+            await test_db.execute(
+                select(ContentVersion.version_number)
+                .where(ContentVersion.content_id == content_id)
+                .order_by(ContentVersion.version_number)
+            )
+        ).scalars()
+        assert list(numbers) == [1, 2, 3]
@@ -0,0 +1,257 @@
+"""
+Tests for denormalized engagement counters.
+"""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.comment import Comment, CommentStatus
+from app.models.comment_engagement import ReactionType
+from app.models.content import Content, ContentStatus
+from app.models.user import User
+from app.services.analytics_service import AnalyticsService
+from app.services.comment_service import CommentService
+from app.utils.counters import CounterBuffer, install_counter_jobs
+
+
+@pytest.fixture
+async def test_content(test_db: AsyncSession, test_user: User) -> Content:
+    """Create published content to count against."""
+    content = Content(
+        title="Counted Article",
+        body="Body",
+        slug="counted-article",
+        status=ContentStatus.PUBLISHED,
+        author_id=test_user.id,
+    )
+    test_db.add(content)
+    await test_db.commit()
+    await test_db.refresh(content)
+    return content
+
+
+async def _column(db: AsyncSession, column):
+    db.expire_all()
+    return (await db.execute(select(column))).scalar()
+
+
+class TestCounterBuffer:
+    """Tests for CounterBuffer without Redis."""
+
+    @pytest.mark.asyncio
+    async def test_incr_and_pending(self, local_counter_buffer):
+        """Deltas accumulate per row and column; zeros are omitted."""
+        await local_counter_buffer.incr("content", 1, "view_count")
+        await local_counter_buffer.incr("content", 1, "view_count", 2)
+        await local_counter_buffer.incr("content", 2, "comment_count", 1)
+        await local_counter_buffer.incr("content", 2, "comment_count", -1)
+
+        assert await local_counter_buffer.pending("content", [1, 2, 3]) == {1: {"view_count": 3}}
+
+    @pytest.mark.asyncio
+    async def test_unknown_counter_rejected(self, local_counter_buffer):
+        """Only declared counter columns can be incremented."""
+        with pytest.raises(ValueError):
+            await local_counter_buffer.incr("content", 1, "title")
+
+    @pytest.mark.asyncio
+    async def test_flush_applies_deltas(self, test_db: AsyncSession, test_content: Content, local_counter_buffer):
+        """Flushing writes deltas to the columns without bumping updated_at."""
+        content_id, updated_at = test_content.id, test_content.updated_at
+        await local_counter_buffer.incr("content", content_id, "view_count", 5)
+        await local_counter_buffer.incr("content", content_id, "comment_count", 2)
+
+        assert await local_counter_buffer.flush(test_db) == 2
+
+        assert await _column(test_db, Content.view_count) == 5
+        assert await _column(test_db, Content.comment_count) == 2
+        assert await _column(test_db, Content.updated_at) == updated_at
+        assert await local_counter_buffer.pending("content", [content_id]) == {}
+        assert await local_counter_buffer.flush(test_db) == 0
+
+    @pytest.mark.asyncio
+    async def test_flush_never_goes_negative(self, test_db: AsyncSession, test_content: Content, local_counter_buffer):
+        """Counters are clamped at zero."""
+        await local_counter_buffer.incr("content", test_content.id, "comment_count", -3)
+        await local_counter_buffer.flush(test_db)
+
+        assert await _column(test_db, Content.comment_count) == 0
+
+    @pytest.mark.asyncio
+    async def test_flush_failure_keeps_deltas(self, local_counter_buffer):
+        """A failed write puts in-process deltas back for the next run."""
+        await local_counter_buffer.incr("content", 1, "view_count", 4)
+        db = AsyncMock()
+        db.execute.side_effect = RuntimeError("db down")
+
+        assert await local_counter_buffer.flush(db) == 0
+        assert await local_counter_buffer.pending("content", [1]) == {1: {"view_count": 4}}
+
+    @pytest.mark.asyncio
+    async def test_reconcile_repairs_drift(
+        self, test_db: AsyncSession, test_user: User, test_content: Content, local_counter_buffer
+    ):
+        """Reconciliation recomputes counters from source rows."""
+        service = CommentService(test_db)
+        comment = await service.create_comment(test_content.id, test_user.id, "hi", auto_approve=True)
+        await service.toggle_reaction(comment.id, test_user.id, ReactionType.LIKE)
+        local_counter_buffer.clear()  # simulate lost deltas
+
+        repaired = await local_counter_buffer.reconcile(test_db)
+
+        assert repaired == 2
+        assert await _column(test_db, Content.comment_count) == 1
+        assert await _column(test_db, Comment.like_count) == 1
+        assert await local_counter_buffer.reconcile(test_db) == 0
+
+    @pytest.mark.asyncio
+    async def test_reconcile_drops_deltas_of_repaired_rows(
+        self, test_db: AsyncSession, test_user: User, test_content: Content, local_counter_buffer
+    ):
+        """Deltas that arrive after the pre-flush are not applied on top of the recount."""
+        service = CommentService(test_db)
+        comment = await service.create_comment(test_content.id, test_user.id, "hi", auto_approve=True)
+        await service.toggle_reaction(comment.id, test_user.id, ReactionType.LIKE)
+
+        # The deltas land after reconcile's own flush
+        with patch.object(CounterBuffer, "_flush_locked", AsyncMock(return_value=0)):
+            assert await local_counter_buffer.reconcile(test_db) == 2
+
+        assert await local_counter_buffer.pending("content", [test_content.id]) == {}
+        assert await local_counter_buffer.pending("comment", [comment.id]) == {}
+        await local_counter_buffer.flush(test_db)
+        assert await _column(test_db, Content.comment_count) == 1
+        assert await _column(test_db, Comment.like_count) == 1
+
+
+class TestCounterBufferRedis:
+    """Tests for the Redis-backed path with a mocked client."""
+
+    def _client(self) -> MagicMock:
+        client = MagicMock()
+        for name in ("hincrby", "hmget", "set", "exists", "rename", "hgetall", "delete"):
+            setattr(client, name, AsyncMock())
+        return client
+
+    @pytest.mark.asyncio
+    async def test_incr_uses_hincrby(self):
+        """Increments go to one Redis hash per entity."""
+        client = self._client()
+        buffer = CounterBuffer()
+        with patch("app.utils.counters.cache_manager") as cm:
+            cm.get_client = AsyncMock(return_value=client)
+            await buffer.incr("comment", 7, "like_count")
+
+        client.hincrby.assert_awaited_once_with("counters:pending:comment", "7:like_count", 1)
+        assert buffer._local == {}
+
+    @pytest.mark.asyncio
+    async def test_flush_renames_and_applies(self):
+        """Flush takes the hash atomically, applies it, then deletes it."""
+        client = self._client()
+        client.set.return_value = True
+        client.exists.return_value = 0
+        client.hgetall.side_effect = [{"3:view_count": "2"}, {"7:like_count": "1", "7:dislike_count": "-1"}]
+        db = AsyncMock()
+        buffer = CounterBuffer()
+
+        with patch("app.utils.counters.cache_manager") as cm:
+            cm.get_client = AsyncMock(return_value=client)
+            written = await buffer.flush(db)
+
+        assert written == 3
+        client.rename.assert_any_await("counters:pending:content", "counters:pending:content:flushing")
+        client.delete.assert_any_await("counters:pending:content:flushing", "counters:pending:comment:flushing")
+        assert db.execute.await_count == 3
+        db.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_flush_skipped_when_locked(self):
+        """Only one worker flushes at a time."""
+        client = self._client()
+        client.set.return_value = None
+        buffer = CounterBuffer()
+
+        with patch("app.utils.counters.cache_manager") as cm:
+            cm.get_client = AsyncMock(return_value=client)
+            assert await buffer.flush(AsyncMock()) == 0
+
+        client.rename.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_reconcile_skipped_when_locked(self):
+        """Reconciliation waits for the next run rather than racing a flush."""
+        client = self._client()
+        client.set.return_value = None
+        db = AsyncMock()
+        buffer = CounterBuffer()
+
+        with patch("app.utils.counters.cache_manager") as cm:
+            cm.get_client = AsyncMock(return_value=client)
+            assert await buffer.reconcile(db) == 0
+
+        db.execute.assert_not_awaited()
+        client.delete.assert_not_awaited()
+
+
+class TestCounterIntegration:
+    """Counters maintained by the services."""
+
+    @pytest.mark.asyncio
+    async def test_comment_count_only_approved(
+        self, test_db: AsyncSession, test_user: User, test_content: Content, local_counter_buffer
+    ):
+        """Only approved comments are counted, before and after a flush."""
+        content_id = test_content.id
+        service = CommentService(test_db)
+        await service.create_comment(content_id, test_user.id, "a", auto_approve=True)
+        await service.create_comment(content_id, test_user.id, "p")
+        assert await service.get_comment_count(content_id) == 1
+
+        await local_counter_buffer.flush(test_db)
+        assert await _column(test_db, Content.comment_count) == 1
+        assert await service.get_comment_count(content_id) == 1
+        assert await service.get_comment_count(content_id, include_pending=True) == 2
+
+    @pytest.mark.asyncio
+    async def test_reaction_counts_from_columns(
+        self, test_db: AsyncSession, test_user: User, test_admin: User, test_content: Content, local_counter_buffer
+    ):
+        """Reaction reads combine the counter columns with pending deltas."""
+        service = CommentService(test_db)
+        comment = await service.create_comment(test_content.id, test_user.id, "c", auto_approve=True)
+        await service.toggle_reaction(comment.id, test_user.id, ReactionType.LIKE)
+        await local_counter_buffer.flush(test_db)
+        await service.toggle_reaction(comment.id, test_admin.id, ReactionType.DISLIKE)
+
+        expected = {"like_count": 1, "dislike_count": 1}
+        assert await service.get_reaction_counts(comment.id) == expected
+        assert await service.get_content_reaction_counts(test_content.id) == {comment.id: expected}
+
+    @pytest.mark.asyncio
+    async def test_view_counter(self, local_counter_buffer):
+        """Recorded (non-duplicate) views increment Content.view_count."""
+        db = MagicMock()
+        db.commit = AsyncMock()
+        db.execute = AsyncMock(
+            side_effect=[MagicMock(scalar=MagicMock(return_value=0)), MagicMock(scalar=MagicMock(return_value=1))]
+        )
+
+        assert await AnalyticsService.record_content_view(db, 7, ip_address="1.1.1.1")
+        assert not await AnalyticsService.record_content_view(db, 7, ip_address="1.1.1.1")
+        assert await local_counter_buffer.pending("content", [7]) == {7: {"view_count": 1}}
+
+
+class TestInstallCounterJobs:
+    """Tests for scheduler wiring."""
+
+    def test_registers_jobs(self):
+        """Flush and reconcile jobs are registered with their intervals."""
+        scheduler = MagicMock()
+        install_counter_jobs(scheduler, flush_interval_seconds=3, reconcile_interval_minutes=15)
+
+        ids = [c.kwargs["id"] for c in scheduler.add_job.call_args_list]
+        assert ids == ["counter_flush", "counter_reconcile"]
@@ -203,3 +203,156 @@ class TestGraphQLContext:
 
         ctx = GraphQLContext(user=None, db=AsyncMock())
         assert ctx.user is None
+
+
+# ============================================================================
+# TestGraphQLDataLoaders — relationships batched per request
+# ============================================================================
+
+
+class TestGraphQLDataLoaders:
+    @staticmethod
+    async def _seed(db, user):
+        from app.models.category import Category
+        from app.models.content import Content, ContentStatus
+        from app.models.tag import Tag
+
+        category = Category(name="News", slug="news")
+        tags = [Tag(name="alpha"), Tag(name="beta")]
+        db.add_all([category, *tags])
+        await db.flush()
+        for i in range(3):
+            content = Content(
+                title=f"Loader {i}",
+                body="Body",
+                slug=f"loader-{i}",
+                status=ContentStatus.PUBLISHED,
+                author_id=user.id,
+                category_id=category.id,
+            )
+            db.add(content)
+            await db.flush()
+            await db.execute(content_tags_insert(content.id, [tag.id for tag in tags]))
+        await db.commit()
+
+    @staticmethod
+    async def _run(db, query, **kwargs):
+        from sqlalchemy import event
+
+        from app.graphql.context import GraphQLContext
+        from app.graphql.schema import schema
+
+        statements = []
+
+        def count(*args):
+            statements.append(args[2])
+
+        engine = db.bind.sync_engine
+        event.listen(engine, "before_cursor_execute", count)
+        try:
+            result = await schema.execute(query, context_value=GraphQLContext(user=None, db=db), **kwargs)
+        finally:
+            event.remove(engine, "before_cursor_execute", count)
+        return result, statements
+
+    @pytest.mark.asyncio
+    async def test_nested_fields_batched(self, test_db, test_user):
+        await self._seed(test_db, test_user)
+
+        result, statements = await self._run(
+            test_db,
+            "{ contents { title author { username roleName } category { slug } tags { name } commentCount } }",
+        )
+
+        assert result.errors is None
+        assert len(result.data["contents"]) == 3
+        assert {c["author"]["username"] for c in result.data["contents"]} == {test_user.username}
+        assert result.data["contents"][0]["tags"] == [{"name": "alpha"}, {"name": "beta"}]
+        assert result.data["contents"][0]["commentCount"] == 0
+        # contents, authors, categories, tags, comment counts
+        assert len(statements) == 5
+
+    @pytest.mark.asyncio
+    async def test_unselected_relationships_not_loaded(self, test_db, test_user):
+        await self._seed(test_db, test_user)
+
+        result, statements = await self._run(test_db, "{ contents { id title } }")
+
+        assert result.errors is None
+        assert len(statements) == 1
+
+
+def content_tags_insert(content_id, tag_ids):
+    from app.models.content_tags import content_tags
+
+    return content_tags.insert().values([{"content_id": content_id, "tag_id": tag_id} for tag_id in tag_ids])
+
+
+# ============================================================================
+# TestGraphQLExtensions — persisted queries and query cost
+# ============================================================================
+
+
+class TestGraphQLExtensions:
+    def test_persisted_query_registered_then_served_by_hash(self):
+        import hashlib
+
+        from app.graphql.schema import persisted_queries, schema
+
+        query = "{ __typename }"
+        sha256 = hashlib.sha256(query.encode()).hexdigest()
+        persisted = {"persistedQuery": {"version": 1, "sha256Hash": sha256}}
+        persisted_queries.clear()
+
+        missing = asyncio.run(schema.execute(None, operation_extensions=persisted))
+        assert missing.errors[0].message == "PersistedQueryNotFound"
+
+        registered = asyncio.run(schema.execute(query, operation_extensions=persisted))
+        assert registered.data == {"__typename": "Query"}
+
+        by_hash = asyncio.run(schema.execute(None, operation_extensions=persisted))
+        assert by_hash.data == {"__typename": "Query"}
+
+    def test_mismatched_hash_rejected(self):
+        from app.graphql.schema import schema
+
+        result = asyncio.run(
+            schema.execute("{ __typename }", operation_extensions={"persistedQuery": {"sha256Hash": "0" * 64}})
+        )
+        assert result.errors[0].extensions["code"] == "INVALID_SHA256"
+
+    def test_registry_is_bounded(self):
+        from app.graphql.extensions import PersistedQueryRegistry
+
+        registry = PersistedQueryRegistry(2)
+        for key in ("a", "b", "c"):
+            registry.register(key, key)
+        assert (registry.get("a"), registry.get("c")) == (None, "c")
+
+    def test_cost_counts_list_limits(self):
+        from graphql import parse
+
+        from app.graphql.extensions import DEFAULT_LIST_SIZE, operation_cost
+        from app.graphql.schema import schema
+
+        document = parse("query Q($n: Int) { contents(limit: $n) { title author { username } tags { name } } }")
+        cost = operation_cost(schema._schema, document, None, {"n": 20})
+        assert cost == 20 + 20 + 20 * DEFAULT_LIST_SIZE
+        # Defaults to the argument's default value
+        assert operation_cost(schema._schema, document, None, {}) == cost
+
+    def test_costly_query_rejected_before_resolvers_run(self):
+        from unittest.mock import AsyncMock
+
+        from app.graphql.context import GraphQLContext
+        from app.graphql.schema import schema
+
+        db = AsyncMock()
+        result = asyncio.run(
+            schema.execute(
+                "{ contents(limit: 100000) { author { username } } }",
+                context_value=GraphQLContext(user=None, db=db),
+            )
+        )
+        assert result.errors[0].extensions["code"] == "QUERY_TOO_COSTLY"
+        db.execute.assert_not_awaited()
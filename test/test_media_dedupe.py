@@ -0,0 +1,238 @@
+"""
+Tests for content-addressed media storage and library deduplication.
+"""
+
+import hashlib
+from datetime import datetime
+from io import BytesIO
+from pathlib import Path
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from fastapi import UploadFile
+from PIL import Image
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.media import Media
+from app.models.media_blob import MediaBlob
+from app.models.user import User
+from app.routes.privacy import AccountDeletionRequest, request_account_deletion
+from app.services.upload_service import UploadService, hash_file
+from app.utils.media_dedupe import dedupe_media_library
+
+
+def _png_bytes() -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", (800, 600), color="blue").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _upload(data: bytes, filename: str = "logo.png", content_type: str = "image/png") -> UploadFile:
+    file = Mock(spec=UploadFile)
+    file.filename = filename
+    file.content_type = content_type
+    file.read = AsyncMock(side_effect=[data, b""])
+    return file
+
+
+def _media(user: User, path, **kwargs) -> Media:
+    now = datetime.now()
+    values = {
+        "filename": path.name,
+        "original_filename": path.name,
+        "file_path": str(path),
+        "file_size": path.stat().st_size if path.exists() else 0,
+        "mime_type": "application/pdf",
+        "file_type": "document",
+        "tags": [],
+        "sizes": {},
+        "uploaded_by": user.id,
+        "uploaded_at": now,
+        "updated_at": now,
+    }
+    return Media(**{**values, **kwargs})
+
+
+@pytest.fixture
+def upload_dir(tmp_path):
+    with (
+        patch("app.services.upload_service.UPLOAD_DIR", tmp_path),
+        patch("app.services.upload_service.THUMBNAIL_DIR", tmp_path / "thumbnails"),
+    ):
+        service = UploadService()
+        yield tmp_path, service
+
+
+class TestContentAddressedStorage:
+    """Identical uploads share one stored blob."""
+
+    @pytest.mark.asyncio
+    async def test_save_file_hashes_stream(self, upload_dir):
+        _, service = upload_dir
+        hasher = hashlib.sha256()
+        await service.save_file(_upload(b"abc", "a.txt", "text/plain"), "a.txt", hasher)
+        assert hasher.hexdigest() == hashlib.sha256(b"abc").hexdigest()
+
+    @pytest.mark.asyncio
+    async def test_blob_stored_once_and_shared(self, upload_dir, test_db: AsyncSession):
+        """The second upload of the same bytes reuses the files and takes a reference."""
+        tmp_path, service = upload_dir
+        data = _png_bytes()
+        content_hash = hashlib.sha256(data).hexdigest()
+
+        temp_path, size = await service.save_file(_upload(data), "incoming.png")
+        stored = service.store_blob(temp_path, content_hash, "logo.png", "image", "image/png")
+        blob = await service.insert_blob(content_hash, size, stored, test_db)
+        await test_db.commit()
+
+        stored_name = Path(blob.file_path).name
+        assert Path(blob.file_path).parent == tmp_path
+        assert stored_name.startswith(f"{content_hash}-") and stored_name.endswith(".png")
+        assert blob.thumbnail_path.endswith(f"thumb_{stored_name}")
+        assert set(blob.sizes) == {"small", "medium"}
+        assert not (tmp_path / "incoming.png").exists()
+
+        with patch.object(service, "store_blob") as store_blob:
+            shared = await service.acquire_blob(content_hash, test_db)
+        store_blob.assert_not_called()
+        assert shared.id == blob.id and shared.ref_count == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_insert_takes_reference(self, upload_dir, test_db: AsyncSession):
+        """A blob inserted by a concurrent upload is reused rather than duplicated."""
+        stored = {"file_path": "uploads/x.pdf", "thumbnail_path": None, "width": None, "height": None, "sizes": {}}
+        await UploadService.insert_blob("f" * 64, 10, stored, test_db)
+        blob = await UploadService.insert_blob("f" * 64, 10, stored, test_db)
+        assert blob.ref_count == 2
+
+    @pytest.mark.asyncio
+    async def test_losing_upload_deletes_its_copy(self, upload_dir, test_db: AsyncSession, test_user: User):
+        """An upload that finds the content already stored removes the files it processed."""
+        _, service = upload_dir
+        data = _png_bytes()
+        content_hash = hashlib.sha256(data).hexdigest()
+        first_path, size = await service.save_file(_upload(data), "first.png")
+        second_path, _ = await service.save_file(_upload(data), "second.png")
+        winner = service.store_blob(first_path, content_hash, "logo.png", "image", "image/png")
+        loser = service.store_blob(second_path, content_hash, "logo.jpg", "image", "image/png")
+        await service.insert_blob(content_hash, size, winner, test_db)
+
+        # The loser processed its file before the winner's row appeared (the record itself is not written)
+        with (
+            patch.object(service, "acquire_blob", AsyncMock(return_value=None)),
+            patch.object(test_db, "flush", AsyncMock()),
+        ):
+            media = await service.create_media(
+                second_path, size, content_hash, "logo.jpg", "image", "image/png", test_user, test_db, stored=loser
+            )
+
+        assert media.file_path == winner["file_path"]
+        assert all(Path(path).exists() for path in UploadService._stored_file_paths(winner))
+        assert not any(Path(path).exists() for path in UploadService._stored_file_paths(loser))
+
+    @pytest.mark.asyncio
+    async def test_reupload_after_delete_gets_new_files(self, upload_dir, test_db: AsyncSession, test_user: User):
+        """Files of a deleted blob are never the paths of a later upload of the same content."""
+        _, service = upload_dir
+        data = _png_bytes()
+        content_hash = hashlib.sha256(data).hexdigest()
+        first_path, size = await service.save_file(_upload(data), "first.png")
+        old = service.store_blob(first_path, content_hash, "logo.png", "image", "image/png")
+        second_path, _ = await service.save_file(_upload(data), "second.png")
+        new = service.store_blob(second_path, content_hash, "logo.png", "image", "image/png")
+
+        # The deleter of the old blob unlinks its files after the new upload stored the same content
+        UploadService._delete_media_files(UploadService._stored_file_paths(old))
+
+        assert set(UploadService._stored_file_paths(old)).isdisjoint(UploadService._stored_file_paths(new))
+        assert all(Path(path).exists() for path in UploadService._stored_file_paths(new))
+
+    @pytest.mark.asyncio
+    async def test_delete_respects_refcount(self, upload_dir, test_db: AsyncSession, test_user: User):
+        """Files are removed only with the last record that references them."""
+        tmp_path, service = upload_dir
+        path = tmp_path / "shared.pdf"
+        path.write_bytes(b"pdf")
+        test_db.add(MediaBlob(content_hash="a" * 64, file_path=str(path), file_size=3, sizes={}, ref_count=3))
+        await test_db.flush()
+        records = [_media(test_user, path, content_hash="a" * 64) for _ in range(3)]
+        test_db.add_all(records)
+        await test_db.commit()
+        ids = [m.id for m in records]
+
+        with patch("app.services.upload_service.cache_manager", AsyncMock()):
+            await service.delete_media(ids[0], test_user, test_db)
+            assert path.exists()
+            await service.bulk_delete_media(ids[1:], test_user, test_db)
+
+        assert not path.exists()
+        assert (await test_db.execute(select(MediaBlob))).scalars().first() is None
+
+    @pytest.mark.asyncio
+    async def test_account_deletion_releases_media(
+        self, upload_dir, test_db: AsyncSession, test_user: User, test_admin: User
+    ):
+        """Erasing an account drops its references; files only it used are deleted."""
+        tmp_path, _ = upload_dir
+        shared, own = tmp_path / "shared.pdf", tmp_path / "own.pdf"
+        shared.write_bytes(b"pdf")
+        own.write_bytes(b"mine")
+        test_db.add_all(
+            [
+                MediaBlob(content_hash="a" * 64, file_path=str(shared), file_size=3, sizes={}, ref_count=2),
+                MediaBlob(content_hash="b" * 64, file_path=str(own), file_size=4, sizes={}, ref_count=1),
+            ]
+        )
+        await test_db.flush()
+        test_db.add_all(
+            [
+                _media(test_user, shared, content_hash="a" * 64),
+                _media(test_admin, shared, content_hash="a" * 64),
+                _media(test_user, own, content_hash="b" * 64),
+            ]
+        )
+        await test_db.commit()
+        admin_id = test_admin.id
+
+        request = AccountDeletionRequest(confirm=True, password="TestPassword123")
+        with patch("app.services.upload_service.cache_manager", AsyncMock()):
+            await request_account_deletion(request, db=test_db, current_user=test_user)
+
+        assert shared.exists() and not own.exists()
+        test_db.expire_all()
+        blobs = (await test_db.execute(select(MediaBlob))).scalars().all()
+        assert [(blob.content_hash, blob.ref_count) for blob in blobs] == [("a" * 64, 1)]
+        remaining = (await test_db.execute(select(Media.uploaded_by))).scalars().all()
+        assert remaining == [admin_id]
+
+
+class TestDedupeJob:
+    """The background job folds existing uploads into shared blobs."""
+
+    @pytest.mark.asyncio
+    async def test_merges_identical_files(self, upload_dir, test_db: AsyncSession, test_user: User):
+        tmp_path, _ = upload_dir
+        first, second, other = tmp_path / "a.pdf", tmp_path / "b.pdf", tmp_path / "c.pdf"
+        first.write_bytes(b"same")
+        second.write_bytes(b"same")
+        other.write_bytes(b"different")
+        records = [_media(test_user, p) for p in (first, second, other, tmp_path / "missing.pdf")]
+        test_db.add_all(records)
+        await test_db.commit()
+        ids = [m.id for m in records]
+
+        with patch("app.utils.media_dedupe.cache_manager", AsyncMock()):
+            attached = await dedupe_media_library(test_db, batch_size=2)
+
+        assert attached == 3
+        assert first.exists() and not second.exists() and other.exists()
+
+        test_db.expire_all()
+        rows = {m.id: m for m in (await test_db.execute(select(Media).where(Media.id.in_(ids)))).scalars()}
+        assert rows[ids[0]].file_path == rows[ids[1]].file_path == str(first)
+        assert rows[ids[0]].content_hash == hash_file(first)
+        assert rows[ids[3]].content_hash is None
+
+        blobs = {b.content_hash: b.ref_count for b in (await test_db.execute(select(MediaBlob))).scalars()}
+        assert blobs == {hash_file(first): 2, hash_file(other): 1}
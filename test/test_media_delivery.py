@@ -0,0 +1,230 @@
+"""
+Tests for offloaded media delivery: signed links, cached descriptors and
+conditional / range responses.
+"""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import FastAPI, HTTPException, Request
+from starlette.testclient import TestClient
+
+from app.routes.media import get_signed_file
+from app.utils.cache import CacheManager
+from app.utils.media_delivery import (
+    MediaDescriptor,
+    RangeNotSatisfiableError,
+    get_media_descriptor,
+    parse_range,
+    serve_file,
+    serve_variant,
+    sign_media_url,
+    verify_signature,
+)
+
+BODY = b"0123456789" * 10
+
+
+@pytest.fixture
+def upload_dir(tmp_path):
+    with patch("app.utils.media_delivery.UPLOAD_DIR", tmp_path):
+        yield tmp_path
+
+
+@pytest.fixture
+def descriptor(upload_dir) -> MediaDescriptor:
+    (upload_dir / "photo.jpg").write_bytes(BODY)
+    return MediaDescriptor(
+        id=5,
+        uploaded_by=1,
+        mime_type="image/jpeg",
+        original_filename="my photo.jpg",
+        file_path=str(upload_dir / "photo.jpg"),
+    )
+
+
+@pytest.fixture
+def client(descriptor) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/file")
+    async def file(request: Request):
+        return serve_variant(request, descriptor, "original")
+
+    return TestClient(app)
+
+
+class TestSignedUrls:
+    """Tests for signing and verifying media links."""
+
+    def test_round_trip(self):
+        url, expires = sign_media_url(5, "small", ttl=300, now=1000)
+        sig = url.rsplit("sig=", 1)[1]
+        assert url.startswith(f"/api/v1/media/signed/5/small?expires={expires}&")
+        assert verify_signature(5, "small", expires, sig, now=1000)
+
+    def test_stable_within_window(self):
+        """Links issued in the same window are identical and valid for at least one ttl."""
+        first, expires = sign_media_url(5, "original", ttl=300, now=1200)
+        assert sign_media_url(5, "original", ttl=300, now=1499)[0] == first
+        assert 300 < expires - 1200 <= 600
+
+    def test_rejects_tampering_and_expiry(self):
+        url, expires = sign_media_url(5, "original", ttl=300, now=1000)
+        sig = url.rsplit("sig=", 1)[1]
+        assert not verify_signature(6, "original", expires, sig, now=1000)
+        assert not verify_signature(5, "large", expires, sig, now=1000)
+        assert not verify_signature(5, "original", expires + 300, sig, now=1000)
+        assert not verify_signature(5, "original", expires, sig, now=expires + 1)
+
+    @pytest.mark.asyncio
+    async def test_signed_route_rejects_bad_signature(self):
+        """Bad links are refused before any lookup."""
+        with patch("app.routes.media.get_media_descriptor", AsyncMock()) as lookup, pytest.raises(HTTPException) as exc:
+            await get_signed_file(request=None, media_id=5, variant="original", expires=2**40, sig="x", db=None)
+
+        assert exc.value.status_code == 403
+        lookup.assert_not_awaited()
+
+
+class TestParseRange:
+    """Tests for Range header parsing."""
+
+    @pytest.mark.parametrize(
+        ("header", "expected"),
+        [
+            ("bytes=0-9", (0, 9)),
+            ("bytes=90-", (90, 99)),
+            ("bytes=90-500", (90, 99)),
+            ("bytes=-10", (90, 99)),
+            ("bytes=-500", (0, 99)),
+            ("bytes=5-1", None),
+            ("bytes=0-1,5-6", None),
+            ("items=0-1", None),
+        ],
+    )
+    def test_parse(self, header, expected):
+        assert parse_range(header, 100) == expected
+
+    @pytest.mark.parametrize("header", ["bytes=100-", "bytes=-0"])
+    def test_unsatisfiable(self, header):
+        with pytest.raises(RangeNotSatisfiableError):
+            parse_range(header, 100)
+
+
+class TestServeFile:
+    """Tests for validators, conditional requests and partial content."""
+
+    def test_full_response(self, client):
+        response = client.get("/file")
+        assert response.status_code == 200
+        assert response.content == BODY
+        assert response.headers["accept-ranges"] == "bytes"
+        assert response.headers["content-disposition"] == "attachment; filename*=utf-8''my%20photo.jpg"
+        assert response.headers["etag"] and response.headers["last-modified"]
+
+    def test_conditional_requests(self, client):
+        """Matching ETag or unchanged modification date yields 304 without a body."""
+        first = client.get("/file")
+        by_etag = client.get("/file", headers={"If-None-Match": first.headers["etag"]})
+        by_date = client.get("/file", headers={"If-Modified-Since": first.headers["last-modified"]})
+        stale = client.get("/file", headers={"If-None-Match": '"other"'})
+
+        assert by_etag.status_code == by_date.status_code == 304
+        assert by_etag.content == b""
+        assert stale.status_code == 200
+
+    def test_range(self, client):
+        response = client.get("/file", headers={"Range": "bytes=10-19"})
+        assert response.status_code == 206
+        assert response.content == BODY[10:20]
+        assert response.headers["content-range"] == "bytes 10-19/100"
+        assert response.headers["content-length"] == "10"
+
+    def test_range_not_satisfiable(self, client):
+        response = client.get("/file", headers={"Range": "bytes=500-"})
+        assert response.status_code == 416
+        assert response.headers["content-range"] == "bytes */100"
+
+    def test_stale_if_range_sends_full_file(self, client):
+        response = client.get("/file", headers={"Range": "bytes=0-1", "If-Range": '"stale"'})
+        assert response.status_code == 200
+        assert response.content == BODY
+
+    def test_missing_file(self, upload_dir):
+        with pytest.raises(HTTPException) as exc:
+            serve_file(SimpleNamespace(headers={}), upload_dir / "gone.jpg", "image/jpeg")
+        assert exc.value.status_code == 404
+
+
+class TestAccelRedirect:
+    """Tests for the nginx handoff."""
+
+    def test_hands_off_to_nginx(self, descriptor, upload_dir):
+        (upload_dir / "small").mkdir()
+        (upload_dir / "small" / "photo.jpg").write_bytes(b"")
+        descriptor.sizes = {"small": str(upload_dir / "small" / "photo.jpg")}
+
+        with patch("app.utils.media_delivery.settings.media_accel_redirect_prefix", "/protected-media/"):
+            response = serve_variant(None, descriptor, "small", cache_control="private, max-age=60")
+
+        assert response.headers["x-accel-redirect"] == "/protected-media/small/photo.jpg"
+        assert response.headers["cache-control"] == "private, max-age=60"
+        assert response.media_type == "image/jpeg"
+        assert response.body == b""
+
+    def test_paths_outside_upload_dir_are_refused(self, descriptor):
+        descriptor.file_path = "/etc/passwd"
+        with pytest.raises(HTTPException) as exc:
+            descriptor.path_for("original")
+        assert exc.value.status_code == 403
+
+
+class TestMediaDescriptor:
+    """Tests for the cached descriptor lookup."""
+
+    @pytest.mark.asyncio
+    async def test_loaded_once_then_cached(self):
+        store: dict = {}
+        media = SimpleNamespace(
+            id=3,
+            uploaded_by=1,
+            mime_type="image/png",
+            original_filename="a.png",
+            file_path="uploads/a.png",
+            thumbnail_path=None,
+            sizes=None,
+        )
+
+        async def cache_set(key, value, ttl=None):
+            store[key] = value
+            return True
+
+        with (
+            patch("app.utils.media_delivery.cache_manager") as cm,
+            patch("app.utils.media_delivery.upload_service.get_media_by_id", AsyncMock(return_value=media)) as get,
+        ):
+            cm.get = AsyncMock(side_effect=lambda key: store.get(key))
+            cm.set = AsyncMock(side_effect=cache_set)
+            first = await get_media_descriptor(3, db=None)
+            second = await get_media_descriptor(3, db=None)
+
+        get.assert_awaited_once()
+        assert first == second
+        assert f"{CacheManager.PREFIX_MEDIA}3" in store
+
+    def test_access_rule(self, descriptor):
+        def user(user_id, role):
+            return SimpleNamespace(id=user_id, role=SimpleNamespace(name=role))
+
+        assert descriptor.can_access(user(1, "user"))
+        assert descriptor.can_access(user(2, "admin"))
+        assert not descriptor.can_access(user(2, "editor"))
+
+    @pytest.mark.asyncio
+    async def test_invalidate_media(self):
+        manager = CacheManager()
+        with patch.object(manager, "delete", AsyncMock(return_value=True)) as delete:
+            await manager.invalidate_media(3)
+        delete.assert_awaited_once_with(f"{CacheManager.PREFIX_MEDIA}3")
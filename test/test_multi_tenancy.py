@@ -10,6 +10,7 @@ Test classes:
     TestTenantMiddleware    (~15) — pure logic, no live DB
     TestTenantRoutes        (~15) — route registration + access control
     TestUserTenantIsolation (~10) — User model FK + config + migration
+    TestTenantRegistry      (~6)  — cached slug/domain resolution
 """
 
 from __future__ import annotations
@@ -549,3 +550,117 @@ class TestUserTenantIsolation:
         # Check the code default (not the env-overridden value)
         default_version = Settings.model_fields["app_version"].default
         assert default_version == "1.24.0"
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 6. TestTenantRegistry
+# ══════════════════════════════════════════════════════════════════════════════
+
+
+def _resolved(tenant_id: int = 1, status: str = "active"):
+    from app.utils.tenant_registry import ResolvedTenant
+
+    return ResolvedTenant(tenant_id, "acme", status, "pro")
+
+
+class TestTenantRegistry:
+    def test_hits_and_misses_are_cached(self):
+        from app.utils.tenant_registry import TenantRegistry
+
+        registry = TenantRegistry()
+        load = AsyncMock(side_effect=lambda kind, value: _resolved() if value == "acme" else None)
+
+        async def run():
+            with patch.object(TenantRegistry, "_load", load):
+                for _ in range(3):
+                    assert (await registry.by_slug("acme")).id == 1
+                    assert await registry.by_slug("unknown") is None
+
+        asyncio.run(run())
+        assert load.await_count == 2
+
+    def test_negative_entries_expire_sooner(self):
+        from app.utils.tenant_registry import TenantRegistry
+
+        registry = TenantRegistry(ttl_seconds=60, negative_ttl_seconds=1)
+        load = AsyncMock(side_effect=lambda kind, value: _resolved() if value == "acme" else None)
+
+        async def run():
+            with patch.object(TenantRegistry, "_load", load), patch("app.utils.tenant_registry.time") as clock:
+                clock.monotonic.return_value = 100.0
+                await registry.by_slug("acme")
+                await registry.by_slug("unknown")
+                clock.monotonic.return_value = 110.0
+                await registry.by_slug("acme")
+                await registry.by_slug("unknown")
+
+        asyncio.run(run())
+        assert [c.args for c in load.await_args_list] == [("slug", "acme"), ("slug", "unknown"), ("slug", "unknown")]
+
+    def test_concurrent_lookups_share_one_query(self):
+        from app.utils.tenant_registry import TenantRegistry
+
+        registry = TenantRegistry()
+
+        async def slow_load(kind, value):
+            await asyncio.sleep(0.01)
+            return _resolved()
+
+        load = AsyncMock(side_effect=slow_load)
+
+        async def run():
+            with patch.object(TenantRegistry, "_load", load):
+                return await asyncio.gather(*(registry.by_domain("CMS.acme.com") for _ in range(5)))
+
+        results = asyncio.run(run())
+        assert load.await_count == 1
+        assert load.await_args.args == ("domain", "cms.acme.com")
+        assert all(r.id == 1 for r in results)
+
+    def test_invalidate_drops_entries(self):
+        from app.utils.tenant_registry import TenantRegistry
+
+        registry = TenantRegistry()
+        load = AsyncMock(side_effect=[_resolved(), _resolved(status="suspended")])
+
+        async def run():
+            with patch.object(TenantRegistry, "_load", load):
+                assert (await registry.by_slug("acme")).status == "active"
+                registry.invalidate()
+                assert (await registry.by_slug("acme")).status == "suspended"
+
+        asyncio.run(run())
+
+    def test_suspend_tenant_invalidates_registry(self):
+        from app.services.tenant_service import suspend_tenant
+
+        mock_tenant = MagicMock()
+        mock_tenant.id = 1
+        mock_tenant.slug = "acme"
+        db = _make_async_mock_db()
+        db.execute.return_value.scalars.return_value.first.return_value = mock_tenant
+
+        with patch("app.services.tenant_service.invalidate_tenants", new_callable=AsyncMock) as invalidate:
+            asyncio.run(suspend_tenant(1, db))
+        invalidate.assert_awaited_once()
+
+    def test_middleware_resolves_custom_domain(self):
+        from app.middleware.tenant import TenantMiddleware
+
+        request = MagicMock()
+        request.headers = {"host": "cms.acme.com:443"}
+
+        async def run():
+            middleware = TenantMiddleware(MagicMock())
+            with (
+                patch("app.middleware.tenant.settings") as mock_settings,
+                patch("app.middleware.tenant.tenant_registry") as registry,
+            ):
+                mock_settings.enable_multitenancy = True
+                mock_settings.app_domain = "localhost"
+                registry.by_domain = AsyncMock(return_value=_resolved())
+                await middleware.dispatch(request, AsyncMock())
+                registry.by_domain.assert_awaited_once_with("cms.acme.com")
+
+        asyncio.run(run())
+        assert (request.state.tenant_id, request.state.tenant_slug, request.state.tenant_plan) == (1, "acme", "pro")
@@ -0,0 +1,192 @@
+"""
+Tests for batched digest / queue processing against a local SMTP sink.
+"""
+
+import socketserver
+import threading
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.notification_preference import (
+    DigestFrequency,
+    NotificationCategory,
+    NotificationChannel,
+    NotificationDigest,
+    NotificationPreference,
+    NotificationQueue,
+)
+from app.models.user import User
+from app.services.email_service import EmailService
+from app.services.notification_service import NotificationService
+
+
+class _SMTPSinkHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP to accept messages without TLS or auth"""
+
+    def _reply(self, line: str) -> None:
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        self.server.connections += 1
+        self._reply("220 sink ready")
+        while line := self.rfile.readline():
+            command = line.decode().strip().upper()
+            if command.startswith("EHLO"):
+                self._reply("250 sink")
+            elif command == "DATA":
+                self._reply("354 end with .")
+                data = []
+                while (chunk := self.rfile.readline()) not in (b".\r\n", b""):
+                    data.append(chunk)
+                self.server.messages.append(b"".join(data))
+                self._reply("250 queued")
+            elif command == "QUIT":
+                self._reply("221 bye")
+                return
+            else:
+                self._reply("250 ok")
+
+
+class _SMTPSink(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _SMTPSinkHandler)
+        self.connections = 0
+        self.messages: list[bytes] = []
+
+
+@pytest.fixture
+def smtp_sink():
+    sink = _SMTPSink()
+    thread = threading.Thread(target=sink.serve_forever, daemon=True)
+    thread.start()
+    yield sink
+    sink.shutdown()
+    sink.server_close()
+
+
+@pytest.fixture
+def sink_email_service(smtp_sink):
+    """An EmailService sending to the sink, swapped in for the notification service."""
+    service = EmailService()
+    service.smtp_host, service.smtp_port = smtp_sink.server_address
+    service.smtp_user = service.smtp_password = None
+    service.smtp_starttls = False
+    service.max_connections = 2
+    with patch("app.services.notification_service.email_service", service):
+        yield service
+    service.close()
+
+
+async def _users(db: AsyncSession, role_id: int, count: int) -> list[User]:
+    users = [
+        User(username=f"digest{i}", email=f"digest{i}@example.com", hashed_password="x", role_id=role_id)
+        for i in range(count)
+    ]
+    db.add_all(users)
+    await db.commit()
+    return users
+
+
+def _queued(user: User, subject: str, category=NotificationCategory.CONTENT, is_digest=True) -> NotificationQueue:
+    return NotificationQueue(
+        user_id=user.id,
+        category=category,
+        subject=subject,
+        body=f"{subject} body",
+        channel=NotificationChannel.EMAIL,
+        is_digest=is_digest,
+        created_at=datetime.utcnow(),
+    )
+
+
+class TestBatchedDigests:
+    """Digests go out in batches over a few reused SMTP connections."""
+
+    @pytest.mark.asyncio
+    async def test_digests_sent_over_pooled_connections(
+        self, test_db: AsyncSession, test_user: User, smtp_sink, sink_email_service
+    ):
+        users = await _users(test_db, test_user.role_id, 5)
+        test_db.add_all(
+            NotificationPreference(
+                user_id=user.id,
+                category=NotificationCategory.CONTENT,
+                digest_frequency=DigestFrequency.DAILY,
+                created_at=datetime.utcnow(),
+            )
+            for user in users
+        )
+        test_db.add_all(_queued(user, f"update {n}") for user in users for n in range(2))
+        # Not part of the user's daily digest categories
+        test_db.add(_queued(users[0], "login", category=NotificationCategory.SECURITY))
+        await test_db.commit()
+
+        sent = await NotificationService(test_db).process_digests(DigestFrequency.DAILY, batch_size=2)
+
+        assert sent == 5
+        assert len(smtp_sink.messages) == 5
+        assert smtp_sink.connections <= sink_email_service.max_connections
+        assert b"Subject: Your Daily Notification Digest" in smtp_sink.messages[0]
+
+        rows = (await test_db.execute(select(NotificationQueue.subject, NotificationQueue.is_sent))).all()
+        assert {subject: is_sent for subject, is_sent in rows if subject == "login"} == {"login": False}
+        assert all(is_sent for subject, is_sent in rows if subject != "login")
+        digests = (await test_db.execute(select(NotificationDigest.notification_count))).scalars().all()
+        assert digests == [2] * 5
+
+    @pytest.mark.asyncio
+    async def test_failed_send_counts_attempt(self, test_db: AsyncSession, test_user: User, sink_email_service):
+        test_db.add(_queued(test_user, "queued", is_digest=False))
+        await test_db.commit()
+
+        with patch.object(EmailService, "_send_pooled", return_value=False):
+            assert await NotificationService(test_db).process_immediate_queue() == 0
+
+        item = (await test_db.execute(select(NotificationQueue))).scalar_one()
+        assert (item.is_sent, item.attempts) == (False, 1)
+
+    @pytest.mark.asyncio
+    async def test_exhausted_items_do_not_block_queue(
+        self, test_db: AsyncSession, test_user: User, smtp_sink, sink_email_service
+    ):
+        test_db.add_all([_queued(test_user, f"bounced {n}", is_digest=False) for n in range(3)])
+        test_db.add(_queued(test_user, "retried", is_digest=False))
+        await test_db.flush()
+        items = (await test_db.execute(select(NotificationQueue).order_by(NotificationQueue.id))).scalars().all()
+        for item in items[:3]:
+            item.attempts = settings.notification_max_attempts
+        items[3].attempts = 1
+        test_db.add(_queued(test_user, "fresh", is_digest=False))
+        await test_db.commit()
+
+        # The fresh item is picked before the retry; exhausted items are not picked at all
+        assert await NotificationService(test_db).process_immediate_queue(limit=1) == 1
+        assert b"Subject: fresh" in smtp_sink.messages[0]
+        assert await NotificationService(test_db).process_immediate_queue() == 1
+        assert await NotificationService(test_db).process_immediate_queue() == 0
+        assert len(smtp_sink.messages) == 2
+
+
+class TestImmediateQueue:
+    """The retry queue resolves recipients in bulk and commits once."""
+
+    @pytest.mark.asyncio
+    async def test_sends_queued_items(self, test_db: AsyncSession, test_user: User, smtp_sink, sink_email_service):
+        users = await _users(test_db, test_user.role_id, 3)
+        test_db.add_all(_queued(user, "hello", is_digest=False) for user in users)
+        test_db.add(_queued(users[0], "digest only"))
+        await test_db.commit()
+
+        assert await NotificationService(test_db).process_immediate_queue() == 3
+        assert len(smtp_sink.messages) == 3
+        assert smtp_sink.connections <= sink_email_service.max_connections
+        pending = await test_db.execute(select(NotificationQueue.subject).where(NotificationQueue.is_sent.is_(False)))
+        assert pending.scalars().all() == ["digest only"]
@@ -196,12 +196,12 @@ class TestNotificationEmailIntegration:
         assert hasattr(NotificationService, "process_immediate_queue")
         assert callable(NotificationService.process_immediate_queue)
 
-    def test_notification_service_has_send_digest(self):
-        """Test that NotificationService has _send_digest method."""
+    def test_notification_service_has_send_digest_batch(self):
+        """Test that NotificationService has _send_digest_batch method."""
         from app.services.notification_service import NotificationService
 
-        assert hasattr(NotificationService, "_send_digest")
-        assert callable(NotificationService._send_digest)
+        assert hasattr(NotificationService, "_send_digest_batch")
+        assert callable(NotificationService._send_digest_batch)
 
     def test_notification_service_has_queue_email(self):
         """Test that NotificationService has _queue_email method."""
@@ -7,8 +7,9 @@ All tests run without a live database or Redis connection.
 Test classes:
     TestPermissionDefinitions    — ALL_PERMISSIONS catalogue + template validity
     TestRoleInheritance          — get_role_permissions() with inheritance
+    TestCompiledPermissionMatrix — role bitmasks agree with get_role_permissions()
     TestPermissionTemplates      — PERMISSION_TEMPLATES validity
-    TestPermissionServiceLogic   — PermissionService.check_permission() logic (mocked DB)
+    TestPermissionServiceLogic   — check_permission() / check_permissions() logic (mocked DB)
     TestContentPermissionModel   — ContentPermission model structure
     TestPermissionRoutes         — route registration + auth requirements
     TestPermissionDependency     — dependency factories
@@ -25,7 +26,10 @@ from app.permissions_config.permissions import (
     PERMISSION_TEMPLATES,
     ROLE_INHERITANCE,
     ROLE_OWN_PERMISSIONS,
+    ROLE_PERMISSION_MASKS,
+    WILDCARD_MASK,
     get_role_permissions,
+    role_has_permission,
 )
 from app.services.permission_service import PermissionService
 from main import app
@@ -157,6 +161,28 @@ class TestPermissionTemplates:
         assert "analytics.view" in PERMISSION_TEMPLATES["analyst"]
 
 
+# ── TestCompiledPermissionMatrix ──────────────────────────────────────────────
+
+
+class TestCompiledPermissionMatrix:
+    """ROLE_PERMISSION_MASKS is a faithful compilation of the role tables."""
+
+    @pytest.mark.parametrize("role", sorted(ROLE_OWN_PERMISSIONS))
+    def test_matches_get_role_permissions(self, role):
+        resolved = get_role_permissions(role)
+        for perm in ALL_PERMISSIONS:
+            assert role_has_permission(role, perm) == ("*" in resolved or perm in resolved)
+
+    def test_wildcard_roles(self):
+        assert ROLE_PERMISSION_MASKS["admin"] == WILDCARD_MASK
+        assert role_has_permission("superadmin", "not.in.catalogue")
+        assert not role_has_permission("manager", "not.in.catalogue")
+
+    def test_unknown_role_raises(self):
+        with pytest.raises(ValueError, match="Invalid role"):
+            role_has_permission("ghost_role", "content.read")
+
+
 # ── TestPermissionServiceLogic ────────────────────────────────────────────────
 
 
@@ -229,6 +255,39 @@ class TestPermissionServiceLogic:
         user = self._make_user("editor")
         assert await service.check_permission(user, "content.create", content_id=99)
 
+    @pytest.mark.asyncio
+    async def test_content_scoped_decision_is_memoised(self):
+        service = self._make_service(object_level_result=False)
+        user = self._make_user("editor")
+        assert not await service.check_permission(user, "content.update", content_id=3)
+        assert not await service.check_permission(user, "content.update", content_id=3)
+        service._get_object_level_decision.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_check_permissions_one_query_per_page(self):
+        db = AsyncMock()
+        # (content_id, user_id, granted): user deny on 1, role grant on 2, user grant beats role deny on 3
+        rows = [(1, 1, False), (2, None, True), (3, None, False), (3, 1, True)]
+        db.execute = AsyncMock(return_value=MagicMock(all=lambda: rows))
+        service = PermissionService(db)
+        user = self._make_user("user")
+
+        decisions = await service.check_permissions(user, "content.publish", [1, 2, 3, 4])
+
+        assert decisions == {1: False, 2: True, 3: True, 4: False}
+        db.execute.assert_awaited_once()
+        # Already decided: no further queries, single checks reuse the memo
+        assert await service.check_permissions(user, "content.publish", [2, 4]) == {2: True, 4: False}
+        assert await service.check_permission(user, "content.publish", content_id=3)
+        db.execute.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_check_permissions_wildcard_skips_db(self):
+        db = AsyncMock()
+        service = PermissionService(db)
+        assert await service.check_permissions(self._make_user("admin"), "content.delete", [1, 2]) == {1: True, 2: True}
+        db.execute.assert_not_awaited()
+
     @pytest.mark.asyncio
     async def test_get_effective_permissions_admin_returns_all(self):
         service = self._make_service()
@@ -350,6 +409,10 @@ class TestPermissionRoutes:
         paths = {route.path for route in app.routes}
         assert "/api/v1/permissions/check" in paths
 
+    def test_permissions_check_batch_path_registered(self):
+        paths = {route.path for route in app.routes}
+        assert "/api/v1/permissions/check/batch" in paths
+
     def test_permissions_me_path_registered(self):
         paths = {route.path for route in app.routes}
         assert "/api/v1/permissions/me" in paths
@@ -388,6 +451,34 @@ class TestPermissionRoutes:
             response = await client.get("/api/v1/permissions/check?permission=content.read")
         assert response.status_code in (307, 401, 403)
 
+    @pytest.mark.asyncio
+    async def test_check_batch_requires_auth(self):
+        async with AsyncClient(
+            transport=ASGITransport(app=app),
+            base_url="http://test",
+            follow_redirects=False,
+        ) as client:
+            response = await client.get("/api/v1/permissions/check/batch?permission=content.read&content_ids=1")
+        assert response.status_code in (307, 401, 403)
+
+    @pytest.mark.asyncio
+    async def test_check_batch_resolves_page_in_one_query(self):
+        from app.routes.permissions import check_my_permission_batch
+
+        db = AsyncMock()
+        # (content_id, user_id, granted): user grant on 2
+        db.execute = AsyncMock(return_value=MagicMock(all=lambda: [(2, 1, True)]))
+        user = MagicMock()
+        user.id = 1
+        user.role.name = "user"
+
+        result = await check_my_permission_batch(
+            permission="content.publish", content_ids=[1, 2, 3], db=db, current_user=user
+        )
+
+        assert result == {"permission": "content.publish", "allowed": {1: False, 2: True, 3: False}}
+        db.execute.assert_awaited_once()
+
     @pytest.mark.asyncio
     async def test_me_requires_auth(self):
         async with AsyncClient(
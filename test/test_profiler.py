@@ -0,0 +1,177 @@
+"""
+Tests for the sampling profiler and its monitoring endpoints.
+"""
+
+import asyncio
+import hashlib
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.middleware.profiling import SampledProfilingMiddleware
+from app.utils.profiler import FrameKey, Profile, ProfilerBusyError, RequestSampler, profile_worker
+
+IDLE = (FrameKey("<idle>", "", 0),)
+
+
+def _stack(*names: str) -> tuple[FrameKey, ...]:
+    return (FrameKey("task:Task", "", 0),) + tuple(FrameKey(name, "app/x.py", i + 1) for i, name in enumerate(names))
+
+
+def _crunch(seconds: float) -> None:
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        hashlib.sha256(b"x" * 4096).digest()
+
+
+async def _busy(seconds: float) -> None:
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        _crunch(0.005)
+        await asyncio.sleep(0)
+
+
+class TestProfile:
+    """Aggregated stacks render as folded text, speedscope JSON and hot functions."""
+
+    def test_collapsed(self):
+        profile = Profile(interval=0.005)
+        for _ in range(3):
+            profile.add(_stack("handler", "render"))
+        profile.add(IDLE)
+        assert profile.collapsed() == "<idle> 1\ntask:Task;handler (app/x.py:1);render (app/x.py:2) 3\n"
+
+    def test_speedscope(self):
+        profile = Profile(interval=0.005)
+        profile.add(_stack("handler", "render"))
+        profile.add(_stack("handler"))
+        profile.add(_stack("handler"))
+
+        document = profile.speedscope()
+        frames = [frame["name"] for frame in document["shared"]["frames"]]
+        assert frames == ["task:Task", "handler", "render"]
+        sampled = document["profiles"][0]
+        assert sampled["type"] == "sampled"
+        assert sampled["samples"] == [[0, 1, 2], [0, 1]]
+        assert sampled["weights"] == [5.0, 10.0]
+        assert sampled["endValue"] == 15.0
+
+    def test_hot_functions_exclude_idle(self):
+        profile = Profile(interval=0.005)
+        profile.add(_stack("handler", "render"))
+        profile.add(_stack("handler"))
+        profile.add(IDLE)
+        hot = profile.hot_functions()
+        assert [(row["function"], row["self_samples"], row["total_samples"]) for row in hot] == [
+            ("render (app/x.py:2)", 1, 1),
+            ("handler (app/x.py:1)", 1, 2),
+        ]
+
+
+class TestProfileWorker:
+    """On-demand sessions sample the event loop thread."""
+
+    @pytest.mark.asyncio
+    async def test_samples_running_task(self):
+        busy = asyncio.create_task(_busy(0.4), name="busy-7")
+        profile = await profile_worker(0.3, interval=0.002)
+        await busy
+
+        assert profile.samples > 0
+        folded = profile.collapsed()
+        assert "task:busy;_busy (" in folded
+        assert "_crunch (" in folded
+        # Loop machinery below the task is dropped
+        assert "run_forever" not in folded.split("task:busy", 1)[1].split("\n", 1)[0]
+
+    @pytest.mark.asyncio
+    async def test_one_session_at_a_time(self):
+        first = asyncio.create_task(profile_worker(0.2))
+        await asyncio.sleep(0.05)
+        with pytest.raises(ProfilerBusyError):
+            await profile_worker(0.1)
+        await first
+
+
+class TestRequestSampler:
+    """The always-on sampler keeps hot functions per window."""
+
+    def test_windows_rotate_into_ring(self):
+        sampler = RequestSampler(window_seconds=60, windows=1, top_n=1)
+        sampler.record(_stack("handler", "render"))
+        sampler.record(_stack("handler", "render"))
+        sampler.record(_stack("handler", "serialize"))
+        sampler.record(IDLE)
+        sampler._rotate(time.time())
+        sampler.record(_stack("handler"))
+
+        hot = sampler.hot_functions(10)
+        # The closed window kept only its hottest function
+        assert [(row["function"], row["self_samples"]) for row in hot["functions"]] == [
+            ("render (app/x.py:2)", 2),
+            ("handler (app/x.py:1)", 1),
+        ]
+        assert hot["samples"] == 5
+
+        # The ring holds one window, so the first one is dropped
+        sampler._rotate(time.time())
+        assert [row["function"] for row in sampler.hot_functions(10)["functions"]] == ["handler (app/x.py:1)"]
+
+    def test_rate_limits_sampled_requests(self):
+        sampler = MagicMock(spec=RequestSampler)
+        app = FastAPI()
+        app.add_middleware(SampledProfilingMiddleware, sample_rate=3, sampler=sampler)
+
+        @app.get("/")
+        async def index():
+            return {}
+
+        client = TestClient(app)
+        for _ in range(7):
+            client.get("/")
+        assert sampler.begin.call_count == sampler.end.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_samples_while_request_in_flight(self):
+        sampler = RequestSampler(interval=0.002)
+        sampler.begin()
+        try:
+            await _busy(0.2)
+        finally:
+            sampler.end()
+        functions = [row["function"] for row in sampler.hot_functions()["functions"]]
+        assert any(function.startswith("_crunch (") for function in functions)
+
+
+class TestProfilingRoutes:
+    """The profiling endpoints are admin-only and return the requested format."""
+
+    def test_requires_authentication(self, monkeypatch):
+        from app.middleware.rbac import RBACMiddleware
+        from main import app
+
+        async def passthrough(self, request, call_next):
+            return await call_next(request)
+
+        monkeypatch.setattr(RBACMiddleware, "dispatch", passthrough)
+        client = TestClient(app)
+        # The route's own role check, not only the RBAC middleware, turns anonymous callers away
+        assert client.post("/metrics/profile?seconds=0.1").status_code == 401
+        assert client.get("/metrics/profile/hot").status_code == 401
+
+    @pytest.mark.asyncio
+    async def test_formats(self):
+        from app.routes.monitoring import cpu_profile
+
+        busy = asyncio.create_task(_busy(0.3), name="busy")
+        folded = await cpu_profile(seconds=0.2, interval_ms=2, format="collapsed", current_user=None)
+        document = await cpu_profile(seconds=0.05, interval_ms=2, format="speedscope", current_user=None)
+        await busy
+
+        assert folded.media_type == "text/plain"
+        assert b"task:busy;" in folded.body
+        assert b'"type":"sampled"' in document.body
+        assert "speedscope" in document.headers["content-disposition"]
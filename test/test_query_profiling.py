@@ -0,0 +1,204 @@
+"""
+Tests for request-scoped SQL profiling, N+1 detection and query budgets.
+"""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.middleware.query_profiling import QueryProfilingMiddleware
+from app.models.content import Content, ContentStatus
+from app.models.user import User
+from app.utils.query_monitor import (
+    EndpointQueryStats,
+    QueryStats,
+    current_query_stats,
+    endpoint_query_stats,
+    fingerprint,
+    install_query_monitor,
+    track_queries,
+)
+
+
+class TestFingerprint:
+    """Statements differing only in values share a fingerprint."""
+
+    def test_literals_and_placeholders_normalized(self):
+        assert fingerprint("SELECT * FROM users WHERE id = $1") == fingerprint("SELECT *  FROM users\nWHERE id = 42")
+        assert fingerprint("SELECT 1 FROM t WHERE name = 'a''b'") == "SELECT ? FROM t WHERE name = ?"
+
+    def test_lists_collapse(self):
+        assert fingerprint("SELECT x FROM t WHERE id IN ($1, $2, $3)") == "SELECT x FROM t WHERE id IN (...)"
+        assert fingerprint("SELECT x FROM t WHERE id in (7)") == "SELECT x FROM t WHERE id IN (...)"
+        assert (
+            fingerprint("INSERT INTO t (a, b) VALUES ($1, $2), ($3, $4)") == "INSERT INTO t (a, b) VALUES (?, ?), ..."
+        )
+
+    def test_identifiers_kept(self):
+        assert fingerprint("SELECT users_1.id FROM users AS users_1") == "SELECT users_1.id FROM users AS users_1"
+
+
+class TestQueryStats:
+    """Queries are attributed to the active QueryStats."""
+
+    def test_repeated_above_threshold(self):
+        stats = QueryStats()
+        for i in range(4):
+            stats.record(f"SELECT * FROM comments WHERE parent_id = {i}", 1.0)
+        stats.record("SELECT 1", 2.0)
+        assert stats.count == 5
+        assert stats.total_ms == 6.0
+        assert stats.repeated(3) == [("SELECT * FROM comments WHERE parent_id = ?", 4)]
+        assert stats.repeated(4) == []
+
+    @pytest.mark.asyncio
+    async def test_track_queries_counts_session_queries(self, test_db: AsyncSession):
+        install_query_monitor(test_db.bind)
+        await test_db.execute(text("SELECT 1"))
+
+        with track_queries() as stats:
+            for i in range(3):
+                await test_db.execute(text(f"SELECT {i}"))
+            # Tasks started inside the block count too
+            await asyncio.gather(*(asyncio.create_task(asyncio.sleep(0)) for _ in range(2)))
+        await test_db.execute(text("SELECT 99"))
+
+        assert stats.count == 3
+        assert stats.repeated(2) == [("SELECT ?", 3)]
+
+    def test_install_is_idempotent(self):
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        install_query_monitor(engine)
+        install_query_monitor(engine, slow_threshold_ms=5)
+        assert len(engine.sync_engine.dispatch.after_cursor_execute) == 1
+
+
+class TestEndpointQueryStats:
+    """Finished requests aggregate per endpoint."""
+
+    def test_worst_endpoints_first(self):
+        registry = EndpointQueryStats()
+        light, heavy = QueryStats(), QueryStats()
+        light.record("SELECT 1", 1.0)
+        for i in range(12):
+            heavy.record(f"SELECT * FROM t WHERE id = {i}", 1.0)
+
+        registry.record("GET /light", light, [])
+        registry.record("GET /heavy", heavy, heavy.repeated(10))
+
+        worst = registry.worst()
+        assert [row["endpoint"] for row in worst] == ["GET /heavy", "GET /light"]
+        assert worst[0]["n_plus_one_requests"] == 1
+        assert worst[0]["worst_repeat"] == {"statement": "SELECT * FROM t WHERE id = ?", "count": 12}
+
+    def test_endpoint_cap(self):
+        registry = EndpointQueryStats(max_endpoints=1)
+        registry.record("GET /a", QueryStats(), [])
+        registry.record("GET /b", QueryStats(), [])
+        assert registry.get("GET /b") is None
+
+
+def _profiled_app(**options) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(QueryProfilingMiddleware, **options)
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int, lookups: int = 1):
+        # Stand-in for the statements an endpoint would run
+        for i in range(lookups):
+            current_query_stats.get().record(f"SELECT * FROM tags WHERE content_id = {i}", 0.5)
+        return {"id": item_id}
+
+    return app
+
+
+class TestRequestProfiling:
+    """The middleware profiles each request."""
+
+    @pytest.fixture(autouse=True)
+    def fresh_endpoint_stats(self):
+        endpoint_query_stats.reset()
+        yield
+        endpoint_query_stats.reset()
+
+    def test_server_timing_header(self):
+        client = TestClient(_profiled_app(server_timing=True))
+        response = client.get("/items/1?lookups=3")
+        timing = response.headers["server-timing"]
+        assert timing.startswith('db;dur=1.5;desc="3 queries", app;dur=')
+
+        assert "server-timing" not in TestClient(_profiled_app()).get("/items/1").headers
+
+    def test_n_plus_one_recorded_by_route(self):
+        client = TestClient(_profiled_app(n_plus_one_threshold=5))
+        with patch("app.middleware.query_profiling.logger") as logger:
+            client.get("/items/1?lookups=2")
+            logger.warning.assert_not_called()
+            client.get("/items/2?lookups=6")
+
+        entry = endpoint_query_stats.get("GET /items/{item_id}")
+        assert (entry["requests"], entry["queries"], entry["max_queries"]) == (2, 8, 6)
+        assert entry["n_plus_one_requests"] == 1
+        assert logger.warning.call_args.args[1:4] == ("GET /items/{item_id}", 6, 6)
+
+    @pytest.mark.asyncio
+    async def test_feed_within_budget(self, test_db: AsyncSession, test_user: User, query_budget, monkeypatch):
+        """The feed's query count does not grow with the number of items or authors."""
+        from httpx import ASGITransport, AsyncClient
+
+        from app.middleware.rbac import RBACMiddleware
+        from main import app
+
+        async def passthrough(self, request, call_next):
+            return await call_next(request)
+
+        monkeypatch.setattr(RBACMiddleware, "dispatch", passthrough)
+        authors = [
+            User(username=f"author{i}", email=f"author{i}@example.com", hashed_password="x", role_id=test_user.role_id)
+            for i in range(5)
+        ]
+        test_db.add_all(authors)
+        await test_db.commit()
+        test_db.add_all(
+            Content(
+                title=f"Post {i}",
+                body="Body",
+                slug=f"post-{i}",
+                status=ContentStatus.PUBLISHED,
+                author_id=authors[i % len(authors)].id,
+            )
+            for i in range(15)
+        )
+        await test_db.commit()
+
+        with query_budget(4):
+            async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                response = await client.get("/feed.xml")
+        assert response.status_code == 200
+        assert response.text.count("<item>") == 15
+
+        with pytest.raises(AssertionError, match=r"GET /feed.xml ran \d+ queries \(budget 1\)"), query_budget(1):
+            async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                await client.get("/feed.xml")
+
+    def test_worst_endpoints_report_dev_only(self):
+        from main import app
+
+        stats = QueryStats()
+        stats.record("SELECT 1", 1.0)
+        endpoint_query_stats.record("GET /busy", stats, [])
+        client = TestClient(app)
+
+        with patch("app.routes.monitoring.settings.debug", False):
+            assert client.get("/metrics/queries").status_code == 404
+        with patch("app.routes.monitoring.settings.debug", True):
+            response = client.get("/metrics/queries?limit=5")
+        assert response.status_code == 200
+        assert response.json()["endpoints"][0]["endpoint"] == "GET /busy"
@@ -0,0 +1,204 @@
+"""
+Tests for precomputed related-content recommendations.
+"""
+
+from collections import Counter
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.content import Content, ContentStatus
+from app.models.content_relations import ContentRecommendation, ContentRelation, RelationType
+from app.models.content_tags import content_tags
+from app.models.tag import Tag
+from app.models.user import User
+from app.services.content_relations_service import ContentRelationsService
+from app.utils import recommendations
+from app.utils.recommendations import (
+    SimilarityIndex,
+    extract_features,
+    load_corpus,
+    rebuild_recommendations,
+    refresh_recommendations,
+    schedule_recommendation_refresh,
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_index():
+    """Each test starts without the per-worker index of an earlier one."""
+    with patch.object(recommendations, "_cached_index", None):
+        yield
+
+
+async def _content(db: AsyncSession, user: User, slug: str, title: str, tag_ids=(), status=ContentStatus.PUBLISHED):
+    content = Content(title=title, body=title, slug=slug, status=status, author_id=user.id)
+    db.add(content)
+    await db.flush()
+    if tag_ids:
+        await db.execute(insert(content_tags), [{"content_id": content.id, "tag_id": t} for t in tag_ids])
+    return content
+
+
+@pytest.fixture
+async def tags(test_db: AsyncSession) -> list[int]:
+    rows = [Tag(name=name) for name in ("python", "asyncio", "gardening", "tomatoes", "misc")]
+    test_db.add_all(rows)
+    await test_db.flush()
+    return [t.id for t in rows]
+
+
+async def _stored(db: AsyncSession) -> dict[int, list[int]]:
+    result = await db.execute(
+        select(ContentRecommendation.content_id, ContentRecommendation.related_content_id).order_by(
+            ContentRecommendation.content_id, ContentRecommendation.score.desc()
+        )
+    )
+    stored: dict[int, list[int]] = {}
+    for content_id, related in result:
+        stored.setdefault(content_id, []).append(related)
+    return stored
+
+
+class TestSimilarityIndex:
+    """Tests for the sparse TF-IDF vectors."""
+
+    def test_features_weight_tags_and_skip_markup(self):
+        features = extract_features("Async Python", body="<p class='x'>the python loop</p>", tag_ids=[7])
+        assert features["tag:7"] == 3.0
+        assert features["python"] == 2.5
+        assert "the" not in features and "class" not in features
+
+    def test_neighbors_rank_by_shared_terms(self):
+        docs = {
+            1: extract_features("python asyncio event loop", tag_ids=[1]),
+            2: extract_features("python asyncio tasks", tag_ids=[1]),
+            3: extract_features("event loop internals"),
+            4: extract_features("growing tomatoes", tag_ids=[2]),
+        }
+        index = SimilarityIndex.build(docs)
+
+        neighbors = index.neighbors(1, k=3)
+        assert [doc for doc, _ in neighbors] == [2, 3]
+        assert neighbors[0][1] == pytest.approx(index.similarity(2, 1), abs=1e-6)
+        assert index.neighbors(4, k=3) == []
+
+    def test_ubiquitous_terms_are_dropped(self):
+        docs = {i: Counter({"common": 1, f"group{i % 10}": 1}) for i in range(40)}
+        index = SimilarityIndex.build(docs, max_df=0.5)
+        assert "common" not in index.postings
+        assert {doc for doc, _ in index.neighbors(0, k=10)} == {10, 20, 30}
+
+    def test_update_and_remove_one_item(self):
+        docs = {1: extract_features("python asyncio", tag_ids=[1]), 2: extract_features("growing tomatoes")}
+        index = SimilarityIndex.build(docs)
+        assert index.neighbors(1, k=3) == []
+
+        # The new item matches a term only item 1 had so far
+        index.update(3, extract_features("python asyncio tasks", tag_ids=[1]))
+        assert [doc for doc, _ in index.neighbors(1, k=3)] == [3]
+
+        index.remove(3)
+        assert index.neighbors(1, k=3) == []
+        assert 3 not in index.vectors and index.df == SimilarityIndex.build(docs).df
+
+
+class TestRecommendationStore:
+    """Tests for the batch rebuild and the per-publish refresh."""
+
+    @pytest.mark.asyncio
+    async def test_rebuild_covers_published_content(self, test_db: AsyncSession, test_user: User, tags):
+        py1 = await _content(test_db, test_user, "py-1", "Python asyncio basics", tags[:2])
+        py2 = await _content(test_db, test_user, "py-2", "Python asyncio patterns", tags[:2])
+        garden = await _content(test_db, test_user, "garden", "Growing tomatoes", tags[2:4])
+        draft = await _content(test_db, test_user, "py-draft", "Python asyncio draft", tags[:2], ContentStatus.DRAFT)
+        await test_db.commit()
+
+        written = await rebuild_recommendations(test_db, top_k=5)
+
+        stored = await _stored(test_db)
+        assert written == 2
+        assert stored == {py1.id: [py2.id], py2.id: [py1.id]}
+        assert garden.id not in stored and draft.id not in stored
+
+    @pytest.mark.asyncio
+    async def test_publish_refresh_updates_neighbor_lists(self, test_db: AsyncSession, test_user: User, tags):
+        py1 = await _content(test_db, test_user, "py-1", "Python asyncio basics", tags[:2])
+        py2 = await _content(test_db, test_user, "py-2", "Python asyncio patterns", tags[:2])
+        await _content(test_db, test_user, "garden", "Growing tomatoes", tags[2:4])
+        await test_db.commit()
+        await rebuild_recommendations(test_db, top_k=5)
+
+        new = await _content(test_db, test_user, "py-3", "Python asyncio patterns in depth", tags[:2])
+        await test_db.commit()
+        with patch.object(recommendations, "load_corpus", AsyncMock(wraps=load_corpus)) as loaded:
+            assert await refresh_recommendations(new.id, test_db, top_k=5) == 2
+        # Only the published item is loaded, not the corpus
+        assert loaded.await_args.args[1] == {new.id}
+
+        stored = await _stored(test_db)
+        assert stored[new.id][0] == py2.id
+        assert new.id in stored[py1.id] and new.id in stored[py2.id]
+
+        new.status = ContentStatus.DRAFT
+        await test_db.commit()
+        assert await refresh_recommendations(new.id, test_db, top_k=5) == 0
+
+        stored = await _stored(test_db)
+        assert new.id not in stored
+        assert stored[py1.id] == [py2.id] and stored[py2.id] == [py1.id]
+
+    @pytest.mark.asyncio
+    async def test_refreshes_are_coalesced(self):
+        with (
+            patch.object(recommendations, "REFRESH_DEBOUNCE_SECONDS", 0),
+            patch.object(recommendations, "_refresh_in_background", AsyncMock()) as refresh,
+        ):
+            schedule_recommendation_refresh(1, top_k=5)
+            schedule_recommendation_refresh(2, top_k=5)
+            schedule_recommendation_refresh(1, top_k=5)
+            worker = recommendations._refresh_worker
+            await worker
+            schedule_recommendation_refresh(3, top_k=5)
+            assert recommendations._refresh_worker is not worker
+            await recommendations._refresh_worker
+
+        assert [call.args for call in refresh.await_args_list] == [(1, 5), (2, 5), (3, 5)]
+
+
+class TestRelatedContent:
+    """Tests for the merged read path."""
+
+    @pytest.mark.asyncio
+    async def test_curated_first_then_computed(self, test_db: AsyncSession, test_user: User):
+        source = await _content(test_db, test_user, "source", "Source")
+        curated = await _content(test_db, test_user, "curated", "Curated")
+        computed = await _content(test_db, test_user, "computed", "Computed")
+        both = await _content(test_db, test_user, "both", "Both")
+        hidden = await _content(test_db, test_user, "hidden", "Hidden", status=ContentStatus.DRAFT)
+        test_db.add_all(
+            [
+                ContentRelation(source_content_id=curated.id, target_content_id=source.id),
+                ContentRelation(source_content_id=source.id, target_content_id=both.id),
+                ContentRelation(
+                    source_content_id=source.id, target_content_id=computed.id, relation_type=RelationType.DEPENDS_ON
+                ),
+                ContentRecommendation(content_id=source.id, related_content_id=computed.id, score=0.4),
+                ContentRecommendation(content_id=source.id, related_content_id=both.id, score=0.9),
+                ContentRecommendation(content_id=source.id, related_content_id=hidden.id, score=0.8),
+            ]
+        )
+        await test_db.commit()
+
+        rows = await ContentRelationsService(test_db).get_related_content(source.id, limit=10)
+
+        assert [(r.id, r.score, r.curated) for r in rows] == [
+            (curated.id, None, True),
+            (both.id, None, True),
+            (computed.id, 0.4, False),
+        ]
+
+        limited = await ContentRelationsService(test_db).get_related_content(source.id, limit=1)
+        assert len(limited) == 1
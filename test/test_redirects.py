@@ -0,0 +1,187 @@
+"""
+Tests for the in-memory redirect table, the cache bus and single-flight loads.
+"""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.content import Content, ContentStatus
+from app.models.content_relations import ContentRedirect
+from app.models.user import User
+from app.routes.privacy import AccountDeletionRequest, request_account_deletion
+from app.services.content_relations_service import ContentRelationsService
+from app.utils.cache_bus import CacheBus
+from app.utils.redirects import REDIRECTS_TOPIC, RedirectResolver, ResolvedRedirect, collapse_chains
+from app.utils.single_flight import SingleFlightCache
+
+
+def _entry(redirect_id: int, old: str, new: str, status_code: int = 301) -> ResolvedRedirect:
+    return ResolvedRedirect(redirect_id, old, redirect_id * 10, new, status_code)
+
+
+async def _content(db: AsyncSession, user: User, slug: str) -> Content:
+    content = Content(title=slug, body=slug, slug=slug, status=ContentStatus.PUBLISHED, author_id=user.id)
+    db.add(content)
+    await db.commit()
+    return content
+
+
+class TestCollapseChains:
+    """Chains resolve in one hop."""
+
+    def test_chain_points_at_final_target(self):
+        table = {"a": _entry(1, "a", "b"), "b": _entry(2, "b", "c", 302), "c": _entry(3, "c", "d")}
+        collapsed = collapse_chains(table)
+        assert collapsed["a"] == ResolvedRedirect(1, "a", 30, "d", 302)
+        assert collapsed["c"] == table["c"]
+
+    def test_cycle_left_alone(self):
+        table = {"a": _entry(1, "a", "b"), "b": _entry(2, "b", "a")}
+        assert collapse_chains(table) == table
+
+
+class TestRedirectResolver:
+    """Lookups come from memory; changes reload the table."""
+
+    @pytest.mark.asyncio
+    async def test_loads_once_and_answers_misses_from_memory(self):
+        resolver = RedirectResolver()
+        load = AsyncMock(return_value={"old": _entry(1, "old", "new")})
+        with patch.object(RedirectResolver, "_load", load):
+            assert (await resolver.resolve("old", None)).new_slug == "new"
+            assert await resolver.resolve("unknown", None) is None
+            assert load.await_count == 1
+
+            resolver.invalidate()
+            await resolver.resolve("old", None)
+            assert load.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_service_lifecycle(self, test_db: AsyncSession, test_user: User):
+        """Creating and deleting a redirect are visible on the next lookup."""
+        content = await _content(test_db, test_user, "current")
+        service = ContentRelationsService(test_db)
+
+        assert await service.resolve_redirect("legacy") is None
+        redirect = await service.create_redirect("legacy", content.id, created_by_id=test_user.id)
+        resolved = await service.resolve_redirect("legacy")
+        assert (resolved.new_slug, resolved.status_code) == ("current", 301)
+
+        await service.delete_redirect(redirect.id)
+        assert await service.resolve_redirect("legacy") is None
+
+    @pytest.mark.asyncio
+    async def test_hits_flushed_in_one_batch(self, test_db: AsyncSession, test_user: User):
+        content = await _content(test_db, test_user, "target")
+        test_db.add_all([ContentRedirect(old_slug=slug, content_id=content.id) for slug in ("one", "two", "three")])
+        await test_db.commit()
+        resolver = RedirectResolver()
+
+        for slug in ("one", "one", "two", "missing"):
+            await resolver.resolve(slug, test_db)
+        assert await resolver.flush_hits(test_db) == 2
+        assert await resolver.flush_hits(test_db) == 0
+
+        result = await test_db.execute(select(ContentRedirect.old_slug, ContentRedirect.hit_count))
+        assert dict(result.all()) == {"one": 2, "two": 1, "three": 0}
+
+    @pytest.mark.asyncio
+    async def test_account_deletion_drops_redirects(self, test_db: AsyncSession, test_user: User):
+        """Erasing an account's content stops redirects to it from resolving."""
+        content = await _content(test_db, test_user, "mine")
+        service = ContentRelationsService(test_db)
+        await service.create_redirect("old-mine", content.id, created_by_id=test_user.id)
+        assert await service.resolve_redirect("old-mine") is not None
+
+        request = AccountDeletionRequest(confirm=True, password="TestPassword123")
+        with patch("app.services.upload_service.cache_manager", AsyncMock()):
+            await request_account_deletion(request, db=test_db, current_user=test_user)
+
+        assert await service.resolve_redirect("old-mine") is None
+
+
+class TestCacheBus:
+    """Invalidations reach local handlers at once and other workers through Redis."""
+
+    @pytest.mark.asyncio
+    async def test_publish_runs_local_handlers_and_broadcasts(self):
+        bus = CacheBus()
+        received = []
+        bus.subscribe(REDIRECTS_TOPIC, received.append)
+        client = AsyncMock()
+
+        with patch("app.utils.cache_bus.cache_manager.get_client", AsyncMock(return_value=client)):
+            await bus.publish(REDIRECTS_TOPIC, "legacy")
+
+        assert received == ["legacy"]
+        channel, payload = client.publish.await_args.args
+        assert json.loads(payload) == {"topic": REDIRECTS_TOPIC, "key": "legacy", "origin": bus.origin}
+
+    def test_messages_from_other_workers_only(self):
+        bus = CacheBus()
+        received = []
+        bus.subscribe(REDIRECTS_TOPIC, received.append)
+
+        bus._on_message(json.dumps({"topic": REDIRECTS_TOPIC, "key": None, "origin": bus.origin}))
+        bus._on_message(json.dumps({"topic": REDIRECTS_TOPIC, "key": "x", "origin": "other"}))
+        bus._on_message("not json")
+
+        assert received == ["x"]
+
+
+class TestSingleFlightCache:
+    """Concurrent misses share one load; loads that raced an invalidation are not stored."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_load(self):
+        loads = SingleFlightCache()
+        stored = []
+
+        async def loader():
+            await asyncio.sleep(0.01)
+            return "value"
+
+        load = AsyncMock(side_effect=loader)
+        results = await asyncio.gather(*(loads.load("key", load, stored.append) for _ in range(5)))
+
+        assert results == ["value"] * 5
+        assert load.await_count == 1
+        assert stored == ["value"]
+
+    @pytest.mark.asyncio
+    async def test_waiters_see_the_error(self):
+        loads = SingleFlightCache()
+
+        async def loader():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("database down")
+
+        results = await asyncio.gather(
+            *(loads.load("key", loader, pytest.fail) for _ in range(3)), return_exceptions=True
+        )
+        assert [str(result) for result in results] == ["database down"] * 3
+
+    @pytest.mark.asyncio
+    async def test_invalidation_during_load(self):
+        loads = SingleFlightCache()
+        stored = []
+        release = asyncio.Event()
+
+        async def stale():
+            await release.wait()
+            return "stale"
+
+        first = asyncio.create_task(loads.load("key", stale, stored.append))
+        await asyncio.sleep(0)
+        loads.invalidate()
+        # A caller after the invalidation does not join the stale load
+        assert await loads.load("key", AsyncMock(return_value="fresh"), stored.append) == "fresh"
+        release.set()
+
+        assert await first == "stale"
+        assert stored == ["fresh"]
@@ -0,0 +1,162 @@
+"""
+Tests for the pre-serialized response cache.
+"""
+
+import json
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.requests import Request
+
+from app.models.content import Content, ContentStatus
+from app.models.user import User
+from app.routes.content import get_all_content_route
+from app.utils.cache import CacheManager
+from app.utils.field_selector import FieldSelector
+from app.utils.response_cache import cached_json_response, principal_class, response_cache_key
+
+
+class FakeRedis:
+    """Just enough of redis.asyncio for hashes written through a pipeline."""
+
+    def __init__(self):
+        self.hashes: dict[str, dict] = {}
+        self.ttls: dict[str, int] = {}
+
+    async def hgetall(self, key):
+        return {k: v.decode() if isinstance(v, bytes) else v for k, v in self.hashes.get(key, {}).items()}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis: FakeRedis):
+        self.redis = redis
+        self.ops = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def hset(self, key, mapping):
+        self.ops.append(lambda: self.redis.hashes.setdefault(key, {}).update(mapping))
+
+    def expire(self, key, ttl):
+        self.ops.append(lambda: self.redis.ttls.__setitem__(key, ttl))
+
+    async def execute(self):
+        for op in self.ops:
+            op()
+
+
+def _request(headers: dict[str, str] | None = None) -> Request:
+    raw = [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw, "query_string": b""})
+
+
+@pytest.fixture
+def fake_redis():
+    redis = FakeRedis()
+    with patch("app.utils.response_cache.cache_manager") as cm:
+        cm.get_client = AsyncMock(return_value=redis)
+        yield redis
+
+
+class TestResponseCacheKey:
+    """Tests for key normalization."""
+
+    def test_params_are_normalized(self):
+        """Parameter order, None values and set ordering do not change the key."""
+        a = response_cache_key("r", {"skip": 0, "status": None, "fields": {"title", "id"}}, "anon")
+        b = response_cache_key("r", {"fields": {"id", "title"}, "skip": 0}, "anon")
+        assert a == b
+        assert a.startswith(f"{CacheManager.PREFIX_RESPONSE}r:anon:")
+
+    def test_principal_and_params_partition(self):
+        """Different principals or parameter values get different keys."""
+        base = response_cache_key("r", {"skip": 0}, "anon")
+        assert base != response_cache_key("r", {"skip": 0}, "auth")
+        assert base != response_cache_key("r", {"skip": 10}, "anon")
+
+    def test_principal_class(self):
+        """Callers with credentials are partitioned from anonymous ones."""
+        assert principal_class(_request()) == "anon"
+        assert principal_class(_request({"Authorization": "Bearer x"})) == "auth"
+
+
+class TestCachedJsonResponse:
+    """Tests for serving and storing encoded bodies."""
+
+    @pytest.mark.asyncio
+    async def test_miss_then_hit(self, fake_redis):
+        """The body is rendered once, then served from the cache with the same ETag."""
+        render = AsyncMock(return_value=b'[{"id":1}]')
+
+        miss = await cached_json_response(_request(), "r", {"skip": 0}, render)
+        hit = await cached_json_response(_request(), "r", {"skip": 0}, render)
+
+        render.assert_awaited_once()
+        assert miss.headers["x-cache"] == "MISS" and hit.headers["x-cache"] == "HIT"
+        assert hit.body == b'[{"id":1}]'
+        assert hit.media_type == "application/json"
+        assert hit.headers["etag"] == miss.headers["etag"]
+        assert list(fake_redis.ttls.values()) == [CacheManager.TTL_SHORT]
+
+    @pytest.mark.asyncio
+    async def test_if_none_match(self, fake_redis):
+        """A matching If-None-Match is answered with 304 and no body."""
+        render = AsyncMock(return_value=b"[]")
+        etag = (await cached_json_response(_request(), "r", {}, render)).headers["etag"]
+
+        response = await cached_json_response(_request({"If-None-Match": etag}), "r", {}, render)
+
+        assert response.status_code == 304
+        assert response.body == b""
+
+    @pytest.mark.asyncio
+    async def test_without_redis_renders_every_time(self):
+        """With Redis unavailable every request renders."""
+        render = AsyncMock(return_value=b"[]")
+        with patch("app.utils.response_cache.cache_manager") as cm:
+            cm.get_client = AsyncMock(return_value=None)
+            await cached_json_response(_request(), "r", {}, render)
+            await cached_json_response(_request(), "r", {}, render)
+
+        assert render.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_invalidate_content_drops_responses(self):
+        """Content events invalidate pre-serialized responses."""
+        manager = CacheManager()
+        with patch.object(manager, "delete_pattern", AsyncMock(return_value=0)) as delete_pattern:
+            await manager.invalidate_content(1)
+
+        delete_pattern.assert_any_await(f"{CacheManager.PREFIX_RESPONSE}*")
+
+
+class TestContentListCache:
+    """Tests for the cached content listing."""
+
+    @pytest.mark.asyncio
+    async def test_listing_served_from_cache(self, test_db: AsyncSession, test_user: User, fake_redis):
+        """The listing is encoded once; field selection is applied while encoding."""
+        test_db.add(
+            Content(title="Cached", body="Body", slug="cached", status=ContentStatus.PUBLISHED, author_id=test_user.id)
+        )
+        await test_db.commit()
+
+        fields = FieldSelector(fields="id,title")
+        first = await get_all_content_route(_request(), fields=fields, db=test_db)
+        with patch("app.routes.content.content_service.get_all_content", AsyncMock()) as get_all:
+            second = await get_all_content_route(_request(), fields=fields, db=test_db)
+
+        get_all.assert_not_awaited()
+        assert json.loads(first.body) == [{"id": json.loads(first.body)[0]["id"], "title": "Cached"}]
+        assert second.body == first.body
+
+        full = json.loads((await get_all_content_route(_request(), fields=FieldSelector(fields=None), db=test_db)).body)
+        assert {"id", "title", "body", "status", "author_id", "view_count"} <= set(full[0])
@@ -0,0 +1,261 @@
+"""
+Tests for resumable chunked uploads and concurrent bulk upload processing.
+"""
+
+import asyncio
+import hashlib
+import threading
+import time
+from datetime import datetime
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from fastapi import HTTPException, UploadFile
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.requests import ClientDisconnect
+
+from app.models.media import Media
+from app.models.resumable_upload import ResumableUpload
+from app.models.user import User
+from app.services import resumable_upload_service as resumable_module
+from app.services.resumable_upload_service import resumable_upload_service
+from app.services.upload_service import UploadService
+
+DATA = b"%PDF-1.4 " + bytes(range(256)) * 4
+
+
+async def _body(*chunks: bytes, disconnect: bool = False):
+    for chunk in chunks:
+        yield chunk
+    if disconnect:
+        raise ClientDisconnect()
+
+
+@pytest.fixture
+def upload_dir(tmp_path):
+    with (
+        patch("app.services.upload_service.UPLOAD_DIR", tmp_path),
+        patch("app.services.resumable_upload_service.UPLOAD_DIR", tmp_path),
+    ):
+        yield tmp_path
+
+
+@pytest.fixture
+async def upload(upload_dir, test_db: AsyncSession, test_user: User) -> ResumableUpload:
+    return await resumable_upload_service.create("report.pdf", "application/pdf", len(DATA), None, test_user, test_db)
+
+
+class TestResumableUpload:
+    """Tests for the chunk protocol."""
+
+    @pytest.mark.asyncio
+    async def test_create_validates(self, upload_dir, test_db: AsyncSession, test_user: User):
+        with pytest.raises(HTTPException) as exc:
+            await resumable_upload_service.create("x.exe", "application/x-msdownload", 10, None, test_user, test_db)
+        assert exc.value.status_code == 400
+
+        with pytest.raises(HTTPException) as exc:
+            await resumable_upload_service.create("x.pdf", "application/pdf", 2**40, None, test_user, test_db)
+        assert exc.value.status_code == 413
+
+    @pytest.mark.asyncio
+    async def test_chunks_resume_after_disconnect(self, upload, test_db: AsyncSession, test_user: User):
+        """Bytes that arrived before a disconnect are kept and the client resumes from there."""
+        upload_id = upload.id
+        state = await resumable_upload_service.write_chunk(upload_id, 0, _body(DATA[:100]), test_user, test_db)
+        assert state.received == 100
+
+        state = await resumable_upload_service.write_chunk(
+            upload_id, 100, _body(DATA[100:300], disconnect=True), test_user, test_db
+        )
+        assert state.received == 300
+
+        with pytest.raises(HTTPException) as exc:
+            await resumable_upload_service.write_chunk(upload_id, 100, _body(DATA[100:]), test_user, test_db)
+        assert exc.value.status_code == 409
+        assert exc.value.headers["Upload-Offset"] == "300"
+
+        state = await resumable_upload_service.write_chunk(upload_id, 300, _body(DATA[300:]), test_user, test_db)
+        assert state.received == len(DATA)
+
+    @pytest.mark.asyncio
+    async def test_racing_chunk_loses_offset(self, upload, test_db: AsyncSession, test_user: User):
+        """A chunk whose offset moved while it streamed does not advance the upload."""
+        upload_id = upload.id
+
+        async def racing_body():
+            yield DATA[:100]
+            # Another request finishes a chunk at the same offset first
+            await test_db.execute(update(ResumableUpload).where(ResumableUpload.id == upload_id).values(received=50))
+            await test_db.commit()
+            yield DATA[100:200]
+
+        with pytest.raises(HTTPException) as exc:
+            await resumable_upload_service.write_chunk(upload_id, 0, racing_body(), test_user, test_db)
+        assert exc.value.status_code == 409
+        assert exc.value.headers["Upload-Offset"] == "50"
+        assert (await resumable_upload_service.get(upload_id, test_user, test_db)).received == 50
+        assert upload_id not in resumable_module._running_hashes
+
+    @pytest.mark.asyncio
+    async def test_chunk_past_declared_size(self, upload, test_db: AsyncSession, test_user: User):
+        with pytest.raises(HTTPException) as exc:
+            await resumable_upload_service.write_chunk(upload.id, 0, _body(DATA, b"extra"), test_user, test_db)
+        assert exc.value.status_code == 413
+
+    @pytest.mark.asyncio
+    async def test_other_users_cannot_see_upload(self, upload, test_db: AsyncSession):
+        stranger = Mock(id=-1)
+        with pytest.raises(HTTPException) as exc:
+            await resumable_upload_service.get(upload.id, stranger, test_db)
+        assert exc.value.status_code == 404
+
+
+class TestCompleteUpload:
+    """Tests for finalizing an assembled upload."""
+
+    @pytest.mark.asyncio
+    async def test_incomplete(self, upload, test_db: AsyncSession, test_user: User):
+        await resumable_upload_service.write_chunk(upload.id, 0, _body(DATA[:10]), test_user, test_db)
+        with pytest.raises(HTTPException) as exc:
+            await resumable_upload_service.complete(upload.id, test_user, test_db)
+        assert exc.value.status_code == 409
+
+    @pytest.mark.asyncio
+    async def test_checksum_mismatch_discards(self, upload_dir, test_db: AsyncSession, test_user: User):
+        upload = await resumable_upload_service.create(
+            "report.pdf", "application/pdf", len(DATA), "0" * 64, test_user, test_db
+        )
+        upload_id = upload.id
+        await resumable_upload_service.write_chunk(upload_id, 0, _body(DATA), test_user, test_db)
+
+        with pytest.raises(HTTPException) as exc:
+            await resumable_upload_service.complete(upload_id, test_user, test_db)
+
+        assert exc.value.status_code == 422
+        assert not list((upload_dir / "incoming").iterdir())
+        with pytest.raises(HTTPException):
+            await resumable_upload_service.get(upload_id, test_user, test_db)
+
+    @pytest.mark.asyncio
+    async def test_complete_hands_off_once(self, upload_dir, test_db: AsyncSession, test_user: User):
+        """The assembled file is hashed and stored; retrying returns the same media."""
+        digest = hashlib.sha256(DATA).hexdigest()
+        upload = await resumable_upload_service.create(
+            "report.pdf", "application/pdf", len(DATA), digest.upper(), test_user, test_db
+        )
+        upload_id = upload.id
+        await resumable_upload_service.write_chunk(upload_id, 0, _body(DATA), test_user, test_db)
+
+        now = datetime.now()
+        media = Media(
+            filename="r.pdf",
+            original_filename="report.pdf",
+            file_path="uploads/r.pdf",
+            file_size=len(DATA),
+            mime_type="application/pdf",
+            file_type="document",
+            tags=[],
+            sizes={},
+            uploaded_by=test_user.id,
+            uploaded_at=now,
+            updated_at=now,
+        )
+        test_db.add(media)
+        await test_db.flush()
+
+        with (
+            patch(
+                "app.services.resumable_upload_service.upload_service.create_media", AsyncMock(return_value=media)
+            ) as create_media,
+            patch("app.services.resumable_upload_service.hash_file") as hash_file,
+        ):
+            first = await resumable_upload_service.complete(upload_id, test_user, test_db)
+            second = await resumable_upload_service.complete(upload_id, test_user, test_db)
+
+        # The digest was kept while the chunks arrived, so the file is not re-read
+        hash_file.assert_not_called()
+        create_media.assert_awaited_once()
+        args = create_media.await_args.args
+        assert args[1:6] == (len(DATA), digest, "report.pdf", "document", "application/pdf")
+        assert first.id == second.id == media.id
+
+    @pytest.mark.asyncio
+    async def test_rehashes_chunks_from_other_workers(self, upload_dir, test_db: AsyncSession, test_user: User):
+        """Without a running digest for every chunk the assembled file is hashed."""
+        upload = await resumable_upload_service.create(
+            "report.pdf", "application/pdf", len(DATA), "0" * 64, test_user, test_db
+        )
+        upload_id = upload.id
+        await resumable_upload_service.write_chunk(upload_id, 0, _body(DATA[:100]), test_user, test_db)
+        # The next chunk lands on another instance
+        resumable_module._running_hashes.pop(upload_id)
+        await resumable_upload_service.write_chunk(upload_id, 100, _body(DATA[100:]), test_user, test_db)
+        assert upload_id not in resumable_module._running_hashes
+
+        with (
+            patch("app.services.resumable_upload_service.hash_file", Mock(return_value="f" * 64)) as hash_file,
+            pytest.raises(HTTPException) as exc,
+        ):
+            await resumable_upload_service.complete(upload_id, test_user, test_db)
+
+        assert exc.value.status_code == 422
+        hash_file.assert_called_once()
+
+
+class TestBulkUpload:
+    """Tests for concurrent post-processing of bulk uploads."""
+
+    @staticmethod
+    def _file(data: bytes, name: str) -> UploadFile:
+        file = Mock(spec=UploadFile)
+        file.filename = name
+        file.content_type = "application/pdf"
+        file.read = AsyncMock(side_effect=[data, b""])
+        return file
+
+    @pytest.mark.asyncio
+    async def test_processes_each_new_content_once(self, upload_dir, test_db: AsyncSession, test_user: User):
+        service = UploadService()
+        files = [self._file(b"a", "a.pdf"), self._file(b"b", "b.pdf"), self._file(b"a", "a2.pdf")]
+        invalid = Mock(spec=UploadFile, filename="x.exe", content_type="application/x-msdownload")
+
+        with (
+            patch.object(service, "process_blob", AsyncMock(return_value={"file_path": "p"})) as process_blob,
+            patch.object(service, "create_media", AsyncMock(side_effect=lambda *a, **kw: Mock())) as create_media,
+            patch.object(test_db, "refresh", AsyncMock()),
+        ):
+            media_items, failed = await service.bulk_upload([*files, invalid], test_user, test_db)
+
+        assert len(media_items) == 3
+        assert failed == [{"filename": "x.exe", "error": failed[0]["error"]}]
+        assert process_blob.await_count == 2
+        stored = [call.kwargs["stored"] for call in create_media.await_args_list]
+        assert stored == [{"file_path": "p"}, {"file_path": "p"}, None]
+
+    @pytest.mark.asyncio
+    async def test_processing_pool_is_bounded(self, upload_dir):
+        service = UploadService()
+        running = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def slow_store(*args):
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.05)
+            with lock:
+                running -= 1
+            return {}
+
+        with (
+            patch("app.services.upload_service.settings.media_processing_workers", 2),
+            patch("app.services.upload_service._processing_semaphores", {}),
+            patch.object(service, "store_blob", slow_store),
+        ):
+            await asyncio.gather(*(service.process_blob("t", str(i), "f.png", "image", "image/png") for i in range(6)))
+
+        assert peak == 2
@@ -4,6 +4,8 @@ Tests for Search Service
 Tests search functionality including full-text search, filtering, and pagination.
 """
 
+from unittest.mock import AsyncMock, MagicMock
+
 import pytest
 from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -11,10 +13,11 @@ from utils.mock_utils import create_test_category, create_test_content, create_t
 
 from app.models.category import Category
 from app.models.content import Content, ContentStatus
-from app.models.search_query import SearchQuery
+from app.models.search_query import SearchQuery, SearchQueryRollup
 from app.models.tag import Tag
 from app.models.user import User
 from app.services.search_service import SearchService, search_service
+from app.utils.search_analytics import SearchAnalyticsBuffer, SearchEvent, search_analytics_buffer
 
 
 class TestSearchService:
@@ -629,16 +632,40 @@ class TestSearchSuggestions:
 class TestSearchAnalytics:
     """Test search analytics tracking"""
 
+    @pytest.fixture(autouse=True)
+    def empty_buffer(self):
+        """Start each test with an empty analytics buffer"""
+        search_analytics_buffer._events.clear()
+        yield
+        search_analytics_buffer._events.clear()
+
+    @pytest.mark.asyncio
+    async def test_track_search_does_not_write_inline(self, async_db_session, test_user):
+        """Tracking only enqueues; nothing is written until the buffer is flushed"""
+        search_service.track_search(
+            query="python tutorial",
+            results_count=5,
+            execution_time_ms=15.5,
+            user_id=test_user.id,
+        )
+
+        assert len(search_analytics_buffer) == 1
+        result = await async_db_session.execute(select(SearchQuery))
+        assert result.scalars().first() is None
+
     @pytest.mark.asyncio
     async def test_track_search(self, async_db_session, test_user):
         """Test that search queries are tracked"""
-        await search_service.track_search(
-            db=async_db_session,
+        search_service.track_search(
             query="python tutorial",
             results_count=5,
             execution_time_ms=15.5,
             user_id=test_user.id,
         )
+        written = await search_analytics_buffer.flush(async_db_session)
+
+        assert written == 1
+        assert len(search_analytics_buffer) == 0
 
         result = await async_db_session.execute(select(SearchQuery).where(SearchQuery.query == "python tutorial"))
         record = result.scalars().first()
@@ -649,23 +676,41 @@ class TestSearchAnalytics:
         assert record.execution_time_ms == 15.5
         assert record.user_id == test_user.id
 
+    @pytest.mark.asyncio
+    async def test_flush_upserts_rollups(self, async_db_session, test_user):
+        """Repeated queries across flushes accumulate into one rollup row per day"""
+        search_service.track_search(query="Python", results_count=4, execution_time_ms=10.0)
+        search_service.track_search(query="  python ", results_count=0, execution_time_ms=20.0)
+        await search_analytics_buffer.flush(async_db_session)
+        search_service.track_search(query="python", results_count=2, execution_time_ms=30.0)
+        await search_analytics_buffer.flush(async_db_session)
+
+        result = await async_db_session.execute(select(SearchQueryRollup))
+        rollups = result.scalars().all()
+
+        assert len(rollups) == 1
+        assert rollups[0].normalized_query == "python"
+        assert rollups[0].search_count == 3
+        assert rollups[0].zero_result_count == 1
+        assert rollups[0].total_results == 6
+        assert rollups[0].total_execution_time_ms == 60.0
+
     @pytest.mark.asyncio
     async def test_get_search_analytics(self, async_db_session, test_user):
         """Test search analytics aggregation"""
         for i in range(5):
-            await search_service.track_search(
-                db=async_db_session,
+            search_service.track_search(
                 query=f"query {i}",
                 results_count=i * 2,
                 execution_time_ms=10.0 + i,
                 user_id=test_user.id,
             )
-        await search_service.track_search(
-            db=async_db_session,
+        search_service.track_search(
             query="no results query",
             results_count=0,
             execution_time_ms=5.0,
         )
+        await search_analytics_buffer.flush(async_db_session)
 
         analytics = await search_service.get_search_analytics(db=async_db_session, days=30)
 
@@ -675,3 +720,46 @@ class TestSearchAnalytics:
         assert analytics["avg_execution_time_ms"] >= 0
         assert len(analytics["top_queries"]) >= 1
         assert len(analytics["zero_result_queries"]) >= 1
+        assert sum(day["count"] for day in analytics["searches_over_time"]) == analytics["total_searches"]
+
+
+class TestSearchAnalyticsBuffer:
+    """Test the in-process search analytics buffer (no database)"""
+
+    def test_record_drops_oldest_when_full(self):
+        buffer = SearchAnalyticsBuffer(max_size=3, batch_size=100)
+        for i in range(5):
+            buffer.record(SearchEvent(query=f"q{i}", results_count=1, execution_time_ms=1.0))
+
+        assert len(buffer) == 3
+        assert buffer.dropped == 2
+        assert [e.query for e in buffer._events] == ["q2", "q3", "q4"]
+
+    @pytest.mark.asyncio
+    async def test_flush_failure_returns_zero(self):
+        buffer = SearchAnalyticsBuffer()
+        buffer.record(SearchEvent(query="q", results_count=1, execution_time_ms=1.0))
+        db = AsyncMock()
+        db.execute.side_effect = Exception("db down")
+
+        assert await buffer.flush(db) == 0
+        assert len(buffer) == 0
+        assert buffer.dropped == 1
+        db.rollback.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_flush_empty_buffer_is_noop(self):
+        buffer = SearchAnalyticsBuffer()
+        db = AsyncMock()
+
+        assert await buffer.flush(db) == 0
+        db.execute.assert_not_called()
+
+    def test_install_registers_scheduler_job(self):
+        from app.utils.search_analytics import install_search_analytics_writer
+
+        scheduler = MagicMock()
+        install_search_analytics_writer(scheduler, interval_seconds=7)
+
+        scheduler.add_job.assert_called_once()
+        assert scheduler.add_job.call_args.kwargs["id"] == "search_analytics_writer"
@@ -2,13 +2,18 @@
 Tests for SEO functionality (sitemap, RSS, robots.txt).
 """
 
+from unittest.mock import AsyncMock, patch
+
 import pytest
+from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.requests import Request
 
 from app.models.category import Category
 from app.models.content import Content, ContentStatus
 from app.models.user import User
-from app.services.seo_service import SEOService
+from app.routes.seo import _feed_response, get_content_sitemap
+from app.services.seo_service import RenderedFeed, SEOService
 
 
 @pytest.fixture
@@ -159,6 +164,225 @@ class TestSEOService:
         assert "https://example.com/sitemap-pages.xml" in index
 
 
+@pytest.fixture
+async def sitemap_content(test_db: AsyncSession, test_user: User) -> list[Content]:
+    """Published and draft content without a category, for sitemap sharding."""
+    contents = []
+    for i in range(5):
+        content = Content(
+            title=f"Sitemap Article {i}",
+            body=f"Body {i}",
+            slug=f"sitemap-article-{i}",
+            status=ContentStatus.PUBLISHED if i < 4 else ContentStatus.DRAFT,
+            author_id=test_user.id,
+        )
+        test_db.add(content)
+        contents.append(content)
+
+    await test_db.commit()
+    for content in contents:
+        await test_db.refresh(content)
+
+    return contents
+
+
+@pytest.fixture
+def no_seo_cache():
+    """Bypass Redis so every call hits the database."""
+    with patch("app.services.seo_service.cache_manager") as mock_cache:
+        mock_cache.get = AsyncMock(return_value=None)
+        mock_cache.set = AsyncMock(return_value=True)
+        yield mock_cache
+
+
+class TestSitemapSharding:
+    """Tests for streamed, sharded sitemaps."""
+
+    @pytest.mark.asyncio
+    async def test_get_sitemap_shards(self, test_db: AsyncSession, sitemap_content, no_seo_cache):
+        """Only published content is counted, split by SITEMAP_MAX_URLS."""
+        service = SEOService(test_db, base_url="https://example.com")
+        with patch("app.services.seo_service.SITEMAP_MAX_URLS", 3):
+            shards = await service.get_sitemap_shards()
+
+        assert [s["shard"] for s in shards] == [0, 1]
+        assert [s["count"] for s in shards] == [3, 1]
+        assert shards[0]["first_id"] == sitemap_content[0].id
+        assert shards[1]["first_id"] == sitemap_content[3].id
+        assert shards[0]["lastmod"] is not None
+        no_seo_cache.set.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_get_sitemap_shards_empty(self, test_db: AsyncSession, no_seo_cache):
+        """No published content means no content shards."""
+        service = SEOService(test_db, base_url="https://example.com")
+        assert await service.get_sitemap_shards() == []
+
+    @pytest.mark.asyncio
+    async def test_get_sitemap_shards_cached(self, test_db: AsyncSession, no_seo_cache):
+        """Cached shard metadata is returned without querying."""
+        cached = [{"shard": 0, "first_id": 1, "count": 1, "lastmod": "2026-01-01", "version": "x"}]
+        no_seo_cache.get.return_value = cached
+        service = SEOService(test_db, base_url="https://example.com")
+
+        assert await service.get_sitemap_shards() == cached
+        no_seo_cache.set.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_generate_content_sitemap(self, test_db: AsyncSession, sitemap_content, no_seo_cache):
+        """A content shard contains exactly its slice of published URLs."""
+        service = SEOService(test_db, base_url="https://example.com")
+        with patch("app.services.seo_service.SITEMAP_MAX_URLS", 3):
+            first = (await service.get_content_sitemap(0)).decode()
+            second = (await service.get_content_sitemap(1)).decode()
+            missing = await service.get_content_sitemap(2)
+
+        assert first.startswith('<?xml version="1.0" encoding="UTF-8"?>')
+        assert "<urlset" in first and "</urlset>" in first
+        assert first.count("<loc>") == 3
+        assert "https://example.com/content/sitemap-article-0" in first
+        assert "sitemap-article-3" not in first
+        assert second.count("<loc>") == 1
+        assert "https://example.com/content/sitemap-article-3" in second
+        assert "sitemap-article-4" not in first + second  # draft
+        assert missing is None
+
+    @pytest.mark.asyncio
+    async def test_generate_pages_sitemap(self, test_db: AsyncSession, no_seo_cache):
+        """The pages shard lists static pages."""
+        service = SEOService(test_db, base_url="https://example.com")
+        pages = (await service.get_pages_sitemap()).decode()
+
+        assert "<urlset" in pages
+        assert "<loc>https://example.com/</loc>" in pages
+
+    @pytest.mark.asyncio
+    async def test_generate_sharded_sitemap_index(self, test_db: AsyncSession, sitemap_content, no_seo_cache):
+        """The index lists the pages sitemap and every content shard."""
+        service = SEOService(test_db, base_url="https://example.com")
+        with patch("app.services.seo_service.SITEMAP_MAX_URLS", 3):
+            index = await service.generate_sitemap_index()
+
+        assert "<sitemapindex" in index
+        assert "https://example.com/sitemap-pages.xml" in index
+        assert "https://example.com/sitemap-content-0.xml" in index
+        assert "https://example.com/sitemap-content-1.xml" in index
+        assert "sitemap-content-2.xml" not in index
+        assert index.count("<lastmod>") == 2
+
+    @pytest.mark.asyncio
+    async def test_generate_sitemap_escapes_slugs(self, test_db: AsyncSession, test_user: User, no_seo_cache):
+        """Streamed entries are XML-escaped."""
+        test_db.add(
+            Content(
+                title="Q&A",
+                body="b",
+                slug="q&a",
+                status=ContentStatus.PUBLISHED,
+                author_id=test_user.id,
+            )
+        )
+        await test_db.commit()
+
+        service = SEOService(test_db, base_url="https://example.com")
+        sitemap = await service.generate_sitemap()
+
+        assert "/content/q&amp;a" in sitemap
+
+
+class TestFeedCaching:
+    """Tests for cached feeds and conditional GET."""
+
+    @pytest.mark.asyncio
+    async def test_get_feed_renders_and_caches(self, test_db: AsyncSession, sitemap_content, no_seo_cache):
+        """A cache miss renders bytes and stores body plus validators."""
+        service = SEOService(test_db, base_url="https://example.com")
+        feed = await service.get_feed("rss", limit=10)
+
+        assert isinstance(feed, RenderedFeed)
+        assert b"<rss" in feed.body
+        assert feed.body.count(b"<item>") == 4
+        assert feed.etag.startswith('"') and feed.etag.endswith('"')
+        assert feed.last_modified.endswith("GMT")
+
+        no_seo_cache.set.assert_awaited_once()
+        key, payload, _ttl = no_seo_cache.set.await_args.args
+        assert key.startswith("cache:feed:https://example.com:rss:")
+        assert payload["etag"] == feed.etag
+
+    @pytest.mark.asyncio
+    async def test_get_feed_cache_hit_skips_database(self, no_seo_cache):
+        """A cached feed is returned without touching the session."""
+        no_seo_cache.get.return_value = {"body": "<rss/>", "etag": '"abc"', "last_modified": "x"}
+        db = AsyncMock()
+        service = SEOService(db, base_url="https://example.com")
+
+        feed = await service.get_feed("atom", category_id=1)
+
+        assert feed == RenderedFeed(b"<rss/>", '"abc"', "x")
+        db.execute.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_feed_etag_stable_until_content_changes(self, test_db: AsyncSession, sitemap_content, no_seo_cache):
+        """Re-rendering unchanged content yields identical bytes and ETag."""
+        service = SEOService(test_db, base_url="https://example.com")
+        first = await service.get_feed("atom")
+        second = await service.get_feed("atom")
+        assert first == second
+
+        sitemap_content[0].title = "Edited"
+        await test_db.commit()
+
+        third = await service.get_feed("atom")
+        assert third.etag != first.etag
+
+    @pytest.mark.asyncio
+    async def test_author_feed(self, test_db: AsyncSession, sitemap_content, test_user: User, no_seo_cache):
+        """Author feeds contain only that author's published content."""
+        service = SEOService(test_db, base_url="https://example.com")
+
+        own = await service.get_feed("rss", author_id=test_user.id)
+        other = await service.get_feed("rss", author_id=test_user.id + 1000)
+
+        assert own.body.count(b"<item>") == 4
+        assert b"/feed/author/" in own.body
+        assert b"<item>" not in other.body
+
+    def _request(self, **headers) -> Request:
+        raw = [(k.replace("_", "-").encode(), v.encode()) for k, v in headers.items()]
+        return Request({"type": "http", "method": "GET", "path": "/feed.xml", "headers": raw})
+
+    def test_feed_response_if_none_match(self):
+        """A matching If-None-Match returns 304 with validators and no body."""
+        feed = RenderedFeed(b"<rss/>", '"abc"', "Mon, 05 Jan 2026 10:00:00 GMT")
+
+        response = _feed_response(self._request(if_none_match='W/"abc"'), feed, "application/rss+xml")
+        assert response.status_code == 304
+        assert response.body == b""
+        assert response.headers["etag"] == '"abc"'
+
+        response = _feed_response(self._request(if_none_match='"other"'), feed, "application/rss+xml")
+        assert response.status_code == 200
+        assert response.body == b"<rss/>"
+        assert response.headers["last-modified"] == feed.last_modified
+
+    def test_feed_response_if_modified_since(self):
+        """If-Modified-Since at or after the newest item returns 304."""
+        feed = RenderedFeed(b"<rss/>", '"abc"', "Mon, 05 Jan 2026 10:00:00 GMT")
+
+        same = _feed_response(
+            self._request(if_modified_since="Mon, 05 Jan 2026 10:00:00 GMT"), feed, "application/rss+xml"
+        )
+        older = _feed_response(
+            self._request(if_modified_since="Sun, 04 Jan 2026 10:00:00 GMT"), feed, "application/rss+xml"
+        )
+        invalid = _feed_response(self._request(if_modified_since="garbage"), feed, "application/rss+xml")
+
+        assert same.status_code == 304
+        assert older.status_code == 200
+        assert invalid.status_code == 200
+
+
 class TestSEORoutes:
     """Tests for SEO API routes."""
 
@@ -170,7 +394,9 @@ class TestSEORoutes:
 
         content = response.text
         assert '<?xml version="1.0" encoding="UTF-8"?>' in content
-        assert "<urlset" in content
+        assert "<sitemapindex" in content
+        assert "/sitemap-pages.xml" in content
+        assert "/sitemap-content-0.xml" in content
 
     def test_get_robots_txt(self, client):
         """Test getting robots.txt via API."""
@@ -213,6 +439,19 @@ class TestSEORoutes:
         assert response.status_code == 200
         assert "application/rss+xml" in response.headers["content-type"]
 
+    @pytest.mark.asyncio
+    async def test_get_content_sitemap_not_found(self, test_db: AsyncSession, sitemap_content, no_seo_cache):
+        """Out-of-range content shards return 404."""
+        request = Request(
+            {"type": "http", "method": "GET", "path": "/", "headers": [], "scheme": "http", "server": ("test", 80)}
+        )
+
+        response = await get_content_sitemap(0, request, db=test_db)
+        assert response.status_code == 200
+        with pytest.raises(HTTPException) as exc_info:
+            await get_content_sitemap(999, request, db=test_db)
+        assert exc_info.value.status_code == 404
+
     def test_sitemap_caching_headers(self, client):
         """Test that sitemap has caching headers."""
         response = client.get("/sitemap.xml")
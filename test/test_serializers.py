@@ -0,0 +1,127 @@
+"""
+Tests for the fast JSON serialization layer.
+"""
+
+import json
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.models.content import Content, ContentStatus
+from app.schemas.content import ContentResponse
+from app.schemas.media import MediaResponse
+from app.schemas.user import UserResponse
+from app.utils.field_selector import FieldSelector
+from app.utils.serializers import (
+    CONTENT_SERIALIZER,
+    MEDIA_SERIALIZER,
+    USER_SERIALIZER,
+    FastJSONResponse,
+    SchemaSerializer,
+)
+
+
+def _content(i: int, tz=None) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=i,
+        title=f"Title {i} — ünïcode",
+        body='Body\nwith "quotes" and <tags>',
+        status=ContentStatus.PUBLISHED,
+        created_at=datetime(2026, 1, 2, 3, 4, 5, 123456, tzinfo=tz),
+        updated_at=datetime(2026, 1, 2, 3, 4, 5, tzinfo=tz),
+        author_id=7,
+        view_count=i * 3,
+        comment_count=0,
+    )
+
+
+def _media(i: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=i,
+        filename=f"f{i}.png",
+        original_filename="photo.png",
+        file_path=f"uploads/f{i}.png",
+        file_size=2**40,
+        mime_type="image/png",
+        file_type="image",
+        width=640,
+        height=None,
+        thumbnail_path=None,
+        alt_text="alt",
+        title=None,
+        description=None,
+        tags=["a", "b"],
+        folder_id=None,
+        sizes={"small": "s.png"},
+        uploaded_by=1,
+        uploaded_at=datetime.now(timezone.utc),
+        updated_at=None,
+    )
+
+
+class TestSchemaSerializerParity:
+    """Compiled serializers produce exactly what the Pydantic models produce."""
+
+    @pytest.mark.parametrize("tz", [None, timezone.utc, timezone(timedelta(hours=3))])
+    def test_content(self, tz):
+        rows = [_content(i, tz) for i in range(3)]
+        expected = b"[" + b",".join(ContentResponse.model_validate(r).model_dump_json().encode() for r in rows) + b"]"
+        assert CONTENT_SERIALIZER.dumps(rows) == expected
+
+    def test_media(self):
+        row = _media(1)
+        assert MEDIA_SERIALIZER.dumps(row) == MediaResponse.model_validate(row).model_dump_json().encode()
+
+    def test_media_defaults_for_null_json_columns(self):
+        """NULL list/dict columns fall back to the schema defaults, as validation would."""
+        row = _media(1)
+        row.tags = None
+        row.sizes = None
+        assert MEDIA_SERIALIZER.to_dict(row)["tags"] == []
+        assert MEDIA_SERIALIZER.to_dict(row)["sizes"] == {}
+
+    def test_user_with_source(self):
+        """Per-field sources resolve values that are not plain attributes."""
+        user = SimpleNamespace(id=1, username="ann", email="a@example.com", role=SimpleNamespace(name="admin"))
+        expected = UserResponse(id=1, username="ann", email="a@example.com", role="admin").model_dump_json().encode()
+        assert USER_SERIALIZER.dumps(user) == expected
+
+
+class TestFieldSelection:
+    """Field selection is compiled into the serializer and the SQL column list."""
+
+    def test_selected_fields_only(self):
+        """Only requested fields are read and emitted, in schema order."""
+        row = SimpleNamespace(id=1, title="t")  # no other attributes: reading them would raise
+        assert json.loads(CONTENT_SERIALIZER.dumps([row], {"title", "id", "unknown"})) == [{"id": 1, "title": "t"}]
+
+    def test_plans_are_reused(self):
+        serializer = SchemaSerializer(UserResponse)
+        assert serializer._compile({"id"}) is serializer._compile(["id"])
+
+    def test_columns_pushdown(self):
+        """Requested names map to mapped columns; id is always loaded; non-columns are dropped."""
+        columns = FieldSelector(fields="title,author,view_count").columns(Content)
+        assert [c.key for c in columns] == ["id", "title", "view_count"]
+        assert FieldSelector(fields=None).columns(Content) is None
+
+    def test_pydantic_items_filtered_while_dumping(self):
+        model = UserResponse(id=1, username="ann", email="a@example.com", role="admin")
+        assert FieldSelector(fields="id,role").apply(model) == {"id": 1, "role": "admin"}
+
+
+class TestFastJSONResponse:
+    """Tests for the orjson-backed response class."""
+
+    def test_renders_like_pydantic(self):
+        payload = {
+            "when": datetime(2026, 1, 1, tzinfo=timezone.utc),
+            "model": UserResponse(id=1, username="a", email="e", role="r"),
+        }
+        body = FastJSONResponse(payload).body
+        assert json.loads(body) == {
+            "when": "2026-01-01T00:00:00Z",
+            "model": {"id": 1, "username": "a", "email": "e", "role": "r"},
+        }
+        assert FastJSONResponse({"a": 1}).media_type == "application/json"
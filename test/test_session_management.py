@@ -5,20 +5,38 @@ Tests session creation, retrieval, validation, and deletion.
 Note: These tests require a running Redis instance or use fakeredis.
 """
 
+import json
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from app.utils import session as session_module
 from app.utils.session import RedisSessionManager
 
 
 @pytest.fixture
 def mock_redis():
-    """Create a mock Redis client"""
+    """Create a mock Redis client with a pipeline and Lua scripts"""
     mock = AsyncMock()
+    # Pipeline commands are buffered (sync) and sent by execute()
+    pipe = MagicMock()
+    pipe.execute = AsyncMock()
+    pipe.__aenter__ = AsyncMock(return_value=pipe)
+    pipe.__aexit__ = AsyncMock(return_value=False)
+    mock.pipeline = MagicMock(return_value=pipe)
+    mock.pipe = pipe
+    # One AsyncMock per script, keyed by its module-level name
+    mock.scripts = {name: AsyncMock() for name in ("_GET_AND_TOUCH",)}
+    mock.register_script = MagicMock(
+        side_effect=lambda source: next(
+            script for name, script in mock.scripts.items() if getattr(session_module, name) == source
+        )
+    )
+    mock.mget = AsyncMock()
     mock.ping = AsyncMock()
     mock.setex = AsyncMock()
     mock.get = AsyncMock()
+    mock.getdel = AsyncMock()
     mock.exists = AsyncMock()
     mock.delete = AsyncMock()
     mock.sadd = AsyncMock()
@@ -58,9 +76,11 @@ class TestSessionCreation:
         """Test that session stores correct user data"""
         await session_manager.create_session(user_id=1, user_email="test@example.com", user_role="user")
 
-        # Verify setex was called with session data
-        mock_redis.setex.assert_called_once()
-        call_args = mock_redis.setex.call_args
+        # Verify setex was queued with session data in one transaction
+        mock_redis.pipeline.assert_called_once_with(transaction=True)
+        mock_redis.pipe.execute.assert_awaited_once()
+        mock_redis.pipe.setex.assert_called_once()
+        call_args = mock_redis.pipe.setex.call_args
         session_key = call_args[0][0]
         session_data_json = call_args[0][2]
 
@@ -86,11 +106,12 @@ class TestSessionCreation:
         """Test that session is added to user's session set"""
         await session_manager.create_session(user_id=1, user_email="test@example.com", user_role="user")
 
-        # Verify sadd was called to track the session
-        mock_redis.sadd.assert_called_once()
-        call_args = mock_redis.sadd.call_args
+        # Verify sadd was queued to track the session
+        mock_redis.pipe.sadd.assert_called_once()
+        call_args = mock_redis.pipe.sadd.call_args
         user_sessions_key = call_args[0][0]
         assert user_sessions_key == "user_sessions:1"
+        mock_redis.pipe.expire.assert_called_once()
 
 
 class TestSessionRetrieval:
@@ -101,7 +122,7 @@ class TestSessionRetrieval:
         """Test retrieving an existing session"""
         # Mock Redis returning session data
         session_data = '{"user_id": 1, "email": "test@example.com", "role": "user", "created_at": "2024-01-01T00:00:00", "last_activity": "2024-01-01T00:00:00"}'
-        mock_redis.get.return_value = session_data
+        mock_redis.scripts["_GET_AND_TOUCH"].return_value = session_data
 
         result = await session_manager.get_session("test-session-id")
 
@@ -113,7 +134,7 @@ class TestSessionRetrieval:
     @pytest.mark.asyncio
     async def test_get_nonexistent_session(self, session_manager, mock_redis):
         """Test retrieving a session that doesn't exist"""
-        mock_redis.get.return_value = None
+        mock_redis.scripts["_GET_AND_TOUCH"].return_value = None
 
         result = await session_manager.get_session("nonexistent-session")
 
@@ -121,16 +142,35 @@ class TestSessionRetrieval:
 
     @pytest.mark.asyncio
     async def test_get_session_updates_last_activity(self, session_manager, mock_redis):
-        """Test that getting a session updates last_activity timestamp"""
+        """Test that getting a session updates last_activity timestamp in the same round-trip"""
         session_data = '{"user_id": 1, "email": "test@example.com", "role": "user", "created_at": "2024-01-01T00:00:00", "last_activity": "2024-01-01T00:00:00"}'
-        mock_redis.get.return_value = session_data
+        script = mock_redis.scripts["_GET_AND_TOUCH"]
+        script.return_value = session_data
 
         result = await session_manager.get_session("test-session-id")
 
         assert result is not None
         assert "last_activity" in result
-        # Verify setex was called to update the session
-        mock_redis.setex.assert_called_once()
+        # One script call reads and touches the session; no separate GET/SETEX
+        script.assert_awaited_once()
+        assert script.call_args.kwargs["keys"] == ["session:test-session-id"]
+        last_activity, ttl, prefix = script.call_args.kwargs["args"]
+        assert last_activity > "2024-01-01T00:00:00"
+        assert prefix == "user_sessions:"
+        mock_redis.get.assert_not_called()
+        mock_redis.setex.assert_not_called()
+        mock_redis.expire.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_scripts_registered_once(self, session_manager, mock_redis):
+        """Test that each Lua script is registered once and reused"""
+        mock_redis.scripts["_GET_AND_TOUCH"].return_value = None
+
+        await session_manager.get_session("a")
+        await session_manager.get_session("b")
+
+        assert mock_redis.register_script.call_count == 1
+        assert mock_redis.scripts["_GET_AND_TOUCH"].await_count == 2
 
     @pytest.mark.asyncio
     async def test_validate_existing_session(self, session_manager, mock_redis):
@@ -157,39 +197,42 @@ class TestSessionDeletion:
     @pytest.mark.asyncio
     async def test_delete_existing_session(self, session_manager, mock_redis):
         """Test deleting an existing session"""
-        # Mock getting session data first
-        session_data = '{"user_id": 1, "email": "test@example.com"}'
-        mock_redis.get.return_value = session_data
-        mock_redis.delete.return_value = 1
+        mock_redis.getdel.return_value = '{"user_id": 1}'
 
         deleted = await session_manager.delete_session("test-session-id")
 
         assert deleted is True
-        mock_redis.delete.assert_called()
-        mock_redis.srem.assert_called_once()
+        mock_redis.getdel.assert_awaited_once_with("session:test-session-id")
+        mock_redis.srem.assert_awaited_once_with("user_sessions:1", "test-session-id")
+        # Deleting does not touch the session first
+        mock_redis.scripts["_GET_AND_TOUCH"].assert_not_called()
 
     @pytest.mark.asyncio
     async def test_delete_nonexistent_session(self, session_manager, mock_redis):
         """Test deleting a session that doesn't exist"""
-        mock_redis.get.return_value = None
-        mock_redis.delete.return_value = 0
+        mock_redis.getdel.return_value = None
 
         deleted = await session_manager.delete_session("nonexistent-session")
 
         assert deleted is False
+        mock_redis.srem.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_delete_all_user_sessions(self, session_manager, mock_redis):
         """Test deleting all sessions for a user"""
-        # Mock user has 3 sessions
-        mock_redis.smembers.return_value = ["session1", "session2", "session3"]
-        mock_redis.delete.return_value = 1
+        mock_redis.smembers.return_value = ["s1", "s2", "s3", "s4"]
+        # 3 of the 4 tracked sessions were still live
+        mock_redis.pipe.execute.return_value = [3, 4]
 
         count = await session_manager.delete_all_user_sessions(user_id=1)
 
         assert count == 3
-        # Should delete each session + the user sessions set
-        assert mock_redis.delete.call_count == 4
+        # One transaction regardless of how many sessions the user has
+        mock_redis.pipeline.assert_called_once_with(transaction=True)
+        mock_redis.pipe.delete.assert_called_once_with("session:s1", "session:s2", "session:s3", "session:s4")
+        # Only the ids read are removed, so a session created meanwhile stays tracked
+        mock_redis.pipe.srem.assert_called_once_with("user_sessions:1", "s1", "s2", "s3", "s4")
+        mock_redis.delete.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_delete_all_user_sessions_no_sessions(self, session_manager, mock_redis):
@@ -199,6 +242,41 @@ class TestSessionDeletion:
         count = await session_manager.delete_all_user_sessions(user_id=1)
 
         assert count == 0
+        mock_redis.pipeline.assert_not_called()
+
+
+class TestTouchScript:
+    """Run the touch script against a Lua-capable fake Redis"""
+
+    @pytest.mark.asyncio
+    async def test_touch_preserves_session_data(self):
+        """Empty arrays survive a touch; only last_activity changes"""
+        fakeredis = pytest.importorskip("fakeredis")
+        pytest.importorskip("lupa")
+        manager = RedisSessionManager()
+        manager._redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+
+        session_id = await manager.create_session(1, "test@example.com", "user", {"scopes": [], "prefs": {}})
+        stored = await manager._redis.get(f"session:{session_id}")
+        session = await manager.get_session(session_id)
+
+        assert session["scopes"] == [] and session["prefs"] == {}
+        assert session["last_activity"] > json.loads(stored)["last_activity"]
+        assert await manager._redis.ttl("user_sessions:1") > 0
+
+    @pytest.mark.asyncio
+    async def test_touch_slides_user_session_set(self):
+        """The user's session set outlives its original TTL while the session is used"""
+        fakeredis = pytest.importorskip("fakeredis")
+        pytest.importorskip("lupa")
+        manager = RedisSessionManager()
+        manager._redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+
+        session_id = await manager.create_session(1, "test@example.com", "user")
+        await manager._redis.expire("user_sessions:1", 10)
+        await manager.get_session(session_id)
+
+        assert await manager._redis.ttl("user_sessions:1") > 10
 
 
 class TestActiveSessions:
@@ -210,29 +288,40 @@ class TestActiveSessions:
         # Mock user has 2 sessions
         mock_redis.smembers.return_value = {"session1", "session2"}
         session_data = '{"user_id": 1, "email": "test@example.com", "role": "user"}'
-        mock_redis.get.return_value = session_data
+        mock_redis.mget.return_value = [session_data, session_data]
 
         sessions = await session_manager.get_active_sessions(user_id=1)
 
         assert len(sessions) == 2
         assert all("session_id" in s for s in sessions)
         assert all("user_id" in s for s in sessions)
+        # One MGET; listing sessions does not touch them
+        mock_redis.mget.assert_awaited_once()
+        mock_redis.get.assert_not_called()
+        mock_redis.srem.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_get_active_sessions_filters_expired(self, session_manager, mock_redis):
-        """Test that get_active_sessions filters out expired sessions"""
-        mock_redis.smembers.return_value = {"session1", "session2", "session3"}
+        """Test that get_active_sessions filters out and trims expired sessions"""
+        mock_redis.smembers.return_value = ["session1", "session2", "session3"]
 
-        # First call returns data, second returns None (expired), third returns data
-        mock_redis.get.side_effect = [
-            '{"user_id": 1}',  # session1 exists
-            None,  # session2 expired
-            '{"user_id": 1}',  # session3 exists
-        ]
+        # session2 has expired
+        mock_redis.mget.return_value = ['{"user_id": 1}', None, '{"user_id": 1}']
 
         sessions = await session_manager.get_active_sessions(user_id=1)
 
-        assert len(sessions) == 2
+        assert [s["session_id"] for s in sessions] == ["session1", "session3"]
+        mock_redis.mget.assert_awaited_once_with(["session:session1", "session:session2", "session:session3"])
+        # The expired id is removed from the user's set
+        mock_redis.srem.assert_awaited_once_with("user_sessions:1", "session2")
+
+    @pytest.mark.asyncio
+    async def test_get_active_sessions_none(self, session_manager, mock_redis):
+        """Test that a user without sessions costs a single SMEMBERS"""
+        mock_redis.smembers.return_value = set()
+
+        assert await session_manager.get_active_sessions(user_id=1) == []
+        mock_redis.mget.assert_not_called()
 
 
 class TestSessionExpiration:
@@ -303,22 +392,19 @@ class TestErrorHandling:
     @pytest.mark.asyncio
     async def test_get_session_handles_json_decode_error(self, session_manager, mock_redis):
         """Test handling of invalid JSON in session data"""
-        mock_redis.get.return_value = "invalid json{"
+        # The script hands back undecodable data untouched
+        mock_redis.scripts["_GET_AND_TOUCH"].return_value = "invalid json{"
 
         result = await session_manager.get_session("test-session-id")
 
         assert result is None
 
     @pytest.mark.asyncio
-    async def test_create_session_requires_redis_connection(self):
+    async def test_create_session_requires_redis_connection(self, mock_redis):
         """Test that create_session connects to Redis if not connected"""
         manager = RedisSessionManager()
 
         with patch.object(manager, "connect", new_callable=AsyncMock) as mock_connect:
-            mock_redis = AsyncMock()
-            mock_redis.setex = AsyncMock()
-            mock_redis.sadd = AsyncMock()
-            mock_redis.expire = AsyncMock()
             manager._redis = mock_redis
 
             await manager.create_session(user_id=1, user_email="test@example.com", user_role="user")
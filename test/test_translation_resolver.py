@@ -0,0 +1,143 @@
+"""
+Tests for batched locale resolution of translated content.
+"""
+
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.i18n.locale import locale_chain
+from app.models.content import Content, ContentStatus
+from app.models.content_translation import ContentTranslation, TranslationStatus
+from app.models.user import User
+from app.services.translation_service import (
+    get_content_in_locale,
+    publish_translation,
+    resolve_translations,
+)
+
+
+async def _content(db: AsyncSession, user: User, slug: str, translations: dict[str, str]) -> Content:
+    """Create content with translations; locales prefixed with "~" stay drafts."""
+    content = Content(title=slug, body=slug, slug=slug, status=ContentStatus.PUBLISHED, author_id=user.id)
+    db.add(content)
+    await db.flush()
+    for code, title in translations.items():
+        draft = code.startswith("~")
+        db.add(
+            ContentTranslation(
+                content_id=content.id,
+                locale=code.lstrip("~"),
+                title=title,
+                body=title,
+                slug=f"{slug}-{code.lstrip('~')}",
+                status=(TranslationStatus.draft if draft else TranslationStatus.published).value,
+                # The columns are naive; the model's default is aware
+                created_at=datetime.utcnow(),
+                updated_at=datetime.utcnow(),
+            )
+        )
+    await db.commit()
+    return content
+
+
+class _QueryCounter:
+    def __init__(self, db: AsyncSession):
+        self.engine = db.bind.sync_engine
+        self.count = 0
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._count)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._count)
+
+    def _count(self, *args):
+        self.count += 1
+
+
+class TestLocaleChain:
+    def test_exact_base_fallback(self):
+        assert locale_chain("fr-CA", "en") == ["fr-CA", "fr", "en"]
+
+    def test_duplicates_removed(self):
+        assert locale_chain("en", "en") == ["en"]
+        assert locale_chain("en-GB", "en") == ["en-GB", "en"]
+
+
+class TestResolveTranslations:
+    """One query resolves a listing; results are cached until a translation is published."""
+
+    @pytest.mark.asyncio
+    async def test_fallback_order_in_one_query(self, test_db: AsyncSession, test_user: User):
+        exact = await _content(test_db, test_user, "exact", {"fr-CA": "Québécois", "fr": "Français", "en": "English"})
+        base = await _content(test_db, test_user, "base", {"fr": "Français", "en": "English"})
+        fallback = await _content(test_db, test_user, "fallback", {"~fr": "Brouillon", "en": "English"})
+        missing = await _content(test_db, test_user, "missing", {"de": "Deutsch"})
+        ids = [exact.id, base.id, fallback.id, missing.id]
+
+        with _QueryCounter(test_db) as queries:
+            resolved = await resolve_translations(ids, "fr-CA", "en", test_db)
+        assert queries.count == 1
+        assert {cid: t.locale for cid, t in resolved.items()} == {exact.id: "fr-CA", base.id: "fr", fallback.id: "en"}
+        assert resolved[exact.id].title == "Québécois"
+
+        with _QueryCounter(test_db) as queries:
+            assert await resolve_translations(ids, "fr-CA", "en", test_db) == resolved
+        assert queries.count == 0
+
+    @pytest.mark.asyncio
+    async def test_matches_single_item_lookup(self, test_db: AsyncSession, test_user: User):
+        content = await _content(test_db, test_user, "single", {"fr": "Français", "en": "English"})
+
+        single = await get_content_in_locale(content.id, "fr-BE", "en", test_db)
+        batched = await resolve_translations([content.id], "fr-BE", "en", test_db)
+
+        assert single.locale == "fr"
+        assert batched[content.id].translation_id == single.id
+
+    @pytest.mark.asyncio
+    async def test_publish_invalidates(self, test_db: AsyncSession, test_user: User, fresh_translation_cache):
+        content = await _content(test_db, test_user, "pending", {"~fr": "Français", "en": "English"})
+        other = await _content(test_db, test_user, "other", {"fr": "Français"})
+        await resolve_translations([content.id, other.id], "fr", "en", test_db)
+        chain = ("fr", "en")
+
+        with (
+            patch("app.services.translation_service.get_translation", AsyncMock(return_value=MagicMock())),
+            patch("app.utils.cache_bus.cache_manager.get_client", AsyncMock(return_value=None)),
+        ):
+            await publish_translation(content.id, "fr", test_user.id, AsyncMock())
+
+        assert fresh_translation_cache.get(content.id, chain) == (False, None)
+        assert fresh_translation_cache.get(other.id, chain)[0] is True
+
+    @pytest.mark.asyncio
+    async def test_invalidation_during_query_not_cached(
+        self, test_db: AsyncSession, test_user: User, fresh_translation_cache
+    ):
+        """A result that raced an invalidation is returned but not stored; bodies are never read."""
+        content = await _content(test_db, test_user, "racing", {"fr": "Français"})
+        statements = []
+
+        def publish_elsewhere(conn, cursor, statement, *args):
+            statements.append(statement)
+            fresh_translation_cache.invalidate(str(content.id))
+
+        engine = test_db.bind.sync_engine
+        event.listen(engine, "before_cursor_execute", publish_elsewhere)
+        try:
+            resolved = await resolve_translations([content.id], "fr", "en", test_db)
+        finally:
+            event.remove(engine, "before_cursor_execute", publish_elsewhere)
+
+        assert resolved[content.id].title == "Français"
+        assert fresh_translation_cache.get(content.id, ("fr", "en")) == (False, None)
+        assert "body" not in statements[0]
+
+        await resolve_translations([content.id], "fr", "en", test_db)
+        assert fresh_translation_cache.get(content.id, ("fr", "en"))[0] is True
@@ -2,10 +2,17 @@
 Tests for Workflow functionality.
 """
 
+from unittest.mock import MagicMock
+
 import pytest
 from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.workflow import WorkflowState, WorkflowTransition, WorkflowType
+from app.models.content import Content, ContentStatus
+from app.models.user import User
+from app.models.workflow import WorkflowApproval, WorkflowState, WorkflowTransition, WorkflowType
+from app.services.workflow_service import WorkflowService
 from main import app
 
 
@@ -176,3 +183,75 @@ class TestWorkflowRoutes:
             response = await client.get("/api/v1/workflow/approvals/pending")
 
         assert response.status_code == 401
+
+
+def _user(role_name: str, user_id: int) -> MagicMock:
+    user = MagicMock()
+    user.id = user_id
+    user.role.name = role_name
+    return user
+
+
+class TestCompiledWorkflow:
+    """Definitions come from the compiled graph; a page of content costs two queries."""
+
+    @pytest.fixture
+    async def workflow(self, test_db: AsyncSession, test_user: User):
+        service = WorkflowService(test_db)
+        ids = {}
+        for order, name in enumerate(("draft", "pending", "published"), start=1):
+            ids[name] = (await service.create_state(name, name.title(), is_initial=order == 1, order=order))["id"]
+        submit = await service.create_transition("Submit", ids["draft"], ids["pending"])
+        publish = await service.create_transition(
+            "Publish", ids["pending"], ids["published"], required_roles=["manager"], requires_approval=True
+        )
+        contents = [
+            Content(title=f"c{i}", body="b", slug=f"c{i}", status=status, author_id=test_user.id)
+            for i, status in enumerate((ContentStatus.DRAFT, ContentStatus.PENDING, ContentStatus.PENDING))
+        ]
+        test_db.add_all(contents)
+        await test_db.flush()
+        test_db.add(WorkflowApproval(content_id=contents[1].id, transition_id=publish["id"], approver_id=test_user.id))
+        await test_db.commit()
+        return service, submit, publish, [c.id for c in contents]
+
+    @pytest.mark.asyncio
+    async def test_batched_listing(self, test_db: AsyncSession, workflow):
+        service, submit, publish, (draft_id, pending_id, other_id) = workflow
+        await service.get_states()  # compile the graph
+
+        queries = []
+
+        def count(*args):
+            queries.append(args[2])
+
+        engine = test_db.bind.sync_engine
+        event.listen(engine, "before_cursor_execute", count)
+        try:
+            available = await service.get_available_transitions_for_contents(
+                [draft_id, pending_id, other_id, 999999], _user("manager", 1)
+            )
+        finally:
+            event.remove(engine, "before_cursor_execute", count)
+        assert len(queries) == 2
+
+        assert [t["id"] for t in available[draft_id]] == [submit["id"]]
+        assert available[pending_id][0]["approval_status"] == {"approved": 0, "rejected": 0, "pending": 1}
+        assert available[other_id][0]["approval_status"] == {"approved": 0, "rejected": 0, "pending": 0}
+        assert 999999 not in available
+
+        # Role filtering matches the single-item call
+        assert await service.get_available_transitions(pending_id, _user("editor", 1)) == []
+
+    @pytest.mark.asyncio
+    async def test_graph_recompiled_after_change(self, workflow):
+        service, submit, publish, _ = workflow
+        assert len(await service.get_transitions()) == 2
+
+        states = {s["name"]: s["id"] for s in await service.get_states()}
+        await service.create_transition("Withdraw", states["pending"], states["draft"])
+
+        assert [t["name"] for t in await service.get_transitions(from_state_id=states["pending"])] == [
+            "Publish",
+            "Withdraw",
+        ]